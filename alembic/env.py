@@ -11,6 +11,9 @@ from backend.core.database import Base
 import backend.models.user  # noqa: F401
 import backend.models.service  # noqa: F401
 import backend.models.operation  # noqa: F401
+import backend.models.stats  # noqa: F401
+import backend.models.idempotency  # noqa: F401
+import backend.models.purge  # noqa: F401
 
 config = context.config
 fileConfig(config.config_file_name)
@@ -0,0 +1,25 @@
+"""add_client_ref_to_session_check_ins
+
+Revision ID: a1b2c3d4e5f6
+Revises: 2a6a8b95f400
+Create Date: 2026-10-17 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a1b2c3d4e5f6'
+down_revision = '2a6a8b95f400'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Client-generated id for offline-queued check-ins (batch ingest dedupe)
+    op.add_column('session_check_ins', sa.Column('client_ref', sa.String(64), nullable=True))
+    op.create_index('ix_session_check_ins_client_ref', 'session_check_ins', ['client_ref'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_check_ins_client_ref', table_name='session_check_ins')
+    op.drop_column('session_check_ins', 'client_ref')
@@ -0,0 +1,31 @@
+"""add_occupancy_counters_to_class_events
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('class_events', sa.Column('booked_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('class_events', sa.Column('checked_in_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the child tables
+    op.execute("""
+        UPDATE class_events SET
+            booked_count = (SELECT COUNT(*) FROM bookings b WHERE b.event_id = class_events.id),
+            checked_in_count = (SELECT COUNT(*) FROM session_check_ins c WHERE c.event_id = class_events.id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('class_events', 'checked_in_count')
+    op.drop_column('class_events', 'booked_count')
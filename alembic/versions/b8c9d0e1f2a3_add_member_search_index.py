@@ -0,0 +1,124 @@
+"""add_member_search_index
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17 18:00:00.000000
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.String),
+    sa.column('first_name', sa.String),
+    sa.column('last_name', sa.String),
+    sa.column('email', sa.String),
+    sa.column('phone_number', sa.String),
+    sa.column('search_text', sa.String),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+
+# Trigram FTS5 index over users.search_text, synced by triggers (same as backend/models/user.py)
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "search_text, content='users', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF search_text ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); "
+    "INSERT INTO users_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+)
+
+# Folding rules as of this revision (frozen copy of backend/services/member_search.py);
+# later rule changes re-fold through backend/scripts/rebuild_member_search.py
+_TURKISH_FOLD = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s",
+    "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c",
+    "Ö": "o", "ö": "o",
+    "Ü": "u", "ü": "u",
+})
+
+
+def _fold(value):
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.translate(_TURKISH_FOLD))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def _search_text(first_name, last_name, email, phone_number) -> str:
+    digits = "".join(c for c in phone_number or "" if c.isdigit())
+    return " ".join(part for part in (_fold(first_name), _fold(last_name), _fold(email), digits) if part)
+
+
+def _backfill(bind) -> None:
+    """Fill search_text for existing users in id-ordered batches, keeping updated_at."""
+    statement = (
+        sa.update(users)
+        .where(users.c.id == sa.bindparam('b_id'))
+        .values(search_text=sa.bindparam('b_search_text'), updated_at=users.c.updated_at)
+    )
+    last_id = None
+    while True:
+        query = (
+            sa.select(users.c.id, users.c.first_name, users.c.last_name, users.c.email, users.c.phone_number)
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(users.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        bind.execute(statement, [
+            {'b_id': row.id, 'b_search_text': _search_text(row.first_name, row.last_name, row.email, row.phone_number)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('search_text', sa.String(length=1024), nullable=True))
+    # Before the index and triggers exist, so each row is indexed once
+    _backfill(op.get_bind())
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_users_search_text_trgm',
+            'users',
+            ['search_text'],
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_users_search_text_trgm', table_name='users')
+    elif dialect == 'sqlite':
+        for trigger in ('users_fts_ai', 'users_fts_ad', 'users_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_fts')
+    op.drop_column('users', 'search_text')
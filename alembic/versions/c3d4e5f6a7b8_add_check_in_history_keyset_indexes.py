@@ -0,0 +1,25 @@
+"""add_check_in_history_keyset_indexes
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-17 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite indexes backing keyset pagination of /checkin/history/page
+    op.create_index('ix_session_check_ins_time_id', 'session_check_ins', ['check_in_time', 'id'])
+    op.create_index('ix_session_check_ins_member_time_id', 'session_check_ins', ['member_user_id', 'check_in_time', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_check_ins_member_time_id', table_name='session_check_ins')
+    op.drop_index('ix_session_check_ins_time_id', table_name='session_check_ins')
@@ -0,0 +1,42 @@
+"""add_member_purge_jobs
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 19:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'member_purge_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('current_step', sa.String(length=40), nullable=True),
+        sa.Column('deleted_rows', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('batches', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_member_purge_jobs_user_id', 'member_purge_jobs', ['user_id'])
+    # Scheduler sweep: pending, stalled and failed jobs
+    op.create_index('ix_member_purge_jobs_status_updated_at', 'member_purge_jobs', ['status', 'updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_member_purge_jobs_status_updated_at', table_name='member_purge_jobs')
+    op.drop_index('ix_member_purge_jobs_user_id', table_name='member_purge_jobs')
+    op.drop_table('member_purge_jobs')
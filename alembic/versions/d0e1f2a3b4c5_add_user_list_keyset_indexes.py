@@ -0,0 +1,25 @@
+"""add_user_list_keyset_indexes
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17 20:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of the member/staff lists: (updated_at, id)
+    op.create_index('ix_users_updated_at_id', 'users', ['updated_at', 'id'])
+    # Role filter of the lists and their totals
+    op.create_index('ix_user_roles_role_id_user_id', 'user_roles', ['role_id', 'user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_roles_role_id_user_id', table_name='user_roles')
+    op.drop_index('ix_users_updated_at_id', table_name='users')
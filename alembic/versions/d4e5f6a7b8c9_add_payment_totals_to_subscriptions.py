@@ -0,0 +1,35 @@
+"""add_payment_totals_to_subscriptions
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-17 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('subscriptions', sa.Column('paid_total', sa.DECIMAL(10, 2), nullable=False, server_default='0'))
+    op.add_column('subscriptions', sa.Column('balance', sa.DECIMAL(10, 2), nullable=False, server_default='0'))
+
+    # Backfill from existing payments
+    op.execute("""
+        UPDATE subscriptions SET paid_total = COALESCE(
+            (SELECT SUM(p.amount_paid) FROM payments p WHERE p.subscription_id = subscriptions.id), 0
+        )
+    """)
+    op.execute("UPDATE subscriptions SET balance = purchase_price - paid_total")
+
+    op.create_index('ix_subscriptions_balance', 'subscriptions', ['balance'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subscriptions_balance', table_name='subscriptions')
+    op.drop_column('subscriptions', 'balance')
+    op.drop_column('subscriptions', 'paid_total')
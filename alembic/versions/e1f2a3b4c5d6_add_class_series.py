@@ -0,0 +1,75 @@
+"""add_class_series
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-17 21:00:00.000000
+
+Existing weekly rows are folded into series by
+backend/scripts/fold_class_series.py after this migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'class_series',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('subscription_id', sa.String(length=36), nullable=True),
+        sa.Column('template_id', sa.String(length=36), nullable=False),
+        sa.Column('instructor_user_id', sa.String(length=36), nullable=False),
+        sa.Column('weekdays', sa.String(length=20), nullable=False),
+        sa.Column('interval_weeks', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), server_default='60', nullable=False),
+        sa.Column('starts_on', sa.Date(), nullable=False),
+        sa.Column('ends_on', sa.Date(), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['template_id'], ['class_templates.id']),
+        sa.ForeignKeyConstraint(['instructor_user_id'], ['instructors.user_id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_class_series_subscription_id', 'class_series', ['subscription_id'])
+    # Range expansion: series overlapping the requested days
+    op.create_index('ix_class_series_starts_on_ends_on', 'class_series', ['starts_on', 'ends_on'])
+
+    op.create_table(
+        'class_series_exceptions',
+        sa.Column('series_id', sa.String(length=36), nullable=False),
+        sa.Column('occurrence_date', sa.Date(), nullable=False),
+        sa.Column('is_cancelled', sa.Boolean(), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['series_id'], ['class_series.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('series_id', 'occurrence_date'),
+    )
+
+    op.add_column('class_events', sa.Column('series_id', sa.String(length=36), nullable=True))
+    op.add_column('class_events', sa.Column('occurrence_date', sa.Date(), nullable=True))
+    op.create_foreign_key(
+        'fk_class_events_series_id', 'class_events', 'class_series', ['series_id'], ['id'], ondelete='CASCADE'
+    )
+    # One row per materialized occurrence; also serves the materialized lookups
+    op.create_unique_constraint(
+        'uq_class_events_series_occurrence', 'class_events', ['series_id', 'occurrence_date']
+    )
+
+
+def downgrade() -> None:
+    # Occurrences that were only expanded from a series are lost
+    op.drop_constraint('uq_class_events_series_occurrence', 'class_events', type_='unique')
+    op.drop_constraint('fk_class_events_series_id', 'class_events', type_='foreignkey')
+    op.drop_column('class_events', 'occurrence_date')
+    op.drop_column('class_events', 'series_id')
+    op.drop_table('class_series_exceptions')
+    op.drop_index('ix_class_series_starts_on_ends_on', table_name='class_series')
+    op.drop_index('ix_class_series_subscription_id', table_name='class_series')
+    op.drop_table('class_series')
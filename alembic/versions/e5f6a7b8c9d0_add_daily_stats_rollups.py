@@ -0,0 +1,118 @@
+"""add_daily_stats_rollups
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17 15:00:00.000000
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+# Business days are Turkey-local (frozen here rather than read from app settings)
+BUSINESS_TIMEZONE = ZoneInfo('Europe/Istanbul')
+
+BATCH_SIZE = 5000
+
+payments = sa.table(
+    'payments',
+    sa.column('id', sa.String),
+    sa.column('subscription_id', sa.String),
+    sa.column('amount_paid', sa.Numeric(10, 2)),
+    sa.column('payment_date', sa.DateTime(timezone=True)),
+    sa.column('payment_method', sa.String),
+)
+check_ins = sa.table(
+    'session_check_ins',
+    sa.column('id', sa.String),
+    sa.column('subscription_id', sa.String),
+    sa.column('check_in_time', sa.DateTime(timezone=True)),
+)
+subscriptions = sa.table('subscriptions', sa.column('id', sa.String), sa.column('package_id', sa.String))
+
+
+def _business_day(moment: datetime) -> date:
+    """Turkey-local calendar date of a stored timestamp (naive = UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(BUSINESS_TIMEZONE).date()
+
+
+def _batches(bind, table, *columns):
+    """Rows of `table` (joined to their subscription's package) in id order, BATCH_SIZE at a time."""
+    last_id = None
+    while True:
+        query = (
+            sa.select(table.c.id, subscriptions.c.package_id, *columns)
+            .join(subscriptions, subscriptions.c.id == table.c.subscription_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _backfill(bind, revenue_table, attendance_table) -> None:
+    """Aggregate existing payments and check-ins by business day (as stats_rollups.rebuild_rollups)."""
+    revenue = defaultdict(lambda: [Decimal('0'), 0])
+    for rows in _batches(bind, payments, payments.c.payment_date, payments.c.payment_method, payments.c.amount_paid):
+        for row in rows:
+            bucket = revenue[(_business_day(row.payment_date), row.package_id, row.payment_method)]
+            bucket[0] += row.amount_paid or 0
+            bucket[1] += 1
+
+    attendance = defaultdict(int)
+    for rows in _batches(bind, check_ins, check_ins.c.check_in_time):
+        for row in rows:
+            attendance[(_business_day(row.check_in_time), row.package_id)] += 1
+
+    revenue_rows = [
+        {'day': day, 'package_id': package_id, 'payment_method': method, 'amount_total': total, 'payment_count': n}
+        for (day, package_id, method), (total, n) in revenue.items()
+    ]
+    attendance_rows = [
+        {'day': day, 'package_id': package_id, 'check_in_count': n}
+        for (day, package_id), n in attendance.items()
+    ]
+    for table, rows in ((revenue_table, revenue_rows), (attendance_table, attendance_rows)):
+        for start in range(0, len(rows), BATCH_SIZE):
+            op.bulk_insert(table, rows[start:start + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    revenue_table = op.create_table(
+        'daily_revenue_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('package_id', sa.String(length=36), nullable=False),
+        sa.Column('payment_method', sa.String(length=20), nullable=False),
+        sa.Column('amount_total', sa.DECIMAL(12, 2), nullable=False, server_default='0'),
+        sa.Column('payment_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'package_id', 'payment_method'),
+    )
+    attendance_table = op.create_table(
+        'daily_attendance_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('package_id', sa.String(length=36), nullable=False),
+        sa.Column('check_in_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'package_id'),
+    )
+    _backfill(op.get_bind(), revenue_table, attendance_table)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_attendance_rollups')
+    op.drop_table('daily_revenue_rollups')
@@ -0,0 +1,129 @@
+"""add_check_in_event_unique_index
+
+Revision ID: f3a4b5c6d7e8
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18 09:00:00.000000
+
+Concurrent scans could both pass the NOT EXISTS guard and store two check-ins
+for the same subscription and class. Such duplicates are removed (keeping the
+earliest) and their session/attendance, event and rollup counts given back
+before the unique index is created.
+"""
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f3a4b5c6d7e8'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+# The rollups' business day, as e5f6a7b8c9d0 computed it
+BUSINESS_TIMEZONE = ZoneInfo('Europe/Istanbul')
+
+check_ins = sa.table(
+    'session_check_ins',
+    sa.column('id', sa.String),
+    sa.column('subscription_id', sa.String),
+    sa.column('event_id', sa.String),
+    sa.column('check_in_time', sa.DateTime(timezone=True)),
+)
+subscriptions = sa.table(
+    'subscriptions',
+    sa.column('id', sa.String),
+    sa.column('package_id', sa.String),
+    sa.column('access_type', sa.String),
+    sa.column('used_sessions', sa.Integer),
+    sa.column('attendance_count', sa.Integer),
+)
+class_events = sa.table('class_events', sa.column('id', sa.String), sa.column('checked_in_count', sa.Integer))
+attendance = sa.table(
+    'daily_attendance_rollups',
+    sa.column('day', sa.Date),
+    sa.column('package_id', sa.String),
+    sa.column('check_in_count', sa.Integer),
+)
+
+
+def _business_day(moment: datetime) -> date:
+    """Turkey-local calendar date of a stored timestamp (naive = UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(BUSINESS_TIMEZONE).date()
+
+
+def _remove_duplicates(bind) -> None:
+    earlier = check_ins.alias('earlier')
+    duplicates = bind.execute(
+        sa.select(
+            check_ins.c.id,
+            check_ins.c.subscription_id,
+            check_ins.c.event_id,
+            check_ins.c.check_in_time,
+            subscriptions.c.package_id,
+            subscriptions.c.access_type,
+        )
+        .join(subscriptions, subscriptions.c.id == check_ins.c.subscription_id)
+        .where(
+            check_ins.c.event_id.is_not(None),
+            sa.exists().where(
+                earlier.c.subscription_id == check_ins.c.subscription_id,
+                earlier.c.event_id == check_ins.c.event_id,
+                sa.or_(
+                    earlier.c.check_in_time < check_ins.c.check_in_time,
+                    sa.and_(earlier.c.check_in_time == check_ins.c.check_in_time, earlier.c.id < check_ins.c.id),
+                ),
+            ),
+        )
+    ).all()
+
+    for row in duplicates:
+        bind.execute(sa.delete(check_ins).where(check_ins.c.id == row.id))
+        counter = subscriptions.c.used_sessions if row.access_type == 'SESSION_BASED' else subscriptions.c.attendance_count
+        bind.execute(
+            sa.update(subscriptions)
+            .where(subscriptions.c.id == row.subscription_id, counter > 0)
+            .values({counter.name: counter - 1})
+        )
+        bind.execute(
+            sa.update(attendance)
+            .where(
+                attendance.c.day == _business_day(row.check_in_time),
+                attendance.c.package_id == row.package_id,
+                attendance.c.check_in_count > 0,
+            )
+            .values(check_in_count=attendance.c.check_in_count - 1)
+        )
+
+    event_ids = sorted({row.event_id for row in duplicates})
+    for start in range(0, len(event_ids), 500):
+        chunk = event_ids[start:start + 500]
+        bind.execute(
+            sa.update(class_events)
+            .where(class_events.c.id.in_(chunk))
+            .values(checked_in_count=(
+                sa.select(sa.func.count())
+                .select_from(check_ins)
+                .where(check_ins.c.event_id == class_events.c.id)
+                .scalar_subquery()
+            ))
+        )
+
+
+def upgrade() -> None:
+    _remove_duplicates(op.get_bind())
+    op.create_index(
+        'uq_session_check_ins_subscription_event',
+        'session_check_ins',
+        ['subscription_id', 'event_id'],
+        unique=True,
+        postgresql_where=sa.text('event_id IS NOT NULL'),
+        sqlite_where=sa.text('event_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_session_check_ins_subscription_event', table_name='session_check_ins')
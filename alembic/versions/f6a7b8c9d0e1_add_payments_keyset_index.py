@@ -0,0 +1,23 @@
+"""add_payments_keyset_index
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index backing keyset pagination of /sales/payments
+    op.create_index('ix_payments_date_id', 'payments', ['payment_date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payments_date_id', table_name='payments')
@@ -8,6 +8,8 @@ from backend.api.v1.checkin import router as checkin_router
 from backend.api.v1.stats import router as stats_router
 from backend.api.v1.staff import router as staff_router
 from backend.api.v1.measurements import router as measurements_router
+from backend.api.v1.events import router as events_router
+from backend.api.v1.exports import router as exports_router
 
 api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
@@ -19,3 +21,5 @@ api_router.include_router(checkin_router, prefix="/api/v1/checkin", tags=["check
 api_router.include_router(stats_router, prefix="/api/v1/stats", tags=["stats"])
 api_router.include_router(staff_router, prefix="/api/v1/staff", tags=["staff"])
 api_router.include_router(measurements_router, prefix="/api/v1/measurements", tags=["measurements"])
+api_router.include_router(events_router, prefix="/api/v1/events", tags=["events"])
+api_router.include_router(exports_router, prefix="/api/v1/exports", tags=["exports"])
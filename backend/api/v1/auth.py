@@ -12,6 +12,7 @@ from backend.core.security import verify_password, create_access_token, hash_pas
 from backend.models.user import User, Role
 from backend.schemas.token import Token
 from backend.schemas.user import UserCreate, UserRead
+from backend.services.stats_cache import StatsComponent, stats_cache
 
 router = APIRouter(tags=["auth"]) 
 
@@ -52,6 +53,7 @@ async def register(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    stats_cache.invalidate(StatsComponent.MEMBERS, StatsComponent.MEMBERS_COUNT)
     
     # Load roles for response
     await db.execute(select(User).where(User.id == user.id).options(selectinload(User.roles)))
@@ -1,50 +1,80 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func
 
 from backend.api.deps import get_db, get_current_user
+from backend.core.config import settings
+from backend.core.pagination import decode_cursor, encode_cursor, keyset_condition
 from backend.models.user import User, Instructor
 from backend.models.operation import (
-    SubscriptionQrCode,
     Subscription,
     ClassEvent,
     SessionCheckIn,
-    BookingPermission,
     SubscriptionStatus,
 )
-from backend.models.service import ServicePackage, PlanDefinition
-from backend.schemas.checkin import CheckInRequest, CheckInResponse, CheckInHistoryRead, ScanResult, EligibleEvent
+from backend.models.service import ServicePackage
+from backend.schemas.checkin import (
+    CheckInRequest,
+    CheckInResponse,
+    BatchCheckInRequest,
+    BatchCheckInResponse,
+    BatchCheckInItemResult,
+    CheckInHistoryRead,
+    CheckInHistoryPage,
+    ScanResult,
+    EligibleEvent,
+    QrTokenCacheStats,
+)
+from backend.services.booking_permissions import booking_permission_index
+from backend.services.class_series import expand_range
+from backend.services.checkin_service import (
+    BatchCheckInItem,
+    CheckInError,
+    apply_check_in_batch,
+    perform_check_in,
+    revert_check_in,
+)
+from backend.services.event_hub import event_hub
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.qr_token_cache import qr_token_cache, resolve_qr_token
 
 router = APIRouter()
 
+@router.get("/cache-stats", response_model=QrTokenCacheStats)
+async def get_qr_token_cache_stats(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    QR token cache doluluk ve hit/miss sayaçlarını döndür (süreç bazlı).
+    """
+    return QrTokenCacheStats(**qr_token_cache.stats())
+
+
 @router.get("/scan", response_model=ScanResult)
 async def scan_qr_code(
     qr_token: str,
     db: AsyncSession = Depends(get_db),
 ):
-    # 1. Find Subscription by QR Token
-    query = (
-        select(SubscriptionQrCode)
-        .where(SubscriptionQrCode.qr_token == qr_token, SubscriptionQrCode.is_active == True)
-        .options(
-            selectinload(SubscriptionQrCode.subscription).options(
-                selectinload(Subscription.package).selectinload(ServicePackage.plan),
-                selectinload(Subscription.member)
-            )
-        )
-    )
-    result = await db.execute(query)
-    qr_code = result.scalar_one_or_none()
+    # 1. Resolve QR Token (cached snapshot, fresh counters)
+    snapshot = await resolve_qr_token(db, qr_token)
+    if not snapshot:
+        return ScanResult(valid=False, message="Geçersiz veya pasif QR kod.")
 
-    if not qr_code:
+    state_result = await db.execute(
+        select(
+            Subscription.status,
+            Subscription.end_date,
+            Subscription.used_sessions,
+            Subscription.attendance_count,
+        ).where(Subscription.id == snapshot.subscription_id)
+    )
+    subscription = state_result.one_or_none()
+    if not subscription:
+        qr_token_cache.invalidate_token(qr_token)
         return ScanResult(valid=False, message="Geçersiz veya pasif QR kod.")
-    
-    subscription = qr_code.subscription
-    member = subscription.member
 
     # 2. Validate Subscription Status
     if subscription.status != SubscriptionStatus.active:
@@ -54,11 +84,10 @@ async def scan_qr_code(
     if subscription.end_date.replace(tzinfo=None) < now:
         return ScanResult(valid=False, message="Abonelik süresi dolmuş.")
 
-    plan = subscription.package.plan
-    
     # Kalan hak hesaplama: access_type'a göre ayrıştır
-    if plan.access_type == "SESSION_BASED":
-        remaining = plan.sessions_granted - subscription.used_sessions if plan.sessions_granted > 0 else 9999
+    if snapshot.access_type == "SESSION_BASED":
+        sessions_granted = snapshot.sessions_granted or 0
+        remaining = sessions_granted - subscription.used_sessions if sessions_granted > 0 else 9999
         # SESSION_BASED: Seans sınırı kontrol
         if remaining <= 0:
             return ScanResult(valid=False, message="Kalan hak yok.")
@@ -72,33 +101,27 @@ async def scan_qr_code(
     time_window_start = now - timedelta(minutes=30)
     time_window_end = now + timedelta(minutes=60)
     
-    events_query = (
-        select(ClassEvent)
-        .where(
-            ClassEvent.start_time >= time_window_start,
-            ClassEvent.start_time <= time_window_end,
-            ClassEvent.is_cancelled == False
-        )
-        .options(
-            selectinload(ClassEvent.template),
-            selectinload(ClassEvent.instructor).selectinload(Instructor.user)
-        )
-    )
-    events_result = await db.execute(events_query)
-    potential_events = events_result.scalars().all()
-    
+    # Only templates this package may book are candidates (one in-memory lookup)
+    await booking_permission_index.ensure_loaded(db)
+    allowed_template_ids = booking_permission_index.templates_for_package(snapshot.package_id)
+
     eligible_events = []
-    for event in potential_events:
-        # Check permission
-        perm_query = (
-            select(BookingPermission)
+    if allowed_template_ids:
+        events_query = (
+            select(ClassEvent)
             .where(
-                BookingPermission.package_id == subscription.package_id,
-                BookingPermission.template_id == event.template_id
+                ClassEvent.start_time >= time_window_start,
+                ClassEvent.start_time <= time_window_end,
+                ClassEvent.is_cancelled == False,
+                ClassEvent.template_id.in_(allowed_template_ids)
+            )
+            .options(
+                selectinload(ClassEvent.template),
+                selectinload(ClassEvent.instructor).selectinload(Instructor.user)
             )
         )
-        perm_result = await db.execute(perm_query)
-        if perm_result.scalar_one_or_none():
+        events_result = await db.execute(events_query)
+        for event in events_result.scalars().all():
             eligible_events.append(EligibleEvent(
                 id=event.id,
                 name=event.template.name,
@@ -106,212 +129,209 @@ async def scan_qr_code(
                 end_time=event.end_time,
                 instructor_name=f"{event.instructor.user.first_name} {event.instructor.user.last_name}"
             ))
+        # Recurring series occurrences that have no row yet (materialized on check-in)
+        occurrences = await expand_range(
+            db, time_window_start, time_window_end + timedelta(microseconds=1), template_ids=allowed_template_ids
+        )
+        for occurrence in occurrences:
+            if occurrence.is_cancelled:
+                continue
+            eligible_events.append(EligibleEvent(
+                id=occurrence.id,
+                name=occurrence.template.name,
+                start_time=occurrence.start_time,
+                end_time=occurrence.end_time,
+                instructor_name=f"{occurrence.instructor_first_name} {occurrence.instructor_last_name}"
+            ))
 
     return ScanResult(
         valid=True,
         message="QR Kod Geçerli",
-        member_name=f"{member.first_name} {member.last_name}",
-        subscription_name=subscription.package.name,
+        member_name=snapshot.member_name,
+        subscription_name=snapshot.package_name,
         remaining_sessions=remaining,
-        access_type=plan.access_type,
+        access_type=snapshot.access_type,
         attendance_count=subscription.attendance_count,
         eligible_events=eligible_events
     )
 
-@router.get("/history", response_model=List[CheckInHistoryRead])
-async def list_checkin_history(
-    member_id: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-):
-    query = (
+def _history_query():
+    return (
         select(SessionCheckIn)
         .options(
             selectinload(SessionCheckIn.event).selectinload(ClassEvent.template),
             selectinload(SessionCheckIn.verified_by),
             selectinload(SessionCheckIn.subscription).selectinload(Subscription.package).selectinload(ServicePackage.plan)
         )
-        .order_by(SessionCheckIn.check_in_time.desc())
+        .order_by(SessionCheckIn.check_in_time.desc(), SessionCheckIn.id.desc())
     )
 
+
+def _history_item(c: SessionCheckIn) -> dict:
+    # Handle NULL event_id (for TIME_BASED or SESSION_BASED check-ins without event)
+    if c.event and c.event.template:
+        event_name = c.event.template.name
+        class_name = event_name
+    else:
+        # Check subscription access_type to determine the type
+        access_type = c.subscription.package.plan.access_type if c.subscription and c.subscription.package and c.subscription.package.plan else "UNKNOWN"
+        if access_type == "TIME_BASED":
+            event_name = "Zaman Bazlı Katılım"
+            class_name = "Zaman Bazlı Katılım"
+        elif access_type == "SESSION_BASED":
+            event_name = "Seans Bazlı Giriş"
+            class_name = "Seans Bazlı Giriş"
+        else:
+            event_name = "Bilinmeyen Giriş"
+            class_name = "Bilinmeyen Giriş"
+
+    return {
+        "id": c.id,
+        "check_in_time": c.check_in_time,
+        "event_id": c.event_id,
+        "event_name": event_name,
+        "class_name": class_name,
+        "subscription_name": c.subscription.package.name if c.subscription and c.subscription.package else "Bilinmeyen Paket",
+        "verified_by_name": f"{c.verified_by.first_name} {c.verified_by.last_name}" if c.verified_by else "Sistem"
+    }
+
+
+@router.get("/history", response_model=List[CheckInHistoryRead])
+async def list_checkin_history(
+    member_id: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Offset tabanlı geçmiş listesi (geriye dönük uyumluluk).
+    Yeni istemciler derin sayfalarda sabit maliyetli /history/page ucunu kullanmalı.
+    """
+    query = _history_query()
     if member_id:
         query = query.where(SessionCheckIn.member_user_id == member_id)
 
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
-    checkins = result.scalars().all()
+    return [_history_item(c) for c in result.scalars().all()]
 
-    response = []
-    for c in checkins:
-        # Handle NULL event_id (for TIME_BASED or SESSION_BASED check-ins without event)
-        if c.event and c.event.template:
-            event_name = c.event.template.name
-            class_name = event_name
-        else:
-            # Check subscription access_type to determine the type
-            access_type = c.subscription.package.plan.access_type if c.subscription and c.subscription.package and c.subscription.package.plan else "UNKNOWN"
-            if access_type == "TIME_BASED":
-                event_name = "Zaman Bazlı Katılım"
-                class_name = "Zaman Bazlı Katılım"
-            elif access_type == "SESSION_BASED":
-                event_name = "Seans Bazlı Giriş"
-                class_name = "Seans Bazlı Giriş"
-            else:
-                event_name = "Bilinmeyen Giriş"
-                class_name = "Bilinmeyen Giriş"
-        
-        response.append({
-            "id": c.id,
-            "check_in_time": c.check_in_time,
-            "event_id": c.event_id,
-            "event_name": event_name,
-            "class_name": class_name,
-            "subscription_name": c.subscription.package.name if c.subscription and c.subscription.package else "Bilinmeyen Paket",
-            "verified_by_name": f"{c.verified_by.first_name} {c.verified_by.last_name}" if c.verified_by else "Sistem"
-        })
-    
-    return response
 
-@router.post("/check-in", response_model=CheckInResponse)
-async def check_in_member(
-    checkin_in: CheckInRequest,
+@router.get("/history/page", response_model=CheckInHistoryPage)
+async def list_checkin_history_page(
+    member_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    # 1. Find Subscription by QR Token
-    query = (
-        select(SubscriptionQrCode)
-        .where(SubscriptionQrCode.qr_token == checkin_in.qr_token, SubscriptionQrCode.is_active == True)
-        .options(
-            selectinload(SubscriptionQrCode.subscription).options(
-                selectinload(Subscription.package).selectinload(ServicePackage.plan),
-                selectinload(Subscription.member)
-            )
-        )
-    )
-    result = await db.execute(query)
-    qr_code = result.scalar_one_or_none()
-
-    if not qr_code:
-        raise HTTPException(status_code=404, detail="Invalid or inactive QR code")
-    
-    subscription = qr_code.subscription
-    member = subscription.member
-
-    # 2. Validate Subscription Status and Date
-    if subscription.status != SubscriptionStatus.active:
-        raise HTTPException(status_code=400, detail=f"Subscription is {subscription.status.value}")
-    
-    now = datetime.now()
-    # Naive vs Aware datetime check might be needed depending on DB setup. 
-    # Assuming DB returns aware or we handle it. For now simple comparison.
-    if subscription.end_date.replace(tzinfo=None) < now:
-        raise HTTPException(status_code=400, detail="Subscription has expired")
+    """
+    (check_in_time, id) imlecine göre sayfalanmış geçmiş, en yeni kayıt önce.
 
-    # 3. Find Event (if provided)
-    event = None
-    if checkin_in.event_id:
-        query = (
-            select(ClassEvent)
-            .where(ClassEvent.id == checkin_in.event_id)
-            .options(selectinload(ClassEvent.template))
-        )
-        result = await db.execute(query)
-        event = result.scalar_one_or_none()
-
-        if not event:
-            raise HTTPException(status_code=404, detail="Class Event not found")
-        
-        if event.is_cancelled == True: # type: ignore
-            raise HTTPException(status_code=400, detail="Class Event is cancelled")
-
-        # 4. Validate Permissions (Does this package allow this class template?)
-        perm_query = (
-            select(BookingPermission)
-            .where(
-                BookingPermission.package_id == subscription.package_id,
-                BookingPermission.template_id == event.template_id
-            )
+    - cursor: Önceki yanıttaki `next_cursor`; o satırdan sonraki (daha eski) kayıtlar.
+    - since: Sadece bu zamandan sonra yapılan girişler (artımlı yenileme için).
+    """
+    query = _history_query()
+    if member_id:
+        query = query.where(SessionCheckIn.member_user_id == member_id)
+    if since:
+        query = query.where(SessionCheckIn.check_in_time > since)
+    if cursor:
+        try:
+            cursor_time, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            keyset_condition(SessionCheckIn.check_in_time, SessionCheckIn.id, cursor_time, cursor_id)
         )
-        perm_result = await db.execute(perm_query)
-        permission = perm_result.scalar_one_or_none()
 
-        if not permission:
-            raise HTTPException(status_code=403, detail="This subscription does not cover this class type")
-
-        # 5. Validate Event Capacity
-        count_query = select(func.count(SessionCheckIn.id)).where(SessionCheckIn.event_id == event.id)
-        count_result = await db.execute(count_query)
-        current_checkins = count_result.scalar()
-
-        if current_checkins is not None and current_checkins >= event.capacity: # type: ignore
-            raise HTTPException(status_code=400, detail="Class is full")
+    # One extra row tells whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    checkins = result.scalars().all()
+    has_more = len(checkins) > limit
+    checkins = checkins[:limit]
 
-        # 7. Check if already checked in for this event
-        existing_checkin_query = (
-            select(SessionCheckIn)
-            .where(
-                SessionCheckIn.subscription_id == subscription.id,
-                SessionCheckIn.event_id == event.id
-            )
-        )
-        existing_result = await db.execute(existing_checkin_query)
-        if existing_result.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Member already checked in to this event")
+    next_cursor = None
+    if has_more:
+        last = checkins[-1]
+        next_cursor = encode_cursor(last.check_in_time, last.id)
 
-    # 6. Validate Session Limits (only for SESSION_BASED packages)
-    plan = subscription.package.plan
-    
-    # SESSION_BASED: Kontrol et, TIME_BASED: Pas
-    if plan.access_type == "SESSION_BASED":
-        if plan.sessions_granted > 0:
-            if subscription.used_sessions >= plan.sessions_granted:
-                raise HTTPException(status_code=400, detail="No sessions remaining in this subscription")
-
-    # 8. Perform Check-in
-    check_in = SessionCheckIn(
-        subscription_id=subscription.id,
-        member_user_id=member.id,
-        event_id=event.id if event else None,
-        verified_by_user_id=current_user.id,
+    return CheckInHistoryPage(
+        items=[_history_item(c) for c in checkins],
+        next_cursor=next_cursor,
     )
-    db.add(check_in)
-    
-    # Capture values before commit to avoid MissingGreenlet on expired objects
-    member_first_name = member.first_name
-    member_last_name = member.last_name
-    sessions_granted = plan.sessions_granted
-    access_type = plan.access_type
-    
-    # Güncelleme mantığı: access_type'a göre ayrıştır
-    if access_type == "SESSION_BASED":
-        # SESSION_BASED: used_sessions düş
-        subscription.used_sessions += 1
-        new_used_sessions = subscription.used_sessions
-    else:
-        # TIME_BASED: attendance_count artır, used_sessions'a dokunma
-        subscription.attendance_count += 1
-        new_used_sessions = subscription.attendance_count
-
-    db.add(subscription)
-
-    await db.commit()
-    await db.refresh(check_in)
 
-    # Remaining gösterme mantığı
-    if access_type == "SESSION_BASED":
-        remaining = sessions_granted - new_used_sessions if sessions_granted > 0 else 9999
-    else:
-        # TIME_BASED: sınırsız, sadece katılım sayısını göster (opsiyonel)
-        remaining = 9999
+@router.post("/check-in", response_model=CheckInResponse)
+async def check_in_member(
+    checkin_in: CheckInRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Check-in işlemini tek transaction içinde, koşullu INSERT/UPDATE ile yap.
+    Kapasite ve seans hakkı eş zamanlı taramalarda da aşılamaz.
+    """
+    try:
+        outcome = await perform_check_in(db, checkin_in.qr_token, checkin_in.event_id, current_user.id)
+        await db.commit()
+    except CheckInError as e:
+        await db.rollback()
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    stats_cache.invalidate(StatsComponent.ACTIVITY, StatsComponent.OCCUPANCY)
+    event_hub.publish("checkin.created", outcome.to_event())
 
     return CheckInResponse(
         success=True,
         message="Check-in successful",
-        member_name=f"{member_first_name} {member_last_name}",
-        remaining_sessions=remaining,
-        check_in_time=check_in.check_in_time.strftime("%Y-%m-%d %H:%M:%S")
+        member_name=outcome.member_name,
+        remaining_sessions=outcome.remaining_sessions,
+        check_in_time=outcome.check_in_time.strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+
+@router.post("/batch", response_model=BatchCheckInResponse)
+async def batch_check_in(
+    batch_in: BatchCheckInRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Çevrimdışı kuyruğa alınmış taramaları toplu işle.
+    Her öğe için ayrı sonuç döner; aynı client_id tekrar gönderilirse "duplicate" olur.
+    """
+    items = [
+        BatchCheckInItem(
+            client_id=item.client_id,
+            qr_token=item.qr_token,
+            event_id=item.event_id,
+            scanned_at=item.scanned_at,
+        )
+        for item in batch_in.items
+    ]
+    results = await apply_check_in_batch(
+        db, items, current_user.id, chunk_size=settings.CHECKIN_BATCH_CHUNK_SIZE
+    )
+
+    if any(r.outcome for r in results):
+        stats_cache.invalidate(StatsComponent.ACTIVITY, StatsComponent.OCCUPANCY)
+    response_items = []
+    for r in results:
+        if r.outcome:
+            event_hub.publish("checkin.created", r.outcome.to_event())
+        response_items.append(BatchCheckInItemResult(
+            client_id=r.client_id,
+            status=r.status,
+            status_code=r.status_code,
+            message=r.message,
+            member_name=r.outcome.member_name if r.outcome else None,
+            remaining_sessions=r.outcome.remaining_sessions if r.outcome else None,
+            check_in_time=r.outcome.check_in_time.strftime("%Y-%m-%d %H:%M:%S") if r.outcome else None,
+        ))
+
+    return BatchCheckInResponse(
+        results=response_items,
+        created=sum(1 for r in results if r.status == "created"),
+        duplicates=sum(1 for r in results if r.status == "duplicate"),
+        rejected=sum(1 for r in results if r.status == "rejected"),
     )
 
 
@@ -360,37 +380,9 @@ async def delete_checkin(
     Delete a check-in record from history.
     Only staff members can delete check-in records.
     """
-    # 1. Find the check-in record
-    query = (
-        select(SessionCheckIn)
-        .where(SessionCheckIn.id == checkin_id)
-        .options(
-            selectinload(SessionCheckIn.subscription).options(
-                selectinload(Subscription.package).selectinload(ServicePackage.plan)
-            )
-        )
-    )
-    result = await db.execute(query)
-    checkin = result.scalar_one_or_none()
-
-    if not checkin:
+    # The row is deleted first; counters are only given back if this request removed it
+    if not await revert_check_in(db, checkin_id):
         raise HTTPException(status_code=404, detail="Check-in record not found")
-
-    subscription = checkin.subscription
-    plan = subscription.package.plan
-
-    # 2. Reverse the effects of the check-in
-    if plan.access_type == "SESSION_BASED":
-        # Decrease used_sessions count
-        if subscription.used_sessions > 0:
-            subscription.used_sessions -= 1
-            db.add(subscription)
-    elif plan.access_type == "TIME_BASED":
-        # Decrease attendance_count
-        if subscription.attendance_count > 0:
-            subscription.attendance_count -= 1
-            db.add(subscription)
-
-    # 3. Delete the check-in record
-    await db.delete(checkin)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.ACTIVITY, StatsComponent.OCCUPANCY)
+    event_hub.publish("checkin.deleted", {"checkin_id": checkin_id})
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.deps import get_db, get_current_user
+from backend.core.config import settings
+from backend.models.user import User
+from backend.services.event_hub import HubEvent, event_hub
+
+router = APIRouter()
+
+
+def _format_sse(event: HubEvent) -> str:
+    payload = json.dumps(event.data, default=str, ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {payload}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Check-in, rezervasyon, ödeme ve abonelik olaylarını Server-Sent Events olarak yayınla.
+
+    Olay tipleri: checkin.created, checkin.deleted, booking.created, booking.cancelled,
+    payment.created, payment.deleted, subscription.created, subscription.deleted,
+    subscription.expired. Yeniden bağlanan istemci `Last-Event-ID` gönderirse
+    kaçırdığı son olaylar tekrar iletilir.
+    """
+    # Authentication is done; do not hold a pooled connection for the stream's lifetime
+    await db.close()
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    subscriber = event_hub.subscribe(resume_from)
+    heartbeat = settings.EVENT_STREAM_HEARTBEAT_SECONDS
+
+    async def event_source():
+        try:
+            # Tell EventSource-style clients how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while not subscriber.closed:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event)
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
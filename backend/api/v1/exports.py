@@ -0,0 +1,65 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.deps import get_db, get_current_user
+from backend.core.time_utils import get_turkey_time
+from backend.models.operation import PaymentMethod
+from backend.models.user import User
+from backend.services.dashboard_stats import sibling_session_factory
+from backend.services.exports import DATASETS, FORMATS, ExportFilters, build_export_query, stream_export
+
+router = APIRouter()
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    member_id: Optional[str] = None,
+    package_id: Optional[str] = None,
+    payment_method: Optional[PaymentMethod] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Ödeme, abonelik veya check-in dökümünü CSV/NDJSON olarak akıt.
+
+    - dataset: payments, subscriptions, check_ins
+    - start/end: Türkiye saatine göre dahil günler (ödeme tarihi, abonelik
+      başlangıcı veya giriş zamanı)
+    - member_id, package_id, payment_method: isteğe bağlı filtreler
+      (payment_method check-in dökümünde desteklenmez)
+
+    Satırlar sunucu tarafı imleçle parça parça okunur; bellek kullanımı tarih
+    aralığından bağımsızdır.
+    """
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{dataset}'")
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    filters = ExportFilters(
+        start=start, end=end, member_id=member_id, package_id=package_id, payment_method=payment_method
+    )
+    try:
+        build_export_query(dataset, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session_factory = sibling_session_factory(db)
+    # The stream opens its own session; release the request's connection now
+    await db.close()
+
+    extension = "csv" if fmt == "csv" else "ndjson"
+    filename = f"{dataset}_{get_turkey_time().strftime('%Y%m%d_%H%M')}.{extension}"
+    return StreamingResponse(
+        stream_export(session_factory, dataset, filters, fmt),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=\"{filename}\""},
+    )
@@ -1,7 +1,9 @@
+import csv
+import io
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from backend.core.time_utils import get_turkey_time
@@ -9,7 +11,22 @@ from backend.core.time_utils import get_turkey_time
 from backend.api.deps import get_db, get_current_active_admin
 from backend.core.security import hash_password
 from backend.models.user import User, Role
-from backend.schemas.user import UserCreate, UserRead, UserUpdate
+from backend.schemas.imports import ImportReport
+from backend.models.purge import MemberPurgeJob
+from backend.schemas.user import (
+    MemberDeleteResponse,
+    MemberPurgeJobRead,
+    MemberSuggestion,
+    UserCreate,
+    UserRead,
+    UserUpdate,
+)
+from backend.services.member_autocomplete import member_autocomplete_index
+from backend.services.member_import import DEFAULT_BATCH_SIZE, check_columns, import_members
+from backend.services.member_purge import request_purge, run_purge_job
+from backend.services.qr_token_cache import qr_token_cache
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.user_lists import list_users_page
 
 router = APIRouter()
 
@@ -36,38 +53,55 @@ async def list_pending_members(
 
 @router.get("/", response_model=List[UserRead])
 async def list_members(
+    response: Response,
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1),
     search: Optional[str] = None,
     include_inactive: bool = False,
+    cursor: Optional[str] = None,
+    total_mode: Optional[str] = Query(None, pattern="^(exact|cached|estimated)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    # Filter by role="MEMBER", optionally include inactive users, order by updated_at DESC
-    query = (
-        select(User)
-        .join(User.roles)
-        .where(Role.role_name == "MEMBER")
-        .order_by(User.updated_at.desc())
-        .options(selectinload(User.roles))
-    )
-    
-    if not include_inactive:
-        query = query.where(User.is_active == True)
-
-    if search:
-        search_filter = or_(
-            User.first_name.ilike(f"%{search}%"),
-            User.last_name.ilike(f"%{search}%"),
-            User.email.ilike(f"%{search}%"),
-            User.phone_number.ilike(f"%{search}%")
+    """
+    Üyeler, en son güncellenen önce (updated_at, id) sırasıyla.
+
+    - skip/limit: Eski istemciler için OFFSET ile sayfalama.
+    - cursor: Önceki yanıttaki `X-Next-Cursor` header'ı; verilirse `skip` yok
+      sayılır ve liste index üzerinden o satırdan devam eder (aramayla birlikte
+      kullanılamaz, arama sonuçları alakaya göre sıralıdır).
+    - total_mode: Verilirse toplam `X-Total-Count` header'ında döner
+      (`exact`, `cached` veya `estimated`).
+    """
+    try:
+        page = await list_users_page(
+            db,
+            ["MEMBER"],
+            StatsComponent.MEMBERS_COUNT,
+            search=search,
+            include_inactive=include_inactive,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            total_mode=total_mode,
         )
-        query = query.where(search_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers.update(page.headers())
+    return page.users
 
-    query = query.offset(skip).limit(limit).distinct()
-    
-    result = await db.execute(query)
-    users = result.scalars().all()
-    return users
+@router.get("/autocomplete", response_model=List[MemberSuggestion])
+async def autocomplete_members(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    include_inactive: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Type-ahead member lookup by name, surname, email or phone prefix.
+
+    Served from the in-memory prefix index; case, Turkish letters and
+    diacritics are ignored. Shortest matching token first.
+    """
+    return await member_autocomplete_index.search(db, q, limit=limit, include_inactive=include_inactive)
 
 @router.post("/", response_model=UserRead)
 async def create_member(
@@ -108,11 +142,44 @@ async def create_member(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    stats_cache.invalidate(StatsComponent.MEMBERS, StatsComponent.MEMBERS_COUNT)
     
     # Load roles for response
     await db.execute(select(User).where(User.id == user.id).options(selectinload(User.roles)))
     return user
 
+@router.post("/import", response_model=ImportReport)
+async def import_members_csv(
+    file: UploadFile = File(...),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=5000),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_active_admin)
+):
+    """Bulk import members (and optionally their current package) from a CSV file.
+
+    Columns: email, first_name, last_name (required), phone_number, password,
+    is_active, package (id or name), start_date, purchase_price, amount_paid,
+    payment_method. The upload is read row by row and written in batches;
+    invalid rows are skipped and listed in the report with their line numbers.
+    """
+    # UploadFile spools large bodies to disk; read it as a text stream
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(stream)
+        try:
+            check_columns(reader.fieldnames)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="File is not a UTF-8 CSV")
+        # A file that turns unreadable partway returns the partial report (read_error)
+        return await import_members(
+            db, reader, current_admin.id, batch_size=batch_size, dry_run=dry_run
+        )
+    finally:
+        stream.detach()
+
 @router.get("/{user_id}", response_model=UserRead)
 async def get_member(
     user_id: str,
@@ -149,27 +216,54 @@ async def update_member(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    # Cached QR snapshots carry the member's display name
+    qr_token_cache.invalidate_member(user_id)
+    # is_active and the name shown in the activity feed may have changed
+    stats_cache.invalidate(StatsComponent.MEMBERS, StatsComponent.MEMBERS_COUNT, StatsComponent.ACTIVITY)
     
     # Load roles for response
     await db.execute(select(User).where(User.id == user.id).options(selectinload(User.roles)))
     return user
 
-@router.delete("/{user_id}")
+@router.get("/purge-jobs/{job_id}", response_model=MemberPurgeJobRead)
+async def get_purge_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a member hard delete started by `DELETE /members/{id}`."""
+    job = await db.get(MemberPurgeJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return job
+
+@router.delete("/{user_id}", response_model=MemberDeleteResponse)
 async def delete_member(
     user_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
-    user = await db.get(User, user_id, options=[selectinload(User.roles)])
+    """Deactivate the member now and hard-delete their data in the background.
+
+    The member can no longer check in once this returns; subscriptions,
+    payments, bookings, check-ins and measurements are deleted in small
+    batches afterwards. Poll `GET /members/purge-jobs/{id}` for progress.
+    """
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    try:
-        # Use the model's hard_delete method for proper separation of concerns
-        await user.hard_delete(db)
-        await db.commit()
-        
-        return {"message": "Member deleted successfully"}
-    
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
+
+    job = await request_purge(db, user)
+    qr_token_cache.invalidate_member(user_id)
+    stats_cache.invalidate(StatsComponent.MEMBERS, StatsComponent.MEMBERS_COUNT, StatsComponent.ACTIVITY)
+
+    # Own session, after the response; the scheduler resumes it if this process dies
+    session_provider = request.app.dependency_overrides.get(get_db, get_db)
+    background_tasks.add_task(run_purge_job, session_provider, job.id)
+
+    return {
+        "message": "Member deactivated; deletion continues in the background",
+        "id": user_id,
+        "is_active": False,
+        "purge_job": job,
+    }
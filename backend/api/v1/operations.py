@@ -1,12 +1,12 @@
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 from backend.api.deps import get_db
-from backend.models.operation import ClassTemplate, ClassEvent, Booking, Subscription, BookingPermission, SubscriptionStatus
+from backend.models.operation import ClassTemplate, ClassEvent, ClassSeries, Booking, Subscription, SubscriptionStatus
 from backend.models.user import Instructor, User
 from backend.schemas.operations import (
     ClassTemplateCreate,
@@ -14,9 +14,34 @@ from backend.schemas.operations import (
     ClassEventCreate,
     ClassEventRead,
     ClassEventUpdate,
+    ClassSeriesCreate,
+    ClassSeriesExceptionCreate,
+    ClassSeriesExceptionRead,
+    ClassSeriesRead,
     BookingCreate,
-    BookingRead
+    BookingRead,
+    CalendarEvent,
+    CalendarInstructor,
+    CalendarParticipant,
+    WeekCalendar,
 )
+from backend.core.time_utils import get_turkey_time
+from backend.services.booking_permissions import booking_permission_index
+from backend.services.class_series import (
+    as_local,
+    expand_range,
+    format_weekdays,
+    get_occurrence,
+    parse_occurrence_id,
+    parse_weekdays,
+    resolve_event,
+    rrule,
+    set_exception,
+)
+from backend.services.event_counters import adjust_booked_count
+from backend.services.event_hub import event_hub
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.week_calendar import load_week
 
 router = APIRouter()
 
@@ -48,6 +73,8 @@ async def update_class_template(
     
     template.name = template_in.name
     await db.commit()
+    # Template names appear in the schedule and activity feed
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.ACTIVITY, StatsComponent.OCCUPANCY)
     await db.refresh(template)
     return template
 
@@ -62,6 +89,7 @@ async def delete_class_template(
     
     await db.delete(template)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.ACTIVITY, StatsComponent.OCCUPANCY)
     return {"message": "Class Template deleted"}
 
 # --- Class Events ---
@@ -86,11 +114,70 @@ async def list_class_events(
         query = query.where(ClassEvent.end_time <= end_date)
     if instructor_id:
         query = query.where(ClassEvent.instructor_user_id == instructor_id)
-        
+
+    if start_date and end_date:
+        # Series occurrences are expanded for bounded ranges only and merged
+        # with the stored rows before paging
+        result = await db.execute(query.limit(skip + limit))
+        events = list(result.scalars().all())
+        occurrences = await expand_range(db, start_date, end_date, instructor_id=instructor_id)
+        events += [o for o in occurrences if as_local(o.end_time) <= as_local(end_date)]
+        events.sort(key=lambda e: (as_local(e.start_time), e.id))
+        return events[skip:skip + limit]
+
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+@router.get("/calendar", response_model=WeekCalendar)
+async def get_week_calendar(
+    week_start: Optional[date] = Query(None, description="Any day of the week; defaults to the current week"),
+    participants: int = Query(3, ge=0, le=50, description="Participant names to embed per class"),
+    instructor_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Haftanın dersleri (Pazartesi-Pazar), şablon, eğitmen, rezervasyon/giriş
+    sayıları ve ilk katılımcı adlarıyla tek yanıtta.
+
+    Takvim ekranı ders başına `/events/{id}/bookings` çağırmak yerine bunu
+    kullanır; tam katılımcı listesi ders detayında yüklenir.
+    """
+    monday, entries = await load_week(
+        db,
+        week_start or get_turkey_time().date(),
+        participant_limit=participants,
+        instructor_id=instructor_id,
+    )
+    return WeekCalendar(
+        week_start=monday,
+        week_end=monday + timedelta(days=6),
+        events=[
+            CalendarEvent(
+                id=entry.id,
+                template_id=entry.template_id,
+                instructor_user_id=entry.instructor_user_id,
+                start_time=entry.start_time,
+                end_time=entry.end_time,
+                capacity=entry.capacity,
+                is_cancelled=entry.is_cancelled,
+                booked_count=entry.booked_count,
+                checked_in_count=entry.checked_in_count,
+                series_id=entry.series_id,
+                occurrence_date=entry.occurrence_date,
+                is_materialized=entry.is_materialized,
+                template=ClassTemplateRead(id=entry.template_id, name=entry.template_name),
+                instructor=CalendarInstructor(
+                    user_id=entry.instructor_user_id,
+                    first_name=entry.instructor_first_name,
+                    last_name=entry.instructor_last_name,
+                ),
+                participants=[CalendarParticipant(**vars(p)) for p in entry.participants],
+            )
+            for entry in entries
+        ],
+    )
+
 @router.post("/events", response_model=ClassEventRead)
 async def create_class_event(
     event_in: ClassEventCreate, db: AsyncSession = Depends(get_db)
@@ -108,6 +195,7 @@ async def create_class_event(
     event = ClassEvent(**event_in.model_dump())
     db.add(event)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
     await db.refresh(event)
     
     # Re-fetch to populate relationships
@@ -121,22 +209,28 @@ async def create_class_event(
 
 @router.get("/events/{event_id}", response_model=ClassEventRead)
 async def get_class_event(event_id: str, db: AsyncSession = Depends(get_db)):
+    # Reading a series occurrence never materializes it
+    event = await resolve_event(db, event_id, create=False)
+    if not event:
+        occurrence = parse_occurrence_id(event_id)
+        occurrence = await get_occurrence(db, *occurrence) if occurrence else None
+        if not occurrence:
+            raise HTTPException(status_code=404, detail="Class Event not found")
+        return occurrence
     query = (
         select(ClassEvent)
-        .where(ClassEvent.id == event_id)
+        .where(ClassEvent.id == event.id)
         .options(selectinload(ClassEvent.template))
     )
     result = await db.execute(query)
-    event = result.scalar_one_or_none()
-    if not event:
-        raise HTTPException(status_code=404, detail="Class Event not found")
-    return event
+    return result.scalar_one()
 
 @router.put("/events/{event_id}", response_model=ClassEventRead)
 async def update_class_event(
     event_id: str, event_in: ClassEventUpdate, db: AsyncSession = Depends(get_db)
 ):
-    event = await db.get(ClassEvent, event_id)
+    # Editing a single series occurrence stores it as its own row
+    event = await resolve_event(db, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Class Event not found")
         
@@ -146,6 +240,7 @@ async def update_class_event(
         
     db.add(event)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
     await db.refresh(event)
     
     # Re-fetch
@@ -159,13 +254,27 @@ async def update_class_event(
 
 @router.delete("/events/{event_id}", response_model=ClassEventRead)
 async def cancel_class_event(event_id: str, db: AsyncSession = Depends(get_db)):
-    event = await db.get(ClassEvent, event_id)
+    event = await resolve_event(db, event_id, create=False)
+    occurrence = parse_occurrence_id(event_id)
+    if not event and occurrence:
+        # A virtual occurrence is cancelled with a series exception, not a row
+        series = await db.get(ClassSeries, occurrence[0])
+        if not series:
+            raise HTTPException(status_code=404, detail="Class Event not found")
+        try:
+            await set_exception(db, series, occurrence[1], is_cancelled=True)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Class Event not found")
+        await db.commit()
+        stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
+        return await get_occurrence(db, *occurrence)
     if not event:
         raise HTTPException(status_code=404, detail="Class Event not found")
     
     event.is_cancelled = True
     db.add(event)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
     await db.refresh(event)
     
     # Re-fetch
@@ -177,12 +286,103 @@ async def cancel_class_event(event_id: str, db: AsyncSession = Depends(get_db)):
     result = await db.execute(query)
     return result.scalar_one()
 
+# --- Class Series ---
+async def _series_read(db: AsyncSession, series_id: str) -> ClassSeriesRead:
+    query = (
+        select(ClassSeries)
+        .where(ClassSeries.id == series_id)
+        .options(selectinload(ClassSeries.template), selectinload(ClassSeries.exceptions))
+    )
+    series = (await db.execute(query)).scalar_one()
+    read = ClassSeriesRead.model_validate(series)
+    read.rrule = rrule(series)
+    return read
+
+@router.post("/series", response_model=ClassSeriesRead)
+async def create_class_series(
+    series_in: ClassSeriesCreate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Haftalık tekrarlayan ders (RRULE: FREQ=WEEKLY;INTERVAL;BYDAY;UNTIL).
+
+    Oturumlar kaydedilmez; takvim ve ders listeleri istenen aralık için seriyi
+    açar, rezervasyon veya check-in gelince oturum `class_events` satırı olur.
+    """
+    try:
+        weekdays = parse_weekdays(series_in.weekdays)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if series_in.ends_on and series_in.ends_on < series_in.starts_on:
+        raise HTTPException(status_code=400, detail="ends_on must not be before starts_on")
+
+    template = await db.get(ClassTemplate, series_in.template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="Class Template not found")
+    instructor = await db.get(Instructor, series_in.instructor_user_id)
+    if not instructor:
+        raise HTTPException(status_code=404, detail="Instructor not found")
+
+    data = series_in.model_dump()
+    data["weekdays"] = format_weekdays(weekdays)
+    series = ClassSeries(**data)
+    db.add(series)
+    await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
+    await db.refresh(series)
+    return await _series_read(db, series.id)
+
+@router.get("/series/{series_id}", response_model=ClassSeriesRead)
+async def get_class_series(series_id: str, db: AsyncSession = Depends(get_db)):
+    if not await db.get(ClassSeries, series_id):
+        raise HTTPException(status_code=404, detail="Class Series not found")
+    return await _series_read(db, series_id)
+
+@router.post("/series/{series_id}/exceptions", response_model=ClassSeriesExceptionRead)
+async def set_class_series_exception(
+    series_id: str,
+    exception_in: ClassSeriesExceptionCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Tek bir oturumu iptal eder veya saatini değiştirir (EXDATE / RECURRENCE-ID)."""
+    series = await db.get(ClassSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Class Series not found")
+    try:
+        exception = await set_exception(
+            db,
+            series,
+            exception_in.occurrence_date,
+            is_cancelled=exception_in.is_cancelled,
+            start_time=exception_in.start_time,
+            end_time=exception_in.end_time,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
+    await db.refresh(exception)
+    return exception
+
 # --- Bookings ---
 @router.get("/events/{event_id}/bookings", response_model=List[BookingRead])
 async def list_event_bookings(event_id: str, db: AsyncSession = Depends(get_db)):
+    event = await resolve_event(db, event_id, create=False)
+    if not event:
+        occurrence = parse_occurrence_id(event_id)
+        occurrence = await get_occurrence(db, *occurrence) if occurrence else None
+        if not occurrence or not occurrence.member_user_id:
+            return []
+        # The series subscriber's booking is implied until the occurrence is materialized
+        return [BookingRead(
+            member_user_id=occurrence.member_user_id,
+            event_id=occurrence.id,
+            subscription_id=occurrence.subscription_id,
+            status="confirmed",
+            member_name=occurrence.member_name,
+        )]
     query = (
         select(Booking)
-        .where(Booking.event_id == event_id)
+        .where(Booking.event_id == event.id)
         .options(selectinload(Booking.member))
     )
     result = await db.execute(query)
@@ -201,8 +401,8 @@ async def list_event_bookings(event_id: str, db: AsyncSession = Depends(get_db))
 async def create_booking(
     booking_in: BookingCreate, db: AsyncSession = Depends(get_db)
 ):
-    # 1. Validate Event
-    event = await db.get(ClassEvent, booking_in.event_id)
+    # 1. Validate Event (a series occurrence is materialized here)
+    event = await resolve_event(db, booking_in.event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
@@ -220,27 +420,33 @@ async def create_booking(
     # 3. Check Permissions
     # (Simplified: Assuming if admin selects it, it's okay, OR we enforce it)
     # Let's enforce it for consistency
-    perm_query = (
-        select(BookingPermission)
-        .where(
-            BookingPermission.package_id == sub.package_id,
-            BookingPermission.template_id == event.template_id
-        )
-    )
-    perm_result = await db.execute(perm_query)
-    if not perm_result.scalar_one_or_none():
+    if not await booking_permission_index.is_allowed(db, sub.package_id, event.template_id):
         raise HTTPException(status_code=403, detail="Subscription does not cover this event type")
 
+    already_booked = await db.scalar(
+        select(Booking.id).where(Booking.member_user_id == booking_in.member_user_id, Booking.event_id == event.id)
+    )
+    if already_booked:
+        raise HTTPException(status_code=400, detail="Member is already booked for this class")
+
     # 4. Create Booking
     booking = Booking(
         member_user_id=booking_in.member_user_id,
-        event_id=booking_in.event_id,
+        event_id=event.id,
         subscription_id=booking_in.subscription_id,
         status="confirmed"
     )
     db.add(booking)
+    booked_count = await adjust_booked_count(db, event.id, 1)
     await db.commit()
     await db.refresh(booking)
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
+    event_hub.publish("booking.created", {
+        "booking_id": booking.id,
+        "event_id": booking.event_id,
+        "member_user_id": booking.member_user_id,
+        "booked_count": booked_count,
+    })
     
     # Load member for response
     query = select(Booking).where(Booking.id == booking.id).options(selectinload(Booking.member))
@@ -261,6 +467,14 @@ async def cancel_booking(booking_id: str, db: AsyncSession = Depends(get_db)):
     # Hard delete or soft delete? Let's hard delete for now or set status
     # booking.status = "cancelled_by_admin"
     # db.add(booking)
+    event_id = booking.event_id
     await db.delete(booking) # Simple remove
+    booked_count = await adjust_booked_count(db, event_id, -1)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.SCHEDULE, StatsComponent.OCCUPANCY)
+    event_hub.publish("booking.cancelled", {
+        "booking_id": booking_id,
+        "event_id": event_id,
+        "booked_count": booked_count,
+    })
     return {"success": True}
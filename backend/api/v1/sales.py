@@ -1,12 +1,14 @@
-from datetime import timedelta, datetime, timezone
+from datetime import timedelta, datetime, time, timezone
 import zoneinfo
-from typing import List, Optional, cast
+from typing import List, Optional, Union, cast
 import secrets
 import string
 import math
+import uuid
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, func
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, delete, func
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -24,33 +26,123 @@ from backend.models.operation import (
     SessionCheckIn,
     ClassTemplate,
     ClassEvent,
+    ClassSeries,
+    ClassSeriesException,
     BookingPermission,
 )
+from backend.schemas.operations import ClassEventRead
 from backend.schemas.sales import (
     SubscriptionCreate,
     SubscriptionCreateWithEvents,
     SubscriptionRead,
+    SubscriptionSummary,
     PaymentCreate,
     PaymentRead,
     PaymentPagination,
 )
 from backend.core.date_utils import calculate_end_date
+from backend.core.pagination import decode_cursor, encode_cursor, keyset_condition
 from backend.core.time_utils import get_turkey_time, convert_to_turkey_time
+from backend.services.booking_permissions import booking_permission_index
+from backend.services.class_series import as_local, format_weekdays, series_span, subscription_occurrences
+from backend.services.event_counters import collect_event_ids, refresh_event_counters
+from backend.services.event_hub import event_hub
+from backend.services.list_counts import resolve_total
+from backend.services.qr_token_cache import qr_token_cache
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.stats_rollups import collect_rollup_days, rebuild_rollup_days, record_payment
+from backend.services.subscription_ledger import apply_payment
 
 router = APIRouter()
 
 
+def _subscription_read(subscription: Subscription) -> SubscriptionRead:
+    """SubscriptionRead whose class_events include the lazily expanded series occurrences."""
+    read = SubscriptionRead.model_validate(subscription)
+    read.class_events = [ClassEventRead.model_validate(e) for e in subscription_occurrences(subscription)]
+    return read
 
-@router.get("/subscriptions", response_model=List[SubscriptionRead])
+
+# view=summary / fields= projection: field name -> column expression
+_SUMMARY_COLUMNS = {
+    "id": Subscription.id,
+    "member_user_id": Subscription.member_user_id,
+    "member_name": (User.first_name + " " + User.last_name),
+    "package_id": Subscription.package_id,
+    "package_name": ServicePackage.name,
+    "access_type": Subscription.access_type,
+    "status": Subscription.status,
+    "start_date": Subscription.start_date,
+    "end_date": Subscription.end_date,
+    "purchase_price": Subscription.purchase_price,
+    "paid_total": Subscription.paid_total,
+    "balance": Subscription.balance,
+    "used_sessions": Subscription.used_sessions,
+    "sessions_granted": PlanDefinition.sessions_granted,
+    "remaining_sessions": case(
+        (Subscription.access_type == "SESSION_BASED", PlanDefinition.sessions_granted - Subscription.used_sessions),
+        else_=None,
+    ),
+    "attendance_count": Subscription.attendance_count,
+}
+_MEMBER_FIELDS = {"member_name"}
+_PLAN_FIELDS = {"sessions_granted", "remaining_sessions"}
+_PACKAGE_FIELDS = {"package_name"} | _PLAN_FIELDS
+
+
+@router.get("/subscriptions", response_model=Union[List[SubscriptionRead], List[SubscriptionSummary]])
 async def list_subscriptions(
     skip: int = 0, 
     limit: int = 100, 
     member_id: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    Abonelik listesi.
+
+    - view=full (varsayılan): ödemeler, ders etkinlikleri ve paket detayıyla tam kayıt.
+    - view=summary: ilişki yüklemeden, tek sorguda kolon projeksiyonu
+      (`SubscriptionSummary`; kalan seans dahil).
+    - fields: virgülle ayrılmış `SubscriptionSummary` alanları; verilirse
+      summary görünümü yalnızca bu alanlarla (ve `id`) döner.
+    """
+    if view == "summary" or fields:
+        selected = list(_SUMMARY_COLUMNS)
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = sorted(set(requested) - set(_SUMMARY_COLUMNS))
+            if unknown:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(_SUMMARY_COLUMNS)}",
+                )
+            selected = ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+        query = select(*[_SUMMARY_COLUMNS[f].label(f) for f in selected]).select_from(Subscription)
+        if _MEMBER_FIELDS.intersection(selected):
+            query = query.join(User, User.id == Subscription.member_user_id)
+        if _PACKAGE_FIELDS.intersection(selected):
+            query = query.join(ServicePackage, ServicePackage.id == Subscription.package_id)
+        if _PLAN_FIELDS.intersection(selected):
+            query = query.join(PlanDefinition, PlanDefinition.id == ServicePackage.plan_id)
+        if member_id:
+            query = query.where(Subscription.member_user_id == member_id)
+        result = await db.execute(query.offset(skip).limit(limit))
+
+        # Partial objects: bypass response_model so unselected fields are omitted
+        items = [
+            SubscriptionSummary(**row._mapping).model_dump(mode="json", include=set(selected))
+            for row in result
+        ]
+        return JSONResponse(content=items)
+
     query = select(Subscription).options(
         selectinload(Subscription.payments),
         selectinload(Subscription.class_events).selectinload(ClassEvent.template),
+        selectinload(Subscription.class_series).selectinload(ClassSeries.template),
+        selectinload(Subscription.class_series).selectinload(ClassSeries.exceptions),
         selectinload(Subscription.package).selectinload(ServicePackage.category),
         selectinload(Subscription.package).selectinload(ServicePackage.offering),
         selectinload(Subscription.package).selectinload(ServicePackage.plan)
@@ -71,7 +163,7 @@ async def list_subscriptions(
             # If conversion fails, keep original payments to avoid data loss
             pass
 
-    return subscriptions
+    return [_subscription_read(s) for s in subscriptions]
 
 @router.get("/subscriptions/{subscription_id}", response_model=SubscriptionRead)
 async def get_subscription(
@@ -84,6 +176,8 @@ async def get_subscription(
         .options(
             selectinload(Subscription.payments),
             selectinload(Subscription.class_events).selectinload(ClassEvent.template),
+            selectinload(Subscription.class_series).selectinload(ClassSeries.template),
+            selectinload(Subscription.class_series).selectinload(ClassSeries.exceptions),
             selectinload(Subscription.package).selectinload(ServicePackage.category),
             selectinload(Subscription.package).selectinload(ServicePackage.offering),
             selectinload(Subscription.package).selectinload(ServicePackage.plan)
@@ -97,7 +191,7 @@ async def get_subscription(
         subscription.payments = [p for p in (subscription.payments or []) if p.amount_paid is not None and float(p.amount_paid) != 0.0]
     except Exception:
         pass
-    return subscription
+    return _subscription_read(subscription)
 
 @router.post("/payments", response_model=PaymentRead)
 async def create_payment(
@@ -118,8 +212,20 @@ async def create_payment(
         refund_reason=payment_in.refund_reason,
     )
     db.add(payment)
+    await apply_payment(db, payment_in.subscription_id, payment_in.amount_paid)
+    # payment_date defaults to now()
+    await record_payment(
+        db, datetime.now(timezone.utc), subscription.package_id, payment_in.payment_method, payment_in.amount_paid
+    )
     await db.commit()
     await db.refresh(payment)
+    stats_cache.invalidate(StatsComponent.DEBT, StatsComponent.REVENUE, StatsComponent.PAYMENTS_COUNT)
+    event_hub.publish("payment.created", {
+        "payment_id": payment.id,
+        "subscription_id": payment.subscription_id,
+        "amount_paid": float(payment.amount_paid),
+        "payment_date": payment.payment_date.isoformat() if payment.payment_date else None,
+    })
     return payment
 
 @router.get("/payments", response_model=PaymentPagination)
@@ -127,10 +233,23 @@ async def list_payments(
     page: int = 1,
     size: int = 10,
     member_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: str = Query("exact", pattern="^(exact|cached|estimated)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    skip = (page - 1) * size
-    
+    """
+    Ödemeler, en yeni önce (payment_date, id) sırasıyla.
+
+    - page/size: Eski istemciler için OFFSET ile sayfalama.
+    - cursor: Önceki yanıttaki `next_cursor`; verilirse `page` yok sayılır ve
+      liste o satırdan sonra index üzerinden devam eder.
+    - total_mode: `exact` her istekte sayar; `cached` sayımı önbellekten verir;
+      `estimated` filtresiz listede planlayıcı tahminini kullanır
+      (`total_estimated` true döner).
+    """
+    if size < 1:
+        raise HTTPException(status_code=400, detail="size must be at least 1")
+
     # Base query joining necessary tables for filtering and display
     query = (
         select(Payment)
@@ -138,23 +257,43 @@ async def list_payments(
         .join(User, Subscription.member_user_id == User.id)
         .join(ServicePackage, Subscription.package_id == ServicePackage.id)
     )
+    count_query = select(func.count(Payment.id))
     
     if member_id:
         query = query.where(Subscription.member_user_id == member_id)
-        
-    # Count total
-    # We use a subquery to count correctly with joins
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-    
-    # Fetch items with eager loading
+        count_query = count_query.join(Subscription).where(Subscription.member_user_id == member_id)
+
+    async def count_payments() -> int:
+        return await db.scalar(count_query) or 0
+
+    total, total_estimated = await resolve_total(
+        db,
+        total_mode,
+        count_payments,
+        StatsComponent.PAYMENTS_COUNT,
+        key=member_id,
+        table_name=None if member_id else "payments",
+    )
+
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(keyset_condition(Payment.payment_date, Payment.id, cursor_date, cursor_id))
+    else:
+        query = query.offset((max(page, 1) - 1) * size)
+
+    # Fetch items with eager loading; one extra row tells whether another page exists
     query = query.options(
         selectinload(Payment.subscription).selectinload(Subscription.member),
         selectinload(Payment.subscription).selectinload(Subscription.package)
-    ).order_by(Payment.payment_date.desc()).offset(skip).limit(size)
+    ).order_by(Payment.payment_date.desc(), Payment.id.desc()).limit(size + 1)
     
     result = await db.execute(query)
     payments = result.scalars().all()
+    has_more = len(payments) > size
+    payments = payments[:size]
     
     # Map to schema with extra fields
     payment_reads = []
@@ -170,14 +309,16 @@ async def list_payments(
             
         payment_reads.append(p_read)
         
-    total_pages = math.ceil((total or 0) / size) if size > 0 else 0
+    total_pages = math.ceil(total / size)
     
     return PaymentPagination(
-        total=total or 0,
+        total=total,
         page=page,
         size=size,
         pages=total_pages,
-        items=payment_reads
+        items=payment_reads,
+        next_cursor=encode_cursor(payments[-1].payment_date, payments[-1].id) if has_more else None,
+        total_estimated=total_estimated,
     )
 
 @router.delete("/subscriptions/{subscription_id}", status_code=204)
@@ -189,6 +330,19 @@ async def delete_subscription(
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
+    # Events of other subscriptions touched by this one's bookings/check-ins
+    # need their occupancy counters recomputed after the bulk deletes
+    affected_event_ids = await collect_event_ids(
+        db,
+        (SessionCheckIn.__table__, SessionCheckIn.subscription_id == subscription_id),
+        (Booking.__table__, Booking.subscription_id == subscription_id),
+    )
+    affected_rollup_days = await collect_rollup_days(
+        db,
+        payment_condition=Payment.subscription_id == subscription_id,
+        check_in_condition=SessionCheckIn.subscription_id == subscription_id,
+    )
+
     # IMPORTANT: Delete in correct order to avoid FK constraint violations
     # 1. Delete SessionCheckIn (references Booking and ClassEvent)
     await db.execute(delete(SessionCheckIn).where(SessionCheckIn.subscription_id == subscription_id))
@@ -198,6 +352,11 @@ async def delete_subscription(
     
     # 3. Delete ClassEvent (now safe after Bookings are removed)
     await db.execute(delete(ClassEvent).where(ClassEvent.subscription_id == subscription_id))
+
+    # 3b. Delete the sold series and their exceptions (materialized rows are gone)
+    own_series = select(ClassSeries.id).where(ClassSeries.subscription_id == subscription_id)
+    await db.execute(delete(ClassSeriesException).where(ClassSeriesException.series_id.in_(own_series)))
+    await db.execute(delete(ClassSeries).where(ClassSeries.subscription_id == subscription_id))
     
     # 4. Delete Payment (references Subscription)
     await db.execute(delete(Payment).where(Payment.subscription_id == subscription_id))
@@ -207,7 +366,19 @@ async def delete_subscription(
     
     # 6. Finally delete the Subscription itself
     await db.delete(subscription)
+    await refresh_event_counters(db, affected_event_ids)
+    await rebuild_rollup_days(db, affected_rollup_days)
     await db.commit()
+    qr_token_cache.invalidate_subscriptions([subscription_id])
+    stats_cache.invalidate(
+        StatsComponent.DEBT,
+        StatsComponent.REVENUE,
+        StatsComponent.SCHEDULE,
+        StatsComponent.ACTIVITY,
+        StatsComponent.OCCUPANCY,
+        StatsComponent.PAYMENTS_COUNT,
+    )
+    event_hub.publish("subscription.deleted", {"subscription_id": subscription_id})
 
 @router.delete("/payments/{payment_id}", status_code=204)
 async def delete_payment(
@@ -218,8 +389,21 @@ async def delete_payment(
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
+    subscription_id = payment.subscription_id
+    amount_paid = float(payment.amount_paid)
+    subscription = await db.get(Subscription, subscription_id)
+    await apply_payment(db, subscription_id, -payment.amount_paid)
+    await record_payment(
+        db, payment.payment_date, subscription.package_id, payment.payment_method, -payment.amount_paid, count=-1
+    )
     await db.delete(payment)
     await db.commit()
+    stats_cache.invalidate(StatsComponent.DEBT, StatsComponent.REVENUE, StatsComponent.PAYMENTS_COUNT)
+    event_hub.publish("payment.deleted", {
+        "payment_id": payment_id,
+        "subscription_id": subscription_id,
+        "amount_paid": amount_paid,
+    })
 
 
 @router.post("/subscriptions-with-events", response_model=SubscriptionRead)
@@ -232,14 +416,15 @@ async def create_subscription_with_events(
     Create a subscription with optional automatic ClassEvent(s) for SESSION_BASED plans.
     
     If class_events is provided with days_and_times:
-    - Creates ClassEvent(s) repeating weekly for the specified number of weeks
-    - For each selected day of week and time, creates repeat_weeks ClassEvent(s)
-    Total ClassEvents = len(days_and_times) × repeat_weeks
+    - Creates a weekly ClassSeries per distinct time, running repeat_weeks weeks
+    - Occurrences are expanded lazily (see backend/services/class_series.py) and
+      listed in the response's class_events; rows are materialized on check-in
+    Total occurrences = len(days_and_times) × repeat_weeks
     
     Example:
     days_and_times: [{day: "monday", time: "14:00"}, {day: "wednesday", time: "14:00"}]
     repeat_weeks: 4
-    → 8 ClassEvent(s) total (2 days × 4 weeks)
+    → 1 ClassSeries (BYDAY=MO,WE), 8 occurrences (2 days × 4 weeks)
     """
     
     # 1. Get Package and Plan
@@ -290,6 +475,8 @@ async def create_subscription_with_events(
         status=enforced_status,
         access_type=plan.access_type or "SESSION_BASED",
         used_sessions=0,
+        # balance defaults to purchase_price - paid_total (see subscription_ledger)
+        paid_total=sub_in.initial_payment.amount_paid if sub_in.initial_payment else 0,
     )
     db.add(subscription)
     await db.flush()  # Flush to get ID
@@ -305,6 +492,13 @@ async def create_subscription_with_events(
             refund_reason=sub_in.initial_payment.refund_reason,
         )
         db.add(payment)
+        await record_payment(
+            db,
+            datetime.now(timezone.utc),
+            subscription.package_id,
+            sub_in.initial_payment.payment_method,
+            sub_in.initial_payment.amount_paid,
+        )
     
     # 5. Generate QR Code
     # Generate a unique cryptographically secure hex token (0-9, A-F).
@@ -384,20 +578,16 @@ async def create_subscription_with_events(
             await db.flush()
         
         # Create BookingPermission for this package + template combination
-        # First check if permission already exists
-        permission_result = await db.execute(
-            select(BookingPermission).where(
-                (BookingPermission.package_id == sub_in.package_id) &
-                (BookingPermission.template_id == template.id)
-            )
-        )
-        existing_permission = permission_result.scalar_one_or_none()
-        if not existing_permission:
-            booking_permission = BookingPermission(
-                package_id=sub_in.package_id,
-                template_id=template.id
-            )
-            db.add(booking_permission)
+        # First check if permission already exists (checked once, not per event)
+        if not await booking_permission_index.is_allowed(db, sub_in.package_id, template.id):
+            # The index may lag behind another worker; confirm before inserting the PK row
+            existing_permission = await db.get(BookingPermission, (sub_in.package_id, template.id))
+            if not existing_permission:
+                booking_permission = BookingPermission(
+                    package_id=sub_in.package_id,
+                    template_id=template.id
+                )
+                db.add(booking_permission)
         
         # Map day names to weekday numbers (0=Monday, 6=Sunday)
         day_name_to_weekday = {
@@ -410,9 +600,11 @@ async def create_subscription_with_events(
             "sunday": 6
         }
         
-        start_datetime = start_date
-        
-        # Create ClassEvent(s) for each day_and_time pair and each week
+        # One weekly series per distinct time (days sharing a time form one
+        # BYDAY rule). Occurrences are expanded when read and only become
+        # class_events rows once a check-in or extra booking attaches, so the
+        # sale writes the same rows regardless of repeat_weeks.
+        weekdays_by_time = {}
         for day_time in sub_in.class_events.days_and_times:
             day_key = day_time.day.lower()
             target_weekday = day_name_to_weekday.get(day_key)
@@ -424,58 +616,36 @@ async def create_subscription_with_events(
             # Parse time
             try:
                 time_hour, time_min = map(int, day_time.time.split(":"))
+                class_time = time(time_hour, time_min)
             except (ValueError, AttributeError):
                 await db.rollback()
                 raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM")
-            
-            # Current start date's weekday
-            current_weekday = start_datetime.weekday()
-            
-            # Calculate how many days to add to reach target_weekday
-            days_offset = (target_weekday - current_weekday) % 7
-            first_occurrence = start_datetime + timedelta(days=days_offset)
-            
-            # Create ClassEvent(s) for each week
-            for week in range(sub_in.class_events.repeat_weeks):
-                # Calculate event date
-                event_date = first_occurrence + timedelta(weeks=week)
-                
-                # Set start_time (1 hour duration by default)
-                event_start = event_date.replace(hour=time_hour, minute=time_min, second=0, microsecond=0)
-                event_end = event_start + timedelta(hours=1)
-                
-                # Create ClassEvent
-                class_event = ClassEvent(
+
+            weekdays_by_time.setdefault(class_time, set()).add(target_weekday)
+
+        # Every selected weekday occurs exactly repeat_weeks times in the span
+        starts_on = as_local(start_date).date()
+        if sub_in.class_events.repeat_weeks > 0:
+            for class_time, weekdays in weekdays_by_time.items():
+                db.add(ClassSeries(
+                    id=str(uuid.uuid4()),
                     subscription_id=subscription.id,
                     template_id=template.id,
                     instructor_user_id=sub_in.class_events.instructor_user_id,
-                    start_time=event_start,
-                    end_time=event_end,
+                    weekdays=format_weekdays(weekdays),
+                    interval_weeks=1,
+                    start_time=class_time,
+                    duration_minutes=60,
+                    starts_on=starts_on,
+                    ends_on=series_span(starts_on, sub_in.class_events.repeat_weeks),
                     capacity=sub_in.class_events.capacity,
-                    is_cancelled=False,
-                )
-                db.add(class_event)
-                await db.flush()  # Flush to get ID
-                
-                # Auto-create Booking if BookingPermission allows
-                permission = await db.execute(
-                    select(BookingPermission).where(
-                        (BookingPermission.package_id == sub_in.package_id) &
-                        (BookingPermission.template_id == template.id)
-                    )
-                )
-                if permission.scalar_one_or_none():
-                    booking = Booking(
-                        member_user_id=sub_in.member_user_id,
-                        event_id=class_event.id,
-                        subscription_id=subscription.id,
-                        status="confirmed",
-                    )
-                    db.add(booking)
+                ))
 
     try:
         await db.commit()
         await db.refresh(subscription)
+        # A freshly issued token must never be shadowed by a previous snapshot
+        qr_token_cache.invalidate_token(qr_token)
     except DBAPIError as e:
         await db.rollback()
         error_str = str(e.orig) if hasattr(e, 'orig') and e.orig else str(e)
@@ -495,10 +665,25 @@ async def create_subscription_with_events(
         .options(
             selectinload(Subscription.payments),
             selectinload(Subscription.class_events).selectinload(ClassEvent.template),
+            selectinload(Subscription.class_series).selectinload(ClassSeries.template),
+            selectinload(Subscription.class_series).selectinload(ClassSeries.exceptions),
             selectinload(Subscription.package).selectinload(ServicePackage.category),
             selectinload(Subscription.package).selectinload(ServicePackage.offering),
             selectinload(Subscription.package).selectinload(ServicePackage.plan)
         )
     )
     result = await db.execute(query)
-    return result.scalar_one()
+    created = _subscription_read(result.scalar_one())
+    stats_cache.invalidate(
+        StatsComponent.DEBT,
+        StatsComponent.REVENUE,
+        StatsComponent.SCHEDULE,
+        StatsComponent.OCCUPANCY,
+        StatsComponent.PAYMENTS_COUNT,
+    )
+    event_hub.publish("subscription.created", {
+        "subscription_id": created.id,
+        "member_user_id": created.member_user_id,
+        "class_event_ids": [e.id for e in created.class_events],
+    })
+    return created
@@ -23,6 +23,7 @@ from backend.schemas.service import (
     ServicePackageRead,
     ServicePackageUpdate,
 )
+from backend.services.qr_token_cache import qr_token_cache
 
 router = APIRouter()
 
@@ -253,6 +254,8 @@ async def update_package(
         
     db.add(package)
     await db.commit()
+    # Scans cache the package name and its plan's session rules
+    qr_token_cache.invalidate_packages([package_id])
     await db.refresh(package)
     
     # Re-fetch with relationships
@@ -277,6 +280,7 @@ async def delete_package(package_id: str, db: AsyncSession = Depends(get_db)):
     try:
         await db.delete(package)
         await db.commit()
+        qr_token_cache.invalidate_packages([package_id])
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from sqlalchemy.orm import selectinload
@@ -7,45 +7,46 @@ from sqlalchemy.orm import selectinload
 from backend.api.deps import get_db
 from backend.core.security import hash_password
 from backend.models.user import User, Role, Instructor, UserRole
+from backend.models.operation import Booking, Payment, SessionCheckIn
 from backend.schemas.user import UserCreate, UserRead, UserUpdate
+from backend.services.event_counters import collect_event_ids, refresh_event_counters
+from backend.services.stats_rollups import collect_rollup_days, rebuild_rollup_days
+from backend.services.subscription_ledger import refresh_balances, subscription_ids_for_payments
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.user_lists import list_users_page
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserRead])
 async def list_staff(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: Optional[str] = Query(None, pattern="^(exact|cached|estimated)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List staff members with optional search"""
-    # Filter users with role ADMIN or INSTRUCTOR
-    query = (
-        select(User)
-        .join(UserRole, User.id == UserRole.user_id)
-        .join(Role, UserRole.role_id == Role.id)
-        .where(Role.role_name.in_(["ADMIN", "INSTRUCTOR"]))
-        .options(selectinload(User.roles))
-        .distinct()
-    )
-    
-    # Apply search filter if provided
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = query.where(
-            or_(
-                User.first_name.ilike(search_term),
-                User.last_name.ilike(search_term),
-                User.email.ilike(search_term),
-                User.phone_number.ilike(search_term)
-            )
+    """List staff (ADMIN or INSTRUCTOR), most recently updated first.
+
+    Pagination works like `GET /members/`: pass the `X-Next-Cursor` header
+    back as `cursor`, and `total_mode` for an `X-Total-Count` header.
+    """
+    try:
+        page = await list_users_page(
+            db,
+            ["ADMIN", "INSTRUCTOR"],
+            StatsComponent.STAFF_COUNT,
+            search=search,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            total_mode=total_mode,
         )
-    
-    query = query.offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    users = result.scalars().all()
-    return users
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers.update(page.headers())
+    return page.users
 
 @router.post("/", response_model=UserRead)
 async def create_staff(
@@ -91,6 +92,7 @@ async def create_staff(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    stats_cache.invalidate(StatsComponent.STAFF_COUNT)
     
     # Load roles for response
     await db.execute(select(User).where(User.id == user.id).options(selectinload(User.roles)))
@@ -159,6 +161,7 @@ async def update_staff(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    stats_cache.invalidate(StatsComponent.STAFF_COUNT)
     
     # Load roles for response
     await db.execute(select(User).where(User.id == staff_id).options(selectinload(User.roles)))
@@ -181,8 +184,34 @@ async def delete_staff(
             detail="Staff member not found.",
         )
     
+    # Check-ins/bookings cascade with the user; keep event counters in sync
+    affected_event_ids = await collect_event_ids(
+        db,
+        (SessionCheckIn.__table__, or_(
+            SessionCheckIn.member_user_id == staff_id,
+            SessionCheckIn.verified_by_user_id == staff_id,
+        )),
+        (Booking.__table__, Booking.member_user_id == staff_id),
+    )
+
+    # Payments recorded by this staff member cascade too; keep balances in sync
+    affected_subscription_ids = await subscription_ids_for_payments(db, Payment.recorded_by_user_id == staff_id)
+    affected_rollup_days = await collect_rollup_days(
+        db,
+        payment_condition=Payment.recorded_by_user_id == staff_id,
+        check_in_condition=or_(
+            SessionCheckIn.member_user_id == staff_id,
+            SessionCheckIn.verified_by_user_id == staff_id,
+        ),
+    )
+
     # Delete the user
     await db.delete(user)
+    await db.flush()
+    await refresh_event_counters(db, affected_event_ids)
+    await refresh_balances(db, affected_subscription_ids)
+    await rebuild_rollup_days(db, affected_rollup_days)
     await db.commit()
+    stats_cache.invalidate()
     
     return {"message": "Staff member deleted successfully"}
@@ -36,6 +36,44 @@ class Settings(BaseSettings):
     # Timezone
     TIMEZONE: str = "Europe/Istanbul"  # Turkey timezone for all operations
 
+    # Check-in caches
+    QR_TOKEN_CACHE_TTL_SECONDS: int = 300
+    QR_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    BOOKING_PERMISSION_INDEX_TTL_SECONDS: int = 300
+    MEMBER_AUTOCOMPLETE_TTL_SECONDS: int = 300
+    CHECKIN_BATCH_CHUNK_SIZE: int = 50
+
+    # Server-Sent Events stream (/api/v1/events/stream)
+    EVENT_STREAM_QUEUE_SIZE: int = 256
+    EVENT_STREAM_REPLAY_SIZE: int = 500
+    EVENT_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Dashboard stats cache (per component; writes invalidate immediately)
+    STATS_CACHE_MEMBERS_TTL_SECONDS: int = 300
+    STATS_CACHE_SCHEDULE_TTL_SECONDS: int = 60
+    STATS_CACHE_DEBT_TTL_SECONDS: int = 300
+    STATS_CACHE_REVENUE_TTL_SECONDS: int = 300
+    STATS_CACHE_ACTIVITY_TTL_SECONDS: int = 30
+    STATS_CACHE_OCCUPANCY_TTL_SECONDS: int = 600
+    STATS_CACHE_LIST_COUNT_TTL_SECONDS: int = 300  # total_mode=cached list totals
+    # Compute dashboard units concurrently, each on its own pooled session
+    STATS_CONCURRENT_UNITS: bool = True
+
+    # Daily revenue/attendance rollups: days the scheduler re-derives each run
+    STATS_ROLLUP_REFRESH_DAYS: int = 2
+    STATS_ROLLUP_REFRESH_MINUTES: int = 15
+
+    # Idempotency-Key replay of sales/payment/booking/check-in POSTs
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_PURGE_MINUTES: int = 60
+
+    # Background hard delete of members (DELETE /api/v1/members/{id})
+    MEMBER_PURGE_BATCH_SIZE: int = 500
+    MEMBER_PURGE_BATCH_PAUSE_SECONDS: float = 0.05  # Lets check-ins take the locks between batches
+    MEMBER_PURGE_SWEEP_MINUTES: int = 5  # Resumes stalled or failed purges
+    MEMBER_PURGE_STALL_MINUTES: int = 10
+    MEMBER_PURGE_MAX_ATTEMPTS: int = 5
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
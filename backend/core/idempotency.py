@@ -0,0 +1,179 @@
+"""
+Idempotency-Key middleware.
+
+`IDEMPOTENT_ENDPOINTS` listesindeki POST'lar `Idempotency-Key` header'ı ile
+gelirse:
+
+* anahtar ilk kez görülüyorsa istek normal işlenir ve yanıtı saklanır,
+* aynı anahtar + aynı istek tamamlanmışsa saklanan yanıt
+  `Idempotency-Replayed: true` header'ı ile aynen döner (endpoint çalışmaz),
+* ilk istek hâlâ sürüyorsa 409 döner (istemci biraz bekleyip tekrar dener),
+* anahtar farklı bir istek gövdesiyle kullanılmışsa 422 döner.
+
+5xx, 401/403, 409 ve 429 yanıtları saklanmaz; anahtar serbest bırakılır ve
+tekrar deneme isteği yeniden çalıştırır. Header'sız istekler ve diğer
+endpoint'ler etkilenmez. Anahtarlar geçerli token'ın subject'ine göre ayrılır.
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from fastapi import FastAPI
+from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.config import settings
+from backend.core.database import get_db
+from backend.models.idempotency import IdempotencyKey
+from backend.services import idempotency
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotency-Replayed"
+
+# Outcomes a retry may change; never replayed
+_TRANSIENT_STATUSES = {401, 403, 409, 429}
+
+
+def _token_subject(headers: Headers) -> str:
+    """Subject of a valid bearer token, or "" when the request is not authenticated."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return ""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    except JWTError:
+        return ""
+    return str(payload.get("sub") or "")
+
+
+@asynccontextmanager
+async def _session(app: FastAPI) -> AsyncIterator[AsyncSession]:
+    # Same provider the endpoints use (tests override get_db)
+    provider = app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    db = await sessions.__anext__()
+    try:
+        yield db
+    finally:
+        await sessions.aclose()
+
+
+def _stored_response(stored: IdempotencyKey, request_hash: str) -> Response:
+    if stored.request_hash != request_hash:
+        logger.warning("Idempotency key reused with a different request on %s", stored.endpoint)
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+        )
+    if stored.status_code is None:
+        return JSONResponse(
+            status_code=409,
+            content={"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed"},
+            headers={"Retry-After": "1"},
+        )
+    headers = {REPLAYED_HEADER: "true"}
+    if stored.content_type:
+        headers["content-type"] = stored.content_type
+    return Response(content=stored.response_body or "", status_code=stored.status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware: the response is stored after the endpoint (and its
+    dependency cleanup) has finished, then sent to the client."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not idempotency.is_idempotent_endpoint(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"{IDEMPOTENCY_HEADER} must be at most {idempotency.MAX_KEY_LENGTH} characters"},
+            )
+            await response(scope, receive, send)
+            return
+        owner = _token_subject(headers)
+        if not owner:
+            # Unauthenticated: the endpoint rejects it, nothing to store
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        request_hash = idempotency.request_fingerprint(
+            scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"), body
+        )
+        app = scope["app"]
+        async with _session(app) as db:
+            stored = await idempotency.claim(db, owner, key, f"{scope['method']} {scope['path']}", request_hash)
+        if stored is not None:
+            await _stored_response(stored, request_hash)(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        messages: List[Message] = []
+
+        async def capture_send(message: Message) -> None:
+            messages.append(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            async with _session(app) as db:
+                await idempotency.release(db, owner, key)
+            raise
+
+        status_code = self._status_code(messages)
+        if status_code is None or status_code >= 500 or status_code in _TRANSIENT_STATUSES:
+            async with _session(app) as db:
+                await idempotency.release(db, owner, key)
+        else:
+            start = next(m for m in messages if m["type"] == "http.response.start")
+            content = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+            async with _session(app) as db:
+                await idempotency.complete(
+                    db,
+                    owner,
+                    key,
+                    status_code,
+                    Headers(raw=start["headers"]).get("content-type"),
+                    content.decode("utf-8"),
+                )
+        for message in messages:
+            await send(message)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _status_code(messages: List[Message]) -> Optional[int]:
+        for message in messages:
+            if message["type"] == "http.response.start":
+                return message["status"]
+        return None
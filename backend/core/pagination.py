@@ -0,0 +1,45 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Liste uçları `OFFSET` yerine son görülen satırın (sıralama_değeri, id) çiftinden
+devam eder; derin sayfalar da index üzerinden sabit maliyetle okunur. İmleç
+istemci için opaktır: base64url ile kodlanmış JSON.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Encode the last row of a page as an opaque cursor."""
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_condition(sort_column, id_column, sort_value: datetime, row_id: str, descending: bool = True):
+    """WHERE clause selecting rows after (sort_value, row_id) in the page order.
+
+    Written as OR/AND instead of a row-value comparison so it works on every
+    backend and still matches a composite (sort_column, id_column) index.
+    """
+    if descending:
+        return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id))
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > row_id))
@@ -1,16 +1,24 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from datetime import datetime, timedelta
 import zoneinfo
 import secrets
 
+from backend.core.config import settings
 from backend.core.database import get_db
 from backend.core.time_utils import get_turkey_time
 from backend.models.user import User, Role
 from backend.models.operation import Subscription, SubscriptionStatus, SubscriptionQrCode
 from backend.models.service import PlanDefinition, ServicePackage
+from backend.services.event_hub import event_hub
+from backend.services.idempotency import purge_expired as purge_expired_idempotency_keys
+from backend.services.member_purge import claimable_job_ids, run_purge_job
+from backend.services.qr_token_cache import qr_token_cache
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.stats_rollups import refresh_recent_rollups
 
 
 class UserActivityScheduler:
@@ -148,6 +156,9 @@ class UserActivityScheduler:
 
                 if expired_count > 0:
                     await db.commit()
+                    # Rotated tokens must stop resolving from the process-local cache
+                    qr_token_cache.invalidate_subscriptions(expired_ids)
+                    event_hub.publish("subscription.expired", {"subscription_ids": list(expired_ids)})
                     print(f"[{now}] Total expired subscriptions: {expired_count}")
                 else:
                     print(f"[{now}] No subscriptions to expire")
@@ -156,6 +167,50 @@ class UserActivityScheduler:
                 await db.rollback()
                 print(f"[{now}] Error expiring subscriptions: {e}")
 
+    async def refresh_stats_rollups(self):
+        """Son günlerin ciro/katılım rollup'larını ham tablolardan yeniden kur"""
+        now = get_turkey_time()
+
+        async for db in get_db():
+            try:
+                written = await refresh_recent_rollups(db, days=settings.STATS_ROLLUP_REFRESH_DAYS)
+                await db.commit()
+                stats_cache.invalidate(StatsComponent.REVENUE)
+                print(f"[{now}] Refreshed stats rollups: {written}")
+            except Exception as e:
+                await db.rollback()
+                print(f"[{now}] Error refreshing stats rollups: {e}")
+
+    async def purge_idempotency_keys(self):
+        """Süresi dolmuş Idempotency-Key kayıtlarını sil"""
+        now = get_turkey_time()
+
+        async for db in get_db():
+            try:
+                removed = await purge_expired_idempotency_keys(db)
+                await db.commit()
+                if removed:
+                    print(f"[{now}] Purged {removed} expired idempotency keys")
+            except Exception as e:
+                await db.rollback()
+                print(f"[{now}] Error purging idempotency keys: {e}")
+
+    async def resume_member_purges(self):
+        """Yarıda kalan veya hata alan üye silme işlerini yeniden çalıştır"""
+        now = get_turkey_time()
+
+        job_ids = []
+        async for db in get_db():
+            try:
+                job_ids = await claimable_job_ids(db)
+            except Exception as e:
+                print(f"[{now}] Error listing member purge jobs: {e}")
+
+        for job_id in job_ids:
+            outcome = await run_purge_job(get_db, job_id)
+            if outcome:
+                print(f"[{get_turkey_time()}] Member purge job {job_id}: {outcome}")
+
     def start(self):
         """Scheduler'ı başlat"""
         # Her gün saat 02:00'de çalıştır (Türkiye saati)
@@ -176,10 +231,33 @@ class UserActivityScheduler:
             timezone=zoneinfo.ZoneInfo('Europe/Istanbul')
         )
         
+        # Write hook'larının kaçırdığı değişiklikler için son günleri periyodik olarak yeniden kur
+        self.scheduler.add_job(
+            self.refresh_stats_rollups,
+            IntervalTrigger(minutes=settings.STATS_ROLLUP_REFRESH_MINUTES),
+            id="refresh_stats_rollups",
+            name="Refresh Stats Rollups",
+        )
+        
+        self.scheduler.add_job(
+            self.purge_idempotency_keys,
+            IntervalTrigger(minutes=settings.IDEMPOTENCY_PURGE_MINUTES),
+            id="purge_idempotency_keys",
+            name="Purge Idempotency Keys",
+        )
+        
+        self.scheduler.add_job(
+            self.resume_member_purges,
+            IntervalTrigger(minutes=settings.MEMBER_PURGE_SWEEP_MINUTES),
+            id="resume_member_purges",
+            name="Resume Member Purges",
+        )
+        
         self.scheduler.start()
-        print("UserActivityScheduler started - will run daily at 02:00 and 02:30 Turkey time")
+        print("UserActivityScheduler started - will run daily at 02:00 and 02:30 Turkey time, rollups every "
+              f"{settings.STATS_ROLLUP_REFRESH_MINUTES} minutes")
 
     def stop(self):
         """Scheduler'ı durdur"""
         self.scheduler.shutdown()
-        print("UserActivityScheduler stopped - both member deactivation and subscription expiry jobs stopped")
\ No newline at end of file
+        print("UserActivityScheduler stopped - member deactivation, subscription expiry, rollup, idempotency purge and member purge jobs stopped")
\ No newline at end of file
@@ -12,6 +12,7 @@ from backend.web.router import router as web_router
 from backend.core.init_db import init_db
 from backend.core.scheduler import UserActivityScheduler
 from backend.core.config import settings
+from backend.core.idempotency import IdempotencyMiddleware
 
 # Configure logging to reduce verbosity
 logging.basicConfig(
@@ -73,6 +74,9 @@ app = FastAPI(
     redoc_url="/redoc" if settings.ENVIRONMENT == "development" else None
 )
 
+# Idempotency-Key replay for retried sales/payment/booking/check-in POSTs
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS settings - Desktop app için gerekli
 app.add_middleware(
     CORSMiddleware,
@@ -6,6 +6,8 @@ from .operation import (
     Payment,
     ClassTemplate,
     BookingPermission,
+    ClassSeries,
+    ClassSeriesException,
     ClassEvent,
     Booking,
     SubscriptionQrCode,
@@ -14,4 +16,7 @@ from .operation import (
     MeasurementType,
     MeasurementValue,
     SubscriptionStatus
-)
\ No newline at end of file
+)
+from .stats import DailyRevenueRollup, DailyAttendanceRollup
+from .idempotency import IdempotencyKey
+from .purge import MemberPurgeJob
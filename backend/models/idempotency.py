@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.core.database import Base
+
+
+# Stored responses of retried POSTs (see backend/services/idempotency.py).
+# Rows are short-lived: the scheduler deletes them after expires_at.
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(64), primary_key=True)  # Caller (token subject) the key belongs to
+    key = Column(String(128), primary_key=True)  # Idempotency-Key header value
+    endpoint = Column(String(255), nullable=False)  # "POST /api/v1/sales/payments"
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is running
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
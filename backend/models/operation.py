@@ -4,14 +4,18 @@ from enum import Enum as PyEnum
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     DECIMAL,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    Time,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -42,8 +46,18 @@ class BookingStatus(PyEnum):
     completed = "completed"
 
 
+def _initial_balance(context):
+    # New subscriptions start owing their purchase price minus any paid_total given
+    params = context.get_current_parameters()
+    return (params.get("purchase_price") or 0) - (params.get("paid_total") or 0)
+
+
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Debt statistics scan only subscriptions with an outstanding balance
+        Index("ix_subscriptions_balance", "balance"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     member_user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -57,6 +71,9 @@ class Subscription(Base):
     access_type = Column(String(20), nullable=False, default="SESSION_BASED")
     used_sessions = Column(Integer, nullable=False, default=0)
     attendance_count = Column(Integer, nullable=False, default=0)
+    # Maintained by backend/services/subscription_ledger.py on every payment write
+    paid_total = Column(DECIMAL(10, 2), nullable=False, default=0, server_default="0")
+    balance = Column(DECIMAL(10, 2), nullable=False, default=_initial_balance, server_default="0")
 
     member = relationship("User", back_populates="subscriptions")
     package = relationship("ServicePackage", back_populates="subscriptions")
@@ -65,10 +82,15 @@ class Subscription(Base):
     qr_code = relationship("SubscriptionQrCode", back_populates="subscription", uselist=False)
     session_check_ins = relationship("SessionCheckIn", back_populates="subscription")
     class_events = relationship("ClassEvent", back_populates="subscription", cascade="all, delete-orphan")
+    class_series = relationship("ClassSeries", back_populates="subscription", cascade="all, delete-orphan")
 
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination of the payments list: (payment_date, id)
+        Index("ix_payments_date_id", "payment_date", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     subscription_id = Column(String(36), ForeignKey("subscriptions.id"), nullable=False)
@@ -106,19 +128,74 @@ class BookingPermission(Base):
     template = relationship("ClassTemplate", back_populates="booking_permissions")
 
 
+# Weekly recurring class (RRULE FREQ=WEEKLY;INTERVAL;BYDAY;UNTIL). Occurrences
+# are expanded on demand by backend/services/class_series.py and only stored as
+# class_events rows once a booking or check-in attaches.
+class ClassSeries(Base):
+    __tablename__ = "class_series"
+    __table_args__ = (
+        Index("ix_class_series_starts_on_ends_on", "starts_on", "ends_on"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Set for series sold with a subscription: its member is booked into every occurrence
+    subscription_id = Column(
+        String(36), ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    template_id = Column(String(36), ForeignKey("class_templates.id"), nullable=False)
+    instructor_user_id = Column(String(36), ForeignKey("instructors.user_id"), nullable=False)
+    weekdays = Column(String(20), nullable=False)  # RRULE BYDAY, e.g. "MO,TH"
+    interval_weeks = Column(Integer, nullable=False, default=1, server_default="1")
+    start_time = Column(Time, nullable=False)  # Turkey wall clock
+    duration_minutes = Column(Integer, nullable=False, default=60, server_default="60")
+    starts_on = Column(Date, nullable=False)  # DTSTART date
+    ends_on = Column(Date, nullable=True)  # UNTIL (inclusive); NULL = open-ended
+    capacity = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    subscription = relationship("Subscription", back_populates="class_series")
+    template = relationship("ClassTemplate")
+    exceptions = relationship("ClassSeriesException", back_populates="series", cascade="all, delete-orphan")
+    events = relationship("ClassEvent", back_populates="series")
+
+
+# Cancelled or rescheduled occurrence of a series (EXDATE / RECURRENCE-ID)
+class ClassSeriesException(Base):
+    __tablename__ = "class_series_exceptions"
+
+    series_id = Column(String(36), ForeignKey("class_series.id", ondelete="CASCADE"), primary_key=True)
+    occurrence_date = Column(Date, primary_key=True)  # Original date of the occurrence
+    is_cancelled = Column(Boolean, nullable=False, default=True)
+    # Rescheduled occurrence; NULL keeps the series time
+    start_time = Column(DateTime(timezone=True), nullable=True)
+    end_time = Column(DateTime(timezone=True), nullable=True)
+
+    series = relationship("ClassSeries", back_populates="exceptions")
+
+
 class ClassEvent(Base):
     __tablename__ = "class_events"
+    __table_args__ = (
+        UniqueConstraint("series_id", "occurrence_date", name="uq_class_events_series_occurrence"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     subscription_id = Column(String(36), ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=True)
+    # Materialized occurrence of a series (NULL for one-off classes)
+    series_id = Column(String(36), ForeignKey("class_series.id", ondelete="CASCADE"), nullable=True)
+    occurrence_date = Column(Date, nullable=True)
     template_id = Column(String(36), ForeignKey("class_templates.id"), nullable=False)
     instructor_user_id = Column(String(36), ForeignKey("instructors.user_id"), nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
     capacity = Column(Integer, nullable=False)
     is_cancelled = Column(Boolean, nullable=False, default=False)
+    # Denormalized occupancy counters, maintained by backend/services/event_counters.py
+    booked_count = Column(Integer, nullable=False, default=0, server_default="0")
+    checked_in_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     subscription = relationship("Subscription", back_populates="class_events")
+    series = relationship("ClassSeries", back_populates="events")
     template = relationship("ClassTemplate", back_populates="class_events")
     instructor = relationship("Instructor", back_populates="class_events")
     bookings = relationship("Booking", back_populates="event")
@@ -162,6 +239,20 @@ class SubscriptionQrCode(Base):
 
 class SessionCheckIn(Base):
     __tablename__ = "session_check_ins"
+    __table_args__ = (
+        # Keyset pagination of the check-in history: (check_in_time, id)
+        Index("ix_session_check_ins_time_id", "check_in_time", "id"),
+        Index("ix_session_check_ins_member_time_id", "member_user_id", "check_in_time", "id"),
+        # One check-in per subscription and class; entries without a class may repeat
+        Index(
+            "uq_session_check_ins_subscription_event",
+            "subscription_id",
+            "event_id",
+            unique=True,
+            postgresql_where=text("event_id IS NOT NULL"),
+            sqlite_where=text("event_id IS NOT NULL"),
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     subscription_id = Column(String(36), ForeignKey("subscriptions.id"), nullable=False)
@@ -170,6 +261,8 @@ class SessionCheckIn(Base):
     verified_by_user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     check_in_time = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     booking_id = Column(String(36), ForeignKey("bookings.id"), unique=True)
+    # Client-generated id for offline-queued scans; makes batch replays idempotent
+    client_ref = Column(String(64), unique=True, index=True, nullable=True)
 
     subscription = relationship("Subscription", back_populates="session_check_ins")
     member = relationship("User", back_populates="session_check_ins", foreign_keys=[member_user_id])
@@ -0,0 +1,32 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.core.database import Base
+
+
+# Background hard deletes of members (see backend/services/member_purge.py).
+# user_id is deliberately not a foreign key: the job outlives the user row.
+
+
+class MemberPurgeJob(Base):
+    __tablename__ = "member_purge_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String(36), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    current_step = Column(String(40), nullable=True)  # Table being purged, e.g. "session_check_ins"
+    deleted_rows = Column(Integer, nullable=False, default=0, server_default="0")
+    batches = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Heartbeat: bumped after every batch so stalled runs can be picked up again
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_member_purge_jobs_status_updated_at", "status", "updated_at"),
+    )
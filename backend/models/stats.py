@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Date, DECIMAL, Integer, String
+
+from backend.core.database import Base
+
+
+# Rollup tables are derived data (see backend/services/stats_rollups.py).
+# package_id is deliberately not a foreign key so history survives package deletion.
+
+
+class DailyRevenueRollup(Base):
+    __tablename__ = "daily_revenue_rollups"
+
+    day = Column(Date, primary_key=True)  # Turkey-local date of payment_date
+    package_id = Column(String(36), primary_key=True)
+    payment_method = Column(String(20), primary_key=True)
+    amount_total = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    payment_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class DailyAttendanceRollup(Base):
+    __tablename__ = "daily_attendance_rollups"
+
+    day = Column(Date, primary_key=True)  # Turkey-local date of check_in_time
+    package_id = Column(String(36), primary_key=True)
+    check_in_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,9 +1,8 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, text
+from sqlalchemy import DDL, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.database import Base
 
@@ -22,6 +21,20 @@ class User(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    # Folded name/email/phone digits, maintained by backend/services/member_search.py
+    search_text = Column(String(1024))
+
+    __table_args__ = (
+        # Substring + fuzzy search; needs the pg_trgm extension
+        Index(
+            "ix_users_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Keyset pagination of member/staff lists: (updated_at, id)
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+    )
 
     roles = relationship("Role", secondary="user_roles", back_populates="users", overlaps="user_roles")
     user_roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan", overlaps="roles")
@@ -45,109 +58,23 @@ class User(Base):
         cascade="all, delete-orphan"
     )
 
-    async def hard_delete(self, db: AsyncSession) -> None:
-        """
-        Perform a hard delete of the user and all related records.
-        This method handles the complex cascade delete logic that cannot be
-        fully managed by SQLAlchemy's cascade due to foreign key constraints.
-        """
-        try:
-            # Delete subscription_qr_codes first (depends on subscriptions)
-            await db.execute(
-                text("DELETE FROM subscription_qr_codes WHERE subscription_id IN (SELECT id FROM subscriptions WHERE member_user_id = :user_id)"),
-                {"user_id": self.id}
-            )
-
-            # Delete payments that reference subscriptions
-            await db.execute(
-                text("DELETE FROM payments WHERE subscription_id IN (SELECT id FROM subscriptions WHERE member_user_id = :user_id)"),
-                {"user_id": self.id}
-            )
-
-            # Delete session_check_ins that reference subscriptions
-            await db.execute(
-                text("DELETE FROM session_check_ins WHERE subscription_id IN (SELECT id FROM subscriptions WHERE member_user_id = :user_id)"),
-                {"user_id": self.id}
-            )
-
-            # Delete bookings that reference subscriptions (this will break event_id constraint temporarily)
-            await db.execute(
-                text("DELETE FROM bookings WHERE subscription_id IN (SELECT id FROM subscriptions WHERE member_user_id = :user_id)"),
-                {"user_id": self.id}
-            )
-
-            # Delete class_events that are created by this user's subscriptions
-            # Note: class_events don't have subscription_id, so we need to find events that have bookings from this user's subscriptions
-            await db.execute(
-                text("""
-                    DELETE FROM class_events 
-                    WHERE id IN (
-                        SELECT DISTINCT ce.id 
-                        FROM class_events ce
-                        INNER JOIN bookings b ON ce.id = b.event_id
-                        WHERE b.subscription_id IN (SELECT id FROM subscriptions WHERE member_user_id = :user_id)
-                    )
-                """),
-                {"user_id": self.id}
-            )
-
-            # Now delete subscriptions
-            await db.execute(
-                text("DELETE FROM subscriptions WHERE member_user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete remaining session check-ins (member specific)
-            await db.execute(
-                text("DELETE FROM session_check_ins WHERE member_user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete remaining bookings (member specific)
-            await db.execute(
-                text("DELETE FROM bookings WHERE member_user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete measurement values first
-            await db.execute(text('''
-                DELETE FROM measurement_values 
-                WHERE session_id IN (
-                    SELECT id FROM measurement_sessions 
-                    WHERE member_user_id = :user_id
-                )
-            '''), {"user_id": self.id})
-
-            # Delete measurement sessions
-            await db.execute(
-                text("DELETE FROM measurement_sessions WHERE member_user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete payments (recorded by this user)
-            await db.execute(
-                text("DELETE FROM payments WHERE recorded_by_user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete instructor record if exists
-            await db.execute(
-                text("DELETE FROM instructors WHERE user_id = :user_id"),
-                {"user_id": self.id}
-            )
-
-            # Delete user roles - Let SQLAlchemy handle this with cascade
-            # await db.execute(
-            #     text("DELETE FROM user_roles WHERE user_id = :user_id"),
-            #     {"user_id": self.id}
-            # )
-
-            # Finally delete the user
-            await db.delete(self)
-
-        except Exception as e:
-            await db.rollback()
-            raise e
+
+# SQLite: trigram FTS5 index over users.search_text (external content, synced by triggers)
+USERS_FTS_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "search_text, content='users', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF search_text ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); "
+    "INSERT INTO users_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+)
+
+for _statement in USERS_FTS_SQLITE_DDL:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(User.__table__, "before_drop", DDL("DROP TABLE IF EXISTS users_fts").execute_if(dialect="sqlite"))
 
 
 class Role(Base):
@@ -162,6 +89,10 @@ class Role(Base):
 
 class UserRole(Base):
     __tablename__ = "user_roles"
+    __table_args__ = (
+        # Role filter of the lists and their counts: users holding a role
+        Index("ix_user_roles_role_id_user_id", "role_id", "user_id"),
+    )
 
     user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
     role_id = Column(Integer, ForeignKey("roles.id"), primary_key=True)
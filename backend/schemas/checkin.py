@@ -1,11 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class CheckInRequest(BaseModel):
     qr_token: str
     event_id: Optional[str] = None  # NULL for TIME_BASED or when no event available
 
+class BatchCheckInItem(CheckInRequest):
+    client_id: str = Field(..., min_length=1, max_length=64)  # Client-generated id (dedupe key)
+    scanned_at: Optional[datetime] = None  # When the QR code was scanned offline
+
+class BatchCheckInRequest(BaseModel):
+    items: List[BatchCheckInItem] = Field(..., max_length=500)
+
 class CheckInResponse(BaseModel):
     success: bool
     message: str
@@ -13,6 +20,21 @@ class CheckInResponse(BaseModel):
     remaining_sessions: int
     check_in_time: str
 
+class BatchCheckInItemResult(BaseModel):
+    client_id: str
+    status: Literal["created", "duplicate", "rejected"]
+    status_code: int
+    message: str
+    member_name: Optional[str] = None
+    remaining_sessions: Optional[int] = None
+    check_in_time: Optional[str] = None
+
+class BatchCheckInResponse(BaseModel):
+    results: List[BatchCheckInItemResult]
+    created: int
+    duplicates: int
+    rejected: int
+
 class CheckInHistoryRead(BaseModel):
     id: str
     check_in_time: datetime
@@ -25,6 +47,10 @@ class CheckInHistoryRead(BaseModel):
     class Config:
         from_attributes = True
 
+class CheckInHistoryPage(BaseModel):
+    items: List[CheckInHistoryRead]
+    next_cursor: Optional[str] = None  # Opaque; None when there are no older rows
+
 class EligibleEvent(BaseModel):
     id: str
     name: str
@@ -41,3 +67,11 @@ class ScanResult(BaseModel):
     access_type: Optional[str] = None
     attendance_count: Optional[int] = None
     eligible_events: List[EligibleEvent] = []
+
+class QrTokenCacheStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    invalidations: int
+    hit_ratio: float
+    ttl_seconds: float
@@ -0,0 +1,59 @@
+from typing import Any, List, Optional
+from decimal import Decimal
+from datetime import datetime
+from pydantic import BaseModel, field_validator, model_validator
+from backend.models.operation import PaymentMethod
+from backend.schemas.user import UserBase
+
+
+class MemberImportRow(UserBase):
+    """One CSV row: a member and, optionally, their current package."""
+    password: Optional[str] = None  # Empty: member cannot log in until a password is set
+    package: Optional[str] = None  # ServicePackage id or name
+    start_date: Optional[datetime] = None  # Defaults to the import time
+    purchase_price: Optional[Decimal] = None  # Defaults to the package price
+    amount_paid: Optional[Decimal] = None
+    payment_method: Optional[PaymentMethod] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def drop_empty_cells(cls, data: Any) -> Any:
+        # Empty CSV cells mean "not given" so field defaults apply
+        if isinstance(data, dict):
+            return {k: v.strip() if isinstance(v, str) else v for k, v in data.items() if v not in (None, "") and k}
+        return data
+
+    @field_validator('purchase_price', 'amount_paid')
+    @classmethod
+    def validate_amount(cls, v: Optional[Decimal]) -> Optional[Decimal]:
+        if v is not None and not Decimal("0") <= v < Decimal("100000000"):
+            raise ValueError('Tutar 0 ile 100.000.000 TL arasında olmalıdır.')
+        return v
+
+    @model_validator(mode="after")
+    def check_subscription_fields(self) -> "MemberImportRow":
+        if self.package is None and any(
+            v is not None for v in (self.start_date, self.purchase_price, self.amount_paid, self.payment_method)
+        ):
+            raise ValueError("package is required for subscription columns")
+        if self.amount_paid and self.payment_method is None:
+            raise ValueError("payment_method is required when amount_paid is set")
+        return self
+
+
+class ImportRowError(BaseModel):
+    row: int  # CSV line number (header is line 1)
+    email: Optional[str] = None
+    errors: List[str]
+
+
+class ImportReport(BaseModel):
+    dry_run: bool = False
+    total_rows: int = 0
+    imported_members: int = 0
+    imported_subscriptions: int = 0
+    imported_payments: int = 0
+    failed_rows: int = 0
+    errors: List[ImportRowError] = []
+    # The file stopped being readable at this line; nothing after it was imported
+    read_error: Optional[ImportRowError] = None
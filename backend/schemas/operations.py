@@ -1,6 +1,6 @@
 from typing import Optional, List
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import date, datetime, time
+from pydantic import BaseModel, Field
 
 # --- Class Template ---
 class ClassTemplateBase(BaseModel):
@@ -36,14 +36,59 @@ class ClassEventUpdate(BaseModel):
     is_cancelled: Optional[bool] = None
 
 class ClassEventRead(ClassEventBase):
-    id: str
+    id: str  # "<series_id>@<YYYY-MM-DD>" for occurrences that are not materialized yet
+    booked_count: int = 0
+    checked_in_count: int = 0
     template: Optional[ClassTemplateRead] = None
+    series_id: Optional[str] = None
+    occurrence_date: Optional[date] = None
+    is_materialized: bool = True
     # We might want to include instructor details here, but for now let's keep it simple or add a nested UserRead if needed.
     # instructor: Optional[UserRead] = None 
 
     class Config:
         from_attributes = True
 
+# --- Class Series ---
+class ClassSeriesBase(BaseModel):
+    template_id: str
+    instructor_user_id: str
+    weekdays: str  # RRULE BYDAY, e.g. "MO,TH"
+    interval_weeks: int = Field(1, ge=1)
+    start_time: time  # Turkey wall clock
+    duration_minutes: int = Field(60, ge=1)
+    starts_on: date
+    ends_on: Optional[date] = None  # Inclusive; None = open-ended
+    capacity: int
+
+class ClassSeriesCreate(ClassSeriesBase):
+    pass
+
+class ClassSeriesExceptionBase(BaseModel):
+    occurrence_date: date  # Original date of the occurrence
+    is_cancelled: bool = True
+    start_time: Optional[datetime] = None  # Reschedule; None keeps the series time
+    end_time: Optional[datetime] = None
+
+class ClassSeriesExceptionCreate(ClassSeriesExceptionBase):
+    pass
+
+class ClassSeriesExceptionRead(ClassSeriesExceptionBase):
+    series_id: str
+
+    class Config:
+        from_attributes = True
+
+class ClassSeriesRead(ClassSeriesBase):
+    id: str
+    subscription_id: Optional[str] = None
+    rrule: Optional[str] = None  # "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;UNTIL=20260630"
+    template: Optional[ClassTemplateRead] = None
+    exceptions: List[ClassSeriesExceptionRead] = []
+
+    class Config:
+        from_attributes = True
+
 # --- Booking ---
 class BookingBase(BaseModel):
     member_user_id: str
@@ -54,9 +99,31 @@ class BookingCreate(BookingBase):
     pass
 
 class BookingRead(BookingBase):
-    id: str
+    id: Optional[str] = None  # None for the subscriber of a not yet materialized series occurrence
     status: str
     member_name: Optional[str] = None # Computed field for convenience
 
     class Config:
         from_attributes = True
+
+# --- Week Calendar ---
+class CalendarInstructor(BaseModel):
+    user_id: str
+    first_name: str
+    last_name: str
+
+class CalendarParticipant(BaseModel):
+    booking_id: Optional[str] = None  # None for series subscribers (see BookingRead)
+    member_user_id: str
+    member_name: str
+    status: str
+
+class CalendarEvent(ClassEventRead):
+    instructor: CalendarInstructor
+    # First few bookings; booked_count is the full number
+    participants: List[CalendarParticipant] = []
+
+class WeekCalendar(BaseModel):
+    week_start: date  # Monday
+    week_end: date  # Sunday
+    events: List[CalendarEvent]
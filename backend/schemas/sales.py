@@ -56,6 +56,8 @@ class PaymentPagination(BaseModel):
     size: int
     pages: int
     items: List[PaymentRead]
+    next_cursor: Optional[str] = None  # Opaque; None when there are no older rows
+    total_estimated: bool = False  # True when `total` is a planner estimate
 
 # --- Subscription Schemas ---
 class SubscriptionBase(BaseModel):
@@ -83,9 +85,30 @@ class SubscriptionRead(SubscriptionBase):
     used_sessions: int
     access_type: str = "SESSION_BASED"
     attendance_count: int = 0
+    paid_total: Decimal = Decimal("0")
+    balance: Decimal = Decimal("0")
     payments: List[PaymentRead] = []
     package: Optional[ServicePackageRead] = None
     class_events: List[ClassEventRead] = []
 
     class Config:
         from_attributes = True
+
+class SubscriptionSummary(BaseModel):
+    """Column-only projection of a subscription (`view=summary` / `fields=`)"""
+    id: str
+    member_user_id: Optional[str] = None
+    member_name: Optional[str] = None
+    package_id: Optional[str] = None
+    package_name: Optional[str] = None
+    access_type: Optional[str] = None
+    status: Optional[SubscriptionStatus] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    purchase_price: Optional[Decimal] = None
+    paid_total: Optional[Decimal] = None
+    balance: Optional[Decimal] = None
+    used_sessions: Optional[int] = None
+    sessions_granted: Optional[int] = None
+    remaining_sessions: Optional[int] = None  # None for TIME_BASED plans
+    attendance_count: Optional[int] = None
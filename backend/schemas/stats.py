@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 class ActivityItem(BaseModel):
     id: str  # Unique ID for frontend key (e.g., "sale_123")
@@ -16,6 +16,15 @@ class ScheduleItem(BaseModel):
     end_time: datetime
     occupancy: str  # "3/10" or "Dolu"
     status: str # 'active', 'cancelled'
+    booked_count: int = 0
+    capacity: Optional[int] = None
+
+class ComponentCacheInfo(BaseModel):
+    computed_at: datetime
+    age_seconds: float
+    ttl_seconds: float
+    cached: bool  # False: computed for this request
+    compute_ms: Optional[float] = None  # Query time when computed for this request
 
 class DashboardStats(BaseModel):
     active_members: int
@@ -25,6 +34,7 @@ class DashboardStats(BaseModel):
     monthly_revenue: float
     todays_schedule: List[ScheduleItem]
     recent_activities: List[ActivityItem]
+    cache: Dict[str, ComponentCacheInfo] = {}  # component name -> cache metadata
 
 
 class DebtMember(BaseModel):
@@ -32,3 +42,44 @@ class DebtMember(BaseModel):
     first_name: str
     last_name: str
     debt_amount: float
+
+
+class TimeseriesPoint(BaseModel):
+    period_start: date  # First day of the day/week/month bucket
+    key: Optional[str] = None  # package_id or payment method when grouped
+    label: Optional[str] = None  # Human readable key (package name)
+    value: float  # Revenue amount or check-in count
+    count: int  # Number of payments / check-ins
+
+
+class TimeseriesResponse(BaseModel):
+    metric: str
+    granularity: str
+    group_by: str
+    start: date
+    end: date
+    points: List[TimeseriesPoint]
+
+
+class OccupancyCell(BaseModel):
+    weekday: int  # ISO weekday, 1 = Monday
+    hour: int  # Start hour of the class
+    template_id: str
+    template_name: str
+    instructor_user_id: str
+    instructor_name: str
+    events: int
+    capacity_total: int
+    booked_total: int
+    check_ins: int
+    no_shows: int
+    avg_fill_rate: float  # Mean check-ins / capacity per class
+    avg_booking_rate: float  # Mean bookings / capacity per class
+    no_show_rate: Optional[float] = None  # No-shows / bookings
+
+
+class OccupancyResponse(BaseModel):
+    start: date
+    end: date
+    cells: List[OccupancyCell]
+    cache: ComponentCacheInfo
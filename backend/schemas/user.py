@@ -44,6 +44,18 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
     is_active: Optional[bool] = None
 
+class MemberSuggestion(BaseModel):
+    """Type-ahead result; the fields member pickers display."""
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: Optional[str] = None
+    is_active: bool = True
+
+    class Config:
+        from_attributes = True
+
 class UserRead(UserBase):
     id: str
     roles: List[RoleRead] = []
@@ -51,4 +63,27 @@ class UserRead(UserBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MemberPurgeJobRead(BaseModel):
+    """Progress of a background member hard delete."""
+    id: str
+    user_id: str
+    status: str  # pending, running, completed, failed
+    current_step: Optional[str] = None
+    deleted_rows: int = 0
+    batches: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class MemberDeleteResponse(BaseModel):
+    message: str
+    id: str
+    is_active: bool
+    purge_job: MemberPurgeJobRead
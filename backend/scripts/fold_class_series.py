@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Fold weekly class_events rows into recurring class_series.
+
+Run once after the class_series migration (safe to re-run; folded rows are
+skipped). Untouched future occurrences are deleted and expanded lazily from
+their series; past, attended or edited occurrences stay as linked rows:
+    python backend/scripts/fold_class_series.py [--min-occurrences 4] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from backend.core.database import SessionLocal
+from backend.services.class_series import fold_events_into_series
+
+
+async def main(min_occurrences: int, dry_run: bool):
+    """Fold in a single transaction"""
+    print("Folding weekly class events into recurring series...")
+
+    async with SessionLocal() as db:
+        result = await fold_events_into_series(db, min_occurrences=min_occurrences)
+        if dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+
+    print(
+        f"{'Would create' if dry_run else 'Created'} {result.series} series "
+        f"({result.exceptions} cancelled week(s)); "
+        f"{result.linked_events} event(s) linked, {result.removed_events} event(s) removed."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-occurrences", type=int, default=4,
+                        help="Repeats needed before staff-created classes form a series")
+    parser.add_argument("--dry-run", action="store_true", help="Report without committing")
+    args = parser.parse_args()
+    asyncio.run(main(args.min_occurrences, args.dry_run))
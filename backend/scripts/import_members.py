@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Bulk import members (and their current packages) from a CSV file.
+
+    python backend/scripts/import_members.py members.csv --recorded-by admin@studio.com
+    python backend/scripts/import_members.py members.csv --recorded-by admin@studio.com --dry-run
+    python backend/scripts/import_members.py members.csv --recorded-by admin@studio.com --report errors.json
+
+Columns: email, first_name, last_name (required), phone_number, password,
+is_active, package (id or name), start_date, purchase_price, amount_paid,
+payment_method. The file is streamed; see backend/services/member_import.py.
+Exit code is 1 when any row failed.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import os
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from sqlalchemy import select
+
+from backend.core.database import SessionLocal
+from backend.models.user import User
+from backend.services.member_import import DEFAULT_BATCH_SIZE, check_columns, import_members
+
+
+async def run(path: str, recorded_by: str, batch_size: int, dry_run: bool, report_path: str = None) -> int:
+    async with SessionLocal() as db:
+        staff_id = (await db.execute(select(User.id).where(User.email == recorded_by))).scalar_one_or_none()
+        if staff_id is None:
+            print(f"Staff user '{recorded_by}' not found.")
+            return 2
+
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            reader = csv.DictReader(handle)
+            try:
+                check_columns(reader.fieldnames)
+            except ValueError as e:
+                print(e)
+                return 2
+            report = await import_members(db, reader, staff_id, batch_size=batch_size, dry_run=dry_run)
+
+    for error in report.errors[:20]:
+        print(f"  line {error.row} ({error.email or '-'}): {'; '.join(error.errors)}")
+    if len(report.errors) > 20:
+        print(f"  ... {len(report.errors) - 20} more")
+    if report.read_error:
+        print(f"Stopped at line {report.read_error.row}: {'; '.join(report.read_error.errors)}")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as out:
+            json.dump(report.model_dump(), out, ensure_ascii=False, indent=2)
+    prefix = "Dry run: would import" if dry_run else "Imported"
+    print(
+        f"{prefix} {report.imported_members} member(s), {report.imported_subscriptions} subscription(s), "
+        f"{report.imported_payments} payment(s); {report.failed_rows} of {report.total_rows} row(s) failed."
+    )
+    return 1 if report.failed_rows or report.read_error else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV file (UTF-8, header row)")
+    parser.add_argument("--recorded-by", required=True, help="Email of the staff user recorded on payments")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+    parser.add_argument("--report", default=None, help="Write the full JSON report to this file")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.path, args.recorded_by, args.batch_size, args.dry_run, args.report)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Recompute users.search_text (folded name/email/phone used by member and staff
+search) for every user.
+
+The migration fills existing users; run this whenever the folding rules change:
+    python backend/scripts/rebuild_member_search.py
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from backend.core.database import SessionLocal
+from backend.services.member_search import rebuild_search_text
+
+
+async def main(batch_size: int):
+    """Rebuild in one transaction"""
+    async with SessionLocal() as db:
+        print("Rebuilding member search text...")
+        written = await rebuild_search_text(db, batch_size=batch_size)
+        await db.commit()
+
+    print(f"Done. {written} user(s) updated.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild users.search_text")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
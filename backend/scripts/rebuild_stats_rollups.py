@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily revenue / attendance rollup tables from payments and
+session_check_ins.
+
+The migration fills the full history; run this after manual data fixes:
+    python backend/scripts/rebuild_stats_rollups.py
+    python backend/scripts/rebuild_stats_rollups.py --since 2026-01-01 --until 2026-03-31
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import date
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from sqlalchemy import func, select
+
+from backend.core.database import SessionLocal
+from backend.core.time_utils import get_turkey_time
+from backend.models.operation import Payment, SessionCheckIn
+from backend.services.stats_rollups import business_day, rebuild_rollups
+
+
+async def main(since: date = None, until: date = None):
+    """Rebuild the range in one transaction"""
+    async with SessionLocal() as db:
+        if since is None:
+            earliest = [
+                (await db.execute(select(func.min(Payment.payment_date)))).scalar(),
+                (await db.execute(select(func.min(SessionCheckIn.check_in_time)))).scalar(),
+            ]
+            earliest = [business_day(moment) for moment in earliest if moment is not None]
+            if not earliest:
+                print("No payments or check-ins; nothing to rebuild.")
+                return
+            since = min(earliest)
+        until = until or get_turkey_time().date()
+
+        print(f"Rebuilding stats rollups for {since} .. {until}...")
+        written = await rebuild_rollups(db, since, until)
+        await db.commit()
+
+    print(f"Done. {written['revenue']} revenue row(s), {written['attendance']} attendance row(s) written.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild daily stats rollups")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="First day (default: earliest data)")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="Last day (default: today)")
+    args = parser.parse_args()
+    asyncio.run(main(args.since, args.until))
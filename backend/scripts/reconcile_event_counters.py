@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rebuild the denormalized class_events.booked_count / checked_in_count
+counters from the bookings and session_check_ins tables.
+
+Run after manual data fixes or whenever the counters are suspected to drift:
+    python backend/scripts/reconcile_event_counters.py
+"""
+
+import asyncio
+import sys
+import os
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from backend.core.database import SessionLocal
+from backend.services.event_counters import reconcile_event_counters
+
+
+async def main():
+    """Reconcile counters in a single transaction"""
+    print("Reconciling class event occupancy counters...")
+
+    async with SessionLocal() as db:
+        fixed = await reconcile_event_counters(db)
+        await db.commit()
+
+    print(f"Done. {fixed} event(s) corrected.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Check or rebuild the maintained subscriptions.paid_total / balance columns
+from the payments table.
+
+    python backend/scripts/subscription_balances.py verify    # report drift, exit 1 if any
+    python backend/scripts/subscription_balances.py backfill  # fix drifted rows
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add project root and backend to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from backend.core.database import SessionLocal
+from backend.services.subscription_ledger import backfill_balances, verify_balances
+
+
+async def verify() -> int:
+    async with SessionLocal() as db:
+        mismatches = await verify_balances(db)
+
+    for row in mismatches:
+        print(
+            f"  {row['subscription_id']}: paid_total={row['paid_total']} "
+            f"balance={row['balance']} expected_paid_total={row['expected_paid_total']}"
+        )
+    print(f"{len(mismatches)} subscription(s) out of sync.")
+    return 1 if mismatches else 0
+
+
+async def backfill() -> int:
+    print("Rebuilding subscription payment totals...")
+    async with SessionLocal() as db:
+        fixed = await backfill_balances(db)
+        await db.commit()
+    print(f"Done. {fixed} subscription(s) corrected.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["verify", "backfill"])
+    args = parser.parse_args()
+    runner = verify if args.command == "verify" else backfill
+    sys.exit(asyncio.run(runner()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Business service package
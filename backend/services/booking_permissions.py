@@ -0,0 +1,116 @@
+"""
+In-memory package → class template booking permission index.
+
+`booking_permissions` küçük ve nadiren değişen bir tablo; check-in, scan ve
+rezervasyon akışları ise her aday etkinlik için aynı satırı soruyordu. Bu modül
+tabloyu tek sorguda (package_id, template_id) çiftleri kümesine yükler; uygunluk
+kontrolü böylece tek bir set üyelik testine iner.
+
+Index, BookingPermission satırlarını ekleyen/silen her ORM commit'inden sonra
+geçersiz kılınır ve diğer worker süreçlerinde yapılan değişiklikleri yakalamak
+için ayrıca TTL ile yenilenir.
+"""
+import logging
+import time
+from typing import Callable, Dict, FrozenSet, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.models.operation import BookingPermission
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "booking_permissions_changed"
+
+
+class BookingPermissionIndex:
+    """Lazily loaded set of allowed (package_id, template_id) pairs.
+
+    Args:
+        ttl_seconds: Maximum age of a loaded snapshot before it is reloaded.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._pairs: Set[tuple[str, str]] = set()
+        self._templates_by_package: Dict[str, Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+        self.reloads = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl_seconds
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the permission table if the index is stale or was invalidated."""
+        if self.is_fresh:
+            return
+        generation = self._generation
+        result = await db.execute(select(BookingPermission.package_id, BookingPermission.template_id))
+        pairs = {(row.package_id, row.template_id) for row in result}
+
+        templates_by_package: Dict[str, Set[str]] = {}
+        for package_id, template_id in pairs:
+            templates_by_package.setdefault(package_id, set()).add(template_id)
+
+        self._pairs = pairs
+        self._templates_by_package = templates_by_package
+        self.reloads += 1
+        logger.debug("Booking permission index loaded with %d pairs", len(pairs))
+        # An invalidation that raced with this load keeps the index stale
+        if generation == self._generation:
+            self._loaded_at = self._clock()
+
+    def allows(self, package_id: str, template_id: str) -> bool:
+        return (package_id, template_id) in self._pairs
+
+    def templates_for_package(self, package_id: str) -> FrozenSet[str]:
+        return frozenset(self._templates_by_package.get(package_id, ()))
+
+    async def is_allowed(self, db: AsyncSession, package_id: str, template_id: str) -> bool:
+        """Check a single pair, loading the index first if needed."""
+        await self.ensure_loaded(db)
+        return self.allows(package_id, template_id)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+
+    def clear(self) -> None:
+        self.invalidate()
+        self._pairs = set()
+        self._templates_by_package = {}
+        self.reloads = 0
+
+
+booking_permission_index = BookingPermissionIndex(
+    ttl_seconds=settings.BOOKING_PERMISSION_INDEX_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_permission_changes(session: Session, flush_context) -> None:
+    # Only mark here; the index is invalidated once the change is committed so a
+    # concurrent reload cannot cache the pre-commit state.
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        if isinstance(obj, BookingPermission):
+            session.info[_PENDING_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        booking_permission_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,411 @@
+"""
+Atomic check-in workflow shared by the single and batch check-in endpoints.
+
+Kapasite ve seans hakkı artık "oku → Python'da kontrol et → yaz" döngüsüyle
+değil, koşullu SQL ifadeleriyle korunur:
+
+* Check-in kaydı `INSERT ... SELECT ... WHERE NOT EXISTS` ile eklenir; aynı
+  derse tekrar giriş ise satır eklenmez. Aynı anda okunan iki tarama bu
+  kontrolü birlikte geçebileceği için (READ COMMITTED) son karar
+  `uq_session_check_ins_subscription_event` kısmi unique index'inindir.
+* Kapasite, etkinlik satırındaki `checked_in_count` sayacı üzerinden
+  `UPDATE ... WHERE checked_in_count < capacity RETURNING` ile korunur; satır
+  kilidi aynı derse eş zamanlı giriş yapan masaları sıraya sokar.
+* Sayaç `UPDATE ... SET used_sessions = used_sessions + 1 WHERE used_sessions < granted
+  RETURNING used_sessions` ile tek ifadede artırılır.
+
+`perform_check_in` commit/rollback yapmaz; işlem sınırı çağıran tarafa aittir.
+Bir `CheckInError` yükseldiğinde çağıran taraf transaction'ı (veya savepoint'i)
+geri almalıdır, aksi halde eklenmiş check-in satırı kalabilir.
+
+`apply_check_in_batch` ise masaüstü uygulamanın çevrimdışı kuyruğunu parça parça
+(chunk) commit ederek işler; her öğe kendi savepoint'inde çalışır ve istemci
+id'si (`client_ref`) ile tekrar gönderimler idempotenttir.
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, exists, insert, literal, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.models.operation import ClassEvent, SessionCheckIn, Subscription, SubscriptionStatus
+from backend.models.service import PlanDefinition, ServicePackage
+from backend.services.booking_permissions import booking_permission_index
+from backend.services.class_series import materialize, parse_occurrence_id
+from backend.services.event_counters import adjust_checked_in_count, try_claim_check_in_slot
+from backend.services.qr_token_cache import qr_token_cache, resolve_qr_token
+from backend.services.stats_rollups import record_check_in
+
+logger = logging.getLogger(__name__)
+
+UNLIMITED_SESSIONS = 9999
+
+_check_ins = SessionCheckIn.__table__
+_subscriptions = Subscription.__table__
+
+_DUPLICATE_CHECK_IN_INDEX = "uq_session_check_ins_subscription_event"
+
+
+class CheckInError(Exception):
+    """Business rule violation during check-in, mapped to an HTTP error by the caller."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _is_duplicate_check_in(error: IntegrityError) -> bool:
+    """Whether `error` is the (subscription_id, event_id) unique index rejecting a second check-in."""
+    message = str(error.orig)
+    # PostgreSQL names the index, SQLite lists its columns
+    return _DUPLICATE_CHECK_IN_INDEX in message or "session_check_ins.subscription_id, session_check_ins.event_id" in message
+
+
+@dataclass(frozen=True)
+class CheckInOutcome:
+    check_in_id: str
+    check_in_time: datetime
+    subscription_id: str
+    member_name: str
+    remaining_sessions: int
+    event_id: Optional[str] = None
+    member_user_id: Optional[str] = None
+    package_name: Optional[str] = None
+    access_type: Optional[str] = None
+    usage_count: int = 0  # used_sessions (SESSION_BASED) or attendance_count after this check-in
+
+    def to_event(self) -> dict:
+        """Payload of the `checkin.created` stream event (dashboard activity item)."""
+        if self.access_type == "TIME_BASED":
+            description = f"{self.package_name} (sınırsız)"
+        else:
+            description = f"{self.package_name} - {self.usage_count} seansa katıldı."
+        return {
+            "checkin_id": self.check_in_id,
+            "subscription_id": self.subscription_id,
+            "member_user_id": self.member_user_id,
+            "event_id": self.event_id,
+            "remaining_sessions": self.remaining_sessions,
+            "activity": {
+                "id": f"checkin_{self.check_in_id}",
+                "type": "checkin",
+                "description": description,
+                "timestamp": self.check_in_time.isoformat(),
+                "user_name": self.member_name,
+            },
+        }
+
+
+async def perform_check_in(
+    db: AsyncSession,
+    qr_token: str,
+    event_id: Optional[str],
+    verified_by_user_id: str,
+    scanned_at: Optional[datetime] = None,
+    client_ref: Optional[str] = None,
+) -> CheckInOutcome:
+    """Validate and record a check-in inside the caller's transaction.
+
+    Args:
+        db: Session with an open (or implicitly opened) transaction.
+        qr_token: Scanned QR token.
+        event_id: Class event to attend; None for entries without an event.
+        verified_by_user_id: Staff user confirming the check-in.
+        scanned_at: Time the QR code was scanned (offline queue). Expiry is
+            judged at this time and it is stored as the check-in time.
+            Defaults to now.
+        client_ref: Client-generated id stored for batch deduplication.
+
+    Returns:
+        The stored check-in with the subscription's remaining sessions.
+
+    Raises:
+        CheckInError: If the token, subscription, event, permission, capacity
+            or session quota rules reject the check-in. Statements already
+            executed must be rolled back by the caller.
+    """
+    # 1. Resolve QR token (cached snapshot) and read the live subscription state
+    snapshot = await resolve_qr_token(db, qr_token)
+    state = None
+    if snapshot:
+        state_result = await db.execute(
+            select(Subscription.status, Subscription.end_date)
+            .where(Subscription.id == snapshot.subscription_id)
+        )
+        state = state_result.one_or_none()
+
+    if not state:
+        if snapshot:
+            qr_token_cache.invalidate_token(qr_token)
+        raise CheckInError(404, "Invalid or inactive QR code")
+
+    # 2. Validate Subscription Status and Date
+    if state.status != SubscriptionStatus.active:
+        raise CheckInError(400, f"Subscription is {state.status.value}")
+    if state.end_date.replace(tzinfo=None) < (scanned_at or datetime.now()):
+        raise CheckInError(400, "Subscription has expired")
+
+    # 3. Validate the event (if provided); a series occurrence is materialized
+    # here and rolled back with the rest if the check-in is rejected
+    event = None
+    if event_id:
+        occurrence = parse_occurrence_id(event_id)
+        if occurrence:
+            materialized = await materialize(db, *occurrence)
+            event_id = materialized.id if materialized else None
+        if event_id:
+            event_result = await db.execute(
+                select(ClassEvent.id, ClassEvent.template_id, ClassEvent.is_cancelled)
+                .where(ClassEvent.id == event_id)
+            )
+            event = event_result.one_or_none()
+        if not event:
+            raise CheckInError(404, "Class Event not found")
+        if event.is_cancelled:
+            raise CheckInError(400, "Class Event is cancelled")
+        if not await booking_permission_index.is_allowed(db, snapshot.package_id, event.template_id):
+            raise CheckInError(403, "This subscription does not cover this class type")
+
+    # 4. Insert the check-in; the duplicate rule is part of the statement
+    check_in_id = str(uuid.uuid4())
+    values = {
+        "id": check_in_id,
+        "subscription_id": snapshot.subscription_id,
+        "member_user_id": snapshot.member_user_id,
+        "event_id": event.id if event else None,
+        "verified_by_user_id": verified_by_user_id,
+    }
+    if scanned_at is not None:
+        values["check_in_time"] = scanned_at
+    if client_ref is not None:
+        values["client_ref"] = client_ref
+    if event:
+        already_checked_in = exists().where(
+            _check_ins.c.subscription_id == snapshot.subscription_id,
+            _check_ins.c.event_id == event.id,
+        )
+        guarded_row = select(
+            *[literal(value, _check_ins.c[name].type) for name, value in values.items()]
+        ).where(~already_checked_in)
+        insert_stmt = insert(_check_ins).from_select(list(values), guarded_row)
+    else:
+        insert_stmt = insert(_check_ins).values(**values)
+
+    try:
+        check_in_time = (await db.execute(insert_stmt.returning(_check_ins.c.check_in_time))).scalar_one_or_none()
+    except IntegrityError as e:
+        # A concurrent scan of the same subscription and class passed the guard first
+        if not _is_duplicate_check_in(e):
+            raise
+        raise CheckInError(400, "Member already checked in to this event") from e
+    if check_in_time is None:
+        raise CheckInError(400, "Member already checked in to this event")
+
+    # 5. Claim a seat: O(1) counter update instead of COUNT(session_check_ins)
+    if event and await try_claim_check_in_slot(db, event.id) is None:
+        raise CheckInError(400, "Class is full (capacity reached)")
+
+    # 6. Consume a session (SESSION_BASED) or count attendance (TIME_BASED) atomically
+    sessions_granted = snapshot.sessions_granted or 0
+    if snapshot.access_type == "SESSION_BASED":
+        counter = _subscriptions.c.used_sessions
+    else:
+        counter = _subscriptions.c.attendance_count
+    conditions = [
+        _subscriptions.c.id == snapshot.subscription_id,
+        _subscriptions.c.status == SubscriptionStatus.active,
+    ]
+    if snapshot.access_type == "SESSION_BASED" and sessions_granted > 0:
+        conditions.append(_subscriptions.c.used_sessions < sessions_granted)
+
+    new_count = (
+        await db.execute(
+            update(_subscriptions)
+            .where(*conditions)
+            .values({counter.name: counter + 1})
+            .returning(counter)
+        )
+    ).scalar_one_or_none()
+    if new_count is None:
+        raise CheckInError(400, "No sessions remaining in this subscription")
+
+    await record_check_in(db, check_in_time, snapshot.package_id)
+
+    if snapshot.access_type == "SESSION_BASED" and sessions_granted > 0:
+        remaining = sessions_granted - new_count
+    else:
+        remaining = UNLIMITED_SESSIONS
+
+    return CheckInOutcome(
+        check_in_id=check_in_id,
+        check_in_time=check_in_time,
+        subscription_id=snapshot.subscription_id,
+        member_name=snapshot.member_name,
+        remaining_sessions=remaining,
+        event_id=event.id if event else None,
+        member_user_id=snapshot.member_user_id,
+        package_name=snapshot.package_name,
+        access_type=snapshot.access_type,
+        usage_count=new_count,
+    )
+
+
+@dataclass(frozen=True)
+class BatchCheckInItem:
+    client_id: str
+    qr_token: str
+    event_id: Optional[str] = None
+    scanned_at: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class BatchCheckInResult:
+    client_id: str
+    status: str  # "created" | "duplicate" | "rejected"
+    status_code: int
+    message: str
+    outcome: Optional[CheckInOutcome] = None
+
+
+def _normalize_scan_time(scanned_at: Optional[datetime]) -> Optional[datetime]:
+    """Convert to naive local time (like `datetime.now()`) and clamp future scans."""
+    if scanned_at is None:
+        return None
+    if scanned_at.tzinfo is not None:
+        scanned_at = scanned_at.astimezone().replace(tzinfo=None)
+    return min(scanned_at, datetime.now())
+
+
+async def apply_check_in_batch(
+    db: AsyncSession,
+    items: Sequence[BatchCheckInItem],
+    verified_by_user_id: str,
+    chunk_size: int = 50,
+) -> List[BatchCheckInResult]:
+    """Apply offline-queued check-ins, committing once per chunk.
+
+    Items are processed in scan order. Each item runs in its own savepoint so a
+    rejected scan does not undo the rest of its chunk. Client ids that were
+    already stored (earlier replay) or repeat within the batch are reported as
+    duplicates without touching any counters.
+
+    Args:
+        db: Session without pending changes; this function commits it.
+        items: Queued scans with client-generated ids.
+        verified_by_user_id: Staff user submitting the queue.
+        chunk_size: Number of items per transaction.
+
+    Returns:
+        One result per input item, in input order.
+    """
+    results: dict[int, BatchCheckInResult] = {}
+    client_ids = list({item.client_id for item in items})
+    existing_refs = set()
+    for start in range(0, len(client_ids), 500):
+        existing = await db.execute(
+            select(SessionCheckIn.client_ref).where(SessionCheckIn.client_ref.in_(client_ids[start:start + 500]))
+        )
+        existing_refs.update(existing.scalars().all())
+
+    pending: List[tuple[int, BatchCheckInItem, Optional[datetime]]] = []
+    seen = set(existing_refs)
+    for position, item in enumerate(items):
+        if item.client_id in seen:
+            results[position] = BatchCheckInResult(item.client_id, "duplicate", 200, "Already processed")
+            continue
+        seen.add(item.client_id)
+        pending.append((position, item, _normalize_scan_time(item.scanned_at)))
+
+    # Replay in scan order so session quotas are consumed chronologically
+    pending.sort(key=lambda entry: entry[2] or datetime.max)
+
+    for start in range(0, len(pending), max(chunk_size, 1)):
+        for position, item, scanned_at in pending[start:start + chunk_size]:
+            savepoint = await db.begin_nested()
+            try:
+                outcome = await perform_check_in(
+                    db,
+                    item.qr_token,
+                    item.event_id,
+                    verified_by_user_id,
+                    scanned_at=scanned_at,
+                    client_ref=item.client_id,
+                )
+                await savepoint.commit()
+                results[position] = BatchCheckInResult(item.client_id, "created", 200, "Check-in successful", outcome)
+            except CheckInError as e:
+                await savepoint.rollback()
+                results[position] = BatchCheckInResult(item.client_id, "rejected", e.status_code, e.detail)
+            except IntegrityError:
+                # Another request stored the same client id concurrently
+                await savepoint.rollback()
+                results[position] = BatchCheckInResult(item.client_id, "duplicate", 200, "Already processed")
+        await db.commit()
+
+    created = sum(1 for r in results.values() if r.status == "created")
+    logger.info(
+        "Batch check-in: %d items, %d created, %d duplicate, %d rejected",
+        len(items),
+        created,
+        sum(1 for r in results.values() if r.status == "duplicate"),
+        sum(1 for r in results.values() if r.status == "rejected"),
+    )
+    return [results[position] for position in range(len(items))]
+
+
+async def revert_check_in(db: AsyncSession, checkin_id: str) -> bool:
+    """Delete a check-in and give back its session/attendance count atomically.
+
+    The row is deleted first (`DELETE ... RETURNING`); counters are only given
+    back when this call actually removed it, so concurrent reverts of the same
+    check-in decrement once.
+
+    Args:
+        db: Session with an open (or implicitly opened) transaction.
+        checkin_id: Check-in record to remove.
+
+    Returns:
+        False if the check-in does not exist (or was already reverted), True otherwise.
+    """
+    deleted = (
+        await db.execute(
+            delete(_check_ins)
+            .where(_check_ins.c.id == checkin_id)
+            .returning(_check_ins.c.subscription_id, _check_ins.c.event_id, _check_ins.c.check_in_time)
+        )
+    ).one_or_none()
+    if not deleted:
+        return False
+
+    plan = (
+        await db.execute(
+            select(Subscription.package_id, PlanDefinition.access_type)
+            .join(ServicePackage, Subscription.package_id == ServicePackage.id)
+            .join(PlanDefinition, ServicePackage.plan_id == PlanDefinition.id)
+            .where(Subscription.id == deleted.subscription_id)
+        )
+    ).one()
+
+    counter = None
+    if plan.access_type == "SESSION_BASED":
+        counter = _subscriptions.c.used_sessions
+    elif plan.access_type == "TIME_BASED":
+        counter = _subscriptions.c.attendance_count
+
+    if counter is not None:
+        await db.execute(
+            update(_subscriptions)
+            .where(_subscriptions.c.id == deleted.subscription_id, counter > 0)
+            .values({counter.name: counter - 1})
+        )
+
+    if deleted.event_id:
+        await adjust_checked_in_count(db, deleted.event_id, -1)
+    await record_check_in(db, deleted.check_in_time, plan.package_id, -1)
+    return True
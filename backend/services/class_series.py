@@ -0,0 +1,607 @@
+"""
+Recurring weekly classes (`class_series`) with lazy occurrence expansion.
+
+Abonelik satışı ve personelin tekrarlayan dersleri artık her hafta için ayrı
+`class_events` satırı üretmez. Bir seri kaydı (RRULE benzeri: BYDAY, INTERVAL,
+UNTIL) ve istisnaları (iptal / saat değişikliği) saklanır; tarih aralığı
+sorgularında seri yalnızca istenen aralık için bellekte açılır (sanal oturum).
+
+Bir oturum ancak ona rezervasyon veya check-in bağlandığında `materialize` ile
+`class_events` satırına dönüşür. (series_id, occurrence_date) tekil olduğundan
+aynı oturumu eş zamanlı materialize eden iki istek aynı satırı paylaşır.
+
+Sanal oturumların id'si `"<series_id>@<YYYY-MM-DD>"` biçimindedir; ders id'si
+alan uç noktalar bunu `resolve_event` ile kabul eder. Aboneliğe bağlı serilerde
+üye her oturuma kayıtlı sayılır (booked_count = 1); oturum materialize
+edilirken bu kayıt bir `bookings` satırı olarak yazılır.
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from backend.core.time_utils import get_turkey_time, get_turkey_timezone
+from backend.models.operation import (
+    Booking,
+    ClassEvent,
+    ClassSeries,
+    ClassSeriesException,
+    ClassTemplate,
+    SessionCheckIn,
+    Subscription,
+)
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+OCCURRENCE_SEPARATOR = "@"
+
+# (series_id, occurrence_date) pairs that already have a class_events row
+MaterializedKeys = Set[Tuple[str, date]]
+
+
+@dataclass
+class Occurrence:
+    """A not yet materialized occurrence, shaped like a `ClassEvent` row."""
+    id: str
+    series_id: str
+    occurrence_date: date
+    template_id: str
+    template: Optional[ClassTemplate]
+    instructor_user_id: str
+    start_time: datetime
+    end_time: datetime
+    capacity: int
+    is_cancelled: bool
+    subscription_id: Optional[str] = None
+    member_user_id: Optional[str] = None
+    member_name: Optional[str] = None
+    instructor_first_name: Optional[str] = None
+    instructor_last_name: Optional[str] = None
+    is_materialized: bool = False
+
+    @property
+    def booked_count(self) -> int:
+        # The subscriber of a sold series is booked into every occurrence
+        return 1 if self.member_user_id else 0
+
+    @property
+    def checked_in_count(self) -> int:
+        return 0
+
+
+def format_weekdays(weekdays: Iterable[int]) -> str:
+    """Weekday numbers (0 = Monday) as an RRULE BYDAY value, e.g. "MO,TH"."""
+    return ",".join(WEEKDAY_CODES[day] for day in sorted(set(weekdays)))
+
+
+def parse_weekdays(value: str) -> List[int]:
+    """BYDAY value back to weekday numbers.
+
+    Raises:
+        ValueError: Empty value or an unknown day code.
+    """
+    codes = [code.strip().upper() for code in (value or "").split(",") if code.strip()]
+    if not codes:
+        raise ValueError("at least one weekday is required")
+    unknown = [code for code in codes if code not in WEEKDAY_CODES]
+    if unknown:
+        raise ValueError(f"unknown weekday(s): {', '.join(unknown)}")
+    return sorted({WEEKDAY_CODES.index(code) for code in codes})
+
+
+def rrule(series: ClassSeries) -> str:
+    """The series pattern as an RFC 5545 RRULE string."""
+    rule = f"FREQ=WEEKLY;INTERVAL={series.interval_weeks or 1};BYDAY={series.weekdays}"
+    if series.ends_on:
+        rule += f";UNTIL={series.ends_on.strftime('%Y%m%d')}"
+    return rule
+
+
+def occurrence_id(series_id: str, day: date) -> str:
+    return f"{series_id}{OCCURRENCE_SEPARATOR}{day.isoformat()}"
+
+
+def parse_occurrence_id(value: str) -> Optional[Tuple[str, date]]:
+    """(series_id, occurrence_date) of a virtual occurrence id; None for plain event ids."""
+    series_id, separator, day = (value or "").partition(OCCURRENCE_SEPARATOR)
+    if not separator or not series_id:
+        return None
+    try:
+        return series_id, date.fromisoformat(day)
+    except ValueError:
+        return None
+
+
+def as_local(value: datetime) -> datetime:
+    """Aware Turkey time; naive values are Turkey wall clock, as the app stores them."""
+    turkey_tz = get_turkey_timezone()
+    if value.tzinfo is None:
+        return value.replace(tzinfo=turkey_tz)
+    return value.astimezone(turkey_tz)
+
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def occurs_on(series: ClassSeries, day: date) -> bool:
+    """Whether the pattern (ignoring exceptions) has an occurrence on `day`."""
+    if day < series.starts_on or (series.ends_on and day > series.ends_on):
+        return False
+    if day.weekday() not in parse_weekdays(series.weekdays):
+        return False
+    weeks = (_monday(day) - _monday(series.starts_on)).days // 7
+    return weeks % max(series.interval_weeks or 1, 1) == 0
+
+
+def occurrence_dates(series: ClassSeries, first: date, last: date) -> Iterator[date]:
+    """Pattern dates in [first, last], week by week (exceptions not applied)."""
+    first = max(first, series.starts_on)
+    if series.ends_on:
+        last = min(last, series.ends_on)
+    weekdays = parse_weekdays(series.weekdays)
+    interval = max(series.interval_weeks or 1, 1)
+    anchor = _monday(series.starts_on)
+    monday = _monday(first)
+    skipped = ((monday - anchor).days // 7) % interval
+    if skipped:
+        monday += timedelta(weeks=interval - skipped)
+    while monday <= last:
+        for weekday in weekdays:
+            day = monday + timedelta(days=weekday)
+            if first <= day <= last:
+                yield day
+        monday += timedelta(weeks=interval)
+
+
+def occurrence_bounds(
+    series: ClassSeries, day: date, exception: Optional[ClassSeriesException] = None
+) -> Tuple[datetime, datetime]:
+    """Start and end of the occurrence on `day`, honouring a reschedule."""
+    duration = timedelta(minutes=series.duration_minutes or 60)
+    if exception is not None and exception.start_time is not None:
+        start = as_local(exception.start_time)
+        end = as_local(exception.end_time) if exception.end_time is not None else start + duration
+        return start, end
+    start = datetime.combine(day, series.start_time, tzinfo=get_turkey_timezone())
+    return start, start + duration
+
+
+def expand_series(
+    series: ClassSeries,
+    first: date,
+    last: date,
+    exceptions: Optional[Dict[date, ClassSeriesException]] = None,
+    materialized: Optional[MaterializedKeys] = None,
+    template: Optional[ClassTemplate] = None,
+    member_user_id: Optional[str] = None,
+) -> List[Occurrence]:
+    """Virtual occurrences with original dates in [first, last].
+
+    Dates in `materialized` are left out (their class_events row is the
+    occurrence); cancelled exceptions are returned with `is_cancelled`.
+    """
+    exceptions = exceptions or {}
+    materialized = materialized or set()
+    occurrences = []
+    for day in occurrence_dates(series, first, last):
+        if (series.id, day) in materialized:
+            continue
+        exception = exceptions.get(day)
+        start, end = occurrence_bounds(series, day, exception)
+        occurrences.append(Occurrence(
+            id=occurrence_id(series.id, day),
+            series_id=series.id,
+            occurrence_date=day,
+            template_id=series.template_id,
+            template=template,
+            instructor_user_id=series.instructor_user_id,
+            start_time=start,
+            end_time=end,
+            capacity=series.capacity,
+            is_cancelled=bool(exception is not None and exception.is_cancelled),
+            subscription_id=series.subscription_id,
+            member_user_id=member_user_id,
+        ))
+    return occurrences
+
+
+def _range_days(start: datetime, end: datetime) -> Tuple[date, date]:
+    return as_local(start).date(), as_local(end - timedelta(microseconds=1)).date()
+
+
+async def expand_range(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    instructor_id: Optional[str] = None,
+    template_ids: Optional[Sequence[str]] = None,
+    materialized: Optional[MaterializedKeys] = None,
+) -> List[Occurrence]:
+    """Virtual occurrences starting in [start, end), ordered by start time.
+
+    One query loads the overlapping series with their template, instructor and
+    subscriber names plus the exceptions touching the range.
+
+    Args:
+        materialized: Occurrences that already have a class_events row (the
+            caller usually read them with its own event query). When None they
+            are looked up with one more query.
+    """
+    if template_ids is not None and not template_ids:
+        return []
+    start, end = as_local(start), as_local(end)
+    first, last = _range_days(start, end)
+    instructor = aliased(User)
+    member = aliased(User)
+    query = (
+        select(
+            ClassSeries,
+            ClassTemplate,
+            instructor.first_name.label("instructor_first_name"),
+            instructor.last_name.label("instructor_last_name"),
+            Subscription.member_user_id,
+            member.first_name.label("member_first_name"),
+            member.last_name.label("member_last_name"),
+            ClassSeriesException,
+        )
+        .join(ClassTemplate, ClassTemplate.id == ClassSeries.template_id)
+        .join(instructor, instructor.id == ClassSeries.instructor_user_id)
+        .outerjoin(Subscription, Subscription.id == ClassSeries.subscription_id)
+        .outerjoin(member, member.id == Subscription.member_user_id)
+        .outerjoin(ClassSeriesException, and_(
+            ClassSeriesException.series_id == ClassSeries.id,
+            or_(
+                ClassSeriesException.occurrence_date.between(first, last),
+                # Rescheduled into the range from another day
+                and_(ClassSeriesException.start_time >= start, ClassSeriesException.start_time < end),
+            ),
+        ))
+        .where(
+            ClassSeries.starts_on <= last,
+            or_(ClassSeries.ends_on.is_(None), ClassSeries.ends_on >= first),
+        )
+    )
+    if instructor_id:
+        query = query.where(ClassSeries.instructor_user_id == instructor_id)
+    if template_ids is not None:
+        query = query.where(ClassSeries.template_id.in_(list(template_ids)))
+
+    series_rows: Dict[str, tuple] = {}
+    exceptions: Dict[str, Dict[date, ClassSeriesException]] = {}
+    for row in await db.execute(query):
+        series_rows.setdefault(row.ClassSeries.id, row)
+        if row.ClassSeriesException is not None:
+            exceptions.setdefault(row.ClassSeries.id, {})[row.ClassSeriesException.occurrence_date] = row.ClassSeriesException
+    if not series_rows:
+        return []
+
+    if materialized is None:
+        moved_days = [day for by_day in exceptions.values() for day in by_day]
+        materialized = set((await db.execute(
+            select(ClassEvent.series_id, ClassEvent.occurrence_date).where(
+                ClassEvent.series_id.in_(list(series_rows)),
+                ClassEvent.occurrence_date.between(min([first, *moved_days]), max([last, *moved_days])),
+            )
+        )).tuples().all())
+
+    occurrences = []
+    for series_id, row in series_rows.items():
+        series_exceptions = exceptions.get(series_id, {})
+        member_name = None
+        if row.member_user_id:
+            member_name = f"{row.member_first_name} {row.member_last_name}"
+        candidates = expand_series(
+            row.ClassSeries, first, last, series_exceptions, materialized,
+            template=row.ClassTemplate, member_user_id=row.member_user_id,
+        )
+        # Occurrences rescheduled into the range from outside its days
+        for day, exception in series_exceptions.items():
+            if not first <= day <= last and occurs_on(row.ClassSeries, day):
+                candidates += expand_series(
+                    row.ClassSeries, day, day, series_exceptions, materialized,
+                    template=row.ClassTemplate, member_user_id=row.member_user_id,
+                )
+        for occurrence in candidates:
+            if not start <= occurrence.start_time < end:
+                continue
+            occurrence.member_name = member_name
+            occurrence.instructor_first_name = row.instructor_first_name
+            occurrence.instructor_last_name = row.instructor_last_name
+            occurrences.append(occurrence)
+    occurrences.sort(key=lambda o: (o.start_time, o.id))
+    return occurrences
+
+
+async def get_occurrence(db: AsyncSession, series_id: str, day: date) -> Optional[Occurrence]:
+    """The virtual occurrence of `series_id` on `day`; None if the pattern has none."""
+    series = await db.get(ClassSeries, series_id)
+    if series is None or not occurs_on(series, day):
+        return None
+    template = await db.get(ClassTemplate, series.template_id)
+    exception = await db.get(ClassSeriesException, (series_id, day))
+    member = None
+    if series.subscription_id:
+        member = (await db.execute(
+            select(Subscription.member_user_id, User.first_name, User.last_name)
+            .join(User, User.id == Subscription.member_user_id)
+            .where(Subscription.id == series.subscription_id)
+        )).one_or_none()
+    occurrences = expand_series(
+        series, day, day, {day: exception} if exception else {},
+        template=template, member_user_id=member.member_user_id if member else None,
+    )
+    if not occurrences:
+        return None
+    if member:
+        occurrences[0].member_name = f"{member.first_name} {member.last_name}"
+    return occurrences[0]
+
+
+async def find_materialized(db: AsyncSession, series_id: str, day: date) -> Optional[ClassEvent]:
+    result = await db.execute(
+        select(ClassEvent).where(ClassEvent.series_id == series_id, ClassEvent.occurrence_date == day)
+    )
+    return result.scalar_one_or_none()
+
+
+async def materialize(db: AsyncSession, series_id: str, day: date) -> Optional[ClassEvent]:
+    """The class_events row of an occurrence, inserted on first use.
+
+    The row (and the subscriber's booking for sold series) is flushed inside a
+    savepoint but not committed; the caller's transaction decides. A concurrent
+    insert of the same occurrence is resolved by reading the winner's row.
+
+    Returns:
+        The event, or None if the series has no occurrence on `day`.
+    """
+    existing = await find_materialized(db, series_id, day)
+    if existing is not None:
+        return existing
+    series = await db.get(ClassSeries, series_id)
+    if series is None or not occurs_on(series, day):
+        return None
+    exception = await db.get(ClassSeriesException, (series_id, day))
+    member_user_id = None
+    if series.subscription_id:
+        member_user_id = await db.scalar(
+            select(Subscription.member_user_id).where(Subscription.id == series.subscription_id)
+        )
+    start, end = occurrence_bounds(series, day, exception)
+
+    event_id = str(uuid.uuid4())
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(ClassEvent).values(
+                id=event_id,
+                series_id=series.id,
+                occurrence_date=day,
+                subscription_id=series.subscription_id,
+                template_id=series.template_id,
+                instructor_user_id=series.instructor_user_id,
+                start_time=start,
+                end_time=end,
+                capacity=series.capacity,
+                is_cancelled=bool(exception is not None and exception.is_cancelled),
+                booked_count=1 if member_user_id else 0,
+                checked_in_count=0,
+            ))
+            if member_user_id:
+                await db.execute(insert(Booking).values(
+                    id=str(uuid.uuid4()),
+                    member_user_id=member_user_id,
+                    event_id=event_id,
+                    subscription_id=series.subscription_id,
+                    status="confirmed",
+                ))
+    except IntegrityError:
+        logger.info("Occurrence %s of series %s was materialized concurrently", day, series_id)
+        return await find_materialized(db, series_id, day)
+    return await db.get(ClassEvent, event_id)
+
+
+async def resolve_event(db: AsyncSession, event_id: str, create: bool = True) -> Optional[ClassEvent]:
+    """The class_events row behind a plain or virtual (`series@date`) event id.
+
+    Args:
+        create: Materialize a virtual occurrence that has no row yet; with
+            False such occurrences resolve to None.
+    """
+    parsed = parse_occurrence_id(event_id)
+    if parsed is None:
+        return await db.get(ClassEvent, event_id)
+    if create:
+        return await materialize(db, *parsed)
+    return await find_materialized(db, *parsed)
+
+
+async def set_exception(
+    db: AsyncSession,
+    series: ClassSeries,
+    day: date,
+    is_cancelled: bool = True,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> ClassSeriesException:
+    """Cancel or reschedule one occurrence (not committed).
+
+    An already materialized occurrence is updated in place as well.
+
+    Raises:
+        ValueError: The pattern has no occurrence on `day`, or the new end is
+            not after the new start.
+    """
+    if not occurs_on(series, day):
+        raise ValueError(f"series has no occurrence on {day.isoformat()}")
+    if start_time is not None and end_time is not None and end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+    exception = await db.get(ClassSeriesException, (series.id, day))
+    if exception is None:
+        exception = ClassSeriesException(series_id=series.id, occurrence_date=day)
+        db.add(exception)
+    exception.is_cancelled = is_cancelled
+    exception.start_time = start_time
+    exception.end_time = end_time
+
+    event = await find_materialized(db, series.id, day)
+    if event is not None:
+        event.is_cancelled = is_cancelled
+        event.start_time, event.end_time = occurrence_bounds(series, day, exception)
+    return exception
+
+
+def series_span(starts_on: date, weeks: int) -> date:
+    """Last day (UNTIL) of a pattern that runs `weeks` full weeks from `starts_on`."""
+    return starts_on + timedelta(weeks=weeks) - timedelta(days=1)
+
+
+def subscription_occurrences(subscription: Subscription) -> List[object]:
+    """Every class of a subscription: its materialized events plus the virtual
+    occurrences of its series, ordered by start time.
+
+    Expects `class_events`, `class_series` and the series' `template` and
+    `exceptions` to be loaded; runs no queries.
+    """
+    events: List[object] = list(subscription.class_events)
+    materialized = {(e.series_id, e.occurrence_date) for e in subscription.class_events if e.series_id}
+    for series in subscription.class_series:
+        if series.ends_on is None:
+            continue
+        events += expand_series(
+            series,
+            series.starts_on,
+            series.ends_on,
+            {exception.occurrence_date: exception for exception in series.exceptions},
+            materialized,
+            template=series.template,
+            member_user_id=subscription.member_user_id,
+        )
+    events.sort(key=lambda e: (as_local(e.start_time), e.id))
+    return events
+
+
+@dataclass
+class FoldResult:
+    series: int = 0
+    exceptions: int = 0
+    linked_events: int = 0
+    removed_events: int = 0
+
+
+async def _ids_with_rows(db: AsyncSession, column, event_ids: List[str]) -> Dict[str, List]:
+    """event_id -> values of `column` (bookings / check-ins) for the given events."""
+    found: Dict[str, List] = {}
+    for start in range(0, len(event_ids), 500):
+        rows = await db.execute(
+            select(column.table.c.event_id, column).where(column.table.c.event_id.in_(event_ids[start:start + 500]))
+        )
+        for event_id, value in rows:
+            found.setdefault(event_id, []).append(value)
+    return found
+
+
+async def fold_events_into_series(
+    db: AsyncSession, now: Optional[datetime] = None, min_occurrences: int = 4
+) -> FoldResult:
+    """Migration path for classes stored one row per week; does not commit.
+
+    Events of a subscription (same template, instructor, capacity, time and
+    duration) become one series; staff-created events form a series per
+    weekday when at least `min_occurrences` of them repeat. Weeks missing from
+    a run become cancelled exceptions. Past events and events with check-ins,
+    extra bookings or a cancellation stay as rows (linked to their series);
+    only untouched future occurrences are deleted and expanded lazily again.
+    """
+    now = as_local(now or get_turkey_time())
+    rows = (await db.execute(
+        select(
+            ClassEvent.id,
+            ClassEvent.subscription_id,
+            ClassEvent.template_id,
+            ClassEvent.instructor_user_id,
+            ClassEvent.start_time,
+            ClassEvent.end_time,
+            ClassEvent.capacity,
+            ClassEvent.is_cancelled,
+        )
+        .where(ClassEvent.series_id.is_(None))
+        .order_by(ClassEvent.start_time, ClassEvent.id)
+    )).all()
+
+    groups: Dict[tuple, List] = {}
+    for row in rows:
+        start = as_local(row.start_time)
+        duration = int((as_local(row.end_time) - start).total_seconds() // 60)
+        key = (row.subscription_id, row.template_id, row.instructor_user_id, row.capacity, start.time(), duration)
+        if row.subscription_id is None:
+            key += (start.weekday(),)
+        groups.setdefault(key, []).append(row)
+
+    future_ids = [row.id for row in rows if as_local(row.start_time) > now and not row.is_cancelled]
+    future = set(future_ids)
+    bookings = await _ids_with_rows(db, Booking.__table__.c.subscription_id, future_ids)
+    check_ins = await _ids_with_rows(db, SessionCheckIn.__table__.c.id, future_ids)
+
+    result = FoldResult()
+    links, removed = [], []
+    for key, events in groups.items():
+        subscription_id, template_id, instructor_user_id, capacity, start_time, duration = key[:6]
+        if subscription_id is None and len(events) < min_occurrences:
+            continue
+        by_day = {}
+        for row in events:
+            # Same-day duplicates stay one-off rows
+            by_day.setdefault(as_local(row.start_time).date(), row)
+        series = ClassSeries(
+            id=str(uuid.uuid4()),
+            subscription_id=subscription_id,
+            template_id=template_id,
+            instructor_user_id=instructor_user_id,
+            weekdays=format_weekdays(day.weekday() for day in by_day),
+            interval_weeks=1,
+            start_time=start_time,
+            duration_minutes=duration,
+            starts_on=min(by_day),
+            ends_on=max(by_day),
+            capacity=capacity,
+        )
+        db.add(series)
+        result.series += 1
+        for day in occurrence_dates(series, series.starts_on, series.ends_on):
+            if day not in by_day:
+                db.add(ClassSeriesException(series_id=series.id, occurrence_date=day, is_cancelled=True))
+                result.exceptions += 1
+
+        implied = [subscription_id] if subscription_id else []
+        for day, row in by_day.items():
+            untouched = (
+                row.id in future
+                and row.id not in check_ins
+                and bookings.get(row.id, []) == implied
+            )
+            if untouched:
+                removed.append(row.id)
+            else:
+                links.append({"id": row.id, "series_id": series.id, "occurrence_date": day})
+
+    await db.flush()
+    if links:
+        await db.execute(update(ClassEvent), links)
+    for start in range(0, len(removed), 500):
+        chunk = removed[start:start + 500]
+        await db.execute(delete(Booking).where(Booking.event_id.in_(chunk)))
+        await db.execute(delete(ClassEvent).where(ClassEvent.id.in_(chunk)))
+    result.linked_events, result.removed_events = len(links), len(removed)
+    logger.info(
+        "Folded events into %d series: %d linked, %d removed, %d exceptions",
+        result.series, result.linked_events, result.removed_events, result.exceptions,
+    )
+    return result
@@ -0,0 +1,237 @@
+"""
+Dashboard statistics as independent units.
+
+`/api/v1/stats/dashboard` bileşenleri (aktif üye, bugünkü program, borç, aylık
+ciro, aktivite akışı) birbirinden bağımsız sorgulardır. Her birim kendi
+oturumunu (aynı engine'in havuzundan) açar ve `asyncio.gather` ile birlikte
+beklenir; uç noktanın süresi sorguların toplamı değil en yavaş sorgu olur.
+Sonuçlar `stats_cache` üzerinden paylaşılır, süreler birim bazında raporlanır.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from backend.core.time_utils import get_turkey_time
+from backend.models.operation import ClassEvent, SessionCheckIn, Subscription, SubscriptionStatus
+from backend.models.user import Role, User, UserRole
+from backend.schemas.stats import ActivityItem, ScheduleItem
+from backend.services.class_series import as_local, expand_range
+from backend.services.stats_cache import ComponentLookup, StatsCache, StatsComponent
+from backend.services.stats_rollups import sum_revenue
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_DEBT_STATUSES = [SubscriptionStatus.active, SubscriptionStatus.pending, SubscriptionStatus.expired]
+
+
+async def count_active_members(db: AsyncSession) -> int:
+    """Active users with the MEMBER role."""
+    result = await db.execute(
+        select(func.count(User.id)).where(
+            and_(
+                User.is_active == True,
+                User.id.in_(
+                    select(UserRole.user_id).where(
+                        UserRole.role_id.in_(
+                            select(Role.id).where(Role.role_name == "MEMBER")
+                        )
+                    )
+                )
+            )
+        )
+    )
+    return result.scalar() or 0
+
+
+async def load_todays_schedule(db: AsyncSession, today_start: datetime, today_end: datetime) -> List[ScheduleItem]:
+    """Today's non-cancelled classes; the list length doubles as `todays_classes`."""
+    # Occupancy comes from the denormalized booked_count; bookings are not loaded
+    schedule_query = select(ClassEvent).options(
+        selectinload(ClassEvent.template)
+    ).where(
+        and_(
+            ClassEvent.start_time >= today_start,
+            ClassEvent.start_time <= today_end,
+            ClassEvent.is_cancelled == False
+        )
+    ).order_by(ClassEvent.start_time)
+
+    schedule_result = await db.execute(schedule_query)
+    events = list(schedule_result.scalars().all())
+    # Recurring series occurrences without a row yet
+    occurrences = await expand_range(db, today_start, today_end + timedelta(microseconds=1))
+    events += [o for o in occurrences if not o.is_cancelled]
+    events.sort(key=lambda e: as_local(e.start_time))
+
+    todays_schedule_list = []
+    for event in events:
+        participant_count = event.booked_count
+        occupancy_str = f"{participant_count}/{event.capacity}"
+        if participant_count >= event.capacity:
+            occupancy_str = "Dolu"
+
+        todays_schedule_list.append(ScheduleItem(
+            id=str(event.id),
+            title=event.template.name,
+            start_time=event.start_time,
+            end_time=event.end_time,
+            occupancy=occupancy_str,
+            status="active",
+            booked_count=participant_count,
+            capacity=event.capacity
+        ))
+    return todays_schedule_list
+
+
+async def sum_debt(db: AsyncSession) -> Tuple[float, int]:
+    """Total outstanding balance and number of members owing (see subscription_ledger)."""
+    debt_query = (
+        select(
+            func.coalesce(func.sum(Subscription.balance), 0).label("total_debt"),
+            func.count(func.distinct(Subscription.member_user_id)).label("debt_members"),
+        )
+        .where(
+            Subscription.balance > 0,
+            Subscription.status.in_(ACTIVE_DEBT_STATUSES),
+        )
+    )
+    debt_row = (await db.execute(debt_query)).one()
+    return float(debt_row.total_debt or 0), int(debt_row.debt_members or 0)
+
+
+async def sum_monthly_revenue(db: AsyncSession, first_day_of_month: date) -> float:
+    """Revenue since the first of the (Turkey-local) month, from the daily rollups."""
+    return float(await sum_revenue(db, first_day_of_month))
+
+
+async def load_recent_activities(db: AsyncSession) -> List[ActivityItem]:
+    """Latest check-ins rendered as activity feed items."""
+    activities = []
+    checkins_result = await db.execute(
+        select(SessionCheckIn).options(
+            selectinload(SessionCheckIn.member), 
+            selectinload(SessionCheckIn.event).selectinload(ClassEvent.template),
+            selectinload(SessionCheckIn.subscription).selectinload(Subscription.package)
+        ).order_by(SessionCheckIn.check_in_time.desc()).limit(20)
+    )
+    for ci in checkins_result.scalars():
+        if ci.member:
+            # Add subscription info if available
+            subscription_info = ""
+            if ci.subscription and ci.subscription.package:
+                if ci.subscription.access_type == "TIME_BASED":
+                    subscription_info = f"{ci.subscription.package.name} (sınırsız)"
+                else:
+                    remaining_sessions = ci.subscription.used_sessions - ci.subscription.attendance_count
+                    subscription_info = f"{ci.subscription.package.name} - {remaining_sessions} seansa katıldı."
+            else:
+                subscription_info = "Abonelik bilgisi bulunamadı"
+            
+            # Add event info if available
+            event_info = ""
+            if ci.event and ci.event.template:
+                event_info = f" ({ci.event.template.name} dersi)"
+            
+            description = subscription_info + event_info
+            
+            activities.append(ActivityItem(
+                id=f"checkin_{ci.id}",
+                type="checkin",
+                description=description,
+                timestamp=ci.check_in_time,
+                user_name=f"{ci.member.first_name} {ci.member.last_name}"
+            ))
+
+    # Sort by timestamp desc and take top 20
+    activities.sort(key=lambda x: x.timestamp, reverse=True)
+    return activities[:20]
+
+
+def sibling_session_factory(db: AsyncSession) -> Callable[[], AsyncSession]:
+    """Session factory on the same engine (and pool) as `db`.
+
+    Respects whatever engine the request session was bound to (tests and
+    benchmarks override `get_db`).
+    """
+    return sessionmaker(bind=db.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@dataclass(frozen=True)
+class StatsUnit:
+    """One independently computable dashboard component.
+
+    Attributes:
+        name: Cache key / response key (see `StatsComponent`).
+        compute: Coroutine function receiving its own session.
+        scope: Cache validity key (e.g. today's date), see `StatsCache.get_or_compute`.
+    """
+
+    name: str
+    compute: Callable[[AsyncSession], Awaitable[Any]]
+    scope: Hashable = None
+
+
+async def run_units(
+    units: List[StatsUnit],
+    session_factory: Callable[[], AsyncSession],
+    cache: StatsCache,
+    concurrent: bool = True,
+) -> Dict[str, ComponentLookup]:
+    """Resolve every unit through `cache`, computing misses on separate sessions.
+
+    Args:
+        units: Components to resolve.
+        session_factory: Opens a new session per computed unit (only on cache miss).
+        cache: Shared component cache.
+        concurrent: Await all units together (`asyncio.gather`); False runs
+            them one after another, e.g. for single-connection SQLite setups.
+
+    Returns:
+        Unit name → lookup (value, cache metadata and `compute_ms`).
+    """
+
+    async def resolve(unit: StatsUnit) -> ComponentLookup:
+        async def compute():
+            async with session_factory() as session:
+                return await unit.compute(session)
+
+        return await cache.get_or_compute(unit.name, compute, scope=unit.scope)
+
+    if concurrent:
+        lookups = await asyncio.gather(*(resolve(unit) for unit in units))
+    else:
+        lookups = [await resolve(unit) for unit in units]
+
+    computed = {unit.name: lookup.compute_ms for unit, lookup in zip(units, lookups) if lookup.compute_ms is not None}
+    if computed:
+        logger.debug("Dashboard units computed (ms): %s", computed)
+    return {unit.name: lookup for unit, lookup in zip(units, lookups)}
+
+
+def dashboard_units(now: Optional[datetime] = None) -> List[StatsUnit]:
+    """The units behind `/api/v1/stats/dashboard`, scoped to the current day/month."""
+    now = now or datetime.now(timezone.utc)
+    today_start = datetime.combine(now.date(), time.min).replace(tzinfo=timezone.utc)
+    today_end = datetime.combine(now.date(), time.max).replace(tzinfo=timezone.utc)
+    first_day_of_month = get_turkey_time().date().replace(day=1)
+    return [
+        StatsUnit(StatsComponent.MEMBERS, count_active_members),
+        StatsUnit(
+            StatsComponent.SCHEDULE,
+            lambda db: load_todays_schedule(db, today_start, today_end),
+            scope=now.date(),
+        ),
+        StatsUnit(StatsComponent.DEBT, sum_debt),
+        StatsUnit(
+            StatsComponent.REVENUE,
+            lambda db: sum_monthly_revenue(db, first_day_of_month),
+            scope=first_day_of_month,
+        ),
+        StatsUnit(StatsComponent.ACTIVITY, load_recent_activities),
+    ]
@@ -0,0 +1,136 @@
+"""
+Denormalized occupancy counters on `class_events`.
+
+`booked_count` (rezervasyon satırı sayısı) ve `checked_in_count` (giriş kaydı
+sayısı) alt tabloları taramadan okunabilsin diye etkinlik satırında tutulur.
+Tekil yazma yolları sayaçları koşullu `UPDATE ... SET x = x ± 1` ile aynı
+transaction içinde günceller; toplu silme yapan yollar (abonelik/üye silme)
+etkilenen etkinlikleri önceden toplayıp `refresh_event_counters` ile yeniden
+hesaplar. `reconcile_event_counters` tüm tabloyu alt tablolardan yeniden kurar
+(bkz. backend/scripts/reconcile_event_counters.py).
+
+Fonksiyonlar commit yapmaz; çağıran tarafın transaction'ına katılır.
+"""
+import logging
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.operation import Booking, ClassEvent, SessionCheckIn
+
+logger = logging.getLogger(__name__)
+
+_events = ClassEvent.__table__
+_bookings = Booking.__table__
+_check_ins = SessionCheckIn.__table__
+
+_CHUNK = 500
+
+
+async def adjust_booked_count(db: AsyncSession, event_id: str, delta: int) -> Optional[int]:
+    """Add `delta` to an event's booking counter (never below zero).
+
+    Returns:
+        The new count, or None if the event is missing or the counter would go negative.
+    """
+    return await _adjust(db, event_id, _events.c.booked_count, delta)
+
+
+async def adjust_checked_in_count(db: AsyncSession, event_id: str, delta: int) -> Optional[int]:
+    """Add `delta` to an event's check-in counter (never below zero)."""
+    return await _adjust(db, event_id, _events.c.checked_in_count, delta)
+
+
+async def _adjust(db: AsyncSession, event_id: str, counter, delta: int) -> Optional[int]:
+    conditions = [_events.c.id == event_id]
+    if delta < 0:
+        conditions.append(counter >= -delta)
+    result = await db.execute(
+        update(_events).where(*conditions).values({counter.name: counter + delta}).returning(counter)
+    )
+    return result.scalar_one_or_none()
+
+
+async def try_claim_check_in_slot(db: AsyncSession, event_id: str) -> Optional[int]:
+    """Increment `checked_in_count` only while it is below capacity.
+
+    The conditional UPDATE takes the row lock, so concurrent check-ins for
+    the same event are serialized without a COUNT over `session_check_ins`.
+
+    Returns:
+        The new count, or None if the event is full.
+    """
+    result = await db.execute(
+        update(_events)
+        .where(_events.c.id == event_id, _events.c.checked_in_count < _events.c.capacity)
+        .values(checked_in_count=_events.c.checked_in_count + 1)
+        .returning(_events.c.checked_in_count)
+    )
+    return result.scalar_one_or_none()
+
+
+async def collect_event_ids(db: AsyncSession, *conditions_by_table) -> Set[str]:
+    """Return event ids referenced by bookings/check-ins matching the filters.
+
+    Call this before a bulk delete and pass the result to
+    `refresh_event_counters` afterwards.
+
+    Args:
+        conditions_by_table: `(table, condition)` pairs, e.g.
+            `(Booking.__table__, Booking.subscription_id == sub_id)`.
+    """
+    event_ids: Set[str] = set()
+    for table, condition in conditions_by_table:
+        result = await db.execute(
+            select(table.c.event_id).where(condition, table.c.event_id.is_not(None)).distinct()
+        )
+        event_ids.update(result.scalars().all())
+    return event_ids
+
+
+def _recount_values():
+    booked = (
+        select(func.count(_bookings.c.id))
+        .where(_bookings.c.event_id == _events.c.id)
+        .scalar_subquery()
+    )
+    checked_in = (
+        select(func.count(_check_ins.c.id))
+        .where(_check_ins.c.event_id == _events.c.id)
+        .scalar_subquery()
+    )
+    return {"booked_count": booked, "checked_in_count": checked_in}
+
+
+async def refresh_event_counters(db: AsyncSession, event_ids: Iterable[str]) -> None:
+    """Recompute both counters for the given events from the child tables."""
+    ids = list(event_ids)
+    for start in range(0, len(ids), _CHUNK):
+        await db.execute(
+            update(_events)
+            .where(_events.c.id.in_(ids[start:start + _CHUNK]))
+            .values(**_recount_values())
+        )
+
+
+async def reconcile_event_counters(db: AsyncSession) -> int:
+    """Rebuild the counters of every event whose stored values drifted.
+
+    Returns:
+        Number of events that were corrected.
+    """
+    values = _recount_values()
+    drifted = await db.execute(
+        select(_events.c.id).where(
+            or_(
+                _events.c.booked_count != values["booked_count"],
+                _events.c.checked_in_count != values["checked_in_count"],
+            )
+        )
+    )
+    event_ids = drifted.scalars().all()
+    await refresh_event_counters(db, event_ids)
+    if event_ids:
+        logger.warning("Reconciled occupancy counters of %d class events", len(event_ids))
+    return len(event_ids)
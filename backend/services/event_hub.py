@@ -0,0 +1,111 @@
+"""
+In-process pub/sub hub behind the `/api/v1/events/stream` SSE endpoint.
+
+Masaüstü istasyonları dashboard'u 60 saniyede bir baştan indirmek yerine bu
+akışa abone olur; check-in, rezervasyon, ödeme ve abonelik değişiklikleri
+commit edildikten sonra yayınlanır ve istemci tarafında artımlı uygulanır.
+
+Hub süreç içidir: birden fazla worker ile çalışan kurulumlarda her istemci
+yalnızca bağlandığı worker'daki yazmaları görür; bu yüzden masaüstü tarafı
+seyrek bir tam yenilemeyi yedek olarak korur. Yavaş aboneler kuyrukları
+dolunca düşürülür (istemci yeniden bağlanıp `Last-Event-ID` ile kaçırdıklarını
+halka tampondan alır).
+"""
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HubEvent:
+    id: int
+    type: str
+    data: Dict[str, Any]
+    published_at: datetime
+
+
+class HubSubscriber:
+    """A single stream consumer; iterate `queue` until `closed` is set."""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+
+
+class EventHub:
+    """Fan-out of committed domain events to connected SSE clients.
+
+    Args:
+        max_queue: Pending events per subscriber before it is dropped.
+        replay_size: Recent events kept for `Last-Event-ID` resumption.
+    """
+
+    def __init__(self, max_queue: int = 256, replay_size: int = 500):
+        self.max_queue = max_queue
+        self._subscribers: Set[HubSubscriber] = set()
+        self._recent: Deque[HubEvent] = deque(maxlen=replay_size)
+        self._next_id = 1
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> HubSubscriber:
+        """Register a consumer, pre-filled with events after `last_event_id`."""
+        subscription = HubSubscriber(self.max_queue)
+        if last_event_id is not None:
+            for event in self._recent:
+                if event.id > last_event_id and not subscription.queue.full():
+                    subscription.queue.put_nowait(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: HubSubscriber) -> None:
+        subscription.closed = True
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> HubEvent:
+        """Deliver an event to every subscriber without blocking the caller.
+
+        Call only after the change has been committed.
+        """
+        event = HubEvent(id=self._next_id, type=event_type, data=data, published_at=datetime.now())
+        self._next_id += 1
+        self._recent.append(event)
+        self.published += 1
+
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # The client will reconnect and replay from the ring buffer
+                self.unsubscribe(subscription)
+                self.dropped_subscribers += 1
+                logger.warning("Dropped slow event stream subscriber")
+        return event
+
+    def recent(self) -> List[HubEvent]:
+        return list(self._recent)
+
+    def clear(self) -> None:
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+        self._recent.clear()
+        self._next_id = 1
+        self.published = 0
+        self.dropped_subscribers = 0
+
+
+event_hub = EventHub(
+    max_queue=settings.EVENT_STREAM_QUEUE_SIZE,
+    replay_size=settings.EVENT_STREAM_REPLAY_SIZE,
+)
@@ -0,0 +1,225 @@
+"""
+Streaming CSV / NDJSON exports of payments, subscriptions and check-ins.
+
+Muhasebe tam döküm ister; satırlar sunucu tarafı imleçle (`AsyncSession.stream`
++ `yield_per`) parça parça okunur ve her parça hemen metne çevrilip
+gönderilir. Bellek kullanımı tarih aralığından bağımsız olarak tek bir parça
+kadardır. Sorgular ORM nesnesi değil düz kolon seçer.
+
+Her export kendi oturumunu açar: istek oturumu yanıt akarken kapatılabilir ve
+uzun bir akış havuzdan tek bir bağlantı tutar.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from backend.core.time_utils import get_turkey_timezone
+from backend.models.operation import ClassEvent, ClassTemplate, Payment, PaymentMethod, SessionCheckIn, Subscription
+from backend.models.service import ServicePackage
+from backend.models.user import User
+
+DATASETS = ("payments", "subscriptions", "check_ins")
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+EXPORT_CHUNK_ROWS = 1000
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    start: Optional[date] = None  # Inclusive Turkey-local day
+    end: Optional[date] = None  # Inclusive Turkey-local day
+    member_id: Optional[str] = None
+    package_id: Optional[str] = None
+    payment_method: Optional[PaymentMethod] = None
+
+
+def _day_bounds(column, filters: ExportFilters) -> List[Any]:
+    turkey_tz = get_turkey_timezone()
+    conditions = []
+    if filters.start:
+        conditions.append(column >= datetime.combine(filters.start, time.min, tzinfo=turkey_tz))
+    if filters.end:
+        conditions.append(column < datetime.combine(filters.end + timedelta(days=1), time.min, tzinfo=turkey_tz))
+    return conditions
+
+
+def _payments_query(filters: ExportFilters):
+    member, staff = aliased(User), aliased(User)
+    query = (
+        select(
+            Payment.id,
+            Payment.payment_date,
+            Payment.amount_paid,
+            Payment.payment_method,
+            Payment.refund_amount,
+            Payment.refund_date,
+            Payment.subscription_id,
+            Subscription.member_user_id,
+            member.first_name.label("member_first_name"),
+            member.last_name.label("member_last_name"),
+            member.email.label("member_email"),
+            Subscription.package_id,
+            ServicePackage.name.label("package_name"),
+            (staff.first_name + " " + staff.last_name).label("recorded_by"),
+        )
+        .join(Subscription, Subscription.id == Payment.subscription_id)
+        .join(member, member.id == Subscription.member_user_id)
+        .join(ServicePackage, ServicePackage.id == Subscription.package_id)
+        .join(staff, staff.id == Payment.recorded_by_user_id)
+        .where(*_day_bounds(Payment.payment_date, filters))
+        .order_by(Payment.payment_date, Payment.id)
+    )
+    if filters.member_id:
+        query = query.where(Subscription.member_user_id == filters.member_id)
+    if filters.package_id:
+        query = query.where(Subscription.package_id == filters.package_id)
+    if filters.payment_method:
+        query = query.where(Payment.payment_method == filters.payment_method)
+    return query
+
+
+def _subscriptions_query(filters: ExportFilters):
+    query = (
+        select(
+            Subscription.id,
+            Subscription.start_date,
+            Subscription.end_date,
+            Subscription.status,
+            Subscription.access_type,
+            Subscription.purchase_price,
+            Subscription.paid_total,
+            Subscription.balance,
+            Subscription.used_sessions,
+            Subscription.attendance_count,
+            Subscription.member_user_id,
+            User.first_name.label("member_first_name"),
+            User.last_name.label("member_last_name"),
+            User.email.label("member_email"),
+            Subscription.package_id,
+            ServicePackage.name.label("package_name"),
+        )
+        .join(User, User.id == Subscription.member_user_id)
+        .join(ServicePackage, ServicePackage.id == Subscription.package_id)
+        .where(*_day_bounds(Subscription.start_date, filters))
+        .order_by(Subscription.start_date, Subscription.id)
+    )
+    if filters.member_id:
+        query = query.where(Subscription.member_user_id == filters.member_id)
+    if filters.package_id:
+        query = query.where(Subscription.package_id == filters.package_id)
+    if filters.payment_method:
+        # Subscriptions paid (at least partly) with the method
+        query = query.where(exists().where(
+            Payment.subscription_id == Subscription.id,
+            Payment.payment_method == filters.payment_method,
+        ))
+    return query
+
+
+def _check_ins_query(filters: ExportFilters):
+    if filters.payment_method:
+        raise ValueError("Check-in exports cannot be filtered by payment method")
+    member, staff = aliased(User), aliased(User)
+    query = (
+        select(
+            SessionCheckIn.id,
+            SessionCheckIn.check_in_time,
+            SessionCheckIn.subscription_id,
+            SessionCheckIn.member_user_id,
+            member.first_name.label("member_first_name"),
+            member.last_name.label("member_last_name"),
+            member.email.label("member_email"),
+            Subscription.package_id,
+            ServicePackage.name.label("package_name"),
+            SessionCheckIn.event_id,
+            ClassTemplate.name.label("class_name"),
+            ClassEvent.start_time.label("class_start_time"),
+            (staff.first_name + " " + staff.last_name).label("verified_by"),
+        )
+        .join(Subscription, Subscription.id == SessionCheckIn.subscription_id)
+        .join(member, member.id == SessionCheckIn.member_user_id)
+        .join(ServicePackage, ServicePackage.id == Subscription.package_id)
+        .join(staff, staff.id == SessionCheckIn.verified_by_user_id)
+        # TIME_BASED check-ins have no class
+        .outerjoin(ClassEvent, ClassEvent.id == SessionCheckIn.event_id)
+        .outerjoin(ClassTemplate, ClassTemplate.id == ClassEvent.template_id)
+        .where(*_day_bounds(SessionCheckIn.check_in_time, filters))
+        .order_by(SessionCheckIn.check_in_time, SessionCheckIn.id)
+    )
+    if filters.member_id:
+        query = query.where(SessionCheckIn.member_user_id == filters.member_id)
+    if filters.package_id:
+        query = query.where(Subscription.package_id == filters.package_id)
+    return query
+
+
+_QUERIES: Dict[str, Callable[[ExportFilters], Any]] = {
+    "payments": _payments_query,
+    "subscriptions": _subscriptions_query,
+    "check_ins": _check_ins_query,
+}
+
+
+def build_export_query(dataset: str, filters: ExportFilters):
+    """Column select of the dataset, oldest first.
+
+    Raises:
+        ValueError: Unknown dataset or a filter the dataset does not support.
+    """
+    if dataset not in _QUERIES:
+        raise ValueError(f"Unknown export dataset '{dataset}'")
+    return _QUERIES[dataset](filters)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_chunk(rows, columns: List[str], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) + "\n" for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([["" if v is None else _plain(v) for v in row] for row in rows])
+    return buffer.getvalue()
+
+
+async def stream_export(
+    session_factory: Callable[[], AsyncSession],
+    dataset: str,
+    filters: ExportFilters,
+    fmt: str = "csv",
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[str]:
+    """Yield the export as text chunks (CSV starts with a header line).
+
+    Validate with `build_export_query` before starting the response; errors
+    raised here surface mid-stream.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    query = build_export_query(dataset, filters)
+    columns = [c.name for c in query.selected_columns]
+    if fmt == "csv":
+        yield _encode_chunk([columns], columns, "csv")
+
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions():
+            yield _encode_chunk(rows, columns, fmt)
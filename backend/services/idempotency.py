@@ -0,0 +1,124 @@
+"""
+Idempotency-Key storage for retried POSTs.
+
+Masaüstü istemcisi zaman aşımına uğrayan satış/ödeme/check-in çağrılarını
+aynı `Idempotency-Key` ile tekrar dener. İlk istek anahtarı "sürüyor"
+(status_code NULL) olarak kaydeder; yanıt üretilince gövdesi saklanır ve aynı
+anahtarla gelen sonraki istekler işlenmeden bu yanıtı alır. Anahtarlar çağıran
+kullanıcıya (token subject) göre ayrılır ve `IDEMPOTENCY_KEY_TTL_HOURS` sonra
+scheduler tarafından silinir.
+
+HTTP tarafı: backend/core/idempotency.py (middleware).
+
+`claim`, `complete` ve `release` kendi kısa transaction'larını commit eder;
+endpoint'in oturumundan bağımsız bir oturumla çağrılmalıdır.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.idempotency import IdempotencyKey
+
+MAX_KEY_LENGTH = 128
+
+# POST endpoints that honour the header; everything else ignores it
+IDEMPOTENT_ENDPOINTS = frozenset({
+    "/api/v1/sales/payments",
+    "/api/v1/sales/subscriptions-with-events",
+    "/api/v1/operations/bookings",
+    "/api/v1/checkin/check-in",
+    "/api/v1/checkin/batch",
+})
+
+
+def is_idempotent_endpoint(method: str, path: str) -> bool:
+    return method == "POST" and path.rstrip("/") in IDEMPOTENT_ENDPOINTS
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> str:
+    """sha256 of the request; a key reused for a different request is rejected."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.rstrip("/").encode(), query.encode()):
+        digest.update(part)
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; everything here is stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def claim(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    endpoint: str,
+    request_hash: str,
+) -> Optional[IdempotencyKey]:
+    """Mark the key as in progress.
+
+    Returns:
+        None when this request owns the key and should run; otherwise the
+        live row stored for the key (in progress or completed).
+    """
+    now = datetime.now(timezone.utc)
+    existing = await db.get(IdempotencyKey, (scope, key))
+    if existing is not None:
+        if _as_utc(existing.expires_at) > now:
+            return existing
+        # Expired but not purged yet: the key is free again
+        await db.delete(existing)
+        await db.flush()
+
+    db.add(IdempotencyKey(
+        scope=scope,
+        key=key,
+        endpoint=endpoint,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won the insert
+        await db.rollback()
+        return await db.get(IdempotencyKey, (scope, key))
+    return None
+
+
+async def complete(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    status_code: int,
+    content_type: Optional[str],
+    body: str,
+) -> None:
+    """Store the response of the request that claimed the key."""
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status_code=status_code, content_type=content_type, response_body=body)
+    )
+    await db.commit()
+
+
+async def release(db: AsyncSession, scope: str, key: str) -> None:
+    """Forget a claimed key so a retry runs the request again (failed/transient outcome)."""
+    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key))
+    await db.commit()
+
+
+async def purge_expired(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """Delete expired keys; returns the number of rows removed. Does not commit."""
+    now = now or datetime.now(timezone.utc)
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+    return result.rowcount or 0
@@ -0,0 +1,70 @@
+"""
+Cheap totals for paginated list endpoints.
+
+Sayfalı listeler her sayfa değişiminde `SELECT count(*)` çalıştırmasın diye
+toplam üç modda hesaplanır:
+
+* ``exact``: her istekte sayım (eski davranış, varsayılan),
+* ``cached``: sayım `stats_cache` üzerinde filtre başına saklanır; yazma yapan
+  endpoint'ler ilgili bileşeni düşürür, TTL kaçırılmış yazmalara karşı üst sınır,
+* ``estimated``: filtresiz listelerde Postgres planlayıcısının tablo satır
+  tahmini (`pg_class.reltuples`); tahmin yoksa (SQLite, hiç ANALYZE edilmemiş
+  tablo) veya filtre varsa ``cached`` moduna düşer.
+"""
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.services.stats_cache import stats_cache
+
+TOTAL_MODES = ("exact", "cached", "estimated")
+
+
+async def estimated_table_rows(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner row estimate of a table, or None when the backend has none."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    )
+    estimate = result.scalar()
+    # -1 (PG 14+) / 0: never vacuumed or analyzed
+    return int(estimate) if estimate and estimate > 0 else None
+
+
+async def resolve_total(
+    db: AsyncSession,
+    mode: str,
+    count: Callable[[], Awaitable[int]],
+    component: str,
+    key: Hashable = None,
+    table_name: Optional[str] = None,
+) -> Tuple[int, bool]:
+    """Total rows of a list in the requested mode.
+
+    Args:
+        mode: One of `TOTAL_MODES`.
+        count: Coroutine factory running the exact count.
+        component: `StatsComponent` name the cached count is stored under.
+        key: Filter parameters of the list (one cached count per value).
+        table_name: Table estimated in ``estimated`` mode; pass None when the
+            list is filtered, the estimate would not apply.
+
+    Returns:
+        (total, is_estimate)
+
+    Raises:
+        ValueError: Unknown mode.
+    """
+    if mode not in TOTAL_MODES:
+        raise ValueError(f"Unknown total mode '{mode}'")
+    if mode == "exact":
+        return await count(), False
+    if mode == "estimated" and table_name is not None:
+        estimate = await estimated_table_rows(db, table_name)
+        if estimate is not None:
+            return estimate, True
+    lookup = await stats_cache.get_or_compute(component, count, key=key)
+    return lookup.value, False
@@ -0,0 +1,238 @@
+"""
+In-memory prefix index for member type-ahead (`/api/v1/members/autocomplete`).
+
+Kasadaki üye seçiciler her tuş vuruşunda arama yapar. Bu modül MEMBER rolündeki
+kullanıcıların katlanmış (Türkçe harf + aksan duyarsız, bkz. member_search)
+ad, soyad, "ad soyad", "soyad ad", e-posta ve telefon rakamlarını sıralı bir
+(token, tür, üye) dizisinde tutar. Önek araması `bisect` ile aralığın başını
+bulup ilk `limit` farklı üyeyi toplar; veritabanına gidilmez.
+
+Sıralama token'a göredir: önce tam/kısa eşleşen token gelir ("ali" < "alican"),
+eşitlikte ad token'ları e-posta ve telefondan önce gelir.
+
+Güncellik: User/UserRole satırlarını değiştiren her ORM commit'i ilgili üyeleri
+"kirli" işaretler; bir sonraki aramada yalnızca bu üyeler tek sorguyla yeniden
+okunur. ORM dışı toplu yazmalar `invalidate()` çağırır; diğer worker
+süreçlerindeki değişiklikler için index ayrıca TTL ile tamamen yenilenir.
+"""
+import logging
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.models.user import Role, User, UserRole
+from backend.services.member_search import fold_text, normalize_term
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "member_autocomplete_changed"
+
+# Token kinds; break ties between equal tokens
+_NAME, _EMAIL, _PHONE = 0, 1, 2
+
+_Key = Tuple[str, int, str]  # (token, kind, member_id)
+
+
+@dataclass(frozen=True)
+class MemberEntry:
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: Optional[str]
+    is_active: bool
+
+
+def _phone_tokens(phone_number: Optional[str]) -> List[str]:
+    digits = "".join(c for c in phone_number or "" if c.isdigit())
+    if not digits:
+        return []
+    tokens = [digits]
+    # "0532..." and "90532..." are typed as "532..." just as often
+    for prefix in ("90", "0"):
+        if digits.startswith(prefix) and len(digits) > len(prefix) + 3:
+            tokens.append(digits[len(prefix):])
+            break
+    return tokens
+
+
+def _keys_for(entry: MemberEntry) -> List[_Key]:
+    first, last = fold_text(entry.first_name), fold_text(entry.last_name)
+    tokens = {(word, _NAME) for word in f"{first} {last}".split()}
+    tokens.add((f"{first} {last}", _NAME))
+    tokens.add((f"{last} {first}", _NAME))
+    if entry.email:
+        tokens.add((fold_text(entry.email), _EMAIL))
+    tokens.update((digits, _PHONE) for digits in _phone_tokens(entry.phone_number))
+    return sorted((token, kind, entry.id) for token, kind in tokens if token)
+
+
+def _member_query():
+    return select(
+        User.id, User.first_name, User.last_name, User.email, User.phone_number, User.is_active
+    ).where(User.roles.any(Role.role_name == "MEMBER"))
+
+
+class MemberAutocompleteIndex:
+    """Sorted prefix index over member name, email and phone tokens.
+
+    Args:
+        ttl_seconds: Maximum age of a full load before the index is rebuilt.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._keys: List[_Key] = []
+        self._entries: Dict[str, MemberEntry] = {}
+        self._member_keys: Dict[str, List[_Key]] = {}
+        self._dirty: Set[str] = set()
+        self._loaded_at: Optional[float] = None
+        self._loads_in_flight = 0
+        self._generation = 0
+        self.reloads = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def ensure_current(self, db: AsyncSession) -> None:
+        """Full load when stale, otherwise re-read only the members changed since."""
+        if not self.is_fresh:
+            generation = self._generation
+            # Changes committed from here on are applied after this load
+            self._dirty.clear()
+            self._loads_in_flight += 1
+            try:
+                result = await db.execute(_member_query())
+            finally:
+                self._loads_in_flight -= 1
+            self._build(MemberEntry(*row) for row in result)
+            self.reloads += 1
+            logger.debug("Member autocomplete index loaded with %d members", len(self._entries))
+            if generation == self._generation:
+                self._loaded_at = self._clock()
+
+        if self._dirty:
+            member_ids, self._dirty = self._dirty, set()
+            result = await db.execute(_member_query().where(User.id.in_(member_ids)))
+            for member_id in member_ids:
+                self._remove(member_id)
+            for row in result:
+                self._add(MemberEntry(*row))
+
+    def lookup(self, term: str, limit: int = 10, include_inactive: bool = False) -> List[MemberEntry]:
+        """Members with a token starting with `term`, best (shortest) token first."""
+        prefix = normalize_term(term)
+        if not prefix or limit <= 0:
+            return []
+        found: List[MemberEntry] = []
+        seen: Set[str] = set()
+        index = bisect_left(self._keys, (prefix,))
+        while index < len(self._keys) and len(found) < limit:
+            token, _, member_id = self._keys[index]
+            if not token.startswith(prefix):
+                break
+            index += 1
+            if member_id in seen:
+                continue
+            seen.add(member_id)
+            entry = self._entries[member_id]
+            if entry.is_active or include_inactive:
+                found.append(entry)
+        return found
+
+    async def search(
+        self, db: AsyncSession, term: str, limit: int = 10, include_inactive: bool = False
+    ) -> List[MemberEntry]:
+        await self.ensure_current(db)
+        return self.lookup(term, limit=limit, include_inactive=include_inactive)
+
+    def mark_dirty(self, member_ids: Iterable[str]) -> None:
+        """Re-read these users on the next search (no-op while nothing is loaded or loading)."""
+        if self._loaded_at is not None or self._loads_in_flight:
+            self._dirty.update(member_ids)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+
+    def clear(self) -> None:
+        self.invalidate()
+        self._keys = []
+        self._entries = {}
+        self._member_keys = {}
+        self._dirty = set()
+        self.reloads = 0
+
+    def _build(self, entries: Iterable[MemberEntry]) -> None:
+        keys: List[_Key] = []
+        self._entries, self._member_keys = {}, {}
+        for entry in entries:
+            member_keys = _keys_for(entry)
+            self._entries[entry.id] = entry
+            self._member_keys[entry.id] = member_keys
+            keys.extend(member_keys)
+        keys.sort()
+        self._keys = keys
+
+    def _add(self, entry: MemberEntry) -> None:
+        member_keys = _keys_for(entry)
+        self._entries[entry.id] = entry
+        self._member_keys[entry.id] = member_keys
+        for key in member_keys:
+            insort(self._keys, key)
+
+    def _remove(self, member_id: str) -> None:
+        self._entries.pop(member_id, None)
+        for key in self._member_keys.pop(member_id, ()):
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+
+member_autocomplete_index = MemberAutocompleteIndex(
+    ttl_seconds=settings.MEMBER_AUTOCOMPLETE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_member_changes(session: Session, flush_context) -> None:
+    # Collected per flush, applied once the transaction commits
+    changed: Set[str] = session.info.get(_PENDING_KEY, set())
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        # Read without triggering loads: the identity of persistent objects,
+        # the state dict of ones just inserted (no identity until the flush ends)
+        if isinstance(obj, User):
+            identity = inspect(obj).identity
+            member_id = identity[0] if identity else obj.__dict__.get("id")
+        elif isinstance(obj, UserRole):
+            member_id = obj.__dict__.get("user_id")
+        else:
+            continue
+        if member_id:
+            changed.add(member_id)
+    if changed:
+        session.info[_PENDING_KEY] = changed
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    changed = session.info.pop(_PENDING_KEY, None)
+    if changed:
+        member_autocomplete_index.mark_dirty(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,357 @@
+"""
+Streaming bulk import of members (and their current packages) from CSV.
+
+Başka sistemlerden geçen stüdyolar binlerce üye ve aktif paket getirir; tek tek
+`POST /api/v1/members/` + satış çağrıları her kayıt için ayrı şifre hash'i ve
+commit demektir. Burada satırlar artımlı okunur, `MemberImportRow` ile
+doğrulanır ve `batch_size`'lık parçalar halinde users, user_roles,
+subscriptions, payments ve subscription_qr_codes tablolarına executemany ile
+yazılır. Her parça kendi transaction'ında commit edilir; veritabanının
+reddettiği bir parça geri alınır ve satırları hata raporuna düşer. Dosya
+yarıda okunamaz hale gelirse (bozuk UTF-8, hatalı CSV) import orada durur,
+o ana kadar yazılan parçalar kalır ve rapor `read_error` ile döner.
+
+Bellekte yalnızca o anki parça, paket önbelleği ve görülmüş e-postalar tutulur.
+Şifresi verilmeyen üyeler için import başına tek bir rastgele hash üretilir
+(kimse bilmediği için bu üyeler şifre atanana kadar giriş yapamaz).
+
+CLI: backend/scripts/import_members.py
+"""
+import asyncio
+import csv
+import logging
+import secrets
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.date_utils import calculate_end_date
+from backend.core.security import hash_password
+from backend.core.time_utils import convert_to_turkey_time, get_turkey_time
+from backend.models.operation import Payment, Subscription, SubscriptionQrCode, SubscriptionStatus
+from backend.models.service import PlanDefinition, ServicePackage
+from backend.models.user import Role, User, UserRole
+from backend.schemas.imports import ImportReport, ImportRowError, MemberImportRow
+from backend.services.member_autocomplete import member_autocomplete_index
+from backend.services.member_search import search_text_for
+from backend.services.stats_cache import StatsComponent, stats_cache
+from backend.services.stats_rollups import record_payment
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("email", "first_name", "last_name")
+DEFAULT_BATCH_SIZE = 500
+
+# Same grace period as a desk sale of a SESSION_BASED package
+_SESSION_GRACE = timedelta(days=5)
+
+
+@dataclass(frozen=True)
+class _PackageInfo:
+    id: str
+    price: Decimal
+    access_type: str
+    cycle_period: str
+    repeat_weeks: int
+
+
+def check_columns(fieldnames: Optional[Iterable[str]]) -> None:
+    """Raise ValueError when the CSV header lacks a required column."""
+    missing = [c for c in REQUIRED_COLUMNS if c not in (fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing CSV column(s): {', '.join(missing)}")
+
+
+def _batched(rows: Iterable[Tuple[int, Dict[str, str]]], size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return messages
+
+
+class MemberImporter:
+    """Imports one CSV stream; create a new instance per import.
+
+    Args:
+        db: Session used for every batch (committed per batch unless `dry_run`).
+        recorded_by_user_id: Staff user recorded on imported payments.
+        batch_size: Rows per executemany batch / transaction.
+        dry_run: Validate and check duplicates only, write nothing.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        recorded_by_user_id: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dry_run: bool = False,
+    ):
+        self.db = db
+        self.recorded_by_user_id = recorded_by_user_id
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.report = ImportReport(dry_run=dry_run)
+        self._seen_emails: Set[str] = set()
+        self._packages: Dict[str, Optional[_PackageInfo]] = {}
+        self._member_role_id: Optional[int] = None
+        self._placeholder_hash: Optional[str] = None
+
+    async def run(self, rows: Iterable[Dict[str, str]]) -> ImportReport:
+        """Import every row; returns the report (errors carry CSV line numbers)."""
+        try:
+            for batch in _batched(self._numbered(rows), self.batch_size):
+                await self._import_batch(batch)
+        finally:
+            # Also after a failure: the batches committed so far are visible
+            if not self.dry_run and self.report.imported_members:
+                stats_cache.invalidate(
+                    StatsComponent.MEMBERS,
+                    StatsComponent.MEMBERS_COUNT,
+                    StatsComponent.DEBT,
+                    StatsComponent.REVENUE,
+                    StatsComponent.PAYMENTS_COUNT,
+                )
+                # Bulk inserts are not seen by the ORM change tracking
+                member_autocomplete_index.invalidate()
+        logger.info(
+            "Member import finished: %s rows, %s members, %s subscriptions, %s failed (dry_run=%s)",
+            self.report.total_rows,
+            self.report.imported_members,
+            self.report.imported_subscriptions,
+            self.report.failed_rows,
+            self.dry_run,
+        )
+        return self.report
+
+    def _numbered(self, rows: Iterable[Dict[str, str]]) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """Rows with their CSV line number; stops at the first unreadable line."""
+        line = 1  # line 1 is the header
+        rows = iter(rows)
+        while True:
+            try:
+                raw = next(rows)
+            except StopIteration:
+                return
+            except (UnicodeDecodeError, csv.Error) as exc:
+                logger.warning("Member import stopped at unreadable line %s: %s", line + 1, exc)
+                self.report.read_error = ImportRowError(row=line + 1, errors=[f"unreadable CSV: {exc}"])
+                return
+            line += 1
+            yield line, raw
+
+    def _fail(self, line: int, email: Optional[str], errors: List[str]) -> None:
+        self.report.failed_rows += 1
+        self.report.errors.append(ImportRowError(row=line, email=email or None, errors=errors))
+
+    async def _import_batch(self, batch: List[Tuple[int, Dict[str, str]]]) -> None:
+        self.report.total_rows += len(batch)
+
+        valid: List[Tuple[int, MemberImportRow]] = []
+        for line, raw in batch:
+            try:
+                row = MemberImportRow.model_validate(raw)
+            except ValidationError as exc:
+                self._fail(line, raw.get("email"), _validation_messages(exc))
+                continue
+            key = row.email.lower()
+            if key in self._seen_emails:
+                self._fail(line, row.email, ["email: duplicate in file"])
+                continue
+            self._seen_emails.add(key)
+            valid.append((line, row))
+        if not valid:
+            return
+
+        existing = await self._existing_emails([row.email for _, row in valid])
+        await self._load_packages({row.package for _, row in valid if row.package})
+
+        accepted: List[Tuple[int, MemberImportRow, Optional[_PackageInfo]]] = []
+        for line, row in valid:
+            if row.email.lower() in existing:
+                self._fail(line, row.email, ["email: already exists"])
+                continue
+            package = self._packages.get(row.package) if row.package else None
+            if row.package and package is None:
+                self._fail(line, row.email, [f"package: '{row.package}' not found"])
+                continue
+            if package is not None and package.cycle_period.upper() == "FIXED":
+                self._fail(line, row.email, ["package: FIXED cycle plans need a manual end date"])
+                continue
+            accepted.append((line, row, package))
+        if not accepted:
+            return
+
+        if self.dry_run:
+            self._count(accepted)
+            return
+
+        try:
+            await self._write(accepted)
+            await self.db.commit()
+        except (IntegrityError, DBAPIError) as exc:
+            await self.db.rollback()
+            reason = str(getattr(exc, "orig", None) or exc)
+            logger.warning("Member import batch rejected by the database: %s", reason)
+            for line, row, _ in accepted:
+                self._fail(line, row.email, [f"batch rejected by database: {reason}"])
+            return
+        self._count(accepted)
+
+    def _count(self, accepted) -> None:
+        self.report.imported_members += len(accepted)
+        self.report.imported_subscriptions += sum(1 for _, _, package in accepted if package)
+        self.report.imported_payments += sum(1 for _, row, package in accepted if package and row.amount_paid)
+
+    async def _existing_emails(self, emails: List[str]) -> Set[str]:
+        result = await self.db.execute(
+            select(User.email).where(func.lower(User.email).in_([e.lower() for e in emails]))
+        )
+        return {email.lower() for email in result.scalars()}
+
+    async def _load_packages(self, refs: Set[str]) -> None:
+        """Resolve package ids/names not seen yet (one query per batch)."""
+        unknown = [ref for ref in refs if ref not in self._packages]
+        if not unknown:
+            return
+        result = await self.db.execute(
+            select(ServicePackage.id, ServicePackage.name, ServicePackage.price, PlanDefinition)
+            .join(PlanDefinition, PlanDefinition.id == ServicePackage.plan_id)
+            .where(or_(ServicePackage.id.in_(unknown), ServicePackage.name.in_(unknown)))
+        )
+        for package_id, name, price, plan in result:
+            info = _PackageInfo(
+                id=package_id,
+                price=price,
+                access_type=plan.access_type or "SESSION_BASED",
+                cycle_period=str(plan.cycle_period),
+                repeat_weeks=plan.repeat_weeks or 1,
+            )
+            self._packages[package_id] = info
+            self._packages[name] = info
+        for ref in unknown:
+            self._packages.setdefault(ref, None)
+
+    async def _role_id(self) -> int:
+        if self._member_role_id is None:
+            result = await self.db.execute(select(Role.id).where(Role.role_name == "MEMBER"))
+            role_id = result.scalar_one_or_none()
+            if role_id is None:
+                role = Role(role_name="MEMBER")
+                self.db.add(role)
+                await self.db.flush()
+                role_id = role.id
+            self._member_role_id = role_id
+        return self._member_role_id
+
+    async def _password_hash(self, password: Optional[str]) -> str:
+        # pbkdf2 is CPU bound; keep the event loop responsive
+        if password:
+            return await asyncio.to_thread(hash_password, password)
+        if self._placeholder_hash is None:
+            self._placeholder_hash = await asyncio.to_thread(hash_password, secrets.token_urlsafe(32))
+        return self._placeholder_hash
+
+    async def _write(self, accepted) -> None:
+        role_id = await self._role_id()
+        now = get_turkey_time()
+        paid_at = datetime.now(timezone.utc)
+
+        users, user_roles, subscriptions, payments, qr_codes = [], [], [], [], []
+        revenue: Dict[Tuple[str, str], List] = defaultdict(lambda: [Decimal("0"), 0])
+        for _, row, package in accepted:
+            user_id = str(uuid.uuid4())
+            users.append({
+                "id": user_id,
+                "email": row.email,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "phone_number": row.phone_number,
+                "password_hash": await self._password_hash(row.password),
+                "is_active": row.is_active,
+                # Bulk inserts skip the mapper events that fill it
+                "search_text": search_text_for(row.first_name, row.last_name, row.email, row.phone_number),
+            })
+            user_roles.append({"user_id": user_id, "role_id": role_id})
+            if package is None:
+                continue
+
+            start_date = convert_to_turkey_time(row.start_date or now)
+            end_date = calculate_end_date(start_date, package.cycle_period, package.repeat_weeks)
+            if package.access_type == "SESSION_BASED":
+                end_date = end_date + _SESSION_GRACE
+            price = row.purchase_price if row.purchase_price is not None else package.price
+            paid = row.amount_paid or Decimal("0")
+            subscription_id = str(uuid.uuid4())
+            subscriptions.append({
+                "id": subscription_id,
+                "member_user_id": user_id,
+                "package_id": package.id,
+                "purchase_price": price,
+                "start_date": start_date,
+                "end_date": end_date,
+                "status": SubscriptionStatus.expired if end_date < now else SubscriptionStatus.active,
+                "access_type": package.access_type,
+                "used_sessions": 0,
+                "attendance_count": 0,
+                "paid_total": paid,
+                "balance": price - paid,
+            })
+            qr_codes.append({
+                "id": str(uuid.uuid4()),
+                "subscription_id": subscription_id,
+                "qr_token": secrets.token_hex(16).upper(),
+                "is_active": True,
+            })
+            if paid:
+                payments.append({
+                    "id": str(uuid.uuid4()),
+                    "subscription_id": subscription_id,
+                    "recorded_by_user_id": self.recorded_by_user_id,
+                    "amount_paid": paid,
+                    "payment_date": paid_at,
+                    "payment_method": row.payment_method,
+                })
+                bucket = revenue[(package.id, row.payment_method.value)]
+                bucket[0] += paid
+                bucket[1] += 1
+
+        await self.db.execute(insert(User), users)
+        await self.db.execute(insert(UserRole), user_roles)
+        if subscriptions:
+            await self.db.execute(insert(Subscription), subscriptions)
+            await self.db.execute(insert(SubscriptionQrCode), qr_codes)
+        if payments:
+            await self.db.execute(insert(Payment), payments)
+        for (package_id, method), (amount, count) in revenue.items():
+            await record_payment(self.db, paid_at, package_id, method, amount, count=count)
+
+
+async def import_members(
+    db: AsyncSession,
+    rows: Iterable[Dict[str, str]],
+    recorded_by_user_id: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> ImportReport:
+    """Import CSV dict rows (e.g. a `csv.DictReader`) in batches."""
+    importer = MemberImporter(db, recorded_by_user_id, batch_size=batch_size, dry_run=dry_run)
+    return await importer.run(rows)
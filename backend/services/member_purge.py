@@ -0,0 +1,294 @@
+"""
+Background, batched hard delete of members.
+
+`DELETE /api/v1/members/{id}` eskiden isteğin içinde bir düzine toplu
+`DELETE ... IN (SELECT ...)` çalıştırıyor, yıllık check-in/ödeme geçmişi olan
+üyelerde sıcak tabloları kilitleyip masaüstü istemcisini zaman aşımına
+düşürüyordu. Şimdi:
+
+1. `request_purge` üyeyi ve aboneliklerinin QR kodlarını hemen pasifleştirir
+   (yeni check-in alınamaz) ve bir `member_purge_jobs` kaydı açar.
+2. `run_purge_job` bağımlı tabloları FK sırasıyla, her biri kendi kısa
+   transaction'ında en fazla `MEMBER_PURGE_BATCH_SIZE` satırlık partilerle
+   siler; partiler arasındaki kısa bekleme aynı anda çalışan check-in'lerin
+   kilitleri almasına izin verir. Her partinin etkilediği etkinlik sayaçları,
+   abonelik bakiyeleri ve günlük rollup'lar aynı transaction'da yeniden
+   hesaplanır; iş yarıda kalsa da türetilmiş veriler tutarlı kalır.
+
+Adımlar idempotenttir: hata alan ya da yarıda kalan iş scheduler tarafından
+baştan çalıştırılır, önceden tamamlanmış adımlar boş geçer.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from sqlalchemy import Table, and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.operation import (
+    Booking,
+    ClassEvent,
+    ClassSeries,
+    ClassSeriesException,
+    MeasurementSession,
+    MeasurementValue,
+    Payment,
+    SessionCheckIn,
+    Subscription,
+    SubscriptionQrCode,
+)
+from backend.models.purge import MemberPurgeJob
+from backend.models.user import Instructor, User, UserRole
+from backend.services.event_counters import collect_event_ids, refresh_event_counters
+from backend.services.member_autocomplete import member_autocomplete_index
+from backend.services.qr_token_cache import qr_token_cache
+from backend.services.stats_cache import stats_cache
+from backend.services.stats_rollups import collect_rollup_days, rebuild_rollup_days
+from backend.services.subscription_ledger import refresh_balances, subscription_ids_for_payments
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, COMPLETED, FAILED = "pending", "running", "completed", "failed"
+
+_bookings = Booking.__table__
+_check_ins = SessionCheckIn.__table__
+_payments = Payment.__table__
+_subscriptions = Subscription.__table__
+_measurement_sessions = MeasurementSession.__table__
+_series = ClassSeries.__table__
+
+
+def _own_subscriptions(user_id: str):
+    return select(_subscriptions.c.id).where(_subscriptions.c.member_user_id == user_id)
+
+
+def _own_series(user_id: str):
+    return select(_series.c.id).where(_series.c.subscription_id.in_(_own_subscriptions(user_id)))
+
+
+# (step name, table, user_id -> rows of the table to delete), children before parents
+PURGE_STEPS: Tuple[Tuple[str, Table, Callable[[str], Any]], ...] = (
+    ("subscription_qr_codes", SubscriptionQrCode.__table__,
+     lambda user_id: SubscriptionQrCode.__table__.c.subscription_id.in_(_own_subscriptions(user_id))),
+    # Including payments this user recorded on other members' subscriptions
+    ("payments", _payments, lambda user_id: or_(
+        _payments.c.subscription_id.in_(_own_subscriptions(user_id)),
+        _payments.c.recorded_by_user_id == user_id,
+    )),
+    ("session_check_ins", _check_ins, lambda user_id: or_(
+        _check_ins.c.subscription_id.in_(_own_subscriptions(user_id)),
+        _check_ins.c.member_user_id == user_id,
+        _check_ins.c.verified_by_user_id == user_id,
+    )),
+    ("bookings", _bookings, lambda user_id: or_(
+        _bookings.c.subscription_id.in_(_own_subscriptions(user_id)),
+        _bookings.c.member_user_id == user_id,
+    )),
+    # Events auto-created for the member's own subscriptions
+    ("class_events", ClassEvent.__table__,
+     lambda user_id: ClassEvent.__table__.c.subscription_id.in_(_own_subscriptions(user_id))),
+    # Recurring series sold with them (after their materialized occurrences)
+    ("class_series_exceptions", ClassSeriesException.__table__,
+     lambda user_id: ClassSeriesException.__table__.c.series_id.in_(_own_series(user_id))),
+    ("class_series", _series, lambda user_id: _series.c.subscription_id.in_(_own_subscriptions(user_id))),
+    ("subscriptions", _subscriptions, lambda user_id: _subscriptions.c.member_user_id == user_id),
+    ("measurement_values", MeasurementValue.__table__, lambda user_id: MeasurementValue.__table__.c.session_id.in_(
+        select(_measurement_sessions.c.id).where(_measurement_sessions.c.member_user_id == user_id)
+    )),
+    ("measurement_sessions", _measurement_sessions, lambda user_id: _measurement_sessions.c.member_user_id == user_id),
+    ("instructors", Instructor.__table__, lambda user_id: Instructor.__table__.c.user_id == user_id),
+    ("user_roles", UserRole.__table__, lambda user_id: UserRole.__table__.c.user_id == user_id),
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claimable(now: datetime):
+    """Jobs a runner may take: new, stalled, or failed with attempts left."""
+    stalled_before = now - timedelta(minutes=settings.MEMBER_PURGE_STALL_MINUTES)
+    return or_(
+        MemberPurgeJob.status == PENDING,
+        and_(MemberPurgeJob.status == RUNNING, MemberPurgeJob.updated_at < stalled_before),
+        and_(MemberPurgeJob.status == FAILED, MemberPurgeJob.attempts < settings.MEMBER_PURGE_MAX_ATTEMPTS),
+    )
+
+
+async def request_purge(db: AsyncSession, user: User) -> MemberPurgeJob:
+    """Deactivate the member now and queue the hard delete; commits.
+
+    Deleting a member whose purge is already queued returns the existing job
+    (a failed one is queued again).
+    """
+    now = _now()
+    result = await db.execute(
+        select(MemberPurgeJob)
+        .where(MemberPurgeJob.user_id == user.id, MemberPurgeJob.status != COMPLETED)
+        .order_by(MemberPurgeJob.created_at.desc())
+        .limit(1)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        job = MemberPurgeJob(user_id=user.id, status=PENDING, created_at=now, updated_at=now)
+        db.add(job)
+    elif job.status == FAILED:
+        job.status, job.attempts, job.error, job.updated_at = PENDING, 0, None, now
+
+    user.is_active = False
+    # Scans are rejected from here on; the QR rows themselves go with the purge
+    await db.execute(
+        update(SubscriptionQrCode)
+        .where(SubscriptionQrCode.subscription_id.in_(_own_subscriptions(user.id)))
+        .values(is_active=False)
+    )
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def claimable_job_ids(db: AsyncSession) -> List[str]:
+    """Ids of jobs the scheduler sweep should (re)run, oldest first."""
+    result = await db.execute(
+        select(MemberPurgeJob.id).where(_claimable(_now())).order_by(MemberPurgeJob.created_at)
+    )
+    return list(result.scalars().all())
+
+
+async def _claim(db: AsyncSession, job_id: str) -> Optional[str]:
+    """Mark the job running for this runner; returns its user id, None if not claimable."""
+    now = _now()
+    result = await db.execute(
+        update(MemberPurgeJob)
+        .where(MemberPurgeJob.id == job_id, _claimable(now))
+        .values(status=RUNNING, attempts=MemberPurgeJob.attempts + 1, error=None, updated_at=now)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        return None
+    await db.execute(
+        update(MemberPurgeJob)
+        .where(MemberPurgeJob.id == job_id, MemberPurgeJob.started_at.is_(None))
+        .values(started_at=now)
+    )
+    user_id = (await db.execute(select(MemberPurgeJob.user_id).where(MemberPurgeJob.id == job_id))).scalar_one()
+    await db.commit()
+    return user_id
+
+
+async def _purge_batch(db: AsyncSession, table: Table, condition, batch_size: int) -> int:
+    """Delete up to `batch_size` matching rows and refresh what they fed; does not commit."""
+    if "id" not in table.c:
+        # Composite-key link rows (roles, instructor profile): a handful per user
+        result = await db.execute(delete(table).where(condition))
+        return result.rowcount
+
+    ids = (await db.execute(select(table.c.id).where(condition).limit(batch_size))).scalars().all()
+    if not ids:
+        return 0
+    batch = table.c.id.in_(ids)
+
+    event_ids, subscription_ids, rollup_days = set(), set(), set()
+    if table is _bookings or table is _check_ins:
+        event_ids = await collect_event_ids(db, (table, batch))
+    if table is _check_ins:
+        rollup_days = await collect_rollup_days(db, check_in_condition=batch)
+    if table is _payments:
+        subscription_ids = await subscription_ids_for_payments(db, batch)
+        rollup_days = await collect_rollup_days(db, payment_condition=batch)
+
+    await db.execute(delete(table).where(batch))
+    await refresh_event_counters(db, event_ids)
+    await refresh_balances(db, subscription_ids)
+    await rebuild_rollup_days(db, rollup_days)
+    return len(ids)
+
+
+async def _run_steps(db: AsyncSession, job_id: str, user_id: str, batch_size: int, pause: float) -> None:
+    for step, table, condition in PURGE_STEPS:
+        while True:
+            deleted = await _purge_batch(db, table, condition(user_id), batch_size)
+            if deleted:
+                await db.execute(
+                    update(MemberPurgeJob)
+                    .where(MemberPurgeJob.id == job_id)
+                    .values(
+                        current_step=step,
+                        deleted_rows=MemberPurgeJob.deleted_rows + deleted,
+                        batches=MemberPurgeJob.batches + 1,
+                        updated_at=_now(),
+                    )
+                )
+            # One short transaction per batch keeps row locks brief
+            await db.commit()
+            if deleted < batch_size or "id" not in table.c:
+                break
+            await asyncio.sleep(pause)
+
+    await db.execute(delete(User.__table__).where(User.__table__.c.id == user_id))
+    now = _now()
+    await db.execute(
+        update(MemberPurgeJob)
+        .where(MemberPurgeJob.id == job_id)
+        .values(
+            status=COMPLETED,
+            current_step=None,
+            deleted_rows=MemberPurgeJob.deleted_rows + 1,
+            finished_at=now,
+            updated_at=now,
+        )
+    )
+    await db.commit()
+
+
+async def run_purge_job(
+    session_provider: Callable[[], AsyncIterator[AsyncSession]],
+    job_id: str,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> Optional[str]:
+    """Run (or resume) a purge job on its own session.
+
+    Args:
+        session_provider: Async generator yielding a session, e.g. `get_db`.
+        job_id: The `member_purge_jobs` row to run.
+        batch_size: Rows per delete; defaults to `MEMBER_PURGE_BATCH_SIZE`.
+        pause: Seconds to sleep between batches; defaults to
+            `MEMBER_PURGE_BATCH_PAUSE_SECONDS`.
+
+    Returns:
+        The final status, or None if the job was not claimable (finished, or
+        being run by someone else).
+    """
+    batch_size = batch_size or settings.MEMBER_PURGE_BATCH_SIZE
+    pause = settings.MEMBER_PURGE_BATCH_PAUSE_SECONDS if pause is None else pause
+    outcome: Optional[str] = None
+    user_id: Optional[str] = None
+
+    async for db in session_provider():
+        user_id = await _claim(db, job_id)
+        if user_id is None:
+            break
+        try:
+            await _run_steps(db, job_id, user_id, batch_size, pause)
+            outcome = COMPLETED
+            logger.info("Member %s purged (job %s)", user_id, job_id)
+        except Exception as e:
+            await db.rollback()
+            logger.exception("Member purge job %s failed", job_id)
+            await db.execute(
+                update(MemberPurgeJob)
+                .where(MemberPurgeJob.id == job_id)
+                .values(status=FAILED, error=str(e)[:2000], updated_at=_now())
+            )
+            await db.commit()
+            outcome = FAILED
+
+    if user_id is not None:
+        # Raw deletes bypass the ORM hooks that normally keep these current
+        qr_token_cache.invalidate_member(user_id)
+        member_autocomplete_index.mark_dirty([user_id])
+        stats_cache.invalidate()
+    return outcome
@@ -0,0 +1,150 @@
+"""
+Indexed, Turkish-aware member/staff search.
+
+Ad, soyad, e-posta ve telefon rakamları tek bir `users.search_text`
+kolonunda katlanmış (case + aksan) halde tutulur: "İpek Işık" ve "ipek isik"
+aynı metne dönüşür. Kolon ORM yazımlarında mapper event'leriyle, toplu
+insert'lerde `search_text_for` ile doldurulur.
+
+* Postgres: `pg_trgm` GIN index'i hem `%terim%` aramasını hem de yazım
+  hatası toleranslı `<%` (word similarity) eşleşmesini karşılar; sonuçlar
+  `word_similarity` ile sıralanır.
+* SQLite: `users_fts` FTS5 trigram tablosu (tetikleyicilerle senkron) alt
+  dizgi eşleşmesini index'ten bulur, `bm25` ile sıralanır. 3 karakterden kısa
+  terimler (trigram yok) kolon üzerinde LIKE ile aranır.
+
+Mevcut satırları migration, kuralların o günkü kopyasıyla doldurur; katlama
+kuralları değişirse bkz. backend/scripts/rebuild_member_search.py.
+"""
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Float, Integer, bindparam, case, event, func, literal, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from backend.models.user import User
+
+# Turkish letters whose lowercase/ASCII form Unicode case mapping gets wrong
+# ("I".lower() is "i", "İ".lower() is "i̇"); the rest lose their accents in NFKD
+_TURKISH_FOLD = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s",
+    "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c",
+    "Ö": "o", "ö": "o",
+    "Ü": "u", "ü": "u",
+})
+_PHONE_TERM = re.compile(r"[\d\s()+\-.]+")
+_TRIGRAM_MIN_LENGTH = 3
+
+
+def fold_text(value: Optional[str]) -> str:
+    """Lowercase, strip diacritics and collapse whitespace (Turkish-aware)."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.translate(_TURKISH_FOLD))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def _digits(value: Optional[str]) -> str:
+    return "".join(c for c in value or "" if c.isdigit())
+
+
+def search_text_for(
+    first_name: Optional[str],
+    last_name: Optional[str],
+    email: Optional[str],
+    phone_number: Optional[str],
+) -> str:
+    """Value of `users.search_text` for the given fields."""
+    return " ".join(
+        part for part in (fold_text(first_name), fold_text(last_name), fold_text(email), _digits(phone_number)) if part
+    )
+
+
+def normalize_term(term: Optional[str]) -> str:
+    """Fold a search term; phone-looking terms keep only their digits."""
+    if not term or not term.strip():
+        return ""
+    if _PHONE_TERM.fullmatch(term.strip()) and any(c.isdigit() for c in term):
+        return _digits(term)
+    return fold_text(term)
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _refresh_search_text(mapper, connection, target: User) -> None:
+    target.search_text = search_text_for(target.first_name, target.last_name, target.email, target.phone_number)
+
+
+def _fts_phrase(term: str) -> str:
+    # Quoted phrase: the trigram tokenizer turns it into a substring match
+    return '"' + term.replace('"', '""') + '"'
+
+
+def apply_search(query: Select, db: AsyncSession, term: Optional[str]) -> Select:
+    """Filter a `select(User)` by the search term and order it by relevance.
+
+    Call before adding the list's own ORDER BY, which then only breaks ties.
+    An empty term returns `query` unchanged.
+    """
+    folded = normalize_term(term)
+    if not folded:
+        return query
+    dialect = db.get_bind().dialect.name
+    substring = User.search_text.contains(folded, autoescape=True)
+
+    if dialect == "postgresql":
+        # `<%` (word similarity above pg_trgm.word_similarity_threshold) is GIN-indexable
+        fuzzy = literal(folded).op("<%")(User.search_text)
+        return query.where(or_(substring, fuzzy)).order_by(func.word_similarity(folded, User.search_text).desc())
+
+    if dialect == "sqlite" and len(folded) >= _TRIGRAM_MIN_LENGTH:
+        matches = (
+            text(
+                "SELECT rowid AS user_rowid, bm25(users_fts) AS rank "
+                "FROM users_fts WHERE users_fts MATCH :search_phrase"
+            )
+            .bindparams(search_phrase=_fts_phrase(folded))
+            .columns(user_rowid=Integer, rank=Float)
+            .subquery("search_matches")
+        )
+        return query.join(matches, matches.c.user_rowid == literal_column("users.rowid")).order_by(matches.c.rank)
+
+    # Too short for trigrams: scan, prefix matches first
+    prefix = case((User.search_text.startswith(folded, autoescape=True), 0), else_=1)
+    return query.where(substring).order_by(prefix)
+
+
+async def rebuild_search_text(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Recompute `users.search_text` for every user; returns the number of rows.
+
+    Keeps `updated_at` (member lists are ordered by it). Does not commit.
+    """
+    users = User.__table__
+    statement = (
+        users.update()
+        .where(users.c.id == bindparam("b_id"))
+        .values(search_text=bindparam("b_search_text"), updated_at=users.c.updated_at)
+    )
+    written, last_id = 0, None
+    while True:
+        query = select(User.id, User.first_name, User.last_name, User.email, User.phone_number).order_by(User.id)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        rows = (await db.execute(query.limit(batch_size))).all()
+        if not rows:
+            break
+        await db.execute(statement, [
+            {"b_id": row.id, "b_search_text": search_text_for(row.first_name, row.last_name, row.email, row.phone_number)}
+            for row in rows
+        ])
+        written += len(rows)
+        last_id = rows[-1].id
+
+    if db.get_bind().dialect.name == "sqlite":
+        await db.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+    return written
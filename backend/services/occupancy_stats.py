@@ -0,0 +1,202 @@
+"""
+Class occupancy heatmap (weekday × hour × template × instructor).
+
+Saklanan derslerin toplaması SQL'de yapılır: doluluk ve giriş sayıları `class_events`
+üzerindeki denormalize sayaçlardan (`booked_count`, `checked_in_count`) okunur,
+gelmeyen (no-show) rezervasyonlar ise aynı üyenin aynı derse girişi olmayan
+`bookings` satırlarıdır. Sadece başlamış ve iptal edilmemiş dersler sayılır.
+
+Henüz satırı olmayan tekrarlayan seri dersleri (`class_series.expand_range`)
+aynı hücrelere eklenir: satılmış serinin abonesi rezerve sayılır, giriş
+yapılan ders satıra dönüştüğünden bu dersler giriş olmadan (no-show) sayılır.
+
+Haftanın günü ISO numarasıdır (1 = Pazartesi), saat dersin başlangıç saatidir
+(veritabanında saklandığı yerel saat; Postgres oturumu Europe/Istanbul).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, and_, cast, exists, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.time_utils import get_turkey_time, get_turkey_timezone
+from backend.models.operation import Booking, ClassEvent, ClassTemplate, SessionCheckIn
+from backend.models.user import User
+from backend.services.class_series import as_local, expand_range
+
+
+@dataclass(frozen=True)
+class OccupancyCell:
+    weekday: int
+    hour: int
+    template_id: str
+    template_name: str
+    instructor_user_id: str
+    instructor_name: str
+    events: int
+    capacity_total: int
+    booked_total: int
+    check_ins: int
+    no_shows: int
+    avg_fill_rate: float  # mean of check-ins / capacity per event
+    avg_booking_rate: float  # mean of bookings / capacity per event
+    no_show_rate: Optional[float]  # no-shows / bookings (None without bookings)
+
+
+@dataclass
+class _CellTotals:
+    """Running sums of one heatmap cell while SQL rows and occurrences merge."""
+    template_name: str
+    instructor_name: str
+    events: int = 0
+    rated_events: int = 0  # events with a capacity, the denominator of the averages
+    capacity_total: int = 0
+    booked_total: int = 0
+    check_ins: int = 0
+    no_shows: int = 0
+    fill_rate_sum: float = 0.0
+    booking_rate_sum: float = 0.0
+
+
+def _weekday_hour(dialect: str):
+    """ISO weekday (1 = Monday) and hour of ClassEvent.start_time for the dialect."""
+    if dialect == "sqlite":
+        weekday = (cast(func.strftime("%w", ClassEvent.start_time), Integer) + 6) % 7 + 1
+        hour = cast(func.strftime("%H", ClassEvent.start_time), Integer)
+    else:
+        weekday = cast(extract("isodow", ClassEvent.start_time), Integer)
+        hour = cast(extract("hour", ClassEvent.start_time), Integer)
+    return weekday.label("weekday"), hour.label("hour")
+
+
+async def load_occupancy(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    now: Optional[datetime] = None,
+) -> List[OccupancyCell]:
+    """Aggregate classes that started within [start, end] (and before `now`).
+
+    Stored classes are aggregated in SQL, series occurrences without a row are
+    added per cell afterwards.
+    """
+    now = now or get_turkey_time()
+    turkey_tz = get_turkey_timezone()
+    weekday, hour = _weekday_hour(db.get_bind().dialect.name)
+
+    range_start = datetime.combine(start, time.min, tzinfo=turkey_tz)
+    range_end = datetime.combine(end + timedelta(days=1), time.min, tzinfo=turkey_tz)
+    in_range = and_(
+        ClassEvent.is_cancelled == False,
+        ClassEvent.start_time >= range_start,
+        ClassEvent.start_time < range_end,
+        ClassEvent.start_time <= now,
+    )
+
+    # Bookings of in-range classes without a check-in of the same member
+    attended = exists().where(
+        SessionCheckIn.event_id == Booking.event_id,
+        SessionCheckIn.member_user_id == Booking.member_user_id,
+    )
+    no_shows = (
+        select(Booking.event_id, func.count(Booking.id).label("no_shows"))
+        .join(ClassEvent, ClassEvent.id == Booking.event_id)
+        .where(in_range, ~attended)
+        .group_by(Booking.event_id)
+        .subquery()
+    )
+
+    capacity = func.nullif(ClassEvent.capacity, 0)
+    query = (
+        select(
+            weekday,
+            hour,
+            ClassEvent.template_id,
+            ClassTemplate.name.label("template_name"),
+            ClassEvent.instructor_user_id,
+            User.first_name,
+            User.last_name,
+            func.count(ClassEvent.id).label("events"),
+            func.count(capacity).label("rated_events"),
+            func.sum(ClassEvent.capacity).label("capacity_total"),
+            func.sum(ClassEvent.booked_count).label("booked_total"),
+            func.sum(ClassEvent.checked_in_count).label("check_ins"),
+            func.sum(func.coalesce(no_shows.c.no_shows, 0)).label("no_shows"),
+            func.sum(cast(ClassEvent.checked_in_count, Float) / capacity).label("fill_rate_sum"),
+            func.sum(cast(ClassEvent.booked_count, Float) / capacity).label("booking_rate_sum"),
+        )
+        .join(ClassTemplate, ClassTemplate.id == ClassEvent.template_id)
+        .join(User, User.id == ClassEvent.instructor_user_id)
+        .outerjoin(no_shows, no_shows.c.event_id == ClassEvent.id)
+        .where(in_range)
+        .group_by(
+            weekday,
+            hour,
+            ClassEvent.template_id,
+            ClassTemplate.name,
+            ClassEvent.instructor_user_id,
+            User.first_name,
+            User.last_name,
+        )
+    )
+
+    cells: Dict[Tuple[int, int, str, str], _CellTotals] = {}
+    for row in await db.execute(query):
+        cells[(int(row.weekday), int(row.hour), row.template_id, row.instructor_user_id)] = _CellTotals(
+            template_name=row.template_name,
+            instructor_name=f"{row.first_name} {row.last_name}",
+            events=int(row.events),
+            rated_events=int(row.rated_events),
+            capacity_total=int(row.capacity_total or 0),
+            booked_total=int(row.booked_total or 0),
+            check_ins=int(row.check_ins or 0),
+            no_shows=int(row.no_shows or 0),
+            fill_rate_sum=float(row.fill_rate_sum or 0),
+            booking_rate_sum=float(row.booking_rate_sum or 0),
+        )
+
+    # Series occurrences that started in range without a class_events row
+    occurrences = await expand_range(db, range_start, min(range_end, as_local(now) + timedelta(microseconds=1)))
+    for occurrence in occurrences:
+        if occurrence.is_cancelled:
+            continue
+        local_start = as_local(occurrence.start_time)
+        totals = cells.setdefault(
+            (local_start.isoweekday(), local_start.hour, occurrence.template_id, occurrence.instructor_user_id),
+            _CellTotals(
+                template_name=occurrence.template.name,
+                instructor_name=f"{occurrence.instructor_first_name} {occurrence.instructor_last_name}",
+            ),
+        )
+        booked = occurrence.booked_count
+        totals.events += 1
+        totals.capacity_total += occurrence.capacity
+        totals.booked_total += booked
+        totals.check_ins += occurrence.checked_in_count
+        totals.no_shows += booked - occurrence.checked_in_count
+        if occurrence.capacity:
+            totals.rated_events += 1
+            totals.fill_rate_sum += occurrence.checked_in_count / occurrence.capacity
+            totals.booking_rate_sum += booked / occurrence.capacity
+
+    ordered = sorted(cells.items(), key=lambda item: (item[0][0], item[0][1], item[1].template_name))
+    return [
+        OccupancyCell(
+            weekday=iso_weekday,
+            hour=start_hour,
+            template_id=template_id,
+            template_name=totals.template_name,
+            instructor_user_id=instructor_user_id,
+            instructor_name=totals.instructor_name,
+            events=totals.events,
+            capacity_total=totals.capacity_total,
+            booked_total=totals.booked_total,
+            check_ins=totals.check_ins,
+            no_shows=totals.no_shows,
+            avg_fill_rate=round(totals.fill_rate_sum / totals.rated_events, 4) if totals.rated_events else 0.0,
+            avg_booking_rate=round(totals.booking_rate_sum / totals.rated_events, 4) if totals.rated_events else 0.0,
+            no_show_rate=round(totals.no_shows / totals.booked_total, 4) if totals.booked_total else None,
+        )
+        for (iso_weekday, start_hour, template_id, instructor_user_id), totals in ordered
+    ]
@@ -0,0 +1,221 @@
+"""
+Process-local QR token resolution cache.
+
+Turnstile scans (`/checkin/scan` ve `/checkin/check-in`) her seferinde
+SubscriptionQrCode → Subscription → ServicePackage → PlanDefinition (+ member)
+zincirini yüklüyordu. Bu modül token'ı, aboneliğin değişmeyen kimlik bilgilerine
+(üye adı, paket, plan kuralları) eşleyen kısa ömürlü bir snapshot tutar.
+
+Sık değişen alanlar (status, end_date, used_sessions, attendance_count) bilerek
+snapshot'a konmaz; çağıran taraf bunları tek bir primary-key sorgusuyla taze okur.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.core.config import settings
+from backend.models.operation import SubscriptionQrCode, Subscription
+from backend.models.service import ServicePackage, PlanDefinition
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QrTokenSnapshot:
+    """Immutable identity data of the subscription behind an active QR token."""
+
+    qr_token: str
+    subscription_id: str
+    member_user_id: str
+    member_first_name: str
+    member_last_name: str
+    package_id: str
+    package_name: str
+    access_type: str
+    sessions_granted: Optional[int]
+
+    @property
+    def member_name(self) -> str:
+        return f"{self.member_first_name} {self.member_last_name}"
+
+
+class QrTokenCache:
+    """TTL bounded token → snapshot map with explicit invalidation hooks.
+
+    Only positive lookups are cached, so a newly issued token never has to
+    wait for a stale "not found" entry to expire.
+
+    Args:
+        ttl_seconds: Lifetime of a cached snapshot.
+        max_entries: Upper bound; expired entries are purged first, then the
+            oldest entries are evicted.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[str, tuple[float, QrTokenSnapshot]] = {}
+        self._token_by_subscription: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, qr_token: str) -> Optional[QrTokenSnapshot]:
+        entry = self._entries.get(qr_token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, snapshot = entry
+        if expires_at <= self._clock():
+            self._drop(qr_token)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def put(self, snapshot: QrTokenSnapshot) -> None:
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        # A subscription owns exactly one token; drop a previous (rotated) one.
+        previous = self._token_by_subscription.get(snapshot.subscription_id)
+        if previous is not None and previous != snapshot.qr_token:
+            self._drop(previous)
+        self._entries[snapshot.qr_token] = (self._clock() + self.ttl_seconds, snapshot)
+        self._token_by_subscription[snapshot.subscription_id] = snapshot.qr_token
+
+    def invalidate_token(self, qr_token: str) -> None:
+        if self._drop(qr_token):
+            self.invalidations += 1
+
+    def invalidate_subscriptions(self, subscription_ids: Iterable[str]) -> None:
+        for subscription_id in subscription_ids:
+            token = self._token_by_subscription.get(subscription_id)
+            if token is not None:
+                self.invalidate_token(token)
+
+    def invalidate_member(self, member_user_id: str) -> None:
+        tokens = [
+            token for token, (_, snapshot) in self._entries.items()
+            if snapshot.member_user_id == member_user_id
+        ]
+        for token in tokens:
+            self.invalidate_token(token)
+
+    def invalidate_packages(self, package_ids: Iterable[str]) -> None:
+        # Package name and plan rules are part of the snapshot
+        package_ids = set(package_ids)
+        tokens = [
+            token for token, (_, snapshot) in self._entries.items()
+            if snapshot.package_id in package_ids
+        ]
+        for token in tokens:
+            self.invalidate_token(token)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._token_by_subscription.clear()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _drop(self, qr_token: str) -> bool:
+        entry = self._entries.pop(qr_token, None)
+        if entry is None:
+            return False
+        subscription_id = entry[1].subscription_id
+        if self._token_by_subscription.get(subscription_id) == qr_token:
+            del self._token_by_subscription[subscription_id]
+        return True
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for token in [t for t, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            self._drop(token)
+        # Dicts keep insertion order, so the first keys are the oldest entries.
+        overflow = len(self._entries) - self.max_entries + 1
+        for token in list(self._entries)[:max(overflow, 0)]:
+            self._drop(token)
+
+
+qr_token_cache = QrTokenCache(
+    ttl_seconds=settings.QR_TOKEN_CACHE_TTL_SECONDS,
+    max_entries=settings.QR_TOKEN_CACHE_MAX_ENTRIES,
+)
+
+
+async def resolve_qr_token(db: AsyncSession, qr_token: str) -> Optional[QrTokenSnapshot]:
+    """Resolve an active QR token to its subscription snapshot.
+
+    Cache hits cost no database round trip. On a miss the snapshot is built
+    with a single joined column query instead of the nested eager-load chain.
+
+    Args:
+        db: Active database session.
+        qr_token: Token read from the member's QR code.
+
+    Returns:
+        Snapshot of the owning subscription, or None if the token is unknown
+        or inactive.
+    """
+    snapshot = qr_token_cache.get(qr_token)
+    if snapshot is not None:
+        return snapshot
+
+    query = (
+        select(
+            Subscription.id.label("subscription_id"),
+            Subscription.member_user_id,
+            User.first_name,
+            User.last_name,
+            ServicePackage.id.label("package_id"),
+            ServicePackage.name.label("package_name"),
+            PlanDefinition.access_type,
+            PlanDefinition.sessions_granted,
+        )
+        .select_from(SubscriptionQrCode)
+        .join(Subscription, SubscriptionQrCode.subscription_id == Subscription.id)
+        .join(User, Subscription.member_user_id == User.id)
+        .join(ServicePackage, Subscription.package_id == ServicePackage.id)
+        .join(PlanDefinition, ServicePackage.plan_id == PlanDefinition.id)
+        .where(SubscriptionQrCode.qr_token == qr_token, SubscriptionQrCode.is_active == True)
+    )
+    row = (await db.execute(query)).one_or_none()
+    if row is None:
+        return None
+
+    snapshot = QrTokenSnapshot(
+        qr_token=qr_token,
+        subscription_id=row.subscription_id,
+        member_user_id=row.member_user_id,
+        member_first_name=row.first_name,
+        member_last_name=row.last_name,
+        package_id=row.package_id,
+        package_name=row.package_name,
+        access_type=row.access_type or "SESSION_BASED",
+        sessions_granted=row.sessions_granted,
+    )
+    qr_token_cache.put(snapshot)
+    return snapshot
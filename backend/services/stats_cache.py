@@ -0,0 +1,217 @@
+"""
+Process-local cache of `/api/v1/stats/dashboard` components.
+
+Her masaüstü istemcisi dashboard'u dakikada bir çeker; bileşenler (aktif üye
+sayısı, bugünkü dersler, borç, aylık ciro, aktivite akışı) ayrı ayrı ve kendi
+TTL'leri ile saklanır. Aynı bileşen için eşzamanlı istekler tek bir hesaplamayı
+bekler (single-flight), böylece N masa tek hesaplamaya mal olur.
+
+Yazma yapan endpoint'ler commit sonrası etkiledikleri bileşeni
+`stats_cache.invalidate(...)` ile düşürür; TTL yalnızca kaçırılmış yazmalara
+(scheduler, elle veri düzeltme) karşı üst sınırdır.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StatsComponent:
+    """Dashboard component names (cache keys and response `cache` keys)."""
+
+    MEMBERS = "members"
+    SCHEDULE = "schedule"
+    DEBT = "debt"
+    REVENUE = "revenue"
+    ACTIVITY = "activity"
+    OCCUPANCY = "occupancy"  # keyed by date range
+    PAYMENTS_COUNT = "payments_count"  # keyed by member filter (list totals)
+    MEMBERS_COUNT = "members_count"  # keyed by list filters (member list totals)
+    STAFF_COUNT = "staff_count"  # keyed by list filters (staff list totals)
+
+
+@dataclass(frozen=True)
+class CachedComponent:
+    value: Any
+    scope: Hashable
+    computed_at: datetime
+    expires_at: float
+    stored_at: float
+
+
+@dataclass(frozen=True)
+class ComponentLookup:
+    """A component value plus where it came from (for response metadata)."""
+
+    value: Any
+    computed_at: datetime
+    age_seconds: float
+    ttl_seconds: float
+    cached: bool
+    compute_ms: Optional[float] = None  # Set when this call computed the value
+
+
+class StatsCache:
+    """Per-component TTL cache with single-flight recomputation.
+
+    Args:
+        ttl_seconds: Component name → lifetime in seconds. Unknown components
+            use `default_ttl`; a TTL of 0 disables caching for that component.
+        default_ttl: Fallback lifetime.
+        max_keys: Upper bound of keyed entries (e.g. date ranges) kept per
+            component; the oldest entry is evicted first.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60.0,
+        max_keys: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.default_ttl = default_ttl
+        self.max_keys = max_keys
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Hashable], CachedComponent] = {}
+        self._locks: Dict[Tuple[str, Hashable], asyncio.Lock] = {}
+        # Bumped on invalidation so a computation racing a write is not stored
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def ttl_for(self, name: str) -> float:
+        return float(self.ttl_seconds.get(name, self.default_ttl))
+
+    def _fresh(self, name: str, key: Hashable, scope: Hashable) -> Optional[CachedComponent]:
+        entry = self._entries.get((name, key))
+        if entry is None or entry.scope != scope or entry.expires_at <= self._clock():
+            return None
+        return entry
+
+    def _lookup(
+        self, entry: CachedComponent, name: str, cached: bool, compute_ms: Optional[float] = None
+    ) -> ComponentLookup:
+        return ComponentLookup(
+            value=entry.value,
+            computed_at=entry.computed_at,
+            age_seconds=round(max(0.0, self._clock() - entry.stored_at), 3),
+            ttl_seconds=self.ttl_for(name),
+            cached=cached,
+            compute_ms=compute_ms,
+        )
+
+    async def get_or_compute(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+        scope: Hashable = None,
+        key: Hashable = None,
+    ) -> ComponentLookup:
+        """Return the cached component or compute it once for all waiters.
+
+        Args:
+            name: Component name (see `StatsComponent`).
+            compute: Coroutine factory producing the value.
+            scope: Extra validity key, e.g. today's date for "today" components;
+                an entry computed for another scope counts as a miss.
+            key: Parameters of a component cached once per value (e.g. a date
+                range); `invalidate(name)` drops every key of the component.
+        """
+        entry = self._fresh(name, key, scope)
+        if entry is not None:
+            self.hits += 1
+            return self._lookup(entry, name, cached=True)
+
+        lock = self._locks.setdefault((name, key), asyncio.Lock())
+        async with lock:
+            # Another request may have filled it while we waited
+            entry = self._fresh(name, key, scope)
+            if entry is not None:
+                self.hits += 1
+                return self._lookup(entry, name, cached=True)
+
+            self.misses += 1
+            generation = self._generations.get(name, 0)
+            started = time.perf_counter()
+            value = await compute()
+            compute_ms = round((time.perf_counter() - started) * 1000, 2)
+            now = self._clock()
+            entry = CachedComponent(
+                value=value,
+                scope=scope,
+                computed_at=datetime.now(timezone.utc),
+                expires_at=now + self.ttl_for(name),
+                stored_at=now,
+            )
+            if self.ttl_for(name) > 0 and self._generations.get(name, 0) == generation:
+                self._store(name, key, entry)
+        # Not stored (TTL 0 or invalidated meanwhile): nothing left for the lock to guard
+        self._discard_lock((name, key))
+        return self._lookup(entry, name, cached=False, compute_ms=compute_ms)
+
+    def _discard_lock(self, entry_key: Tuple[str, Hashable]) -> None:
+        """Forget an idle lock whose key has no cached entry."""
+        lock = self._locks.get(entry_key)
+        if lock is not None and not lock.locked() and entry_key not in self._entries:
+            del self._locks[entry_key]
+
+    def _store(self, name: str, key: Hashable, entry: CachedComponent) -> None:
+        self._entries[(name, key)] = entry
+        siblings = [k for k in self._entries if k[0] == name]
+        if len(siblings) > self.max_keys:
+            oldest = min(siblings, key=lambda k: self._entries[k].stored_at)
+            del self._entries[oldest]
+            self._locks.pop(oldest, None)
+
+    def invalidate(self, *names: str) -> None:
+        """Drop the given components (all of them when called without names)."""
+        targets = set(names) if names else {k[0] for k in set(self._entries) | set(self._locks)}
+        for name in targets:
+            self._generations[name] = self._generations.get(name, 0) + 1
+        for entry_key in [k for k in self._entries if k[0] in targets]:
+            del self._entries[entry_key]
+            self.invalidations += 1
+        # Keyed components (e.g. one per search term) would otherwise keep a lock per key
+        for entry_key in [k for k in self._locks if k[0] in targets]:
+            self._discard_lock(entry_key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._locks.clear()
+        self._generations.clear()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "locks": len(self._locks),
+        }
+
+
+stats_cache = StatsCache(
+    ttl_seconds={
+        StatsComponent.MEMBERS: settings.STATS_CACHE_MEMBERS_TTL_SECONDS,
+        StatsComponent.SCHEDULE: settings.STATS_CACHE_SCHEDULE_TTL_SECONDS,
+        StatsComponent.DEBT: settings.STATS_CACHE_DEBT_TTL_SECONDS,
+        StatsComponent.REVENUE: settings.STATS_CACHE_REVENUE_TTL_SECONDS,
+        StatsComponent.ACTIVITY: settings.STATS_CACHE_ACTIVITY_TTL_SECONDS,
+        StatsComponent.OCCUPANCY: settings.STATS_CACHE_OCCUPANCY_TTL_SECONDS,
+        StatsComponent.PAYMENTS_COUNT: settings.STATS_CACHE_LIST_COUNT_TTL_SECONDS,
+        StatsComponent.MEMBERS_COUNT: settings.STATS_CACHE_LIST_COUNT_TTL_SECONDS,
+        StatsComponent.STAFF_COUNT: settings.STATS_CACHE_LIST_COUNT_TTL_SECONDS,
+    },
+)
@@ -0,0 +1,300 @@
+"""
+Daily revenue / attendance rollups.
+
+`daily_revenue_rollups` (gün × paket × ödeme yöntemi) ve
+`daily_attendance_rollups` (gün × paket) tabloları ham `payments` ve
+`session_check_ins` tablolarını taramadan zaman serisi sunmak için tutulur.
+Gün, zaman damgasının Türkiye saatine göre tarihidir.
+
+Tekil yazma yolları (ödeme, check-in ve silmeleri) satırı aynı transaction
+içinde upsert ile artırır/azaltır. Toplu silme yapan yollar etkilenen günleri
+önceden toplayıp `rebuild_rollup_days` ile yeniden hesaplar. Scheduler son
+günleri periyodik olarak ham tablolardan yeniden kurar (kaçırılmış yazmalara
+karşı). Tam geçmişi migration doldurur; elle yapılan veri düzeltmelerinden
+sonra bkz. backend/scripts/rebuild_stats_rollups.py.
+
+Fonksiyonlar commit yapmaz; çağıran tarafın transaction'ına katılır.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.time_utils import convert_to_turkey_time, get_turkey_time
+from backend.models.operation import Payment, SessionCheckIn, Subscription
+from backend.models.stats import DailyAttendanceRollup, DailyRevenueRollup
+
+logger = logging.getLogger(__name__)
+
+_revenue = DailyRevenueRollup.__table__
+_attendance = DailyAttendanceRollup.__table__
+
+METRICS = ("revenue", "attendance")
+GRANULARITIES = ("day", "week", "month")
+GROUPINGS = {
+    "revenue": ("none", "package", "payment_method"),
+    "attendance": ("none", "package"),
+}
+
+# Raw rows are re-aggregated in windows of this many days
+_REBUILD_WINDOW_DAYS = 31
+
+
+def business_day(moment: datetime) -> date:
+    """Turkey-local calendar date of a stored timestamp (naive = UTC)."""
+    return convert_to_turkey_time(moment).date()
+
+
+def _method_value(payment_method: Any) -> str:
+    return getattr(payment_method, "value", payment_method)
+
+
+async def _upsert_add(db: AsyncSession, table, keys: Dict[str, Any], amounts: Dict[str, Any]) -> None:
+    """INSERT the row or add `amounts` to an existing one."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table).values(**keys, **amounts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in amounts},
+        )
+        await db.execute(stmt)
+        return
+
+    # Generic fallback: UPDATE first, INSERT when the row does not exist yet
+    result = await db.execute(
+        update(table)
+        .where(*[table.c[name] == value for name, value in keys.items()])
+        .values({name: table.c[name] + value for name, value in amounts.items()})
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(table).values(**keys, **amounts))
+
+
+async def record_payment(
+    db: AsyncSession,
+    paid_at: datetime,
+    package_id: str,
+    payment_method: Any,
+    amount: Decimal,
+    count: int = 1,
+) -> None:
+    """Add a payment to its day's revenue rollup (`count=-1` with a negative amount removes it)."""
+    await _upsert_add(
+        db,
+        _revenue,
+        {"day": business_day(paid_at), "package_id": package_id, "payment_method": _method_value(payment_method)},
+        {"amount_total": amount, "payment_count": count},
+    )
+
+
+async def record_check_in(db: AsyncSession, checked_in_at: datetime, package_id: str, delta: int = 1) -> None:
+    """Add (or with `delta=-1` remove) a check-in on its day's attendance rollup."""
+    await _upsert_add(
+        db,
+        _attendance,
+        {"day": business_day(checked_in_at), "package_id": package_id},
+        {"check_in_count": delta},
+    )
+
+
+async def collect_rollup_days(
+    db: AsyncSession,
+    payment_condition=None,
+    check_in_condition=None,
+) -> Set[date]:
+    """Days touched by the payments / check-ins matching the filters.
+
+    Call this before a bulk delete and pass the result to
+    `rebuild_rollup_days` afterwards.
+    """
+    days: Set[date] = set()
+    if payment_condition is not None:
+        result = await db.execute(select(Payment.payment_date).where(payment_condition))
+        days.update(business_day(moment) for moment in result.scalars())
+    if check_in_condition is not None:
+        result = await db.execute(select(SessionCheckIn.check_in_time).where(check_in_condition))
+        days.update(business_day(moment) for moment in result.scalars())
+    return days
+
+
+async def rebuild_rollup_days(db: AsyncSession, days: Iterable[date]) -> None:
+    """Rebuild each contiguous run of the given days from the raw tables."""
+    ordered = sorted(set(days))
+    run_start = None
+    for index, day in enumerate(ordered):
+        if run_start is None:
+            run_start = day
+        is_last = index == len(ordered) - 1
+        if is_last or ordered[index + 1] != day + timedelta(days=1):
+            await rebuild_rollups(db, run_start, day)
+            run_start = None
+
+
+def _raw_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    # One day of slack on both sides; rows are filtered exactly by business_day
+    return (
+        datetime.combine(start - timedelta(days=1), time.min),
+        datetime.combine(end + timedelta(days=2), time.min),
+    )
+
+
+async def rebuild_rollups(db: AsyncSession, start: date, end: date) -> Dict[str, int]:
+    """Replace the rollup rows of [start, end] with aggregates of the raw tables.
+
+    Returns:
+        Number of rollup rows written per table.
+    """
+    written = {"revenue": 0, "attendance": 0}
+    window_start = start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=_REBUILD_WINDOW_DAYS - 1))
+        counts = await _rebuild_window(db, window_start, window_end)
+        written["revenue"] += counts[0]
+        written["attendance"] += counts[1]
+        window_start = window_end + timedelta(days=1)
+    return written
+
+
+async def _rebuild_window(db: AsyncSession, start: date, end: date) -> Tuple[int, int]:
+    lower, upper = _raw_bounds(start, end)
+
+    revenue: Dict[Tuple[date, str, str], List] = defaultdict(lambda: [Decimal("0"), 0])
+    result = await db.execute(
+        select(Payment.payment_date, Payment.payment_method, Payment.amount_paid, Subscription.package_id)
+        .join(Subscription, Payment.subscription_id == Subscription.id)
+        .where(Payment.payment_date >= lower, Payment.payment_date < upper)
+    )
+    for row in result:
+        day = business_day(row.payment_date)
+        if start <= day <= end:
+            bucket = revenue[(day, row.package_id, _method_value(row.payment_method))]
+            bucket[0] += row.amount_paid or 0
+            bucket[1] += 1
+
+    attendance: Dict[Tuple[date, str], int] = defaultdict(int)
+    result = await db.execute(
+        select(SessionCheckIn.check_in_time, Subscription.package_id)
+        .join(Subscription, SessionCheckIn.subscription_id == Subscription.id)
+        .where(SessionCheckIn.check_in_time >= lower, SessionCheckIn.check_in_time < upper)
+    )
+    for row in result:
+        day = business_day(row.check_in_time)
+        if start <= day <= end:
+            attendance[(day, row.package_id)] += 1
+
+    await db.execute(delete(_revenue).where(_revenue.c.day >= start, _revenue.c.day <= end))
+    await db.execute(delete(_attendance).where(_attendance.c.day >= start, _attendance.c.day <= end))
+    if revenue:
+        await db.execute(insert(_revenue), [
+            {"day": day, "package_id": package_id, "payment_method": method, "amount_total": total, "payment_count": n}
+            for (day, package_id, method), (total, n) in revenue.items()
+        ])
+    if attendance:
+        await db.execute(insert(_attendance), [
+            {"day": day, "package_id": package_id, "check_in_count": n}
+            for (day, package_id), n in attendance.items()
+        ])
+    return len(revenue), len(attendance)
+
+
+async def refresh_recent_rollups(db: AsyncSession, days: int = 2) -> Dict[str, int]:
+    """Rebuild the last `days` business days (today included)."""
+    today = get_turkey_time().date()
+    return await rebuild_rollups(db, today - timedelta(days=max(days, 1) - 1), today)
+
+
+async def sum_revenue(db: AsyncSession, start: date, end: Optional[date] = None) -> Decimal:
+    """Total revenue of the business days in [start, end]."""
+    conditions = [_revenue.c.day >= start]
+    if end is not None:
+        conditions.append(_revenue.c.day <= end)
+    result = await db.execute(select(func.coalesce(func.sum(_revenue.c.amount_total), 0)).where(and_(*conditions)))
+    return Decimal(result.scalar() or 0)
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO week, Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class TimeseriesPoint:
+    period_start: date
+    key: Optional[str]
+    value: Decimal
+    count: int
+
+
+async def load_timeseries(
+    db: AsyncSession,
+    metric: str,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    group_by: str = "none",
+) -> List[TimeseriesPoint]:
+    """Bucket the rollups of [start, end] by day/week/month, optionally per key.
+
+    Every series gets a point for every period in range (zeros included), so
+    charts do not have to fill gaps.
+
+    Raises:
+        ValueError: Unknown metric, granularity or grouping for the metric.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'")
+    if group_by not in GROUPINGS[metric]:
+        raise ValueError(f"Metric '{metric}' cannot be grouped by '{group_by}'")
+
+    if metric == "revenue":
+        table, value_col, count_col = _revenue, _revenue.c.amount_total, _revenue.c.payment_count
+    else:
+        table, value_col, count_col = _attendance, _attendance.c.check_in_count, _attendance.c.check_in_count
+
+    columns = [table.c.day]
+    if group_by != "none":
+        columns.append(table.c[group_by if group_by == "payment_method" else "package_id"])
+    result = await db.execute(
+        select(*columns, func.sum(value_col).label("value"), func.sum(count_col).label("count"))
+        .where(table.c.day >= start, table.c.day <= end)
+        .group_by(*columns)
+    )
+
+    buckets: Dict[Optional[str], Dict[date, List]] = defaultdict(dict)
+    for row in result:
+        key = row[1] if group_by != "none" else None
+        bucket = buckets[key].setdefault(period_start(row.day, granularity), [Decimal("0"), 0])
+        bucket[0] += Decimal(row.value or 0)
+        bucket[1] += int(row.count or 0)
+    if not buckets and group_by == "none":
+        buckets[None] = {}
+
+    points: List[TimeseriesPoint] = []
+    for key in sorted(buckets, key=lambda k: (k is not None, k or "")):
+        period = period_start(start, granularity)
+        while period <= end:
+            value, count = buckets[key].get(period, (Decimal("0"), 0))
+            points.append(TimeseriesPoint(period_start=period, key=key, value=value, count=count))
+            period = _next_period(period, granularity)
+    return points
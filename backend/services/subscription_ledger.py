@@ -0,0 +1,111 @@
+"""
+Maintained payment totals on `subscriptions`.
+
+`paid_total` (ödenen toplam) ve `balance` (purchase_price - paid_total, pozitif
+ise borç) her ödeme yazımında aynı transaction içinde `UPDATE ... SET x = x ± d`
+ile güncellenir. Borç istatistikleri böylece `payments` tablosu üzerinde
+`GROUP BY` yapmak yerine `balance > 0` index taramasına iner.
+
+Ödemeleri toplu silen yollar (personel silme vb.) etkilenen abonelikleri
+`refresh_balances` ile ödemelerden yeniden hesaplar. `backfill_balances` ve
+`verify_balances` için bkz. backend/scripts/subscription_balances.py.
+
+Fonksiyonlar commit yapmaz; çağıran tarafın transaction'ına katılır.
+"""
+import logging
+from decimal import Decimal
+from typing import Iterable, List, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.operation import Payment, Subscription
+
+logger = logging.getLogger(__name__)
+
+_subscriptions = Subscription.__table__
+_payments = Payment.__table__
+
+_CHUNK = 500
+
+
+async def apply_payment(db: AsyncSession, subscription_id: str, amount: Decimal) -> None:
+    """Record a payment (positive) or its removal (negative) on the subscription totals."""
+    await db.execute(
+        update(_subscriptions)
+        .where(_subscriptions.c.id == subscription_id)
+        .values(
+            paid_total=_subscriptions.c.paid_total + amount,
+            balance=_subscriptions.c.balance - amount,
+        )
+    )
+
+
+async def subscription_ids_for_payments(db: AsyncSession, condition) -> Set[str]:
+    """Subscriptions owning the payments matched by `condition` (call before a bulk delete)."""
+    result = await db.execute(select(_payments.c.subscription_id).where(condition).distinct())
+    return set(result.scalars().all())
+
+
+def _recomputed_paid():
+    return (
+        select(func.coalesce(func.sum(_payments.c.amount_paid), 0))
+        .where(_payments.c.subscription_id == _subscriptions.c.id)
+        .scalar_subquery()
+    )
+
+
+async def refresh_balances(db: AsyncSession, subscription_ids: Iterable[str]) -> None:
+    """Recompute `paid_total` and `balance` from the payments table."""
+    ids = list(subscription_ids)
+    paid = _recomputed_paid()
+    for start in range(0, len(ids), _CHUNK):
+        await db.execute(
+            update(_subscriptions)
+            .where(_subscriptions.c.id.in_(ids[start:start + _CHUNK]))
+            .values(paid_total=paid, balance=_subscriptions.c.purchase_price - paid)
+        )
+
+
+def _drift_condition():
+    paid = _recomputed_paid()
+    return or_(
+        _subscriptions.c.paid_total != paid,
+        _subscriptions.c.balance != _subscriptions.c.purchase_price - paid,
+    )
+
+
+async def verify_balances(db: AsyncSession) -> List[dict]:
+    """List subscriptions whose stored totals differ from their payments."""
+    paid = _recomputed_paid().label("expected_paid_total")
+    result = await db.execute(
+        select(
+            _subscriptions.c.id,
+            _subscriptions.c.paid_total,
+            _subscriptions.c.balance,
+            paid,
+        ).where(_drift_condition())
+    )
+    return [
+        {
+            "subscription_id": row.id,
+            "paid_total": row.paid_total,
+            "balance": row.balance,
+            "expected_paid_total": row.expected_paid_total,
+        }
+        for row in result
+    ]
+
+
+async def backfill_balances(db: AsyncSession) -> int:
+    """Rebuild the totals of every drifted subscription.
+
+    Returns:
+        Number of subscriptions that were corrected.
+    """
+    drifted = await db.execute(select(_subscriptions.c.id).where(_drift_condition()))
+    ids = drifted.scalars().all()
+    await refresh_balances(db, ids)
+    if ids:
+        logger.warning("Rebuilt payment totals of %d subscriptions", len(ids))
+    return len(ids)
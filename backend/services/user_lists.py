@@ -0,0 +1,124 @@
+"""
+Member and staff list pages: role filter, keyset pagination and totals.
+
+Listeler rol filtresini `DISTINCT`'li bir JOIN yerine `user_roles` üzerinde
+bir alt sorgu (`users.id IN (...)`) ile uygular ve (updated_at, id) sırasıyla
+döner. İmleç verildiğinde sayfa `ix_users_updated_at_id` index'i üzerinden son
+görülen satırdan devam eder; derin sayfalar ilk sayfa kadar ucuzdur. Arama
+sonuçları alaka sırasıyla döndüğü için imleç yalnızca aramasız listede geçerlidir.
+
+Toplam istenirse `list_counts.resolve_total` ile (exact/cached/estimated)
+hesaplanır; aksi halde hiç sayım yapılmaz.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from backend.core.pagination import decode_cursor, encode_cursor, keyset_condition
+from backend.models.user import Role, User, UserRole
+from backend.services.list_counts import resolve_total
+from backend.services.member_search import apply_search, normalize_term
+
+
+@dataclass
+class UserPage:
+    users: List[User]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+    def headers(self) -> Dict[str, str]:
+        """Pagination metadata for list endpoints whose body is a plain array."""
+        headers = {}
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+            if self.total_estimated:
+                headers["X-Total-Estimated"] = "true"
+        return headers
+
+
+def role_filter(role_names: Sequence[str]):
+    """Users holding any of the roles, as an uncorrelated subquery (no JOIN/DISTINCT)."""
+    holders = (
+        select(UserRole.user_id)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(Role.role_name.in_(list(role_names)))
+    )
+    return User.id.in_(holders)
+
+
+def _sort_key(db: AsyncSession, value=None):
+    # SQLite keeps timestamps as text in two formats (server default without
+    # fractions, ORM writes with them); julianday() compares them as instants
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(User.updated_at if value is None else literal(value, User.updated_at.type))
+    return User.updated_at if value is None else value
+
+
+async def list_users_page(
+    db: AsyncSession,
+    role_names: Sequence[str],
+    count_component: str,
+    search: Optional[str] = None,
+    include_inactive: bool = True,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    total_mode: Optional[str] = None,
+) -> UserPage:
+    """One page of users holding `role_names`, newest `updated_at` first.
+
+    Args:
+        count_component: `StatsComponent` the cached total is stored under.
+        search: Relevance-ranked search term (OFFSET pagination only).
+        cursor: `next_cursor` of the previous page; `skip` is then ignored.
+        total_mode: One of `list_counts.TOTAL_MODES`, or None for no total.
+
+    Raises:
+        ValueError: Malformed cursor, cursor combined with search, or an
+            unknown total mode.
+    """
+    filters = [role_filter(role_names)]
+    if not include_inactive:
+        filters.append(User.is_active == True)
+    searching = bool(normalize_term(search))
+    if cursor and searching:
+        raise ValueError("cursor cannot be combined with search")
+
+    total, total_estimated = None, False
+    if total_mode is not None:
+        async def count_users() -> int:
+            matching = apply_search(select(User.id).where(*filters), db, search).order_by(None)
+            return await db.scalar(select(func.count()).select_from(matching.subquery())) or 0
+
+        total, total_estimated = await resolve_total(
+            db,
+            total_mode,
+            count_users,
+            count_component,
+            key=(include_inactive, normalize_term(search) or None),
+            # The role filter always applies: a table-wide estimate would be wrong
+            table_name=None,
+        )
+
+    query = select(User).where(*filters).options(selectinload(User.roles))
+    query = apply_search(query, db, search)
+    if cursor:
+        cursor_value, cursor_id = decode_cursor(cursor)
+        query = query.where(keyset_condition(_sort_key(db), User.id, _sort_key(db, cursor_value), cursor_id))
+    else:
+        query = query.offset(skip)
+    query = query.order_by(_sort_key(db).desc(), User.id.desc()).limit(limit + 1)
+
+    users = list((await db.execute(query)).scalars().all())
+    has_more = len(users) > limit
+    users = users[:limit]
+    next_cursor = None
+    if has_more and not searching:
+        next_cursor = encode_cursor(users[-1].updated_at, users[-1].id)
+    return UserPage(users=users, next_cursor=next_cursor, total=total, total_estimated=total_estimated)
@@ -0,0 +1,199 @@
+"""
+Week calendar for the desktop scheduler (`/api/v1/operations/calendar`).
+
+Takvim ekranı her ders kartı için ayrı `/events/{id}/bookings` çağrısı
+yapıyordu; 80 derslik bir hafta 81 HTTP isteği ve 81 sorgu demekti. Bu modül
+haftayı iki sorguda yükler:
+
+1. Haftanın dersleri, şablon adı ve eğitmen adıyla (JOIN); rezervasyon ve giriş
+   sayıları `class_events` üzerindeki denormalize sayaçlardan gelir.
+2. Bu derslerin ilk `participant_limit` katılımcısı, tek bir
+   `ROW_NUMBER() OVER (PARTITION BY event_id ...)` sorgusuyla.
+
+Tekrarlayan serilerin (`class_series`) henüz materialize edilmemiş oturumları
+üçüncü bir sorguyla açılır (`class_series.expand_range`). 1. sorgu, haftanın
+günlerine ait materialize oturumları (saati başka haftaya taşınmış olsalar da)
+getirdiği için aynı oturum iki kez listelenmez.
+
+Hafta Pazartesi 00:00'da (Türkiye saati) başlar; başlangıcı hafta içinde olan
+dersler döner.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.time_utils import get_turkey_timezone
+from backend.models.operation import Booking, ClassEvent, ClassTemplate
+from backend.models.user import User
+from backend.services.class_series import MaterializedKeys, as_local, expand_range
+
+
+@dataclass(frozen=True)
+class CalendarParticipant:
+    booking_id: Optional[str]  # None for the subscriber of a virtual series occurrence
+    member_user_id: str
+    member_name: str
+    status: str
+
+
+@dataclass
+class CalendarEntry:
+    id: str
+    template_id: str
+    template_name: str
+    instructor_user_id: str
+    instructor_first_name: str
+    instructor_last_name: str
+    start_time: datetime
+    end_time: datetime
+    capacity: int
+    is_cancelled: bool
+    booked_count: int
+    checked_in_count: int
+    participants: List[CalendarParticipant] = field(default_factory=list)
+    series_id: Optional[str] = None
+    occurrence_date: Optional[date] = None
+    is_materialized: bool = True
+
+
+def week_bounds(week_start: date) -> Tuple[date, datetime, datetime]:
+    """Monday of the week containing `week_start` and its [start, end) instants."""
+    monday = week_start - timedelta(days=week_start.weekday())
+    turkey_tz = get_turkey_timezone()
+    start = datetime.combine(monday, time.min, tzinfo=turkey_tz)
+    return monday, start, start + timedelta(days=7)
+
+
+async def _participants(
+    db: AsyncSession, event_ids: List[str], limit: int
+) -> Dict[str, List[CalendarParticipant]]:
+    """First `limit` bookings (by creation) of each event, in one query."""
+    if not event_ids or limit <= 0:
+        return {}
+    ranked = (
+        select(
+            Booking.id,
+            Booking.event_id,
+            Booking.member_user_id,
+            Booking.status,
+            func.row_number()
+            .over(partition_by=Booking.event_id, order_by=(Booking.created_at, Booking.id))
+            .label("position"),
+        )
+        .where(Booking.event_id.in_(event_ids))
+        .subquery()
+    )
+    query = (
+        select(ranked, User.first_name, User.last_name)
+        .join(User, User.id == ranked.c.member_user_id)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.event_id, ranked.c.position)
+    )
+    participants: Dict[str, List[CalendarParticipant]] = {}
+    for row in await db.execute(query):
+        participants.setdefault(row.event_id, []).append(CalendarParticipant(
+            booking_id=row.id,
+            member_user_id=row.member_user_id,
+            member_name=f"{row.first_name} {row.last_name}",
+            status=getattr(row.status, "value", row.status),
+        ))
+    return participants
+
+
+async def load_week(
+    db: AsyncSession,
+    week_start: date,
+    participant_limit: int = 3,
+    instructor_id: Optional[str] = None,
+) -> Tuple[date, List[CalendarEntry]]:
+    """Classes starting in the week of `week_start`, ordered by start time.
+
+    Returns:
+        (monday of the week, entries)
+    """
+    monday, start, end = week_bounds(week_start)
+    in_week = and_(ClassEvent.start_time >= start, ClassEvent.start_time < end)
+    query = (
+        select(
+            ClassEvent.id,
+            ClassEvent.template_id,
+            ClassTemplate.name.label("template_name"),
+            ClassEvent.instructor_user_id,
+            User.first_name,
+            User.last_name,
+            ClassEvent.start_time,
+            ClassEvent.end_time,
+            ClassEvent.capacity,
+            ClassEvent.is_cancelled,
+            ClassEvent.booked_count,
+            ClassEvent.checked_in_count,
+            ClassEvent.series_id,
+            ClassEvent.occurrence_date,
+            in_week.label("in_week"),
+        )
+        .join(ClassTemplate, ClassTemplate.id == ClassEvent.template_id)
+        .join(User, User.id == ClassEvent.instructor_user_id)
+        # Materialized occurrences of this week's days, even when moved out of it
+        .where(or_(in_week, ClassEvent.occurrence_date.between(monday, monday + timedelta(days=6))))
+        .order_by(ClassEvent.start_time, ClassEvent.id)
+    )
+    if instructor_id:
+        query = query.where(ClassEvent.instructor_user_id == instructor_id)
+
+    rows = (await db.execute(query)).all()
+    materialized: MaterializedKeys = {(row.series_id, row.occurrence_date) for row in rows if row.series_id}
+    entries = [
+        CalendarEntry(
+            id=row.id,
+            template_id=row.template_id,
+            template_name=row.template_name,
+            instructor_user_id=row.instructor_user_id,
+            instructor_first_name=row.first_name,
+            instructor_last_name=row.last_name,
+            start_time=row.start_time,
+            end_time=row.end_time,
+            capacity=row.capacity,
+            is_cancelled=row.is_cancelled,
+            booked_count=row.booked_count,
+            checked_in_count=row.checked_in_count,
+            series_id=row.series_id,
+            occurrence_date=row.occurrence_date,
+        )
+        for row in rows
+        if row.in_week
+    ]
+    participants = await _participants(db, [entry.id for entry in entries], participant_limit)
+    for entry in entries:
+        entry.participants = participants.get(entry.id, [])
+
+    for occurrence in await expand_range(db, start, end, instructor_id=instructor_id, materialized=materialized):
+        entries.append(CalendarEntry(
+            id=occurrence.id,
+            template_id=occurrence.template_id,
+            template_name=occurrence.template.name,
+            instructor_user_id=occurrence.instructor_user_id,
+            instructor_first_name=occurrence.instructor_first_name,
+            instructor_last_name=occurrence.instructor_last_name,
+            start_time=occurrence.start_time,
+            end_time=occurrence.end_time,
+            capacity=occurrence.capacity,
+            is_cancelled=occurrence.is_cancelled,
+            booked_count=occurrence.booked_count,
+            checked_in_count=occurrence.checked_in_count,
+            participants=[
+                CalendarParticipant(
+                    booking_id=None,
+                    member_user_id=occurrence.member_user_id,
+                    member_name=occurrence.member_name,
+                    status="confirmed",
+                )
+            ] if occurrence.member_user_id and participant_limit > 0 else [],
+            series_id=occurrence.series_id,
+            occurrence_date=occurrence.occurrence_date,
+            is_materialized=False,
+        ))
+    entries.sort(key=lambda entry: (as_local(entry.start_time), entry.id))
+    return monday, entries
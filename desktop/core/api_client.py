@@ -1,9 +1,25 @@
 import httpx
 import jwt
-from typing import Any, Optional, Dict
+import time
+import uuid
+from typing import Any, Optional, Dict, Tuple
 from datetime import datetime, timedelta
 
 from .config import get_backend_url
+from .event_stream import EventStreamListener
+
+# POSTs the backend replays by Idempotency-Key (backend/services/idempotency.py);
+# only these are retried automatically
+IDEMPOTENT_POST_PATHS = (
+    "/api/v1/sales/payments",
+    "/api/v1/sales/subscriptions-with-events",
+    "/api/v1/operations/bookings",
+    "/api/v1/checkin/check-in",
+    "/api/v1/checkin/batch",
+)
+IDEMPOTENT_RETRY_ATTEMPTS = 3
+IDEMPOTENT_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+_RETRY_STATUSES = {502, 503, 504}
 
 
 class ApiClient:
@@ -106,6 +122,20 @@ class ApiClient:
             print(f"Request failed: {e}")
             raise
 
+    def listen_events(self, on_event, on_status=None) -> EventStreamListener:
+        """Start a background SSE listener on /api/v1/events/stream.
+
+        `on_event(event_type, data)` is called from the listener thread.
+        Call `stop()` on the returned listener when the view goes away.
+        """
+        def _headers() -> Dict[str, str]:
+            self._ensure_token_fresh()
+            return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+        listener = EventStreamListener(self.base_url, _headers, on_event, on_status)
+        listener.start()
+        return listener
+
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         self._ensure_token_fresh()
         try:
@@ -120,14 +150,35 @@ class ApiClient:
             print(f"Request failed: {e}")
             raise
 
+    def get_page(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, httpx.Headers]:
+        """GET a paginated list; also returns the headers (X-Next-Cursor, X-Total-Count)."""
+        self._ensure_token_fresh()
+        try:
+            response = self.client.get(path, params=params)
+            response.raise_for_status()
+            return self._convert_datetime_strings(response.json()), response.headers
+        except httpx.HTTPStatusError as e:
+            print(f"HTTP Error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"Request failed: {e}")
+            raise
+
     def post(self, path: str, json: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
         """
         POST request with optional per-request timeout (seconds).
         If `timeout` is None the client's default timeout is used.
+
+        Sales, payment, booking and check-in POSTs carry an Idempotency-Key and
+        are retried with backoff on timeouts, connection errors and gateway
+        errors; the server replays the first response instead of running the
+        request twice.
         """
         self._ensure_token_fresh()
         try:
-            if timeout is None:
+            if path.split("?", 1)[0].rstrip("/") in IDEMPOTENT_POST_PATHS:
+                response = self._post_idempotent(path, json=json, data=data, timeout=timeout)
+            elif timeout is None:
                 response = self.client.post(path, json=json, data=data)
             else:
                 response = self.client.post(path, json=json, data=data, timeout=timeout)
@@ -141,6 +192,31 @@ class ApiClient:
             print(f"Request failed: {e}")
             raise
 
+    def _post_idempotent(self, path: str, json: Optional[Dict[str, Any]], data: Optional[Dict[str, Any]], timeout: Optional[float]) -> httpx.Response:
+        # One key per logical call, reused by every retry
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        kwargs: Dict[str, Any] = {"json": json, "data": data, "headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        delay = IDEMPOTENT_RETRY_BACKOFF
+        for attempt in range(1, IDEMPOTENT_RETRY_ATTEMPTS + 1):
+            last_attempt = attempt == IDEMPOTENT_RETRY_ATTEMPTS
+            try:
+                response = self.client.post(path, **kwargs)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                print(f"POST {path} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            else:
+                # 409 + Retry-After: the first attempt is still running on the server
+                in_progress = response.status_code == 409 and "retry-after" in response.headers
+                if last_attempt or not (in_progress or response.status_code in _RETRY_STATUSES):
+                    return response
+                print(f"POST {path} returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            delay *= 2
+
     def put(self, path: str, json: Optional[Dict[str, Any]] = None) -> Any:
         self._ensure_token_fresh()
         try:
@@ -0,0 +1,123 @@
+import json
+import threading
+from typing import Callable, Dict, Optional
+
+import httpx
+
+
+class EventStreamListener:
+    """Background reader of the backend's `/api/v1/events/stream` SSE feed.
+
+    Runs in a daemon thread and calls `on_event(event_type, data)` for every
+    event. The callback runs on the listener thread, so Tk widgets must be
+    touched via `widget.after(0, ...)`. Disconnects are retried with
+    exponential backoff; `Last-Event-ID` lets the server replay what was
+    missed in between. `on_status(connected)` reports connection changes.
+    """
+
+    PATH = "/api/v1/events/stream"
+
+    def __init__(
+        self,
+        base_url: str,
+        headers_provider: Callable[[], Dict[str, str]],
+        on_event: Callable[[str, dict], None],
+        on_status: Optional[Callable[[bool], None]] = None,
+        max_backoff: float = 60.0,
+    ):
+        self.base_url = base_url
+        self.headers_provider = headers_provider
+        self.on_event = on_event
+        self.on_status = on_status
+        self.max_backoff = max_backoff
+        self.last_event_id: Optional[str] = None
+        self.connected = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._response: Optional[httpx.Response] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            if self._response is not None:
+                self._response.close()
+        except Exception:
+            pass
+
+    def _set_connected(self, connected: bool):
+        if self.connected == connected:
+            return
+        self.connected = connected
+        if self.on_status:
+            try:
+                self.on_status(connected)
+            except Exception as e:
+                print(f"Event stream status callback failed: {e}")
+
+    def _run(self):
+        backoff = 1.0
+        # No read timeout: the server sends keep-alive comments while idle
+        timeout = httpx.Timeout(10.0, read=None)
+        while not self._stop.is_set():
+            try:
+                headers = dict(self.headers_provider())
+                headers["Accept"] = "text/event-stream"
+                if self.last_event_id:
+                    headers["Last-Event-ID"] = self.last_event_id
+                with httpx.Client(base_url=self.base_url, timeout=timeout) as client:
+                    with client.stream("GET", self.PATH, headers=headers) as response:
+                        self._response = response
+                        response.raise_for_status()
+                        self._set_connected(True)
+                        backoff = 1.0
+                        self._consume(response)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"Event stream disconnected: {e}")
+            finally:
+                self._response = None
+                self._set_connected(False)
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _consume(self, response: httpx.Response):
+        event_type, event_id, data_lines = "message", None, []
+        for line in response.iter_lines():
+            if self._stop.is_set():
+                return
+            if line == "":
+                # Blank line terminates an event
+                if data_lines:
+                    if event_id:
+                        self.last_event_id = event_id
+                    self._dispatch(event_type, "\n".join(data_lines))
+                event_type, event_id, data_lines = "message", None, []
+                continue
+            if line.startswith(":"):
+                continue  # keep-alive comment
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event_type = value
+            elif field == "data":
+                data_lines.append(value)
+            elif field == "id":
+                event_id = value
+
+    def _dispatch(self, event_type: str, raw: str):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = {"raw": raw}
+        try:
+            self.on_event(event_type, data)
+        except Exception as e:
+            print(f"Event stream handler failed for {event_type}: {e}")
@@ -0,0 +1,97 @@
+import json
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import get_app_config_dir
+
+
+QUEUE_FILENAME = "offline_checkins.json"
+BATCH_SIZE = 200
+
+
+class OfflineCheckInQueue:
+    """Local queue of QR scans that could not reach the backend.
+
+    Scans are persisted to a JSON file in the app config directory and
+    replayed through `POST /api/v1/checkin/batch`. Every entry carries a
+    client-generated id, so flushing the same entries twice is harmless:
+    the backend reports them as duplicates.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        # Resolved lazily so importing this module does not touch the filesystem
+        if self._path is None:
+            self._path = get_app_config_dir() / QUEUE_FILENAME
+        return self._path
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, list) else []
+        except Exception:
+            return []
+
+    def _save(self, entries: List[Dict[str, Any]]) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        tmp_path.replace(self.path)
+
+    def enqueue(self, qr_token: str, event_id: Optional[str] = None) -> Dict[str, Any]:
+        entry = {
+            "client_id": str(uuid.uuid4()),
+            "qr_token": qr_token,
+            "event_id": event_id,
+            "scanned_at": datetime.now().astimezone().isoformat(),
+        }
+        with self._lock:
+            entries = self._load()
+            entries.append(entry)
+            self._save(entries)
+        return entry
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def flush(self, api_client) -> Dict[str, int]:
+        """Send queued scans in batches and drop the ones the backend answered.
+
+        Created, duplicate and rejected items are all final and removed from
+        the queue; a network error leaves the remaining entries for the next
+        flush.
+
+        Returns:
+            Counts of created/duplicate/rejected items and entries still pending.
+        """
+        summary = {"created": 0, "duplicates": 0, "rejected": 0, "pending": 0}
+        with self._lock:
+            entries = self._load()
+            while entries:
+                batch = entries[:BATCH_SIZE]
+                try:
+                    response = api_client.post("/api/v1/checkin/batch", json={"items": batch}, timeout=30.0)
+                except Exception as e:
+                    print(f"Offline check-in flush failed: {e}")
+                    break
+                summary["created"] += response.get("created", 0)
+                summary["duplicates"] += response.get("duplicates", 0)
+                summary["rejected"] += response.get("rejected", 0)
+                entries = entries[len(batch):]
+                self._save(entries)
+            summary["pending"] = len(entries)
+        return summary
+
+
+offline_checkin_queue = OfflineCheckInQueue()
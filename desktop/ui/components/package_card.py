@@ -2,6 +2,9 @@ import customtkinter as ctk
 from desktop.core.locale import _
 from desktop.ui.components.date_utils import format_ddmmyyyy
 
+# `fields=` of /sales/subscriptions (summary view) that PackageCard reads
+PACKAGE_CARD_FIELDS = "package_name,access_type,status,start_date,end_date,used_sessions,sessions_granted"
+
 
 class PackageCard(ctk.CTkFrame):
     """Reusable package/subscription card component with callbacks and active state.
@@ -14,6 +17,7 @@ class PackageCard(ctk.CTkFrame):
     - `on_click` will be bound to left-click if provided and `is_active` is True.
     - `on_delete` will add a delete button calling the callback with no args.
     - `schedule_summary` can be passed precomputed to avoid recomputing in the component.
+    - `sub` may be a full subscription or a summary row with `PACKAGE_CARD_FIELDS`.
     """
 
     def __init__(self, parent, sub: dict, is_active: bool = False, on_click=None, on_delete=None, schedule_summary=None, compact: bool = False, *args, **kwargs):
@@ -61,7 +65,7 @@ class PackageCard(ctk.CTkFrame):
             self.configure(cursor="hand2")
             content.configure(cursor="hand2")
 
-        pkg_name = sub.get('package', {}).get('name', 'Bilinmeyen Paket')
+        pkg_name = sub.get('package_name') or sub.get('package', {}).get('name', 'Bilinmeyen Paket')
         pkg_label = ctk.CTkLabel(content, text=_("{}  {}").format(icon, pkg_name),
                                 font=("Roboto", 16, "bold"),
                                 text_color=text_color)
@@ -78,9 +82,9 @@ class PackageCard(ctk.CTkFrame):
         bottom_row.pack(fill="x", pady=(5, 0))
 
         plan = sub.get('package', {}).get('plan', {})
-        access_type = plan.get('access_type', 'SESSION_BASED')
+        access_type = sub.get('access_type') or plan.get('access_type', 'SESSION_BASED')
         used = sub.get('used_sessions', 0)
-        limit = plan.get('sessions_granted', 0)
+        limit = sub['sessions_granted'] if 'sessions_granted' in sub else plan.get('sessions_granted', 0)
 
         # Schedule summary (caller may pass precomputed summary)
         if schedule_summary:
@@ -1,5 +1,7 @@
 import customtkinter as ctk
+import httpx
 from desktop.core.api_client import ApiClient
+from desktop.core.offline_checkin_queue import offline_checkin_queue
 from desktop.core.locale import _
 from desktop.core.ui_utils import safe_grab
 
@@ -78,6 +80,8 @@ class CheckInDialog(ctk.CTkToplevel):
         self.after(100, self.perform_scan)
 
     def perform_scan(self):
+        # Send scans queued during an earlier network outage first
+        self._flush_offline_queue()
         try:
             response = self.api_client.get(f"/api/v1/checkin/scan?qr_token={self.qr_token}")
             if response.get("valid"):
@@ -98,12 +102,45 @@ class CheckInDialog(ctk.CTkToplevel):
                     payload = {"qr_token": self.qr_token, "event_id": event_id}
                     checkin_resp = self.api_client.post("/api/v1/checkin/check-in", json=payload)
                     self.show_success(checkin_resp)
+                except httpx.TransportError:
+                    self._queue_offline(event_id)
                 except Exception as e:
                     self.show_error(str(e))
             else:
                 self.show_error(response.get("message", _("Geçersiz QR")))
+        except httpx.TransportError:
+            # Backend unreachable: keep the scan and replay it via /checkin/batch later
+            self._queue_offline()
         except Exception as e:
             self.show_error(f"{_('Bağlantı Hatası')}: {e}")
+
+    def _flush_offline_queue(self):
+        try:
+            if offline_checkin_queue.pending_count() == 0:
+                return
+            summary = offline_checkin_queue.flush(self.api_client)
+            print(f"Offline check-in queue flushed: {summary}")
+        except Exception as e:
+            print(f"Error flushing offline check-in queue: {e}")
+
+    def _queue_offline(self, event_id=None):
+        try:
+            offline_checkin_queue.enqueue(self.qr_token, event_id)
+        except Exception as e:
+            self.show_error(f"{_('Bağlantı Hatası')}: {e}")
+            return
+        self.label_status.configure(text=_("📥 Çevrimdışı Kaydedildi"), text_color="orange")
+        lbl = ctk.CTkLabel(
+            self.content_frame,
+            text=_("Sunucuya ulaşılamadı.\nGiriş bağlantı gelince gönderilecek."),
+            font=("Roboto", 16),
+        )
+        lbl.pack(pady=20)
+        ctk.CTkButton(self.content_frame, text=_("Kapat"), command=self._on_close, fg_color="gray").pack(pady=20)
+        try:
+            self.after(3000, self._on_close)
+        except Exception:
+            pass
     
     def _on_close(self):
         try:
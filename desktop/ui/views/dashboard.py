@@ -5,11 +5,21 @@ from datetime import datetime
 import tkinter.messagebox as messagebox
 from desktop.ui.components.activity_item import ActivityItem
 
+# Full reload interval; with a live event stream it is only a safety net
+POLL_INTERVAL_MS = 60000
+STREAM_POLL_INTERVAL_MS = 600000
+MAX_ACTIVITIES = 20
+
 class DashboardView(ctk.CTkFrame):
     def __init__(self, master, api_client: ApiClient, navigate_callback=None):
         super().__init__(master)
         self.api_client = api_client
         self.navigate_callback = navigate_callback
+        # Last dashboard payload parts, updated incrementally from the event stream
+        self.schedule = []
+        self.activities = []
+        self.event_listener = None
+        self._reload_pending = False
         
         # Grid Configuration
         self.grid_columnconfigure(0, weight=1)
@@ -75,15 +85,91 @@ class DashboardView(ctk.CTkFrame):
         self.activity_list.pack(fill="both", expand=True, padx=5, pady=5)
 
         self.start_auto_refresh()
+        self.start_event_stream()
+        self.bind("<Destroy>", self._on_destroy, add="+")
 
     def start_auto_refresh(self):
         try:
             if self.winfo_exists():
                 self.load_data()
-                self.after(60000, self.start_auto_refresh)
+                stream_live = self.event_listener is not None and self.event_listener.connected
+                self.after(STREAM_POLL_INTERVAL_MS if stream_live else POLL_INTERVAL_MS, self.start_auto_refresh)
         except Exception:
             pass
 
+    def start_event_stream(self):
+        """Subscribe to backend events so the dashboard updates without polling."""
+        try:
+            self.event_listener = self.api_client.listen_events(
+                lambda event_type, data: self._post_to_ui(self.apply_event, event_type, data),
+                on_status=lambda connected: self._post_to_ui(self._on_stream_status, connected),
+            )
+        except Exception as e:
+            print(f"Event stream could not be started: {e}")
+
+    def _post_to_ui(self, func, *args):
+        # Listener callbacks run on a background thread; Tk must be touched on the main thread
+        try:
+            self.after(0, lambda: func(*args))
+        except Exception:
+            pass
+
+    def _on_stream_status(self, connected):
+        if connected:
+            # Catch up on anything missed while disconnected
+            self.schedule_reload()
+
+    def _on_destroy(self, event):
+        if event.widget is self and self.event_listener:
+            self.event_listener.stop()
+            self.event_listener = None
+
+    def schedule_reload(self, delay_ms=2000):
+        """Coalesce bursts of events that need a full reload into one request."""
+        if self._reload_pending:
+            return
+        self._reload_pending = True
+
+        def _reload():
+            self._reload_pending = False
+            try:
+                if self.winfo_exists():
+                    self.load_data()
+            except Exception:
+                pass
+
+        self.after(delay_ms, _reload)
+
+    def apply_event(self, event_type, data):
+        """Apply a stream event to the dashboard without re-downloading it."""
+        if event_type == "checkin.created":
+            activity = data.get("activity")
+            if activity:
+                self.activities = [activity] + [a for a in self.activities if a.get('id') != activity.get('id')]
+                self.activities = self.activities[:MAX_ACTIVITIES]
+                self.render_activities()
+        elif event_type == "checkin.deleted":
+            activity_id = f"checkin_{data.get('checkin_id')}"
+            self.activities = [a for a in self.activities if a.get('id') != activity_id]
+            self.render_activities()
+        elif event_type in ("booking.created", "booking.cancelled"):
+            booked_count = data.get("booked_count")
+            for item in self.schedule:
+                if item.get('id') == data.get("event_id") and booked_count is not None:
+                    item['booked_count'] = booked_count
+                    item['occupancy'] = self._format_occupancy(booked_count, item.get('capacity'))
+                    self.render_schedule()
+                    break
+        elif event_type.startswith("payment.") or event_type.startswith("subscription."):
+            # Revenue/debt/member totals are aggregates; refetch them once per burst
+            self.schedule_reload()
+
+    @staticmethod
+    def _format_occupancy(count, capacity):
+        if capacity is None:
+            return str(count)
+        return _("Dolu") if count >= capacity else f"{count}/{capacity}"
+
     def navigate(self, view_name):
         if self.navigate_callback:
             self.navigate_callback(view_name)
@@ -131,15 +217,8 @@ class DashboardView(ctk.CTkFrame):
             self.card_revenue.configure(text=f"₺{revenue:,.2f}")
 
             # Update Schedule List
-            for widget in self.schedule_list.winfo_children():
-                widget.destroy()
-
-            schedule = data.get("todays_schedule", [])
-            if not schedule:
-                ctk.CTkLabel(self.schedule_list, text=_("Bugün ders yok."), text_color="gray").pack(pady=10)
-            else:
-                for item in schedule:
-                    self.create_schedule_item(item)
+            self.schedule = data.get("todays_schedule", [])
+            self.render_schedule()
 
             # Update Pending Approvals List
             for widget in self.pending_list.winfo_children():
@@ -157,22 +236,34 @@ class DashboardView(ctk.CTkFrame):
                 ctk.CTkLabel(self.pending_list, text=_("Onay listesi yüklenemedi."), text_color="red").pack(pady=10)
 
             # Update Activity Feed (Only Check-ins)
-            for widget in self.activity_list.winfo_children():
-                widget.destroy()
-
             activities = data.get("recent_activities", [])
-            checkin_activities = [item for item in activities if item['type'] == 'checkin']
-
-            if not checkin_activities:
-                ctk.CTkLabel(self.activity_list, text=_("Henüz hareket yok."), text_color="gray").pack(pady=10)
-            else:
-                for item in checkin_activities:
-                    self.create_activity_item(item)
+            self.activities = [item for item in activities if item['type'] == 'checkin']
+            self.render_activities()
 
         except Exception as e:
             print(f"Error loading dashboard data: {e}")
             self.card_members.configure(text=_("Err"))
 
+    def render_schedule(self):
+        for widget in self.schedule_list.winfo_children():
+            widget.destroy()
+
+        if not self.schedule:
+            ctk.CTkLabel(self.schedule_list, text=_("Bugün ders yok."), text_color="gray").pack(pady=10)
+        else:
+            for item in self.schedule:
+                self.create_schedule_item(item)
+
+    def render_activities(self):
+        for widget in self.activity_list.winfo_children():
+            widget.destroy()
+
+        if not self.activities:
+            ctk.CTkLabel(self.activity_list, text=_("Henüz hareket yok."), text_color="gray").pack(pady=10)
+        else:
+            for item in self.activities:
+                self.create_activity_item(item)
+
     def create_schedule_item(self, item):
         # Modern card design for schedule items — improved layout
         frame = ctk.CTkFrame(self.schedule_list, fg_color=("#2B2B2B", "#1E1E1E"), corner_radius=8, border_width=1, border_color="#404040")
@@ -159,26 +159,32 @@ class DebtPaymentDialog(ctk.CTkToplevel):
     def load_debts(self):
         """Load packages with outstanding debt, sorted by creation date (oldest first)"""
         try:
-            subscriptions = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={self.member['id']}")
+            subscriptions = self.api_client.get(
+                "/api/v1/sales/subscriptions",
+                params={
+                    "member_id": self.member['id'],
+                    "fields": "status,package_name,purchase_price,paid_total,start_date",
+                },
+            )
             
-            # Filter packages with debt and sort by created_at
+            # Filter packages with debt and sort by start date
             for sub in subscriptions:
                 if sub.get('status') == 'cancelled':
                     continue
                 
-                total_price = float(sub.get('purchase_price', 0))
-                paid_amount = sum(float(p.get('amount_paid', 0)) for p in sub.get('payments', []))
+                total_price = float(sub.get('purchase_price') or 0)
+                paid_amount = float(sub.get('paid_total') or 0)
                 debt = total_price - paid_amount
                 
                 if debt > 0:
-                    package_name = sub.get('package', {}).get('name', _('Unknown'))
+                    package_name = sub.get('package_name') or _('Unknown')
                     self.packages_with_debt.append({
                         'id': sub['id'],
                         'service_name': package_name,
                         'total_price': total_price,
                         'paid_amount': paid_amount,
                         'debt': debt,
-                        'created_at': sub.get('created_at', '')
+                        'created_at': sub.get('start_date') or ''
                     })
             
             # Sort by created_at (oldest first)
@@ -6,6 +6,7 @@ from desktop.ui.views.dialogs import AddMemberDialog
 from desktop.ui.components.search_bar import SearchBar
 from tkinter import messagebox
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
 def get_turkey_time():
     """Get current time in Turkey timezone (UTC+3)"""
@@ -37,14 +38,21 @@ class MembersView(ctk.CTkFrame):
 
 
 class MemberListView(ctk.CTkFrame):
+    PAGE_SIZE = 50  # Members per request; further pages follow the server cursor
+
     def __init__(self, master, api_client: ApiClient, on_detail):
         super().__init__(master)
         self.api_client = api_client
         self.on_detail = on_detail
+        self.list_params = {}
+        self.loaded_count = 0
+        self.btn_more = None
         
         # Title
         self.label_title = ctk.CTkLabel(self, text=_("👥 Üye Yönetimi"), font=("Roboto", 28, "bold"))
-        self.label_title.pack(pady=20, padx=20, anchor="w")
+        self.label_title.pack(pady=(20, 0), padx=20, anchor="w")
+        self.label_count = ctk.CTkLabel(self, text="", font=("Roboto", 13), text_color=("gray50", "gray60"))
+        self.label_count.pack(pady=(0, 10), padx=20, anchor="w")
 
         # Top Bar: Search and Add
         self.top_bar = ctk.CTkFrame(self, fg_color="transparent")
@@ -88,27 +96,45 @@ class MemberListView(ctk.CTkFrame):
         self.load_data("")
     
     def load_data(self, search_term: str = ""):
-        """Load members data with optional search"""
+        """Load the first page of members with optional search"""
         # Clear existing
         for widget in self.scroll_frame.winfo_children():
             widget.destroy()
+        self.btn_more = None
+        self.loaded_count = 0
             
-        params = {}
+        self.list_params = {"limit": self.PAGE_SIZE, "total_mode": "cached"}
         if search_term:
-            params["search"] = search_term
+            self.list_params["search"] = search_term
         
         # Include inactive members if checkbox is checked
         if self.show_inactive_only.get():
-            params["include_inactive"] = "true"
+            self.list_params["include_inactive"] = "true"
+
+        self.load_page(search_term)
+
+    def load_page(self, search_term: str = "", cursor: Optional[str] = None):
+        """Append one page; `cursor` continues after the last loaded member"""
+        if self.btn_more is not None:
+            self.btn_more.destroy()
+            self.btn_more = None
+
+        params = dict(self.list_params)
+        if cursor:
+            params["cursor"] = cursor
 
         try:
-            members_list = self.api_client.get("/api/v1/members/", params=params)
+            members_list, headers = self.api_client.get_page("/api/v1/members/", params=params)
             
             # Filter inactive members only if checkbox is checked
             if self.show_inactive_only.get():
                 members_list = [member for member in members_list if not member.get('is_active', True)]
+
+            total = headers.get("X-Total-Count")
+            if total is not None:
+                self.label_count.configure(text=_("Toplam: {count}").format(count=total))
             
-            if not members_list:
+            if not members_list and not cursor:
                 suffix = _(" (pasif üyeler)") if self.show_inactive_only.get() else ""
                 if not search_term:
                     msg = _("📋 Henüz üye kaydı bulunmuyor{suffix}").format(suffix=suffix)
@@ -121,8 +147,16 @@ class MemberListView(ctk.CTkFrame):
                 no_data.pack(pady=50)
                 return
             
-            for idx, member in enumerate(members_list):
-                self.create_member_card(member, idx)
+            for member in members_list:
+                self.create_member_card(member, self.loaded_count)
+                self.loaded_count += 1
+
+            next_cursor = headers.get("X-Next-Cursor")
+            if next_cursor:
+                self.btn_more = ctk.CTkButton(self.scroll_frame, text=_("⬇️ Daha Fazla Yükle"),
+                                              height=36, font=("Roboto", 13, "bold"),
+                                              command=lambda: self.load_page(search_term, next_cursor))
+                self.btn_more.pack(pady=10)
                 
         except Exception as e:
             print(f"Error loading members: {e}")
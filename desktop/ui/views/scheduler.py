@@ -92,14 +92,14 @@ class SchedulerView(ctk.CTkFrame):
             for widget in frame.winfo_children():
                 widget.destroy()
         
-        start_str = self.current_week_start.isoformat()
-        end_date = self.current_week_start + timedelta(days=7)
-        end_str = end_date.isoformat()
-        
         try:
-            events = self.api_client.get("/api/v1/operations/events", params={"start_date": start_str, "end_date": end_str})
+            # One request per week: events with template, instructor and first participants
+            calendar = self.api_client.get(
+                "/api/v1/operations/calendar",
+                params={"week_start": self.current_week_start.date().isoformat(), "participants": 3},
+            )
             
-            for event in events:
+            for event in calendar.get("events", []):
                 self.create_event_card(event)
                 
         except Exception as e:
@@ -161,18 +161,15 @@ class SchedulerView(ctk.CTkFrame):
         for child in card.winfo_children():
             child.bind("<Button-1>", lambda e, ev=event: self.show_event_detail(ev))
 
-        # Participant names
-        try:
-            bookings = self.api_client.get(f"/api/v1/operations/events/{event['id']}/bookings") or []
-            member_names = [b.get("member_name") or b.get("member", {}).get("full_name") for b in bookings]
-            member_names = [name for name in member_names if name]
-            if member_names:
-                preview = ", ".join(member_names[:3])
-                if len(member_names) > 3:
-                    preview += f" (+{len(member_names) - 3})"
-                ctk.CTkLabel(content, text=_("Katılımcılar: {names}").format(names=preview), font=("Roboto", 12, "bold"), text_color="#B37E7E").pack(anchor="w", padx=(20, 0), pady=(4, 0))
-        except Exception:
-            pass
+        # Participant names (embedded in the calendar response)
+        member_names = [p.get("member_name") for p in event.get("participants", [])]
+        member_names = [name for name in member_names if name]
+        if member_names:
+            preview = ", ".join(member_names)
+            remaining = max(event.get("booked_count", 0), len(member_names)) - len(member_names)
+            if remaining > 0:
+                preview += f" (+{remaining})"
+            ctk.CTkLabel(content, text=_("Katılımcılar: {names}").format(names=preview), font=("Roboto", 12, "bold"), text_color="#B37E7E").pack(anchor="w", padx=(20, 0), pady=(4, 0))
 
     def show_event_detail(self, event):
         EventDetailDialog(self, self.api_client, event, self.load_events)
@@ -242,8 +239,10 @@ class EventDetailDialog(ctk.CTkToplevel):
                 ctk.CTkLabel(row, text=b.get("member_name", "Bilinmeyen Üye")).pack(side="left", padx=10)
                 ctk.CTkLabel(row, text=b.get("status", "-")).pack(side="left", padx=10)
                 
-                ctk.CTkButton(row, text=_("Sil"), width=50, fg_color="red", height=24, 
-                            command=lambda bid=b["id"]: self.remove_booking(bid)).pack(side="right", padx=5)
+                # Series subscribers have no booking row until the class is materialized
+                if b.get("id"):
+                    ctk.CTkButton(row, text=_("Sil"), width=50, fg_color="red", height=24, 
+                                command=lambda bid=b["id"]: self.remove_booking(bid)).pack(side="right", padx=5)
                             
         except Exception as e:
             ctk.CTkLabel(self.list_frame, text=_("Hata: {err}").format(err=str(e))).pack()
@@ -254,7 +253,7 @@ class EventDetailDialog(ctk.CTkToplevel):
         
         # 1. Search Member
         try:
-            members = self.api_client.get("/api/v1/members/", params={"search": term})
+            members = self.api_client.get("/api/v1/members/autocomplete", params={"q": term, "limit": 5})
             if not members:
                 messagebox.showwarning(_("Uyarı"), _("Üye bulunamadı."))
                 return
@@ -264,7 +263,7 @@ class EventDetailDialog(ctk.CTkToplevel):
             member = members[0] # TODO: Better selection
             
             # 2. Find Active Subscription
-            subs = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={member['id']}")
+            subs = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={member['id']}&fields=status")
             active_sub = next((s for s in subs if s["status"] == "active"), None)
             
             if not active_sub:
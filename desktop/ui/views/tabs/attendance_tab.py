@@ -2,9 +2,13 @@ import customtkinter as ctk
 from desktop.core.locale import _
 import tkinter.messagebox as messagebox
 from desktop.core.api_client import ApiClient
-from datetime import datetime
+from datetime import datetime, timedelta
 from desktop.ui.components.activity_item import ActivityItem
 
+PAGE_SIZE = 100
+# Overlap for incremental refresh; rows already shown are skipped by id
+SINCE_OVERLAP = timedelta(minutes=5)
+
 class AttendanceTab:
     def __init__(self, parent_frame, api_client: ApiClient, member: dict):
         self.parent = parent_frame
@@ -13,6 +17,10 @@ class AttendanceTab:
         # State for optimized updates
         self.scroll_frame = None
         self.is_setup = False
+        # Cursor-paginated history state
+        self.checkins = []
+        self.next_cursor = None
+        self.last_synced_at = None
         
     def setup(self):
         """Setup attendance tab skeleton (run once)."""
@@ -46,6 +54,11 @@ class AttendanceTab:
         for chk in checkins:
             self.create_activity_item(self.scroll_frame, chk)
 
+        if self.next_cursor:
+            ctk.CTkButton(
+                self.scroll_frame, text=_("Daha Fazla Yükle"), fg_color="gray", command=self.load_more
+            ).pack(pady=10)
+
     def create_activity_item(self, parent, chk):
         """Create modern activity card with reordered layout"""
         """Use the reusable `ActivityItem` component to render an activity card."""
@@ -65,26 +78,71 @@ class AttendanceTab:
             # Show success message
             messagebox.showinfo(_("Başarılı"), _("Katılım kaydı başarıyla silindi."))
             
-            # Refresh the tab
+            # Drop the row locally; incremental refresh only fetches new rows
+            self.checkins = [c for c in self.checkins if c.get('id') != checkin_id]
             self.refresh()
             
         except Exception as e:
             messagebox.showerror(_("Hata"), _("Silme işlemi başarısız: {}").format(str(e)))
 
+    def _fetch_page(self, cursor=None, since=None):
+        params = {"member_id": self.member['id'], "limit": PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        if since:
+            params["since"] = since.isoformat()
+        return self.api_client.get("/api/v1/checkin/history/page", params=params)
+
+    def _show_error(self, e):
+        for w in self.scroll_frame.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.scroll_frame, text=_("Hata: {}" ).format(e), text_color="red").pack(pady=20)
+
     def refresh(self):
-        """Refresh data and update UI without rebuilding skeleton."""
+        """Refresh data and update UI without rebuilding skeleton.
+
+        The first call loads the newest page; later calls only fetch rows
+        checked in since the previous sync and prepend them.
+        """
         # Ensure skeleton exists
         if not self.is_setup:
             self.setup()
 
+        sync_started = datetime.utcnow()
         try:
-            checkins = self.api_client.get(f"/api/v1/checkin/history?member_id={self.member['id']}")
+            if self.last_synced_at is None:
+                page = self._fetch_page()
+                self.checkins = page.get("items", [])
+                self.next_cursor = page.get("next_cursor")
+            else:
+                known_ids = {c.get('id') for c in self.checkins}
+                new_rows = []
+                cursor = None
+                while True:
+                    page = self._fetch_page(cursor=cursor, since=self.last_synced_at - SINCE_OVERLAP)
+                    new_rows.extend(c for c in page.get("items", []) if c.get('id') not in known_ids)
+                    cursor = page.get("next_cursor")
+                    if not cursor:
+                        break
+                self.checkins = new_rows + self.checkins
         except Exception as e:
             # show error inside scroll_frame
-            for w in self.scroll_frame.winfo_children():
-                w.destroy()
-            ctk.CTkLabel(self.scroll_frame, text=_("Hata: {}" ).format(e), text_color="red").pack(pady=20)
+            self._show_error(e)
             return
 
+        self.last_synced_at = sync_started
         # Update list UI
-        self.update_ui(checkins)
+        self.update_ui(self.checkins)
+
+    def load_more(self):
+        """Append the next (older) page using the cursor from the last response."""
+        if not self.next_cursor:
+            return
+        try:
+            page = self._fetch_page(cursor=self.next_cursor)
+        except Exception as e:
+            self._show_error(e)
+            return
+        self.checkins.extend(page.get("items", []))
+        self.next_cursor = page.get("next_cursor")
+        self.update_ui(self.checkins)
@@ -24,6 +24,8 @@ class FinanceTab(ctk.CTkFrame):
         self.page_size = 10
         self.total_pages = 1
         self.total_records = 0
+        # Keyset cursor that starts each visited page (page 1 starts at the newest row)
+        self.page_cursors: dict[int, Optional[str]] = {1: None}
 
         self.setup_ui()
         self.load_data()
@@ -108,6 +110,7 @@ class FinanceTab(ctk.CTkFrame):
     def clear_filter(self):
         self.member_id = None
         self.page = 1
+        self.page_cursors = {1: None}
         self.label_title.configure(text=_("Finansal Geçmiş"))
         self.label_subtitle.configure(text=self._build_subtitle())
         if hasattr(self, "btn_clear_filter"):
@@ -122,7 +125,12 @@ class FinanceTab(ctk.CTkFrame):
         params: dict[str, object] = {
             "page": self.page,
             "size": self.page_size,
+            "total_mode": "cached",
         }
+        # Known cursor: continue from the index instead of OFFSET
+        cursor = self.page_cursors.get(self.page)
+        if cursor:
+            params["cursor"] = cursor
         if self.member_id:
             params["member_id"] = self.member_id
 
@@ -132,6 +140,8 @@ class FinanceTab(ctk.CTkFrame):
             items = data.get("items", [])
             self.total_pages = max(1, data.get("pages", 1))
             self.total_records = data.get("total", 0)
+            if data.get("next_cursor"):
+                self.page_cursors[self.page + 1] = data["next_cursor"]
 
             self.pagination.update_page_info(self.page, self.total_pages)
 
@@ -188,6 +198,8 @@ class FinanceTab(ctk.CTkFrame):
 
         try:
             self.api_client.delete(f"/api/v1/sales/payments/{payment_id}")
+            # Later pages shift by one row; rebuild their cursors as they are visited
+            self.page_cursors = {p: c for p, c in self.page_cursors.items() if p <= self.page}
             self.load_data()
             # Inform the user that deletion succeeded
             messagebox.showinfo(_("Silme Başarılı"), _("Ödeme kaydı başarıyla silindi."))
@@ -5,7 +5,7 @@ from desktop.core.locale import _
 from desktop.core.api_client import ApiClient
 from desktop.ui.components.date_picker import get_weekday_name
 from tkinter import messagebox
-from desktop.ui.components.package_card import PackageCard
+from desktop.ui.components.package_card import PACKAGE_CARD_FIELDS, PackageCard
 
 class PackagesTab:
     def __init__(self, parent_frame, api_client: ApiClient, member: dict, on_refresh_payments):
@@ -103,7 +103,7 @@ class PackagesTab:
         else:
             for sub in active_subs:
                 schedule_summary = None
-                if sub and sub.get('package', {}).get('plan', {}).get('access_type') == 'SESSION_BASED':
+                if sub.get('access_type') == 'SESSION_BASED':
                     schedule_summary = self._format_schedule_summary(sub.get('class_events', []))
                 pc = PackageCard(self.frame_active_list, sub, is_active=True,
                                  on_click=lambda s=sub: self.show_package_detail(s),
@@ -125,6 +125,13 @@ class PackagesTab:
     def show_package_detail(self, subscription: dict):
         """Show detailed package information dialog"""
         from desktop.ui.views.dialogs import PackageDetailDialog
+        if 'payments' not in subscription:
+            # Summary row: the dialog needs payments and the package plan
+            try:
+                subscription = self.api_client.get(f"/api/v1/sales/subscriptions/{subscription['id']}")
+            except Exception as e:
+                messagebox.showerror(_("Hata"), _("Paket detayı yüklenemedi: {}").format(e))
+                return
         PackageDetailDialog(self.parent, self.api_client, subscription, on_refresh=self.refresh)
     
     def delete_subscription(self, sub_id):
@@ -140,7 +147,17 @@ class PackagesTab:
     def refresh(self):
         """Refresh data and update UI without rebuilding the whole layout."""
         try:
-            subs = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={self.member['id']}")
+            # Summary rows for the whole history; only active session packages are
+            # loaded in full, for their schedule line and detail dialog
+            subs = self.api_client.get(
+                "/api/v1/sales/subscriptions",
+                params={"member_id": self.member['id'], "fields": PACKAGE_CARD_FIELDS},
+            )
+            subs = [
+                self.api_client.get(f"/api/v1/sales/subscriptions/{s['id']}")
+                if s.get('status') == 'active' and s.get('access_type') == 'SESSION_BASED' else s
+                for s in subs
+            ]
         except Exception as e:
             # Show error in the main scroll if available
             if self.main_scroll is not None:
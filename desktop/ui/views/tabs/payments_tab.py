@@ -3,6 +3,8 @@ from desktop.core.locale import _
 from desktop.core.api_client import ApiClient
 from tkinter import messagebox
 
+PAGE_SIZE = 100
+
 class PaymentsTab:
     def __init__(self, parent_frame, api_client: ApiClient, member: dict):
         self.parent = parent_frame
@@ -133,16 +135,16 @@ class PaymentsTab:
             self.setup()
 
         try:
-            subs = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={self.member['id']}")
+            # Member's payments newest first, with package names; no subscription
+            # (and class event) payload is loaded
             payments = []
-            for sub in subs:
-                for p in sub.get('payments', []):
-                    p['package_name'] = sub.get('package', {}).get('name', '-')
-                    p['subscription_id'] = sub.get('id')
-                    payments.append(p)
-
-            # Sort by date (newest first)
-            payments.sort(key=lambda x: x.get('payment_date', ''), reverse=True)
+            params = {"member_id": self.member['id'], "size": PAGE_SIZE}
+            while True:
+                page = self.api_client.get("/api/v1/sales/payments", params=params)
+                payments.extend(page.get('items', []))
+                if not page.get('next_cursor'):
+                    break
+                params["cursor"] = page['next_cursor']
 
             # Update UI with prepared payments
             self.update_ui(payments)
@@ -3,7 +3,7 @@ from desktop.core.locale import _
 from desktop.core.api_client import ApiClient
 import tkinter.messagebox as messagebox
 from datetime import datetime
-from desktop.ui.components.package_card import PackageCard
+from desktop.ui.components.package_card import PACKAGE_CARD_FIELDS, PackageCard
 from desktop.ui.components.activity_item import ActivityItem
 
 class ProfileTab:
@@ -76,22 +76,24 @@ class ProfileTab:
         subs = []
         checkins = []
         try:
-            subs = self.api_client.get(f"/api/v1/sales/subscriptions?member_id={self.member['id']}")
+            # Summary rows: no payments or class events, the balance is maintained server-side
+            subs = self.api_client.get(
+                "/api/v1/sales/subscriptions",
+                params={"member_id": self.member['id'], "fields": f"{PACKAGE_CARD_FIELDS},balance"},
+            )
             try:
                 checkins = self.api_client.get(f"/api/v1/checkin/history?member_id={self.member['id']}")
             except Exception as e:
                 print(f"Error loading checkin history: {e}")
                 checkins = []
 
-            # Calculate Total Debt (unchanged logic)
+            # Calculate Total Debt
             total_debt = 0.0
             for s in subs:
                 if s.get('status') == 'cancelled':
                     continue
 
-                price = float(s.get('purchase_price', 0))
-                paid = sum(float(p.get('amount_paid', 0)) for p in s.get('payments', []))
-                remaining = price - paid
+                remaining = float(s.get('balance') or 0)
                 if remaining > 0:
                     total_debt += remaining
 
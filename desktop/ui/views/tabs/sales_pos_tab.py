@@ -157,10 +157,10 @@ class SalesPOSTab(ctk.CTkFrame):
     def _search_members_api(self, term: str):
         """API callback for MemberSelector search"""
         try:
-            params = {}
-            if term:
-                params["search"] = term
-            return self.api_client.get("/api/v1/members/", params=params) or []
+            if not term:
+                return self.api_client.get("/api/v1/members/") or []
+            # Type-ahead: served from the backend's in-memory prefix index
+            return self.api_client.get("/api/v1/members/autocomplete", params={"q": term, "limit": 20}) or []
         except Exception as e:
             messagebox.showerror(_("Hata"), _("Arama hatası: {}").format(e))
             return []
@@ -0,0 +1,202 @@
+"""
+Shared harness for the in-process benchmark suites under tests/benchmarks.
+
+Benchmarks run the FastAPI app through httpx's ASGITransport against a
+dedicated database (a temporary SQLite file by default, or any async URL such
+as a Postgres stand-in), so the numbers include routing, validation, ORM and
+driver overhead but no network. Results are plain dicts written as JSON so two
+runs (before/after a change, SQLite vs Postgres) can be diffed directly.
+
+The benchmarks create and drop the app's tables, so a database that already
+has tables is refused unless `--reset-db` is passed.
+"""
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.database import Base, get_db
+from backend.core.security import create_access_token
+from backend.main import app
+
+
+def default_sqlite_url() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="rhythm-bench-"), "bench.db")
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def make_engine(db_url: Optional[str]) -> AsyncEngine:
+    url = db_url or default_sqlite_url()
+    connect_args = {}
+    if url.startswith("sqlite"):
+        # Concurrent writers wait for the file lock instead of failing fast
+        connect_args = {"timeout": 30}
+    return create_async_engine(url, connect_args=connect_args)
+
+
+class StatementCounter:
+    """Counts SQL statements executed on an engine (all connections)."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def reset(self) -> int:
+        count, self.count = self.count, 0
+        return count
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms: List[float], wall_seconds: float, statements: int, status_counts: Dict[int, int]) -> Dict[str, Any]:
+    ordered = sorted(latencies_ms)
+    requests = len(ordered)
+    return {
+        "requests": requests,
+        "status_counts": {str(code): n for code, n in sorted(status_counts.items())},
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(requests / wall_seconds, 1) if wall_seconds else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 2),
+            "p95": round(percentile(ordered, 95), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+        },
+        "sql_statements_per_request": round(statements / requests, 2) if requests else 0.0,
+    }
+
+
+async def drive(
+    name: str,
+    jobs: List[Callable[[AsyncClient], Awaitable[int]]],
+    client: AsyncClient,
+    counter: StatementCounter,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Run `jobs` (each returns an HTTP status) with bounded concurrency."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    latencies: List[float] = []
+    status_counts: Dict[int, int] = {}
+
+    async def worker():
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            status = await job(client)
+            latencies.append((time.perf_counter() - started) * 1000)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    counter.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+    result = summarize(latencies, wall, counter.reset(), status_counts)
+    result["name"] = name
+    return result
+
+
+@asynccontextmanager
+async def bench_app(engine: AsyncEngine, drop_after: bool = True, reset: bool = False):
+    """Create the schema, point the app's `get_db` at `engine` and yield a client.
+
+    Raises RuntimeError when the database already has tables, unless `reset`
+    allows dropping the app's tables first.
+    """
+    try:
+        async with engine.begin() as conn:
+            existing = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            if existing and not reset:
+                raise RuntimeError(
+                    f"{engine.url.render_as_string(hide_password=True)} already has {len(existing)} table(s) "
+                    f"({', '.join(sorted(existing)[:5])}{', ...' if len(existing) > 5 else ''}); "
+                    "point --db-url at an empty database or pass --reset-db to drop them"
+                )
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    except BaseException:
+        await engine.dispose()
+        raise
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with session_factory() as session:
+            yield session
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = _get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            yield client, session_factory
+    finally:
+        if previous is not None:
+            app.dependency_overrides[get_db] = previous
+        else:
+            app.dependency_overrides.pop(get_db, None)
+        if drop_after:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+INSERT_CHUNK = 1000
+
+
+async def insert_chunked(db: AsyncSession, model, rows: List[Dict[str, Any]]) -> None:
+    """Bulk INSERT `rows` in chunks (keeps statement parameter counts bounded)."""
+    for start in range(0, len(rows), INSERT_CHUNK):
+        await db.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+def auth_headers(user_id: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+def run_metadata(engine: AsyncEngine, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        revision = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "dialect": engine.dialect.name,
+        "python": platform.python_version(),
+        "params": params,
+    }
+
+
+def emit(report: Dict[str, Any], output: Optional[str]) -> None:
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
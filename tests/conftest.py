@@ -1,3 +1,7 @@
+import functools
+from datetime import datetime, timedelta
+from decimal import Decimal
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
@@ -7,11 +11,24 @@ from sqlalchemy.pool import StaticPool
 
 from backend.main import app
 from backend.core.database import Base, get_db
+from backend.core.security import create_access_token
 
 # Import models to ensure they are registered with Base.metadata
-from backend.models.user import User
-from backend.models.service import ServicePackage, ServiceOffering, PlanDefinition
-from backend.models.operation import ClassEvent, Subscription, SubscriptionQrCode
+from backend.models.user import User, Instructor
+from backend.models.service import ServiceCategory, ServicePackage, ServiceOffering, PlanDefinition
+from backend.models.operation import (
+    BookingPermission,
+    ClassEvent,
+    ClassTemplate,
+    Subscription,
+    SubscriptionQrCode,
+    SubscriptionStatus,
+)
+from backend.services.booking_permissions import booking_permission_index
+from backend.services.event_hub import event_hub
+from backend.services.member_autocomplete import member_autocomplete_index
+from backend.services.qr_token_cache import qr_token_cache
+from backend.services.stats_cache import stats_cache
 
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -34,6 +51,13 @@ app.dependency_overrides[get_db] = override_get_db
 
 @pytest_asyncio.fixture(scope="function")
 async def db_session():
+    # Process-local caches must not leak between freshly created databases
+    qr_token_cache.clear()
+    booking_permission_index.clear()
+    member_autocomplete_index.clear()
+    event_hub.clear()
+    stats_cache.clear()
+
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -51,3 +75,64 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
         yield c
+
+
+async def _seed_gym(db_session, sessions_granted: int = 5, capacity: int = 1, members: int = 2):
+    staff = User(email="staff@test.com", first_name="Staff", last_name="User", password_hash="x", is_active=True)
+    category = ServiceCategory(name="Fitness")
+    offering = ServiceOffering(name="Pilates", default_duration_minutes=60)
+    plan = PlanDefinition(name="Pack", access_type="SESSION_BASED", sessions_granted=sessions_granted, cycle_period="monthly")
+    template = ClassTemplate(name="Reformer")
+    db_session.add_all([staff, category, offering, plan, template])
+    await db_session.flush()
+    package = ServicePackage(name="Pilates Pack", category_id=category.id, offering_id=offering.id, plan_id=plan.id, price=Decimal("100"))
+    db_session.add_all([package, Instructor(user_id=staff.id)])
+    await db_session.flush()
+    db_session.add(BookingPermission(package_id=package.id, template_id=template.id))
+    event = ClassEvent(
+        template_id=template.id,
+        instructor_user_id=staff.id,
+        start_time=datetime.now() + timedelta(minutes=10),
+        end_time=datetime.now() + timedelta(minutes=70),
+        capacity=capacity,
+    )
+    db_session.add(event)
+
+    tokens = []
+    for i in range(members):
+        member = User(email=f"m{i}@test.com", first_name=f"Member{i}", last_name="Test", password_hash="x", is_active=True)
+        db_session.add(member)
+        await db_session.flush()
+        subscription = Subscription(
+            member_user_id=member.id,
+            package_id=package.id,
+            purchase_price=Decimal("100"),
+            start_date=datetime.now() - timedelta(days=1),
+            end_date=datetime.now() + timedelta(days=30),
+            status=SubscriptionStatus.active,
+            used_sessions=0,
+        )
+        db_session.add(subscription)
+        await db_session.flush()
+        token = f"TOKEN{i}"
+        db_session.add(SubscriptionQrCode(subscription_id=subscription.id, qr_token=token, is_active=True))
+        tokens.append(token)
+
+    await db_session.flush()
+    ids = {"staff_id": staff.id, "event_id": event.id}
+    await db_session.commit()
+    token = create_access_token({"sub": ids["staff_id"]})
+    headers = {"Authorization": f"Bearer {token}"}
+    return ids, tokens, headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def seed_gym(db_session):
+    """Seed a staff user, one class event and members with active subscriptions.
+
+    Returns an async factory `seed_gym(sessions_granted=5, capacity=1, members=2)`
+    giving `(ids, tokens, headers)`: `ids` holds `staff_id` and `event_id`,
+    `tokens` the members' QR tokens (TOKEN0, TOKEN1, ...) and `headers` the
+    staff user's bearer token.
+    """
+    return functools.partial(_seed_gym, db_session)
@@ -0,0 +1,128 @@
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+from sqlalchemy import exists, false, func, select
+
+from backend.models.operation import ClassEvent, SessionCheckIn, Subscription
+from backend.services import checkin_service
+from backend.services.checkin_service import revert_check_in
+
+
+@pytest.mark.asyncio
+async def test_checkin_capacity_guard_rejects_overflow(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=1, members=2)
+
+    first = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers)
+    second = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[1], "event_id": ids["event_id"]}, headers=headers)
+
+    assert first.status_code == 200
+    assert first.json()["remaining_sessions"] == 4
+    assert second.status_code == 400
+    assert "capacity" in second.json()["detail"].lower()
+
+    # The rejected check-in must not consume a session
+    result = await db_session.execute(select(Subscription.used_sessions).order_by(Subscription.used_sessions))
+    assert result.scalars().all() == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_delete_checkin_restores_session(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(sessions_granted=1, capacity=5, members=1)
+
+    resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0]}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["remaining_sessions"] == 0
+
+    exhausted = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0]}, headers=headers)
+    assert exhausted.status_code == 400
+    assert "no sessions remaining" in exhausted.json()["detail"].lower()
+
+    checkin_id = (await db_session.execute(select(SessionCheckIn.id))).scalar_one()
+    delete_resp = await client.delete(f"/api/v1/checkin/history/{checkin_id}", headers=headers)
+    assert delete_resp.status_code == 204
+
+    used = (await db_session.execute(select(Subscription.used_sessions))).scalar_one()
+    assert used == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_revert_gives_back_counters_once(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(sessions_granted=5, capacity=5, members=1)
+    for event_id in (ids["event_id"], None):
+        resp = await client.post(
+            "/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": event_id}, headers=headers
+        )
+        assert resp.status_code == 200
+
+    checkin_id = (await db_session.execute(
+        select(SessionCheckIn.id).where(SessionCheckIn.event_id == ids["event_id"])
+    )).scalar_one()
+    # The second revert finds no row to delete and must not decrement again
+    assert await revert_check_in(db_session, checkin_id) is True
+    assert await revert_check_in(db_session, checkin_id) is False
+    await db_session.commit()
+
+    assert (await db_session.execute(select(Subscription.used_sessions))).scalar_one() == 1
+    checked_in = (await db_session.execute(
+        select(ClassEvent.checked_in_count).where(ClassEvent.id == ids["event_id"])
+    )).scalar_one()
+    assert checked_in == 0
+    missing = await client.delete(f"/api/v1/checkin/history/{checkin_id}", headers=headers)
+    assert missing.status_code == 404
+
+class _GuardPasses:
+    """`exists()` stand-in whose duplicate guard never matches, as when two scans read concurrently."""
+
+    def where(self, *conditions):
+        return exists().where(*conditions, false())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_check_in_is_rejected_by_unique_index(
+    client: AsyncClient, db_session, seed_gym, monkeypatch
+):
+    ids, tokens, headers = await seed_gym(sessions_granted=5, capacity=5, members=1)
+    scan = {"qr_token": tokens[0], "event_id": ids["event_id"]}
+    assert (await client.post("/api/v1/checkin/check-in", json=scan, headers=headers)).status_code == 200
+
+    monkeypatch.setattr(checkin_service, "exists", _GuardPasses)
+    second = await client.post("/api/v1/checkin/check-in", json=scan, headers=headers)
+    assert second.status_code == 400
+    assert "already checked in" in second.json()["detail"].lower()
+    # Entries without a class are not affected by the index
+    assert (await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0]}, headers=headers)).status_code == 200
+    assert (await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0]}, headers=headers)).status_code == 200
+
+    assert (await db_session.execute(select(Subscription.used_sessions))).scalar_one() == 3
+    assert (await db_session.execute(
+        select(func.count()).select_from(SessionCheckIn).where(SessionCheckIn.event_id == ids["event_id"])
+    )).scalar_one() == 1
+
+@pytest.mark.asyncio
+async def test_batch_checkin_is_idempotent(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=2)
+    scanned_at = (datetime.now() - timedelta(minutes=5)).isoformat()
+    payload = {
+        "items": [
+            {"client_id": "c-1", "qr_token": tokens[0], "scanned_at": scanned_at},
+            {"client_id": "c-2", "qr_token": "UNKNOWN"},
+            {"client_id": "c-1", "qr_token": tokens[0]},
+            {"client_id": "c-3", "qr_token": tokens[1], "event_id": ids["event_id"]},
+        ]
+    }
+
+    resp = await client.post("/api/v1/checkin/batch", json=payload, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["created", "rejected", "duplicate", "created"]
+    assert body["results"][1]["status_code"] == 404
+    assert (body["created"], body["duplicates"], body["rejected"]) == (2, 1, 1)
+
+    # Replaying the same queue must not create check-ins or consume sessions again
+    replay = await client.post("/api/v1/checkin/batch", json=payload, headers=headers)
+    assert [r["status"] for r in replay.json()["results"]] == ["duplicate", "rejected", "duplicate", "duplicate"]
+
+    count = (await db_session.execute(select(func.count(SessionCheckIn.id)))).scalar_one()
+    assert count == 2
+    used = (await db_session.execute(select(Subscription.used_sessions))).scalars().all()
+    assert used == [1, 1]
@@ -0,0 +1,49 @@
+import pytest
+
+from backend.models.service import ServiceCategory, ServiceOffering, PlanDefinition, ServicePackage
+from backend.models.operation import BookingPermission, ClassTemplate
+from backend.services.booking_permissions import BookingPermissionIndex, booking_permission_index
+
+
+async def _package_and_template(db_session):
+    category = ServiceCategory(name="Fitness")
+    offering = ServiceOffering(name="Yoga", default_duration_minutes=60)
+    plan = PlanDefinition(name="Monthly", cycle_period="monthly")
+    template = ClassTemplate(name="Morning Yoga")
+    db_session.add_all([category, offering, plan, template])
+    await db_session.flush()
+    package = ServicePackage(name="Yoga Monthly", category_id=category.id, offering_id=offering.id, plan_id=plan.id, price=100)
+    db_session.add(package)
+    await db_session.flush()
+    return package.id, template.id
+
+
+@pytest.mark.asyncio
+async def test_permission_index_invalidated_on_commit(db_session):
+    package_id, template_id = await _package_and_template(db_session)
+    await db_session.commit()
+
+    assert await booking_permission_index.is_allowed(db_session, package_id, template_id) is False
+
+    db_session.add(BookingPermission(package_id=package_id, template_id=template_id))
+    await db_session.commit()
+
+    assert booking_permission_index.is_fresh is False
+    assert await booking_permission_index.is_allowed(db_session, package_id, template_id) is True
+    assert booking_permission_index.templates_for_package(package_id) == {template_id}
+
+
+@pytest.mark.asyncio
+async def test_permission_index_reloads_after_ttl(db_session):
+    now = [0.0]
+    index = BookingPermissionIndex(ttl_seconds=60, clock=lambda: now[0])
+    package_id, template_id = await _package_and_template(db_session)
+    await db_session.commit()
+
+    await index.ensure_loaded(db_session)
+    await index.ensure_loaded(db_session)
+    assert index.reloads == 1
+
+    now[0] = 61.0
+    await index.ensure_loaded(db_session)
+    assert index.reloads == 2
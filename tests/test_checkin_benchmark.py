@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from tests.benchmarks.bench_checkin import run
+
+
+@pytest.mark.asyncio
+async def test_checkin_benchmark_smoke():
+    """Tiny run so the benchmark suite keeps working as the code evolves."""
+    report = await run(members=40, events=8, requests=20, concurrency=4)
+
+    for phase in ("scan", "check_in"):
+        result = report["results"][phase]
+        assert result["requests"] == 20
+        assert result["status_counts"] == {"200": 20}
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+        assert result["sql_statements_per_request"] > 0
+    assert report["meta"]["dialect"] == "sqlite"
+
+
+@pytest.mark.asyncio
+async def test_checkin_benchmark_refuses_a_database_with_tables(tmp_path):
+    path = tmp_path / "existing.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO users (id) VALUES (1)"))
+    db_url = f"sqlite+aiosqlite:///{path}"
+
+    with pytest.raises(RuntimeError, match="--reset-db"):
+        await run(db_url=db_url, members=4, events=2, requests=2, concurrency=1)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM users")).scalar_one() == 1
+
+    # Explicitly allowed: replaces the tables and drops them afterwards
+    report = await run(db_url=db_url, members=4, events=2, requests=2, concurrency=1, reset_db=True)
+    assert report["results"]["scan"]["status_counts"] == {"200": 2}
+    assert inspect(engine).get_table_names() == []
+    engine.dispose()
@@ -0,0 +1,64 @@
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+from sqlalchemy import select
+
+from backend.models.operation import SessionCheckIn, Subscription
+
+
+async def _add_checkins(db_session, staff_id, times):
+    sub = (await db_session.execute(select(Subscription).limit(1))).scalar_one()
+    for t in times:
+        db_session.add(SessionCheckIn(
+            subscription_id=sub.id,
+            member_user_id=sub.member_user_id,
+            verified_by_user_id=staff_id,
+            check_in_time=t,
+        ))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_history_cursor_walks_all_rows_once(client: AsyncClient, db_session, seed_gym):
+    ids, _, headers = await seed_gym(members=1)
+    base = datetime(2026, 1, 1, 10, 0, 0)
+    # Duplicate timestamps exercise the id tie-breaker
+    times = [base + timedelta(minutes=i // 2) for i in range(7)]
+    await _add_checkins(db_session, ids["staff_id"], times)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = await client.get("/api/v1/checkin/history/page", params=params, headers=headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        seen.extend(item["id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 7
+    legacy = await client.get("/api/v1/checkin/history", headers=headers)
+    assert [item["id"] for item in legacy.json()] == seen
+
+
+@pytest.mark.asyncio
+async def test_history_since_and_invalid_cursor(client: AsyncClient, db_session, seed_gym):
+    ids, _, headers = await seed_gym(members=1)
+    base = datetime(2026, 1, 1, 10, 0, 0)
+    await _add_checkins(db_session, ids["staff_id"], [base, base + timedelta(hours=1), base + timedelta(hours=2)])
+
+    resp = await client.get(
+        "/api/v1/checkin/history/page",
+        params={"since": (base + timedelta(minutes=30)).isoformat()},
+        headers=headers,
+    )
+    assert len(resp.json()["items"]) == 2
+    assert resp.json()["next_cursor"] is None
+
+    bad = await client.get("/api/v1/checkin/history/page", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert bad.status_code == 400
@@ -0,0 +1,233 @@
+import pytest
+from datetime import date, datetime, time, timedelta
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from backend.models.operation import (
+    Booking,
+    ClassEvent,
+    ClassSeries,
+    SessionCheckIn,
+    Subscription,
+    SubscriptionQrCode,
+)
+from backend.models.user import Role, User
+from backend.services.class_series import (
+    fold_events_into_series,
+    occurrence_dates,
+    occurrence_id,
+    parse_occurrence_id,
+)
+from tests.benchmarks.bench_calendar_range import run
+
+
+async def _count(db_session, model, *conditions):
+    return (await db_session.execute(select(func.count()).select_from(model).where(*conditions))).scalar_one()
+
+
+async def _template_id(db_session, event_id):
+    return (await db_session.execute(select(ClassEvent.template_id).where(ClassEvent.id == event_id))).scalar_one()
+
+
+def test_weekly_pattern_expansion():
+    series = ClassSeries(
+        id="s1", weekdays="MO,TH", interval_weeks=2, start_time=time(9),
+        starts_on=date(2026, 3, 4), ends_on=date(2026, 4, 2),
+    )
+    # Starts on a Wednesday; every other week from the series' first week
+    assert list(occurrence_dates(series, date(2026, 3, 1), date(2026, 4, 30))) == [
+        date(2026, 3, 5), date(2026, 3, 16), date(2026, 3, 19), date(2026, 3, 30), date(2026, 4, 2),
+    ]
+    assert list(occurrence_dates(series, date(2026, 3, 9), date(2026, 3, 15))) == []
+    assert parse_occurrence_id(occurrence_id("s1", date(2026, 3, 5))) == ("s1", date(2026, 3, 5))
+    assert parse_occurrence_id("3f0c8d0e-plain-event-id") is None
+
+
+@pytest.mark.asyncio
+async def test_series_expands_lazily_and_materializes_on_booking(client: AsyncClient, db_session, seed_gym):
+    ids, _, _ = await seed_gym(capacity=10, members=2)
+    template_id = await _template_id(db_session, ids["event_id"])
+    (member_id, subscription_id), (other_id, other_subscription_id) = (await db_session.execute(
+        select(User.id, Subscription.id).join(Subscription, Subscription.member_user_id == User.id).order_by(User.email)
+    )).all()
+    events_before = await _count(db_session, ClassEvent)
+
+    response = await client.post("/api/v1/operations/series", json={
+        "template_id": template_id, "instructor_user_id": ids["staff_id"], "weekdays": "we,mo",
+        "start_time": "09:00", "starts_on": "2026-03-02", "ends_on": "2026-03-29", "capacity": 6,
+    })
+    assert response.status_code == 200, response.text
+    series = response.json()
+    assert series["rrule"] == "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,WE;UNTIL=20260329"
+    bad = await client.post("/api/v1/operations/series", json={**series, "weekdays": "XX"})
+    assert bad.status_code == 400
+
+    # Cancel Wednesday 4th, move Monday 9th to Tuesday 10th 10:00
+    for exception in (
+        {"occurrence_date": "2026-03-04"},
+        {"occurrence_date": "2026-03-09", "is_cancelled": False,
+         "start_time": "2026-03-10T10:00:00+03:00", "end_time": "2026-03-10T11:00:00+03:00"},
+    ):
+        response = await client.post(f"/api/v1/operations/series/{series['id']}/exceptions", json=exception)
+        assert response.status_code == 200, response.text
+    not_an_occurrence = await client.post(
+        f"/api/v1/operations/series/{series['id']}/exceptions", json={"occurrence_date": "2026-03-05"}
+    )
+    assert not_an_occurrence.status_code == 400
+
+    response = await client.get("/api/v1/operations/events", params={
+        "start_date": "2026-03-02T00:00:00+03:00", "end_date": "2026-03-16T00:00:00+03:00",
+    })
+    listed = response.json()
+    assert [(e["start_time"][:16], e["is_cancelled"]) for e in listed] == [
+        ("2026-03-02T09:00", False), ("2026-03-04T09:00", True), ("2026-03-10T10:00", False), ("2026-03-11T09:00", False),
+    ]
+    assert all(not e["is_materialized"] and e["template"]["name"] == "Reformer" for e in listed)
+    assert await _count(db_session, ClassEvent) == events_before
+
+    week = (await client.get("/api/v1/operations/calendar", params={"week_start": "2026-03-09"})).json()
+    moved_id = occurrence_id(series["id"], date(2026, 3, 9))
+    assert [e["id"] for e in week["events"]] == [moved_id, occurrence_id(series["id"], date(2026, 3, 11))]
+    assert (await client.get(f"/api/v1/operations/events/{moved_id}")).json()["start_time"].startswith("2026-03-10T10:00")
+
+    # Bookings materialize the occurrence once, with the rescheduled time
+    for member, subscription in ((member_id, subscription_id), (other_id, other_subscription_id)):
+        response = await client.post("/api/v1/operations/bookings", json={
+            "member_user_id": member, "event_id": moved_id, "subscription_id": subscription,
+        })
+        assert response.status_code == 200, response.text
+    event = (await db_session.execute(
+        select(ClassEvent.id, ClassEvent.start_time, ClassEvent.booked_count).where(ClassEvent.series_id == series["id"])
+    )).one()
+    assert event.start_time.replace(tzinfo=None) == datetime(2026, 3, 10, 10) and event.booked_count == 2
+    duplicate = await client.post("/api/v1/operations/bookings", json={
+        "member_user_id": member_id, "event_id": moved_id, "subscription_id": subscription_id,
+    })
+    assert duplicate.status_code == 400
+    assert len((await client.get(f"/api/v1/operations/events/{moved_id}/bookings")).json()) == 2
+
+    week = (await client.get("/api/v1/operations/calendar", params={"week_start": "2026-03-09"})).json()
+    assert [(e["id"], e["booked_count"], e["is_materialized"]) for e in week["events"]] == [
+        (event.id, 2, True), (occurrence_id(series["id"], date(2026, 3, 11)), 0, False),
+    ]
+
+    # Cancelling a virtual occurrence stores an exception, not a row
+    cancelled = await client.delete(f"/api/v1/operations/events/{occurrence_id(series['id'], date(2026, 3, 11))}")
+    assert cancelled.json()["is_cancelled"] is True
+    assert await _count(db_session, ClassEvent) == events_before + 1
+
+
+@pytest.mark.asyncio
+async def test_sold_series_materializes_on_check_in(client: AsyncClient, db_session, seed_gym):
+    ids, _, headers = await seed_gym(capacity=5, members=1)
+    staff = (await db_session.execute(
+        select(User).where(User.id == ids["staff_id"]).options(selectinload(User.roles))
+    )).scalar_one()
+    staff.roles.append(Role(role_name="INSTRUCTOR"))
+    await db_session.commit()
+    ((member_id, subscription_id, package_id),) = (await db_session.execute(
+        select(User.id, Subscription.id, Subscription.package_id).join(Subscription, Subscription.member_user_id == User.id)
+    )).all()
+    today = date.today()
+    response = await client.post("/api/v1/sales/subscriptions-with-events", json={
+        "member_user_id": member_id,
+        "package_id": package_id,
+        "start_date": str(today),
+        "class_events": {
+            "days_and_times": [{"day": today.strftime("%A").lower(), "time": "23:00"}],
+            "instructor_user_id": ids["staff_id"],
+            "repeat_weeks": 3,
+            "capacity": 1,
+        },
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    sold = response.json()
+    first = sold["class_events"][0]
+    assert len(sold["class_events"]) == 3 and first["booked_count"] == 1
+
+    # The subscriber is listed on the virtual occurrence without a booking row
+    bookings = (await client.get(f"/api/v1/operations/events/{first['id']}/bookings")).json()
+    assert [(b["id"], b["member_name"]) for b in bookings] == [(None, "Member0 Test")]
+
+    # The sold subscription's QR code checks into the occurrence
+    listed = (await client.get(f"/api/v1/sales/subscriptions/{sold['id']}")).json()
+    assert [e["id"] for e in listed["class_events"]] == [e["id"] for e in sold["class_events"]]
+    qr_token = (await db_session.execute(
+        select(SubscriptionQrCode.qr_token).where(SubscriptionQrCode.subscription_id == sold["id"])
+    )).scalar_one()
+    response = await client.post(
+        "/api/v1/checkin/check-in", json={"qr_token": qr_token, "event_id": first["id"]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    event = (await db_session.execute(
+        select(ClassEvent.id, ClassEvent.booked_count, ClassEvent.checked_in_count)
+        .where(ClassEvent.subscription_id == sold["id"])
+    )).one()
+    assert (event.booked_count, event.checked_in_count) == (1, 1)
+    assert await _count(db_session, Booking, Booking.event_id == event.id, Booking.member_user_id == member_id) == 1
+    assert await _count(db_session, SessionCheckIn, SessionCheckIn.event_id == event.id) == 1
+    # Only the attended occurrence became a row
+    sold = (await client.get(f"/api/v1/sales/subscriptions/{sold['id']}")).json()
+    assert [e["is_materialized"] for e in sold["class_events"]] == [True, False, False]
+    assert sold["class_events"][0]["id"] == event.id
+
+
+@pytest.mark.asyncio
+async def test_fold_existing_weekly_events(client: AsyncClient, db_session, seed_gym):
+    ids, _, _ = await seed_gym(capacity=5, members=1)
+    template_id = await _template_id(db_session, ids["event_id"])
+    ((member_id, subscription_id),) = (await db_session.execute(
+        select(User.id, Subscription.id).join(Subscription, Subscription.member_user_id == User.id)
+    )).all()
+    now = datetime(2026, 3, 18, 12)
+    events = []
+    # Six Wednesdays 09:00 from March 4th, one week (March 25th) missing
+    for week in (0, 1, 2, 4, 5, 6):
+        start = datetime(2026, 3, 4, 9) + timedelta(weeks=week)
+        event = ClassEvent(
+            subscription_id=subscription_id, template_id=template_id, instructor_user_id=ids["staff_id"],
+            start_time=start, end_time=start + timedelta(hours=1), capacity=1, booked_count=1,
+        )
+        events.append(event)
+    db_session.add_all(events)
+    await db_session.flush()
+    for event in events:
+        db_session.add(Booking(member_user_id=member_id, event_id=event.id, subscription_id=subscription_id))
+    # The April 8th occurrence already has a check-in
+    db_session.add(SessionCheckIn(
+        subscription_id=subscription_id, member_user_id=member_id, event_id=events[4].id,
+        verified_by_user_id=ids["staff_id"],
+    ))
+    await db_session.commit()
+
+    result = await fold_events_into_series(db_session, now=now)
+    await db_session.commit()
+    # The seeded one-off staff class repeats fewer than 4 times and stays as is
+    assert (result.series, result.exceptions, result.linked_events, result.removed_events) == (1, 1, 4, 2)
+
+    linked = (await db_session.execute(
+        select(ClassEvent.occurrence_date).where(ClassEvent.series_id.is_not(None)).order_by(ClassEvent.occurrence_date)
+    )).scalars().all()
+    assert linked == [date(2026, 3, 4), date(2026, 3, 11), date(2026, 3, 18), date(2026, 4, 8)]
+    assert await _count(db_session, Booking, Booking.subscription_id == subscription_id) == 4
+
+    sold = (await client.get(f"/api/v1/sales/subscriptions/{subscription_id}")).json()
+    assert [(e["start_time"][:10], e["is_materialized"], e["is_cancelled"]) for e in sold["class_events"]] == [
+        ("2026-03-04", True, False), ("2026-03-11", True, False), ("2026-03-18", True, False),
+        ("2026-03-25", False, True), ("2026-04-01", False, False), ("2026-04-08", True, False),
+        ("2026-04-15", False, False),
+    ]
+    # Re-running finds nothing left to fold
+    assert (await fold_events_into_series(db_session, now=now)).series == 0
+
+
+@pytest.mark.asyncio
+async def test_calendar_range_benchmark_smoke():
+    report = await run(subscriptions=3, weeks=4, repeats=1)
+
+    assert report["data"]["rows"] == {"class_events": 24, "bookings": 24}
+    assert report["data"]["series"] == {"class_series": 3, "class_series_exceptions": 6}
+    for phase in ("rows_calendar", "rows_events_month", "series_calendar", "series_events_month"):
+        assert report["results"][phase]["status_counts"] == {"200": 3}
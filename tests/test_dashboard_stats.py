@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from backend.services.dashboard_stats import StatsUnit, run_units
+from backend.services.stats_cache import StatsCache, StatsComponent
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_units_run_concurrently_on_their_own_sessions():
+    opened = []
+
+    def session_factory():
+        session = _Session()
+        opened.append(session)
+        return session
+
+    def unit(name, delay):
+        async def compute(db):
+            await asyncio.sleep(delay)
+            return id(db)
+        return StatsUnit(name, compute)
+
+    units = [unit("a", 0.05), unit("b", 0.05), unit("c", 0.05)]
+    started = time.perf_counter()
+    lookups = await run_units(units, session_factory, StatsCache())
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.12  # slowest unit, not the sum
+    assert len({lookup.value for lookup in lookups.values()}) == 3 == len(opened)
+    assert all(lookup.compute_ms >= 40 for lookup in lookups.values())
+
+    # Cached units open no session
+    cache = StatsCache()
+    await run_units(units, session_factory, cache)
+    opened.clear()
+    cached = await run_units(units, session_factory, cache)
+    assert opened == [] and all(l.compute_ms is None for l in cached.values())
+
+
+@pytest.mark.asyncio
+async def test_dashboard_reports_unit_timings(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=2)
+    resp = await client.get("/api/v1/stats/dashboard", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["todays_classes"] == len(body["todays_schedule"])
+    assert body["pending_payments_amount"] == 200.0
+    assert set(body["cache"]) == {
+        StatsComponent.MEMBERS, StatsComponent.SCHEDULE, StatsComponent.DEBT,
+        StatsComponent.REVENUE, StatsComponent.ACTIVITY,
+    }
+    assert all(info["compute_ms"] is not None for info in body["cache"].values())
+    assert "debt;dur=" in resp.headers["server-timing"]
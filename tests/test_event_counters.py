@@ -0,0 +1,55 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.models.operation import ClassEvent, SessionCheckIn, Subscription
+from backend.services.event_counters import reconcile_event_counters
+
+
+async def _counters(db_session, event_id):
+    db_session.expire_all()
+    row = (await db_session.execute(
+        select(ClassEvent.booked_count, ClassEvent.checked_in_count).where(ClassEvent.id == event_id)
+    )).one()
+    return row.booked_count, row.checked_in_count
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_booking_and_checkin_paths(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=1)
+    subscription_id = (await db_session.execute(select(Subscription.id))).scalar_one()
+    member_id = (await db_session.execute(select(Subscription.member_user_id))).scalar_one()
+
+    booking = await client.post("/api/v1/operations/bookings", json={
+        "member_user_id": member_id, "event_id": ids["event_id"], "subscription_id": subscription_id,
+    }, headers=headers)
+    assert booking.status_code == 200
+    checkin = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers)
+    assert checkin.status_code == 200
+    assert await _counters(db_session, ids["event_id"]) == (1, 1)
+
+    checkin_id = (await db_session.execute(select(SessionCheckIn.id))).scalar_one()
+    await client.delete(f"/api/v1/checkin/history/{checkin_id}", headers=headers)
+    await client.delete(f"/api/v1/operations/bookings/{booking.json()['id']}", headers=headers)
+    assert await _counters(db_session, ids["event_id"]) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_subscription_delete_refreshes_counters_and_reconcile(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=2)
+    for token in tokens:
+        resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": token, "event_id": ids["event_id"]}, headers=headers)
+        assert resp.status_code == 200
+    assert await _counters(db_session, ids["event_id"]) == (0, 2)
+
+    subscription_id = (await db_session.execute(select(Subscription.id).limit(1))).scalar_one()
+    resp = await client.delete(f"/api/v1/sales/subscriptions/{subscription_id}", headers=headers)
+    assert resp.status_code == 204
+    assert await _counters(db_session, ids["event_id"]) == (0, 1)
+
+    # Simulate drift and rebuild from the child tables
+    await db_session.execute(update(ClassEvent).values(booked_count=7, checked_in_count=0))
+    await db_session.commit()
+    assert await reconcile_event_counters(db_session) == 1
+    await db_session.commit()
+    assert await _counters(db_session, ids["event_id"]) == (0, 1)
@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from backend.models.operation import SessionCheckIn
+from backend.services.event_hub import EventHub, event_hub
+
+
+@pytest.mark.asyncio
+async def test_hub_replays_after_last_event_id_and_drops_slow_subscribers():
+    hub = EventHub(max_queue=2, replay_size=10)
+    for i in range(3):
+        hub.publish("payment.created", {"n": i})
+
+    resumed = hub.subscribe(last_event_id=1)
+    assert [resumed.queue.get_nowait().data["n"] for _ in range(2)] == [1, 2]
+
+    hub.publish("payment.created", {"n": 3})
+    hub.publish("payment.created", {"n": 4})
+    hub.publish("payment.created", {"n": 5})  # queue (size 2) overflows
+    assert resumed.closed
+    assert hub.subscriber_count == 0
+    assert hub.dropped_subscribers == 1
+
+
+@pytest.mark.asyncio
+async def test_checkin_and_delete_are_published(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=1)
+    subscriber = event_hub.subscribe()
+
+    resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers)
+    assert resp.status_code == 200
+    created = subscriber.queue.get_nowait()
+    assert created.type == "checkin.created"
+    assert created.data["event_id"] == ids["event_id"]
+    assert created.data["activity"]["user_name"] == "Member0 Test"
+
+    checkin_id = (await db_session.execute(select(SessionCheckIn.id))).scalar_one()
+    await client.delete(f"/api/v1/checkin/history/{checkin_id}", headers=headers)
+    deleted = subscriber.queue.get_nowait()
+    assert (deleted.type, deleted.data["checkin_id"]) == ("checkin.deleted", checkin_id)
+
+    # Rejected check-ins publish nothing
+    await client.post("/api/v1/checkin/check-in", json={"qr_token": "UNKNOWN"}, headers=headers)
+    assert subscriber.queue.empty()
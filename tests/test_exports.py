@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from backend.models.operation import Payment, Subscription
+from backend.services.dashboard_stats import sibling_session_factory
+from backend.services.exports import ExportFilters, stream_export
+
+
+async def _seed_exports(client, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=2)
+    subscriptions = (await db_session.execute(
+        select(Subscription.id, Subscription.member_user_id).order_by(Subscription.id)
+    )).all()
+    await db_session.execute(insert(Payment), [
+        {"subscription_id": subscriptions[0].id, "recorded_by_user_id": ids["staff_id"], "amount_paid": 40,
+         "payment_method": "NAKIT", "payment_date": datetime(2026, 3, 1, 9)},
+        {"subscription_id": subscriptions[1].id, "recorded_by_user_id": ids["staff_id"], "amount_paid": 25,
+         "payment_method": "KREDI_KARTI", "payment_date": datetime(2026, 3, 2, 9)},
+        {"subscription_id": subscriptions[0].id, "recorded_by_user_id": ids["staff_id"], "amount_paid": 10,
+         "payment_method": "NAKIT", "payment_date": datetime(2026, 4, 15, 9)},
+    ])
+    await db_session.commit()
+    for token in tokens:
+        resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": token, "event_id": ids["event_id"]}, headers=headers)
+        assert resp.status_code == 200
+    return headers, subscriptions
+
+
+@pytest.mark.asyncio
+async def test_payment_export_csv_and_ndjson_with_filters(client: AsyncClient, db_session, seed_gym):
+    headers, subscriptions = await _seed_exports(client, db_session, seed_gym)
+
+    resp = await client.get("/api/v1/exports/payments", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [(r["amount_paid"], r["payment_method"]) for r in rows] == [("40.00", "NAKIT"), ("25.00", "KREDI_KARTI"), ("10.00", "NAKIT")]
+    assert rows[0]["package_name"] == "Pilates Pack"
+    assert rows[0]["recorded_by"] == "Staff User"
+
+    filtered = await client.get("/api/v1/exports/payments", params={
+        "format": "ndjson", "start": "2026-03-01", "end": "2026-03-31", "payment_method": "NAKIT",
+    }, headers=headers)
+    lines = [json.loads(line) for line in filtered.text.splitlines()]
+    assert [(line["amount_paid"], line["member_user_id"]) for line in lines] == [("40.00", subscriptions[0].member_user_id)]
+
+    by_member = await client.get("/api/v1/exports/subscriptions", params={
+        "format": "ndjson", "member_id": subscriptions[1].member_user_id,
+    }, headers=headers)
+    [subscription] = [json.loads(line) for line in by_member.text.splitlines()]
+    assert (subscription["id"], subscription["status"]) == (subscriptions[1].id, "active")
+
+
+@pytest.mark.asyncio
+async def test_check_in_export_and_validation(client: AsyncClient, db_session, seed_gym):
+    headers, _ = await _seed_exports(client, db_session, seed_gym)
+
+    rows = list(csv.DictReader(io.StringIO((await client.get("/api/v1/exports/check_ins", headers=headers)).text)))
+    assert len(rows) == 2
+    assert {r["class_name"] for r in rows} == {"Reformer"}
+
+    assert (await client.get("/api/v1/exports/check_ins", params={"payment_method": "NAKIT"}, headers=headers)).status_code == 400
+    assert (await client.get("/api/v1/exports/invoices", headers=headers)).status_code == 404
+    assert (await client.get("/api/v1/exports/payments", params={"start": "2026-02-01", "end": "2026-01-01"}, headers=headers)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stream_export_yields_one_chunk_per_partition(client: AsyncClient, db_session, seed_gym):
+    await _seed_exports(client, db_session, seed_gym)
+
+    chunks = [chunk async for chunk in stream_export(
+        sibling_session_factory(db_session), "payments", ExportFilters(), "ndjson", chunk_rows=2
+    )]
+    assert [chunk.count("\n") for chunk in chunks] == [2, 1]
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+
+from backend.models.idempotency import IdempotencyKey
+from backend.models.operation import Payment, SessionCheckIn, Subscription
+from backend.services.idempotency import purge_expired, request_fingerprint
+
+
+@pytest.mark.asyncio
+async def test_retried_payment_is_replayed_not_recorded_twice(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=1)
+    subscription_id = (await db_session.execute(select(Subscription.id))).scalar_one()
+    payload = {"subscription_id": subscription_id, "amount_paid": "40", "payment_method": "NAKIT"}
+    keyed = {**headers, "Idempotency-Key": "pay-1"}
+
+    first = await client.post("/api/v1/sales/payments", json=payload, headers=keyed)
+    retry = await client.post("/api/v1/sales/payments", json=payload, headers=keyed)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers.get("idempotency-replayed") == "true"
+    assert "idempotency-replayed" not in first.headers
+    assert (await db_session.execute(select(func.count(Payment.id)))).scalar_one() == 1
+
+    # Same key, different body: rejected without touching the data
+    other = await client.post("/api/v1/sales/payments", json={**payload, "amount_paid": "41"}, headers=keyed)
+    assert other.status_code == 422
+    # Without a key every POST still runs
+    plain = await client.post("/api/v1/sales/payments", json=payload, headers=headers)
+    assert plain.status_code == 200
+    assert (await db_session.execute(select(func.count(Payment.id)))).scalar_one() == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_outcomes_are_not_stored(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=1, members=1)
+    keyed = {**headers, "Idempotency-Key": "checkin-1"}
+
+    # Unauthenticated attempt does not claim the key
+    anonymous = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0]}, headers={"Idempotency-Key": "checkin-1"})
+    assert anonymous.status_code == 401
+
+    payload = {"qr_token": tokens[0], "event_id": ids["event_id"]}
+    first = await client.post("/api/v1/checkin/check-in", json=payload, headers=keyed)
+    retry = await client.post("/api/v1/checkin/check-in", json=payload, headers=keyed)
+    assert first.status_code == 200
+    assert retry.json() == first.json()
+    assert (await db_session.execute(select(func.count(SessionCheckIn.id)))).scalar_one() == 1
+
+    # A request still running on the server makes retries wait
+    body = json.dumps(payload).encode()
+    await db_session.execute(insert(IdempotencyKey), [{
+        "scope": ids["staff_id"], "key": "running", "endpoint": "POST /api/v1/checkin/check-in",
+        "request_hash": request_fingerprint("POST", "/api/v1/checkin/check-in", "", body),
+        "expires_at": datetime.now(timezone.utc) + timedelta(hours=1),
+    }])
+    await db_session.commit()
+    busy = await client.post("/api/v1/checkin/check-in", content=body, headers={
+        **headers, "Idempotency-Key": "running", "Content-Type": "application/json",
+    })
+    assert busy.status_code == 409
+    assert busy.headers.get("retry-after") == "1"
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_removes_only_expired_keys(db_session):
+    now = datetime.now(timezone.utc)
+    await db_session.execute(insert(IdempotencyKey), [
+        {"scope": "u1", "key": "old", "endpoint": "POST /x", "request_hash": "h", "status_code": 200,
+         "response_body": "{}", "expires_at": now - timedelta(minutes=1)},
+        {"scope": "u1", "key": "new", "endpoint": "POST /x", "request_hash": "h", "status_code": 200,
+         "response_body": "{}", "expires_at": now + timedelta(hours=1)},
+    ])
+    await db_session.commit()
+
+    assert await purge_expired(db_session, now) == 1
+    await db_session.commit()
+    assert (await db_session.execute(select(IdempotencyKey.key))).scalars().all() == ["new"]
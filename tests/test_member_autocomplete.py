@@ -0,0 +1,113 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from backend.models.user import Role, User
+from backend.services.member_autocomplete import MemberAutocompleteIndex, MemberEntry, member_autocomplete_index
+
+
+def _entry(member_id, first, last, email, phone=None, active=True):
+    return MemberEntry(member_id, first, last, email, phone, active)
+
+
+def test_prefix_lookup_ranks_shortest_token_first():
+    index = MemberAutocompleteIndex()
+    index._build([
+        _entry("1", "Alican", "Kaya", "alican@test.com"),
+        _entry("2", "Ali", "Işık", "ali.isik@test.com", "0532 111 22 33"),
+        _entry("3", "Zeynep", "Alioğlu", "zeynep@test.com"),
+        _entry("4", "Ali", "Pasif", "pasif@test.com", active=False),
+    ])
+
+    # "ali" < "ali isik" < "alican" < "alioglu"
+    assert [e.id for e in index.lookup("ali")] == ["2", "1", "3"]
+    assert [e.id for e in index.lookup("ALİ", include_inactive=True)] == ["2", "4", "1", "3"]
+    assert [e.id for e in index.lookup("ali ış")] == ["2"]
+    assert [e.id for e in index.lookup("isik ali")] == ["2"]
+    assert [e.id for e in index.lookup("532 111")] == ["2"]
+    assert [e.id for e in index.lookup("zeynep@")] == ["3"]
+    assert index.lookup("ali", limit=1)[0].id == "2"
+    assert index.lookup("xyz") == [] and index.lookup(" ") == []
+
+    index._remove("2")
+    index._add(_entry("2", "Veli", "Işık", "veli@test.com"))
+    assert [e.id for e in index.lookup("ali")] == ["1", "3"]
+    assert [e.id for e in index.lookup("vel")] == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_follows_member_writes(client: AsyncClient, db_session):
+    db_session.add(Role(role_name="MEMBER"))
+    await db_session.commit()
+
+    async def suggest(q, **params):
+        response = await client.get("/api/v1/members/autocomplete", params={"q": q, **params})
+        assert response.status_code == 200
+        return [f"{m['first_name']} {m['last_name']}" for m in response.json()]
+
+    created = await client.post("/api/v1/members/", json={
+        "email": "ipek@test.com", "first_name": "İpek", "last_name": "Işık", "password": "secret123",
+    })
+    assert created.status_code == 200
+    assert await suggest("ipe") == ["İpek Işık"]
+    assert member_autocomplete_index.reloads == 1
+
+    # Created after the first load: applied incrementally, no full reload
+    await client.post("/api/v1/members/", json={
+        "email": "ipek2@test.com", "first_name": "Ipek", "last_name": "Demir", "password": "secret123",
+    })
+    assert sorted(await suggest("IPEK")) == ["Ipek Demir", "İpek Işık"]
+    member_id = created.json()["id"]
+    await client.put(f"/api/v1/members/{member_id}", json={"last_name": "Şahin", "is_active": False})
+    assert await suggest("sahin") == []
+    assert await suggest("sahin", include_inactive=True) == ["İpek Şahin"]
+    assert await suggest("isik", include_inactive=True) == []
+
+    await client.delete(f"/api/v1/members/{member_id}")
+    assert await suggest("ipek", include_inactive=True) == ["Ipek Demir"]
+    assert member_autocomplete_index.reloads == 1
+
+    # Staff are not members
+    staff = User(email="coach@test.com", first_name="Ipek", last_name="Coach", password_hash="x")
+    staff.roles.append(Role(role_name="INSTRUCTOR"))
+    db_session.add(staff)
+    await db_session.commit()
+    assert await suggest("ipek") == ["Ipek Demir"]
+    assert (await db_session.execute(select(User.id).where(User.email == "coach@test.com"))).scalar_one()
+
+    assert (await client.get("/api/v1/members/autocomplete", params={"q": ""})).status_code == 422
+
+
+class _CommitDuringLoad:
+    """Session wrapper committing a member right after the first query read its rows."""
+
+    def __init__(self, db, member):
+        self.db = db
+        self.member = member
+
+    async def execute(self, statement):
+        rows = (await self.db.execute(statement)).all()
+        if self.member is not None:
+            self.db.add(self.member)
+            await self.db.commit()
+            self.member = None
+        return rows
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("loaded_before", [False, True])
+async def test_members_committed_during_a_load_are_applied(db_session, loaded_before):
+    role = Role(role_name="MEMBER")
+    db_session.add(role)
+    await db_session.commit()
+    index = member_autocomplete_index
+    if loaded_before:
+        # A reload after invalidate() races the same way as the first load
+        await index.ensure_current(db_session)
+        index.invalidate()
+    late = User(email="late@test.com", first_name="Lale", last_name="Geç", password_hash="x")
+    late.roles.append(role)
+
+    await index.ensure_current(_CommitDuringLoad(db_session, late))
+    assert [e.email for e in index.lookup("lale")] == ["late@test.com"]
+    assert index.reloads == (2 if loaded_before else 1)
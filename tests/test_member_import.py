@@ -0,0 +1,116 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from backend.models.operation import Payment, Subscription, SubscriptionQrCode
+from backend.models.stats import DailyRevenueRollup
+from backend.models.user import Role, User
+
+CSV = """email,first_name,last_name,phone_number,password,package,start_date,amount_paid,payment_method
+new1@test.com,Ayşe,Yılmaz,5551112233,,,,,
+new2@test.com,Mehmet,Demir,,secret,Pilates Pack,2030-01-06,40,NAKIT
+new1@test.com,Dup,Row,,,,,,
+m0@test.com,Existing,Member,,,,,,
+new3@test.com,No,Package,,,Missing Pack,,,
+not-an-email,Bad,Email,,,,,,
+new4@test.com,No,Method,,,Pilates Pack,,25,
+new5@test.com,Full,Price,,,Pilates Pack,,100,KREDI_KARTI
+"""
+
+
+async def _admin_headers(db_session, seed_gym):
+    ids, _, headers = await seed_gym(members=1)
+    staff = (await db_session.execute(
+        select(User).where(User.id == ids["staff_id"]).options(selectinload(User.roles))
+    )).scalar_one()
+    staff.roles.append(Role(role_name="ADMIN"))
+    await db_session.commit()
+    return headers
+
+
+async def _upload(client, headers, content, **params):
+    return await client.post(
+        "/api/v1/members/import",
+        params=params,
+        files={"file": ("members.csv", content.encode("utf-8"), "text/csv")},
+        headers=headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_writes_valid_rows_and_reports_the_rest(client: AsyncClient, db_session, seed_gym):
+    headers = await _admin_headers(db_session, seed_gym)
+
+    resp = await _upload(client, headers, CSV, batch_size=2)
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert (report["total_rows"], report["imported_members"], report["imported_subscriptions"]) == (8, 3, 2)
+    assert report["imported_payments"] == 2
+    assert {e["row"]: e["errors"][0].split(":")[0] for e in report["errors"]} == {
+        4: "email", 5: "email", 6: "package", 7: "email", 8: "Value error, payment_method is required when amount_paid is set",
+    }
+
+    members = (await client.get("/api/v1/members/", params={"search": "new"}, headers=headers)).json()
+    assert sorted(m["email"] for m in members) == ["new1@test.com", "new2@test.com", "new5@test.com"]
+    assert next(m for m in members if m["email"] == "new1@test.com")["phone_number"] == "555-111-2233"
+
+    subscription = (await db_session.execute(
+        select(Subscription).join(User, User.id == Subscription.member_user_id).where(User.email == "new2@test.com")
+    )).scalar_one()
+    assert (float(subscription.paid_total), float(subscription.balance)) == (40.0, 60.0)
+    assert subscription.start_date.year == 2030
+    assert (await db_session.execute(
+        select(func.count()).select_from(SubscriptionQrCode).where(SubscriptionQrCode.subscription_id == subscription.id)
+    )).scalar_one() == 1
+    assert (await db_session.execute(select(func.sum(Payment.amount_paid)))).scalar_one() == 140
+    rollups = (await db_session.execute(
+        select(DailyRevenueRollup.payment_method, DailyRevenueRollup.amount_total)
+    )).all()
+    assert sorted((m, float(a)) for m, a in rollups) == [("KREDI_KARTI", 100.0), ("NAKIT", 40.0)]
+
+
+@pytest.mark.asyncio
+async def test_import_dry_run_and_bad_header(client: AsyncClient, db_session, seed_gym):
+    headers = await _admin_headers(db_session, seed_gym)
+    before = (await db_session.execute(select(func.count(User.id)))).scalar_one()
+
+    report = (await _upload(client, headers, CSV, dry_run="true")).json()
+    assert report["dry_run"] is True
+    assert report["imported_members"] == 3
+    assert (await db_session.execute(select(func.count(User.id)))).scalar_one() == before
+
+    bad = await _upload(client, headers, "mail,name\nx@test.com,X\n")
+    assert bad.status_code == 400
+    assert "email" in bad.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_import_stops_at_unreadable_line_and_keeps_earlier_batches(client: AsyncClient, db_session, seed_gym):
+    headers = await _admin_headers(db_session, seed_gym)
+    # Loaded before the import, so it must be invalidated by it
+    assert (await client.get("/api/v1/members/autocomplete", params={"q": "partial"}, headers=headers)).json() == []
+
+    # Invalid UTF-8 well past the first read chunk of the upload stream
+    rows = "".join(f"partial{i}@test.com,Partial{i},Import\n" for i in range(1000))
+    content = b"email,first_name,last_name\n" + rows.encode("utf-8") + b"bad\xff@test.com,Bad,Bytes\n"
+    resp = await client.post(
+        "/api/v1/members/import",
+        params={"batch_size": 100},
+        files={"file": ("members.csv", content, "text/csv")},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    imported = report["imported_members"]
+    assert 0 < imported <= 1000 and report["total_rows"] == imported and report["failed_rows"] == 0
+    assert report["read_error"]["row"] == imported + 2
+    assert report["read_error"]["errors"][0].startswith("unreadable CSV")
+    assert (await db_session.execute(
+        select(func.count(User.id)).where(User.email.like("partial%"))
+    )).scalar_one() == imported
+
+    suggestions = (await client.get(
+        "/api/v1/members/autocomplete", params={"q": "partial0"}, headers=headers
+    )).json()
+    assert "Partial0" in [m["first_name"] for m in suggestions]
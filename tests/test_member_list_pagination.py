@@ -0,0 +1,70 @@
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+
+from backend.models.user import Role, User
+
+
+async def _walk(client: AsyncClient, path: str, limit: int, **params):
+    """Follow X-Next-Cursor to the end; returns the ids in page order."""
+    ids, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(path, params=query)
+        assert response.status_code == 200
+        ids.extend(u["id"] for u in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.asyncio
+async def test_member_list_cursor_walk_and_cached_total(client: AsyncClient, db_session):
+    member_role, staff_role = Role(role_name="MEMBER"), Role(role_name="INSTRUCTOR")
+    db_session.add_all([member_role, staff_role])
+    await db_session.commit()
+
+    # Ties on updated_at, server-default timestamps and an inactive member
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(7):
+        user = User(
+            email=f"m{i}@test.com", first_name=f"Member{i}", last_name="Test", password_hash="x",
+            is_active=i != 6, updated_at=base + timedelta(minutes=i // 2),
+        )
+        user.roles.append(member_role)
+        db_session.add(user)
+    staff = User(email="coach@test.com", first_name="Coach", last_name="Test", password_hash="x")
+    staff.roles.append(staff_role)
+    db_session.add(staff)
+    await db_session.flush()
+    staff_id = staff.id
+    await db_session.commit()
+    for i in range(3):
+        response = await client.post("/api/v1/members/", json={
+            "email": f"api{i}@test.com", "first_name": "Api", "last_name": f"Member{i}", "password": "secret123",
+        })
+        assert response.status_code == 200
+
+    everything = [u["id"] for u in (await client.get("/api/v1/members/", params={"limit": 100})).json()]
+    assert len(everything) == 9
+    for limit in (1, 2, 3):
+        assert await _walk(client, "/api/v1/members/", limit) == everything
+    assert len(await _walk(client, "/api/v1/members/", 2, include_inactive="true")) == 10
+
+    response = await client.get("/api/v1/members/", params={"limit": 2, "total_mode": "cached"})
+    assert response.headers["X-Total-Count"] == "9"
+    assert "X-Total-Count" not in (await client.get("/api/v1/members/", params={"limit": 2})).headers
+    # Writes drop the cached total
+    await client.post("/api/v1/members/", json={
+        "email": "api9@test.com", "first_name": "Api", "last_name": "Member9", "password": "secret123",
+    })
+    response = await client.get("/api/v1/members/", params={"limit": 2, "total_mode": "cached"})
+    assert response.headers["X-Total-Count"] == "10"
+    response = await client.get("/api/v1/members/", params={"search": "member3", "total_mode": "exact"})
+    assert response.headers["X-Total-Count"] == "1" and "X-Next-Cursor" not in response.headers
+
+    cursor = (await client.get("/api/v1/members/", params={"limit": 2})).headers["X-Next-Cursor"]
+    assert (await client.get("/api/v1/members/", params={"cursor": cursor, "search": "api"})).status_code == 400
+    assert (await client.get("/api/v1/members/", params={"cursor": "not-a-cursor"})).status_code == 400
+
+    assert await _walk(client, "/api/v1/staff/", 1, total_mode="exact") == [staff_id]
@@ -0,0 +1,109 @@
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.core.config import settings
+from backend.models.operation import ClassEvent, Payment, PaymentMethod, SessionCheckIn, Subscription, SubscriptionQrCode
+from backend.models.purge import MemberPurgeJob
+from backend.models.user import User
+from backend.services.member_purge import request_purge, run_purge_job
+
+
+def _provider(db_session):
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+    async def provider():
+        async with factory() as session:
+            yield session
+    return provider
+
+
+async def _count(db_session, model, *conditions):
+    return (await db_session.execute(select(func.count()).select_from(model).where(*conditions))).scalar_one()
+
+
+async def _member_ids(db_session):
+    rows = await db_session.execute(
+        select(User.id, Subscription.id).join(Subscription, Subscription.member_user_id == User.id).order_by(User.email)
+    )
+    return rows.all()
+
+
+@pytest.mark.asyncio
+async def test_delete_member_purges_in_batches(client: AsyncClient, db_session, monkeypatch, seed_gym):
+    monkeypatch.setattr(settings, "MEMBER_PURGE_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "MEMBER_PURGE_BATCH_PAUSE_SECONDS", 0)
+    ids, tokens, headers = await seed_gym(capacity=5, members=2)
+    (member_id, subscription_id), (other_id, other_subscription_id) = await _member_ids(db_session)
+
+    for token in tokens:
+        response = await client.post(
+            "/api/v1/checkin/check-in", json={"qr_token": token, "event_id": ids["event_id"]}, headers=headers
+        )
+        assert response.status_code == 200
+    for amount in ("40", "60"):
+        db_session.add(Payment(
+            subscription_id=subscription_id, recorded_by_user_id=ids["staff_id"],
+            amount_paid=Decimal(amount), payment_method=PaymentMethod.NAKIT,
+        ))
+    await db_session.commit()
+
+    response = await client.delete(f"/api/v1/members/{member_id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == member_id and body["is_active"] is False
+
+    # The background task ran after the response
+    job = (await client.get(f"/api/v1/members/purge-jobs/{body['purge_job']['id']}")).json()
+    assert job["status"] == "completed" and job["attempts"] == 1
+    # qr code, 2 payments, check-in, subscription, user row; one batch each at batch size 1
+    assert job["deleted_rows"] == 6 and job["batches"] == 5
+
+    assert (await client.get(f"/api/v1/members/{member_id}")).status_code == 404
+    assert await _count(db_session, Subscription, Subscription.member_user_id == member_id) == 0
+    assert await _count(db_session, Payment, Payment.subscription_id == subscription_id) == 0
+    assert await _count(db_session, SessionCheckIn, SessionCheckIn.member_user_id == member_id) == 0
+    # The other member is untouched and the event counter follows
+    assert await _count(db_session, SessionCheckIn, SessionCheckIn.member_user_id == other_id) == 1
+    assert await _count(db_session, Subscription, Subscription.id == other_subscription_id) == 1
+    checked_in = (await db_session.execute(
+        select(ClassEvent.checked_in_count).where(ClassEvent.id == ids["event_id"])
+    )).scalar_one()
+    assert checked_in == 1
+
+    assert (await client.get("/api/v1/members/purge-jobs/missing")).status_code == 404
+    assert (await client.delete(f"/api/v1/members/{member_id}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_purge_deactivates_first_and_runs_once(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(members=1)
+    ((member_id, subscription_id),) = await _member_ids(db_session)
+    user = await db_session.get(User, member_id)
+
+    job = await request_purge(db_session, user)
+    job_id = job.id
+    assert job.status == "pending"
+    # Deleting again while queued reuses the job
+    user = await db_session.get(User, member_id)
+    assert (await request_purge(db_session, user)).id == job_id
+
+    # Deactivated before any row is deleted: the member can no longer check in
+    qr_active = (await db_session.execute(
+        select(SubscriptionQrCode.is_active).where(SubscriptionQrCode.subscription_id == subscription_id)
+    )).scalar_one()
+    assert qr_active is False
+    response = await client.post(
+        "/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers
+    )
+    assert response.status_code != 200
+
+    provider = _provider(db_session)
+    assert await run_purge_job(provider, job_id, pause=0) == "completed"
+    # Finished jobs are not claimable again
+    assert await run_purge_job(provider, job_id, pause=0) is None
+    status = (await db_session.execute(select(MemberPurgeJob.status).where(MemberPurgeJob.id == job_id))).scalar_one()
+    assert status == "completed"
+    assert await _count(db_session, User, User.id == member_id) == 0
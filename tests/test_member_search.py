@@ -0,0 +1,88 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.models.user import Role, User
+from backend.services.member_search import fold_text, normalize_term, rebuild_search_text
+from tests.benchmarks.bench_member_search import PREFIXES, TERMS, run
+
+
+async def _seed_members(db_session):
+    member_role, staff_role = Role(role_name="MEMBER"), Role(role_name="INSTRUCTOR")
+    people = [
+        ("İpek", "Işık", "ipek@test.com", None, member_role),
+        ("Ipek", "Demir", "ipek.d@test.com", None, member_role),
+        ("Mehmet", "Işıklar", "mehmet@test.com", None, member_role),
+        ("Ahmet", "Yılmaz", "ahmet@test.com", "0532 111 22 33", member_role),
+        ("Çağrı", "Öztürk", "cagri@test.com", None, staff_role),
+    ]
+    for first_name, last_name, email, phone, role in people:
+        user = User(first_name=first_name, last_name=last_name, email=email, phone_number=phone, password_hash="x")
+        user.roles.append(role)
+        db_session.add(user)
+    await db_session.commit()
+
+
+async def _names(client: AsyncClient, path: str, search: str):
+    response = await client.get(path, params={"search": search})
+    assert response.status_code == 200
+    return [f"{u['first_name']} {u['last_name']}" for u in response.json()]
+
+
+def test_turkish_folding():
+    assert fold_text("İPEK  Işık") == "ipek isik"
+    assert fold_text("Çağrı Öztürk") == "cagri ozturk"
+    assert fold_text("José") == "jose"
+    assert normalize_term("+90 (532) 111-22") == "9053211122"
+    assert normalize_term("  ") == ""
+
+
+@pytest.mark.asyncio
+async def test_member_search_is_case_and_diacritic_insensitive(client: AsyncClient, db_session):
+    await _seed_members(db_session)
+
+    assert set(await _names(client, "/api/v1/members/", "ISIK")) == {"İpek Işık", "Mehmet Işıklar"}
+    assert set(await _names(client, "/api/v1/members/", "ışık")) == {"İpek Işık", "Mehmet Işıklar"}
+    # Best match first
+    assert (await _names(client, "/api/v1/members/", "ipek işık"))[0] == "İpek Işık"
+    # Phone digits regardless of formatting
+    assert await _names(client, "/api/v1/members/", "532 111 22") == ["Ahmet Yılmaz"]
+    # Too short for trigrams: scan with prefix matches first
+    assert await _names(client, "/api/v1/members/", "me") == ["Mehmet Işıklar", "Ahmet Yılmaz"]
+    assert await _names(client, "/api/v1/members/", "zzz") == []
+    # Staff list uses the same index
+    assert await _names(client, "/api/v1/staff/", "cagri") == ["Çağrı Öztürk"]
+    assert await _names(client, "/api/v1/members/", "cagri") == []
+
+
+@pytest.mark.asyncio
+async def test_search_follows_edits_and_rebuild(client: AsyncClient, db_session):
+    await _seed_members(db_session)
+    user_id = (await db_session.execute(select(User.id).where(User.email == "ipek.d@test.com"))).scalar_one()
+
+    response = await client.put(f"/api/v1/members/{user_id}", json={"last_name": "Şahin"})
+    assert response.status_code == 200
+    assert await _names(client, "/api/v1/members/", "sahin") == ["Ipek Şahin"]
+    assert await _names(client, "/api/v1/members/", "demir") == []
+
+    # Rows written around the ORM (e.g. before the migration) are filled by the rebuild
+    await db_session.execute(update(User).values(search_text=None, updated_at=User.updated_at))
+    await db_session.commit()
+    assert await _names(client, "/api/v1/members/", "sahin") == []
+    before = (await db_session.execute(select(User.updated_at).where(User.id == user_id))).scalar_one()
+
+    assert await rebuild_search_text(db_session, batch_size=2) == 5
+    await db_session.commit()
+    assert await _names(client, "/api/v1/members/", "sahin") == ["Ipek Şahin"]
+    after = (await db_session.execute(select(User.updated_at).where(User.id == user_id))).scalar_one()
+    assert after == before
+
+
+@pytest.mark.asyncio
+async def test_member_search_benchmark_smoke():
+    report = await run(sizes=[50, 200], repeats=1)
+
+    for size in ("50", "200"):
+        for phase in ("indexed", "ilike_scan"):
+            assert report["results"][size][phase]["status_counts"] == {"200": len(TERMS)}
+        assert report["results"][size]["autocomplete"]["status_counts"] == {"200": len(PREFIXES)}
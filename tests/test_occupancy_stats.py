@@ -0,0 +1,97 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.core.time_utils import get_turkey_time
+from backend.models.operation import (
+    Booking,
+    ClassEvent,
+    ClassSeries,
+    ClassSeriesException,
+    ClassTemplate,
+    Subscription,
+)
+from backend.services.occupancy_stats import load_occupancy
+from tests.benchmarks.bench_occupancy import run
+
+
+@pytest.mark.asyncio
+async def test_occupancy_heatmap_counts_fill_and_no_shows(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=4, members=2)
+    subscriptions = (await db_session.execute(select(Subscription))).scalars().all()
+    for subscription in subscriptions:
+        db_session.add(Booking(member_user_id=subscription.member_user_id, event_id=ids["event_id"], subscription_id=subscription.id))
+    await db_session.commit()
+    resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers)
+    assert resp.status_code == 200
+
+    # Move the class into the past: Monday of last week, 18:00 local
+    today = get_turkey_time().date()
+    monday = today - timedelta(days=today.weekday() + 7)
+    start = datetime.combine(monday, datetime.min.time()) + timedelta(hours=18)
+    await db_session.execute(
+        update(ClassEvent).where(ClassEvent.id == ids["event_id"])
+        .values(start_time=start, end_time=start + timedelta(hours=1), booked_count=2)
+    )
+    await db_session.commit()
+
+    params = {"start": str(monday - timedelta(days=1)), "end": str(today)}
+    resp = await client.get("/api/v1/stats/occupancy", params=params, headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["cache"]["cached"] is False
+    [cell] = body["cells"]
+    assert (cell["weekday"], cell["hour"], cell["template_name"]) == (1, 18, "Reformer")
+    assert (cell["events"], cell["booked_total"], cell["check_ins"], cell["no_shows"]) == (1, 2, 1, 1)
+    assert cell["avg_fill_rate"] == 0.25
+    assert cell["avg_booking_rate"] == 0.5
+    assert cell["no_show_rate"] == 0.5
+
+    again = (await client.get("/api/v1/stats/occupancy", params=params, headers=headers)).json()
+    assert again["cache"]["cached"] is True
+    outside = (await client.get("/api/v1/stats/occupancy", params={"start": str(today), "end": str(today)}, headers=headers)).json()
+    assert outside["cells"] == []
+
+    bad = await client.get("/api/v1/stats/occupancy", params={"start": str(today), "end": str(monday)}, headers=headers)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_occupancy_heatmap_counts_series_occurrences_without_rows(db_session, seed_gym):
+    ids, _, _ = await seed_gym(capacity=4, members=1)
+    subscription = (await db_session.execute(select(Subscription))).scalar_one()
+    template = ClassTemplate(name="Mat")
+    db_session.add(template)
+    await db_session.flush()
+    # Mondays 10:00 sold with the subscription, from two weeks ago on
+    today = get_turkey_time().date()
+    monday = today - timedelta(days=today.weekday() + 7)
+    series = ClassSeries(
+        subscription_id=subscription.id, template_id=template.id, instructor_user_id=ids["staff_id"],
+        weekdays="MO", start_time=time(10), starts_on=monday - timedelta(weeks=1),
+        ends_on=monday + timedelta(weeks=2), capacity=2,
+    )
+    db_session.add(series)
+    await db_session.flush()
+    # This week's Monday is cancelled, next week's has not started yet
+    db_session.add(ClassSeriesException(
+        series_id=series.id, occurrence_date=monday + timedelta(weeks=1), is_cancelled=True,
+    ))
+    await db_session.commit()
+
+    cells = await load_occupancy(db_session, monday - timedelta(weeks=1), today + timedelta(weeks=2))
+    [cell] = [c for c in cells if c.template_name == "Mat"]
+    assert (cell.weekday, cell.hour, cell.instructor_user_id) == (1, 10, ids["staff_id"])
+    assert (cell.events, cell.capacity_total, cell.booked_total, cell.check_ins, cell.no_shows) == (2, 4, 2, 0, 2)
+    assert (cell.avg_fill_rate, cell.avg_booking_rate, cell.no_show_rate) == (0.0, 0.5, 1.0)
+
+@pytest.mark.asyncio
+async def test_occupancy_benchmark_smoke():
+    report = await run(days=14, slots=3, members=30, repeats=1)
+
+    for phase in ("sql_cold", "cached"):
+        assert report["results"][phase]["status_counts"] == {"200": 3}
+    assert report["results"]["client_side"]["requests"] == 3
+    assert report["data"]["events"] == 42
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from backend.models.operation import Payment, Subscription
+
+
+async def _seed_payments(db_session, seed_gym, count: int = 7):
+    ids, _, headers = await seed_gym(members=2)
+    subscription_ids = (await db_session.execute(select(Subscription.id).order_by(Subscription.id))).scalars().all()
+    base = datetime(2026, 5, 1, 12, 0)
+    # Pairs share a payment_date so the id tie-breaker is exercised
+    await db_session.execute(insert(Payment), [{
+        "subscription_id": subscription_ids[i % 2], "recorded_by_user_id": ids["staff_id"],
+        "amount_paid": 10 + i, "payment_method": "NAKIT", "payment_date": base + timedelta(hours=i // 2),
+    } for i in range(count)])
+    await db_session.commit()
+    return headers, subscription_ids
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_match_offset_pages(client: AsyncClient, db_session, seed_gym):
+    headers, _ = await _seed_payments(db_session, seed_gym)
+
+    offset_ids = []
+    for page in (1, 2, 3):
+        body = (await client.get("/api/v1/sales/payments", params={"page": page, "size": 3}, headers=headers)).json()
+        offset_ids += [p["id"] for p in body["items"]]
+    assert (body["total"], body["pages"], body["next_cursor"]) == (7, 3, None)
+
+    cursor_ids, cursor = [], None
+    while True:
+        params = {"size": 3, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get("/api/v1/sales/payments", params=params, headers=headers)).json()
+        cursor_ids += [p["id"] for p in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert cursor_ids == offset_ids
+    assert len(set(cursor_ids)) == 7
+
+    bad = await client.get("/api/v1/sales/payments", params={"cursor": "garbage"}, headers=headers)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cached_total_is_invalidated_by_payment_writes(client: AsyncClient, db_session, seed_gym):
+    headers, subscription_ids = await _seed_payments(db_session, seed_gym, count=4)
+
+    first = (await client.get("/api/v1/sales/payments", params={"total_mode": "cached"}, headers=headers)).json()
+    assert (first["total"], first["total_estimated"]) == (4, False)
+
+    # A write outside the API is not seen until the cached count expires...
+    await db_session.execute(insert(Payment), [{
+        "subscription_id": subscription_ids[0], "recorded_by_user_id": first["items"][0]["recorded_by_user_id"],
+        "amount_paid": 1, "payment_method": "NAKIT",
+    }])
+    await db_session.commit()
+    stale = (await client.get("/api/v1/sales/payments", params={"total_mode": "cached"}, headers=headers)).json()
+    assert stale["total"] == 4
+
+    # ...but a payment recorded through the API drops it
+    resp = await client.post("/api/v1/sales/payments", json={
+        "subscription_id": subscription_ids[0], "amount_paid": "5", "payment_method": "NAKIT",
+    }, headers=headers)
+    assert resp.status_code == 200
+    fresh = (await client.get("/api/v1/sales/payments", params={"total_mode": "cached"}, headers=headers)).json()
+    assert fresh["total"] == 6
+
+    # No planner statistics on SQLite: estimated falls back to the cached count
+    estimated = (await client.get("/api/v1/sales/payments", params={"total_mode": "estimated"}, headers=headers)).json()
+    assert (estimated["total"], estimated["total_estimated"]) == (6, False)
+    member_id = (await db_session.execute(
+        select(Subscription.member_user_id).where(Subscription.id == subscription_ids[0])
+    )).scalar_one()
+    filtered = (await client.get("/api/v1/sales/payments", params={
+        "total_mode": "cached", "member_id": member_id,
+    }, headers=headers)).json()
+    assert filtered["total"] == 4
@@ -0,0 +1,130 @@
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from backend.models.user import User
+from backend.models.service import ServiceCategory, ServiceOffering, PlanDefinition, ServicePackage
+from backend.models.operation import Subscription, SubscriptionQrCode, SubscriptionStatus
+from backend.services.qr_token_cache import QrTokenCache, QrTokenSnapshot, qr_token_cache
+
+
+def _snapshot(token: str, subscription_id: str = "sub-1", member_id: str = "member-1") -> QrTokenSnapshot:
+    return QrTokenSnapshot(
+        qr_token=token,
+        subscription_id=subscription_id,
+        member_user_id=member_id,
+        member_first_name="Test",
+        member_last_name="Member",
+        package_id="pkg-1",
+        package_name="Pilates 10",
+        access_type="SESSION_BASED",
+        sessions_granted=10,
+    )
+
+
+def test_cache_entry_expires_after_ttl():
+    now = [0.0]
+    cache = QrTokenCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put(_snapshot("TOKEN"))
+
+    assert cache.get("TOKEN") is not None
+    now[0] = 11.0
+    assert cache.get("TOKEN") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_invalidation_by_subscription_and_member():
+    cache = QrTokenCache()
+    cache.put(_snapshot("A", subscription_id="s1", member_id="m1"))
+    cache.put(_snapshot("B", subscription_id="s2", member_id="m2"))
+    # Rotating a subscription's token drops the old token
+    cache.put(_snapshot("A2", subscription_id="s1", member_id="m1"))
+
+    assert cache.get("A") is None
+    cache.invalidate_subscriptions(["s1"])
+    assert cache.get("A2") is None
+    cache.invalidate_member("m2")
+    assert cache.get("B") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scan_uses_cache_and_delete_invalidates(client: AsyncClient, db_session):
+    member = User(email="cache@test.com", first_name="Cache", last_name="Member", password_hash="x", is_active=True)
+    category = ServiceCategory(name="Fitness")
+    offering = ServiceOffering(name="Pilates", default_duration_minutes=60)
+    plan = PlanDefinition(name="10 Pack", access_type="SESSION_BASED", sessions_granted=10, cycle_period="monthly")
+    db_session.add_all([member, category, offering, plan])
+    await db_session.flush()
+    package = ServicePackage(name="Pilates 10", category_id=category.id, offering_id=offering.id, plan_id=plan.id, price=Decimal("100"))
+    db_session.add(package)
+    await db_session.flush()
+    subscription = Subscription(
+        member_user_id=member.id,
+        package_id=package.id,
+        purchase_price=Decimal("100"),
+        start_date=datetime.now() - timedelta(days=1),
+        end_date=datetime.now() + timedelta(days=30),
+        status=SubscriptionStatus.active,
+        used_sessions=3,
+    )
+    db_session.add(subscription)
+    await db_session.flush()
+    subscription_id = subscription.id
+    db_session.add(SubscriptionQrCode(subscription_id=subscription_id, qr_token="CACHETOKEN", is_active=True))
+    await db_session.commit()
+
+    first = await client.get("/api/v1/checkin/scan", params={"qr_token": "CACHETOKEN"})
+    second = await client.get("/api/v1/checkin/scan", params={"qr_token": "CACHETOKEN"})
+    assert first.json()["valid"] is True
+    assert second.json()["member_name"] == "Cache Member"
+    assert second.json()["remaining_sessions"] == 7
+    assert qr_token_cache.stats()["hits"] == 1
+
+    delete_resp = await client.delete(f"/api/v1/sales/subscriptions/{subscription_id}")
+    assert delete_resp.status_code == 204
+
+    after_delete = await client.get("/api/v1/checkin/scan", params={"qr_token": "CACHETOKEN"})
+    assert after_delete.json()["valid"] is False
+
+
+@pytest.mark.asyncio
+async def test_package_plan_change_invalidates_scan_snapshot(client: AsyncClient, db_session):
+    member = User(email="plan@test.com", first_name="Plan", last_name="Member", password_hash="x", is_active=True)
+    category = ServiceCategory(name="Fitness")
+    offering = ServiceOffering(name="Pilates", default_duration_minutes=60)
+    small = PlanDefinition(name="4 Pack", access_type="SESSION_BASED", sessions_granted=4, cycle_period="monthly")
+    large = PlanDefinition(name="12 Pack", access_type="SESSION_BASED", sessions_granted=12, cycle_period="monthly")
+    db_session.add_all([member, category, offering, small, large])
+    await db_session.flush()
+    package = ServicePackage(name="Pilates 4", category_id=category.id, offering_id=offering.id, plan_id=small.id, price=Decimal("100"))
+    db_session.add(package)
+    await db_session.flush()
+    package_id, large_id = package.id, large.id
+    subscription = Subscription(
+        member_user_id=member.id,
+        package_id=package_id,
+        purchase_price=Decimal("100"),
+        start_date=datetime.now() - timedelta(days=1),
+        end_date=datetime.now() + timedelta(days=30),
+        status=SubscriptionStatus.active,
+        used_sessions=4,
+    )
+    db_session.add(subscription)
+    await db_session.flush()
+    db_session.add(SubscriptionQrCode(subscription_id=subscription.id, qr_token="PLANTOKEN", is_active=True))
+    await db_session.commit()
+
+    before = (await client.get("/api/v1/checkin/scan", params={"qr_token": "PLANTOKEN"})).json()
+    assert (before["valid"], before["message"]) == (False, "Kalan hak yok.")
+    assert qr_token_cache.stats()["size"] == 1
+
+    resp = await client.put(f"/api/v1/services/packages/{package_id}", json={"name": "Pilates 12", "plan_id": large_id})
+    assert resp.status_code == 200, resp.text
+    assert qr_token_cache.stats()["size"] == 0
+
+    after = (await client.get("/api/v1/checkin/scan", params={"qr_token": "PLANTOKEN"})).json()
+    assert after["valid"] is True
+    assert after["remaining_sessions"] == 8
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from backend.models.operation import Subscription
+from backend.services.stats_cache import StatsCache, StatsComponent, stats_cache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once_and_expire_per_component():
+    now = [0.0]
+    cache = StatsCache(ttl_seconds={"fast": 5, "slow": 60}, clock=lambda: now[0])
+    calls = {"fast": 0, "slow": 0}
+
+    def compute(name):
+        async def run():
+            calls[name] += 1
+            await asyncio.sleep(0.01)
+            return calls[name]
+        return run
+
+    results = await asyncio.gather(*(cache.get_or_compute("fast", compute("fast")) for _ in range(10)))
+    assert calls["fast"] == 1
+    assert sum(1 for r in results if not r.cached) == 1
+    await cache.get_or_compute("slow", compute("slow"))
+
+    now[0] = 10.0
+    fast = await cache.get_or_compute("fast", compute("fast"))
+    slow = await cache.get_or_compute("slow", compute("slow"))
+    assert (fast.value, fast.cached) == (2, False)
+    assert (slow.value, slow.cached, slow.age_seconds) == (1, True, 10.0)
+
+    # A different scope (e.g. a new day) is a miss
+    other_day = await cache.get_or_compute("slow", compute("slow"), scope="tomorrow")
+    assert other_day.cached is False
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_compute_is_not_stored():
+    cache = StatsCache()
+
+    async def compute():
+        cache.invalidate("debt")
+        return 1
+
+    await cache.get_or_compute("debt", compute)
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_keyed_components_do_not_keep_a_lock_per_key():
+    cache = StatsCache(ttl_seconds={"uncached": 0}, max_keys=8)
+
+    async def compute():
+        return 1
+
+    # One key per search term, invalidated by writes now and then
+    for i in range(1000):
+        await cache.get_or_compute(StatsComponent.MEMBERS_COUNT, compute, key=(True, f"term{i}"))
+        if i % 100 == 99:
+            cache.invalidate(StatsComponent.MEMBERS_COUNT)
+        await cache.get_or_compute("uncached", compute, key=i)
+    stats = cache.stats()
+    assert stats["size"] <= 8
+    assert stats["locks"] <= stats["size"]
+
+    cache.invalidate()
+    assert cache.stats()["locks"] == 0
+
+@pytest.mark.asyncio
+async def test_dashboard_served_from_cache_until_payment_invalidates(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=1)
+    subscription_id = (await db_session.execute(select(Subscription.id))).scalar_one()
+
+    first = (await client.get("/api/v1/stats/dashboard", headers=headers)).json()
+    second = (await client.get("/api/v1/stats/dashboard", headers=headers)).json()
+    assert first["cache"][StatsComponent.DEBT]["cached"] is False
+    assert all(info["cached"] for info in second["cache"].values())
+
+    resp = await client.post("/api/v1/sales/payments", json={
+        "subscription_id": subscription_id, "amount_paid": "30", "payment_method": "NAKIT",
+    }, headers=headers)
+    assert resp.status_code == 200
+
+    third = (await client.get("/api/v1/stats/dashboard", headers=headers)).json()
+    assert third["pending_payments_amount"] == 70.0
+    assert third["monthly_revenue"] == 30.0
+    assert third["cache"][StatsComponent.DEBT]["cached"] is False
+    assert third["cache"][StatsComponent.MEMBERS]["cached"] is True
+    assert stats_cache.stats()["invalidations"] == 2
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from backend.core.time_utils import get_turkey_time
+from backend.models.operation import Subscription
+from backend.models.stats import DailyAttendanceRollup, DailyRevenueRollup
+from backend.services.stats_rollups import rebuild_rollups
+
+
+async def _rollup_rows(db_session):
+    db_session.expire_all()
+    revenue = (await db_session.execute(
+        select(DailyRevenueRollup.payment_method, DailyRevenueRollup.amount_total, DailyRevenueRollup.payment_count)
+    )).all()
+    attendance = (await db_session.execute(select(DailyAttendanceRollup.check_in_count))).scalars().all()
+    return sorted((m, float(a), n) for m, a, n in revenue), attendance
+
+
+@pytest.mark.asyncio
+async def test_write_hooks_match_rebuild_and_feed_timeseries(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(capacity=5, members=2)
+    subscription_id = (await db_session.execute(select(Subscription.id).limit(1))).scalar_one()
+    for token in tokens:
+        resp = await client.post("/api/v1/checkin/check-in", json={"qr_token": token, "event_id": ids["event_id"]}, headers=headers)
+        assert resp.status_code == 200
+    for amount, method in (("40", "NAKIT"), ("25", "KREDI_KARTI"), ("10", "NAKIT")):
+        resp = await client.post("/api/v1/sales/payments", json={
+            "subscription_id": subscription_id, "amount_paid": amount, "payment_method": method,
+        }, headers=headers)
+        assert resp.status_code == 200
+    await client.delete(f"/api/v1/sales/payments/{resp.json()['id']}", headers=headers)
+
+    hooked = await _rollup_rows(db_session)
+    assert hooked == ([("KREDI_KARTI", 25.0, 1), ("NAKIT", 40.0, 1)], [2])
+    today = get_turkey_time().date()
+    await rebuild_rollups(db_session, today - timedelta(days=1), today)
+    await db_session.commit()
+    assert await _rollup_rows(db_session) == hooked
+
+    resp = await client.get("/api/v1/stats/timeseries", params={
+        "metric": "revenue", "start": str(today - timedelta(days=2)), "end": str(today),
+    }, headers=headers)
+    assert resp.status_code == 200
+    assert [(p["period_start"], p["value"]) for p in resp.json()["points"]] == [
+        (str(today - timedelta(days=2)), 0.0), (str(today - timedelta(days=1)), 0.0), (str(today), 65.0),
+    ]
+
+    by_method = (await client.get("/api/v1/stats/timeseries", params={
+        "metric": "revenue", "start": str(today), "end": str(today), "group_by": "payment_method",
+    }, headers=headers)).json()
+    assert {p["key"]: p["count"] for p in by_method["points"]} == {"KREDI_KARTI": 1, "NAKIT": 1}
+
+
+@pytest.mark.asyncio
+async def test_timeseries_buckets_by_week_and_month(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=1)
+    await db_session.execute(insert(DailyAttendanceRollup), [
+        {"day": date(2026, 1, 30), "package_id": "p1", "check_in_count": 3},  # Friday
+        {"day": date(2026, 2, 1), "package_id": "p1", "check_in_count": 4},   # Sunday, same ISO week
+        {"day": date(2026, 2, 2), "package_id": "p2", "check_in_count": 5},   # Monday
+    ])
+    await db_session.commit()
+
+    params = {"metric": "attendance", "start": "2026-01-26", "end": "2026-02-08"}
+    weekly = (await client.get("/api/v1/stats/timeseries", params={**params, "granularity": "week"}, headers=headers)).json()
+    assert [(p["period_start"], p["value"]) for p in weekly["points"]] == [("2026-01-26", 7.0), ("2026-02-02", 5.0)]
+
+    monthly = (await client.get("/api/v1/stats/timeseries", params={
+        **params, "granularity": "month", "group_by": "package",
+    }, headers=headers)).json()
+    assert [(p["key"], p["period_start"], p["value"]) for p in monthly["points"]] == [
+        ("p1", "2026-01-01", 3.0), ("p1", "2026-02-01", 4.0),
+        ("p2", "2026-01-01", 0.0), ("p2", "2026-02-01", 5.0),
+    ]
+
+    bad = await client.get("/api/v1/stats/timeseries", params={**params, "group_by": "payment_method"}, headers=headers)
+    assert bad.status_code == 400
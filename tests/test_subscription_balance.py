@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.models.operation import Subscription
+from backend.services.subscription_ledger import backfill_balances, verify_balances
+
+
+async def _totals(db_session, subscription_id):
+    db_session.expire_all()
+    row = (await db_session.execute(
+        select(Subscription.paid_total, Subscription.balance).where(Subscription.id == subscription_id)
+    )).one()
+    return row.paid_total, row.balance
+
+
+@pytest.mark.asyncio
+async def test_payments_maintain_balance_and_debt_stats(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=2)
+    subscription_id = (await db_session.execute(select(Subscription.id).limit(1))).scalar_one()
+    assert await _totals(db_session, subscription_id) == (Decimal("0"), Decimal("100"))
+
+    payment = await client.post("/api/v1/sales/payments", json={
+        "subscription_id": subscription_id, "amount_paid": "40", "payment_method": "NAKIT",
+    }, headers=headers)
+    assert payment.status_code == 200
+    assert await _totals(db_session, subscription_id) == (Decimal("40"), Decimal("60"))
+
+    debtors = (await client.get("/api/v1/stats/debt-members", headers=headers)).json()
+    assert sorted(d["debt_amount"] for d in debtors) == [60.0, 100.0]
+    dashboard = (await client.get("/api/v1/stats/dashboard", headers=headers)).json()
+    assert dashboard["pending_payments_amount"] == 160.0
+    assert dashboard["debt_members_count"] == 2
+
+    resp = await client.delete(f"/api/v1/sales/payments/{payment.json()['id']}", headers=headers)
+    assert resp.status_code == 204
+    assert await _totals(db_session, subscription_id) == (Decimal("0"), Decimal("100"))
+    assert await verify_balances(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_repairs_drifted_balances(db_session, seed_gym):
+    await seed_gym(members=2)
+    await db_session.execute(update(Subscription).values(paid_total=5, balance=1))
+    await db_session.commit()
+
+    assert len(await verify_balances(db_session)) == 2
+    assert await backfill_balances(db_session) == 2
+    await db_session.commit()
+    assert await verify_balances(db_session) == []
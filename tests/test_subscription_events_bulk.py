@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from backend.models.operation import Booking, ClassEvent, ClassSeries, Subscription
+from backend.models.user import Role, User
+from tests.benchmarks.common import StatementCounter
+
+
+async def _sell(client, headers, member_id, package_id, instructor_id, repeat_weeks):
+    return await client.post("/api/v1/sales/subscriptions-with-events", json={
+        "member_user_id": member_id,
+        "package_id": package_id,
+        "start_date": str(date.today()),
+        "initial_payment": {"amount_paid": 50, "payment_method": "NAKIT"},
+        "class_events": {
+            "days_and_times": [{"day": "monday", "time": "09:00"}, {"day": "thursday", "time": "18:30"}],
+            "instructor_user_id": instructor_id,
+            "repeat_weeks": repeat_weeks,
+            "capacity": 4,
+        },
+    }, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_sale_statement_count_does_not_grow_with_weeks(client: AsyncClient, db_session, seed_gym):
+    ids, _, headers = await seed_gym(members=4)
+    staff = (await db_session.execute(
+        select(User).where(User.id == ids["staff_id"]).options(selectinload(User.roles))
+    )).scalar_one()
+    staff.roles.append(Role(role_name="INSTRUCTOR"))
+    await db_session.commit()
+    subscriptions = (await db_session.execute(select(Subscription))).scalars().all()
+
+    counter = StatementCounter(db_session.bind)
+    statements = []
+    # The first sales also create the template/permission and warm the permission index
+    for subscription, weeks in zip(subscriptions, (1, 1, 1, 12)):
+        counter.reset()
+        resp = await _sell(client, headers, subscription.member_user_id, subscription.package_id, ids["staff_id"], weeks)
+        assert resp.status_code == 200, resp.text
+        statements.append(counter.reset())
+        body = resp.json()
+        assert len(body["class_events"]) == 2 * weeks
+
+    assert statements[2] == statements[3]
+
+    # Occurrences are expanded from one series per time; nothing is materialized yet
+    created = resp.json()
+    occurrences = created["class_events"]
+    assert {datetime.fromisoformat(e["start_time"]).weekday() for e in occurrences} == {0, 3}
+    assert all(e["booked_count"] == 1 and e["capacity"] == 4 and not e["is_materialized"] for e in occurrences)
+    series = (await db_session.execute(
+        select(ClassSeries.weekdays, ClassSeries.start_time).where(ClassSeries.subscription_id == created["id"])
+    )).all()
+    assert sorted((weekdays, str(start)) for weekdays, start in series) == [("MO", "09:00:00"), ("TH", "18:30:00")]
+    for model in (ClassEvent, Booking):
+        rows = (await db_session.execute(
+            select(func.count()).select_from(model).where(model.subscription_id == created["id"])
+        )).scalar_one()
+        assert rows == 0
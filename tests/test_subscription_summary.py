@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from backend.models.operation import Payment, Subscription
+from tests.benchmarks.common import StatementCounter
+
+
+@pytest.mark.asyncio
+async def test_summary_view_is_a_single_column_projection(client: AsyncClient, db_session, seed_gym):
+    ids, tokens, headers = await seed_gym(sessions_granted=8, capacity=5, members=2)
+    await client.post("/api/v1/checkin/check-in", json={"qr_token": tokens[0], "event_id": ids["event_id"]}, headers=headers)
+    member_id = (await db_session.execute(
+        select(Subscription.member_user_id).where(Subscription.used_sessions == 1)
+    )).scalar_one()
+
+    counter = StatementCounter(db_session.bind)
+    resp = await client.get("/api/v1/sales/subscriptions", params={"member_id": member_id, "view": "summary"}, headers=headers)
+    assert counter.reset() == 1
+    [summary] = resp.json()
+    assert summary["member_name"] == "Member0 Test"
+    assert summary["package_name"] == "Pilates Pack"
+    assert (summary["used_sessions"], summary["sessions_granted"], summary["remaining_sessions"]) == (1, 8, 7)
+    assert (summary["status"], summary["balance"]) == ("active", "100.00")
+    assert "payments" not in summary and "class_events" not in summary
+
+    full = (await client.get("/api/v1/sales/subscriptions", params={"member_id": member_id}, headers=headers)).json()
+    assert counter.reset() > 1
+    assert full[0]["id"] == summary["id"]
+    assert "class_events" in full[0]
+
+
+@pytest.mark.asyncio
+async def test_fields_selects_a_subset(client: AsyncClient, db_session, seed_gym):
+    _, _, headers = await seed_gym(members=2)
+
+    resp = await client.get("/api/v1/sales/subscriptions", params={"fields": "status, end_date,status"}, headers=headers)
+    assert resp.status_code == 200
+    assert [sorted(item) for item in resp.json()] == [["end_date", "id", "status"]] * 2
+
+    bad = await client.get("/api/v1/sales/subscriptions", params={"fields": "status,payments"}, headers=headers)
+    assert bad.status_code == 400
+    assert "payments" in bad.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_member_detail_tab_requests(client: AsyncClient, db_session, seed_gym):
+    ids, _, headers = await seed_gym(members=2)
+    subscriptions = (await db_session.execute(
+        select(Subscription.id, Subscription.member_user_id).order_by(Subscription.id)
+    )).all()
+    await db_session.execute(insert(Payment), [{
+        "subscription_id": subscriptions[i % 2].id, "recorded_by_user_id": ids["staff_id"],
+        "amount_paid": 10, "payment_method": "NAKIT", "payment_date": datetime(2026, 5, 1) + timedelta(hours=i),
+    } for i in range(5)])
+    await db_session.commit()
+    member_id = subscriptions[0].member_user_id
+
+    # Profile / packages tabs: package card fields plus the balance, one statement
+    counter = StatementCounter(db_session.bind)
+    card_fields = "package_name,access_type,status,start_date,end_date,used_sessions,sessions_granted"
+    resp = await client.get(
+        "/api/v1/sales/subscriptions", params={"member_id": member_id, "fields": f"{card_fields},balance"}, headers=headers
+    )
+    assert counter.reset() == 1
+    [row] = resp.json()
+    assert sorted(row) == sorted(["id", "balance", *card_fields.split(",")])
+    assert (row["package_name"], row["access_type"], row["sessions_granted"]) == ("Pilates Pack", "SESSION_BASED", 5)
+
+    # Payments tab: the member's payments page by page, newest first
+    seen, params = [], {"member_id": member_id, "size": 2}
+    while True:
+        page = (await client.get("/api/v1/sales/payments", params=params, headers=headers)).json()
+        seen += page["items"]
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert [p["subscription_id"] for p in seen] == [subscriptions[0].id] * 3
+    assert all(p["package_name"] == "Pilates Pack" for p in seen)
+    assert [p["payment_date"] for p in seen] == sorted((p["payment_date"] for p in seen), reverse=True)
@@ -0,0 +1,71 @@
+import pytest
+from datetime import date, datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from backend.models.operation import Booking, ClassEvent, Subscription
+from backend.models.user import User
+from backend.services.event_counters import refresh_event_counters
+from tests.benchmarks.common import StatementCounter
+
+
+@pytest.mark.asyncio
+async def test_week_calendar_embeds_participants_in_three_queries(client: AsyncClient, db_session, seed_gym):
+    ids, _, _ = await seed_gym(capacity=10, members=5)
+    template_id = (await db_session.execute(
+        select(ClassEvent.template_id).where(ClassEvent.id == ids["event_id"])
+    )).scalar_one()
+    monday = date(2026, 3, 2)
+    events = [
+        ClassEvent(
+            template_id=template_id, instructor_user_id=ids["staff_id"], capacity=10,
+            start_time=datetime(2026, 3, 2, 9) + timedelta(days=day, hours=hour),
+            end_time=datetime(2026, 3, 2, 10) + timedelta(days=day, hours=hour),
+        )
+        for day in range(7) for hour in range(3)
+    ]
+    # Next Monday belongs to the following week
+    events.append(ClassEvent(
+        template_id=template_id, instructor_user_id=ids["staff_id"], capacity=10,
+        start_time=datetime(2026, 3, 9, 9), end_time=datetime(2026, 3, 9, 10),
+    ))
+    db_session.add_all(events)
+    await db_session.flush()
+    busy_event_id = events[4].id
+
+    members = (await db_session.execute(
+        select(User.id, User.first_name, Subscription.id)
+        .join(Subscription, Subscription.member_user_id == User.id)
+        .order_by(User.email)
+    )).all()
+    for offset, (member_id, _, subscription_id) in enumerate(members):
+        db_session.add(Booking(
+            member_user_id=member_id, event_id=busy_event_id, subscription_id=subscription_id,
+            created_at=datetime(2026, 3, 1, 12) + timedelta(minutes=offset),
+        ))
+    await db_session.flush()
+    await refresh_event_counters(db_session, [busy_event_id])
+    await db_session.commit()
+
+    counter = StatementCounter(db_session.bind)
+    # Any day of the week selects the same Monday-Sunday range
+    response = await client.get("/api/v1/operations/calendar", params={"week_start": "2026-03-04"})
+    assert response.status_code == 200
+    # Events, participants and (empty) recurring series
+    assert counter.reset() == 3
+    body = response.json()
+    assert body["week_start"] == monday.isoformat() and body["week_end"] == "2026-03-08"
+    assert len(body["events"]) == 21
+    assert [e["start_time"] for e in body["events"]] == sorted(e["start_time"] for e in body["events"])
+
+    busy = next(e for e in body["events"] if e["id"] == busy_event_id)
+    assert busy["booked_count"] == 5
+    assert [p["member_name"] for p in busy["participants"]] == [f"{m.first_name} Test" for m in members[:3]]
+    assert busy["template"]["name"] == "Reformer"
+    assert busy["instructor"] == {"user_id": ids["staff_id"], "first_name": "Staff", "last_name": "User"}
+    assert all(e["participants"] == [] for e in body["events"] if e["id"] != busy_event_id)
+
+    response = await client.get(
+        "/api/v1/operations/calendar", params={"week_start": "2026-03-09", "participants": 0}
+    )
+    assert [e["participants"] for e in response.json()["events"]] == [[]]